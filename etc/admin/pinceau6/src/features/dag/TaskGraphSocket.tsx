@@ -31,6 +31,10 @@ const TaskGraphSocket: React.FC<TaskGraphSocketProps> = ({
   const [isConnected, setIsConnected] = useState(socket.connected);
 
   const valuesMap = useRef<DataMap>({});
+  // last sequence number received, sent back to resume after a reconnect
+  const lastSeq = useRef<number | undefined>(undefined);
+  // deltas were missed, waiting for the replay or a snapshot
+  const resyncing = useRef<boolean>(false);
   const [streamIndex, setStreamIndex] = useState(0);
 
   const [uiElements, setUiElements] = useState(ui);
@@ -48,8 +52,8 @@ const TaskGraphSocket: React.FC<TaskGraphSocketProps> = ({
 
     function onConnect() {
       setIsConnected(true);
-      console.log("subscribe_dag", graphId);
-      socket.emit("subscribe_dag", { dag: graphId });
+      console.log("subscribe_dag", graphId, lastSeq.current);
+      socket.emit("subscribe_dag", { dag: graphId, seq: lastSeq.current });
     }
 
     function onDisconnect() {
@@ -58,6 +62,30 @@ const TaskGraphSocket: React.FC<TaskGraphSocketProps> = ({
 
     function onMessage(data: DataMap) {
       const value = data["payload"];
+      if ("seq" in value) {
+        if (value["snapshot"]) {
+          valuesMap.current = {};
+        } else if (lastSeq.current === undefined) {
+          // received before the first snapshot, which holds it
+          return;
+        } else if (value["seq"] <= lastSeq.current) {
+          // already applied, received before the snapshot
+          return;
+        } else if (value["seq"] !== lastSeq.current + 1) {
+          // deltas were missed, resume from the last applied one
+          if (!resyncing.current) {
+            resyncing.current = true;
+            socket.emit("unsubscribe_dag", { dag: graphId });
+            socket.emit("subscribe_dag", {
+              dag: graphId,
+              seq: lastSeq.current,
+            });
+          }
+          return;
+        }
+        resyncing.current = false;
+        lastSeq.current = value["seq"];
+      }
       const graphIdPrefix = `${graphId}::`;
       const graphIdPrefixLength = graphIdPrefix.length;
       let callStatusProgressCallback = false;
@@ -23,13 +23,24 @@ from tasks.agent_mongodb_upsert import AgentMongoDBUpsert
 from tasks.build_two_steps_vector_index_task import BuildTwoStepsVectorIndexTask
 from tasks.round_robin_task import RoundRobinTask
 
-with TaskDAG(id="arxiv"):
+# papers indexed concurrently, the search is suspended while they are all busy
+index_in_flight = Config().get("ARXIV_INDEX_IN_FLIGHT", coerce=int, default=4)
+# papers stored together, a partial batch waits at most store_batch_wait seconds
+store_batch_size = Config().get("ARXIV_STORE_BATCH_SIZE", coerce=int, default=32)
+store_batch_wait = (
+    Config().get("ARXIV_STORE_BATCH_WAIT_MS", coerce=float, default=200.0) / 1000
+)
+
+with TaskDAG(id="arxiv", checkpoint=True) as dag:
     search = SearchArxivTask(id="search_arxiv_task")
     content = IndexArxivResultPDF(id="index_arxiv_result")
 
     search >> content
+    dag.set_loop_policy(search, content, max_in_flight=index_in_flight)
 
-with TaskDAG(id="arxiv-2", tags=["RAG"], required_worker_tag="MM1"):
+with TaskDAG(
+    id="arxiv-2", tags=["RAG"], required_worker_tag="MM1", checkpoint=True
+) as dag:
     index = BuildTwoStepsVectorIndexTask(
         id="build_two_steps_vector_index", es_url=Config()["ES_URL"]
     )
@@ -38,6 +49,7 @@ with TaskDAG(id="arxiv-2", tags=["RAG"], required_worker_tag="MM1"):
 
     search >> content
     index >> content
+    dag.set_loop_policy(search, content, max_in_flight=index_in_flight)
     # search >> summary
 
 with TaskDAG(id="arxiv-3", tags=["RAG"], required_worker_tag="MM1"):
@@ -74,7 +86,7 @@ with TaskDAG(id="search-arxiv-2"):
 
     index >> task
 
-with TaskDAG(id="build_title_category_index", required_worker_tag="MM1"):
+with TaskDAG(id="build_title_category_index", required_worker_tag="MM1") as dag:
     arxiv_list_search_cat = ListArxivSearchCatTask(id="arxiv_cat")
     search = SearchArxivTask(id="arxiv_search")
     prepare_index = ArxivTitleCategoryPrepareIndexTask(id="arxiv_prepare_index")
@@ -87,10 +99,16 @@ with TaskDAG(id="build_title_category_index", required_worker_tag="MM1"):
     search >> prepare
     prepare >> store
     store >> confirm
+    dag.set_loop_policy(
+        search, prepare, batch_size=store_batch_size, batch_wait=store_batch_wait
+    )
 
 
 with TaskDAG(
-    id="train_model", required_worker_tag="MM1", tags=["arxiv", "saaswedo", "ml"]
+    id="train_model",
+    required_worker_tag="MM1",
+    tags=["arxiv", "saaswedo", "ml"],
+    checkpoint=True,
 ):
 
     split_data = SplitData(id="split_data", requires_trained_model=False)
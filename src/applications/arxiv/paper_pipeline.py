@@ -0,0 +1,418 @@
+import asyncio
+import concurrent.futures
+import functools
+import logging
+import os
+import shutil
+import tempfile
+import time
+from collections import deque
+from pathlib import Path
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    TYPE_CHECKING,
+    cast,
+)
+
+from conf import Config
+from misc.asyncio import on_loop_shutdown
+from misc.rate_limiter import TokenBucket, shared_token_bucket
+
+if TYPE_CHECKING:
+    import aiohttp
+
+logger = logging.getLogger(__name__)
+
+PAPERS_DOWNLOAD_FOLDER = ".papers"
+
+# (text, metadata) of the parsed pages of a paper
+ParsedPaper = List[Tuple[str, Dict[str, Any]]]
+
+
+class StageStats:
+    """Completed and failed item counts of a pipeline stage, with the
+    throughput over a sliding window"""
+
+    def __init__(self, name: str, window: float = 60.0) -> None:
+        self.name = name
+        self._window = window
+        self._completed: Deque[float] = deque()
+        self._first_completed_at: Optional[float] = None
+        self.completed_count = 0
+        self.error_count = 0
+        self.busy_time = 0.0
+
+    def record(self, duration: float, success: bool = True) -> None:
+        self.busy_time += duration
+        if not success:
+            self.error_count += 1
+            return
+
+        now = time.monotonic()
+        if self._first_completed_at is None:
+            self._first_completed_at = now
+        self.completed_count += 1
+        self._completed.append(now)
+        self._prune(now)
+
+    def _prune(self, now: float) -> None:
+        while self._completed and self._completed[0] < now - self._window:
+            self._completed.popleft()
+
+    def papers_per_minute(self) -> float:
+        if self._first_completed_at is None:
+            return 0.0
+
+        now = time.monotonic()
+        self._prune(now)
+        # don't underestimate the rate while the first window fills up
+        span = max(1.0, min(self._window, now - self._first_completed_at))
+        return len(self._completed) * 60.0 / span
+
+    def as_json(self) -> Dict[str, Any]:
+        return {
+            "completed": self.completed_count,
+            "errors": self.error_count,
+            "busyTime": self.busy_time,
+            "papersPerMinute": self.papers_per_minute(),
+        }
+
+
+class PaperJob:
+    """A paper going through the pipeline"""
+
+    def __init__(
+        self,
+        pdf_url: str,
+        doc_id: str,
+        metadata: Mapping[str, Any],
+        summary: str,
+        index,
+    ):
+        self.pdf_url = pdf_url
+        self.doc_id = doc_id
+        self.metadata = dict(metadata)
+        self.summary = summary
+        self.index = index
+        self.directory: Optional[str] = None
+        self.path: Optional[str] = None
+        self.pages: ParsedPaper = []
+        self.done: asyncio.Future = asyncio.get_running_loop().create_future()
+
+    def fail(self, error: BaseException) -> None:
+        if not self.done.done():
+            self.done.set_exception(error)
+            # the submitter may not wait for it
+            self.done.exception()
+
+
+def _paper_metadata(metadata: Mapping[str, Any], *args) -> Mapping[str, Any]:
+    return metadata
+
+
+def parse_paper(path: str, metadata: Mapping[str, Any]) -> ParsedPaper:
+    """Read the pages of a downloaded paper, runs in the parse pool"""
+    from llama_index.core import SimpleDirectoryReader
+
+    docs = SimpleDirectoryReader.load_file(
+        Path(path), functools.partial(_paper_metadata, dict(metadata)), {}
+    )
+
+    return [(doc.text, {**doc.metadata}) for doc in docs]
+
+
+def index_papers(index, jobs: Sequence[PaperJob]) -> None:
+    """Insert the pages and summaries of a batch of papers in their index
+
+    Pages of the whole batch are split and embedded together.
+    """
+    from llama_index.core import Document
+
+    index.insert_vectors(
+        [
+            Document(doc_id=job.doc_id, text=text, extra_info=metadata)
+            for job in jobs
+            for text, metadata in job.pages
+        ]
+    )
+    index.insert_texts(
+        [
+            Document(doc_id=job.doc_id, text=job.summary, extra_info=job.metadata)
+            for job in jobs
+        ]
+    )
+
+
+class PaperPipeline:
+    """Download, parse and index papers in concurrent stages
+
+    Every paper gets its own temporary folder. Downloads are bounded and
+    rate limited, parsing runs in a worker pool and papers are indexed by
+    batches, so the embedding model and the vector store see a few large
+    requests instead of one per page. The stages are connected by bounded
+    queues, submitting waits when the pipeline is saturated.
+    """
+
+    def __init__(
+        self,
+        *,
+        download_concurrency: int = 4,
+        parse_workers: int = 2,
+        parse_executor: str = "thread",
+        batch_size: int = 16,
+        batch_wait: float = 1.0,
+        queue_size: int = 32,
+        download_folder: str = PAPERS_DOWNLOAD_FOLDER,
+        rate_limiter: Optional[TokenBucket] = None,
+        download: Optional[Callable[[PaperJob], Awaitable[None]]] = None,
+        parse: Callable[[str, Mapping[str, Any]], ParsedPaper] = parse_paper,
+        index: Callable[[Any, Sequence[PaperJob]], None] = index_papers,
+    ) -> None:
+        self._download_concurrency = download_concurrency
+        self._parse_workers = parse_workers
+        self._batch_size = batch_size
+        self._batch_wait = batch_wait
+        self._download_folder = download_folder
+        self._rate_limiter = rate_limiter
+        self._download = download or self._download_pdf
+        self._parse = parse
+        self._index = index
+
+        self._executor: concurrent.futures.Executor = (
+            concurrent.futures.ProcessPoolExecutor(parse_workers)
+            if parse_executor == "process"
+            else concurrent.futures.ThreadPoolExecutor(
+                parse_workers, thread_name_prefix="paper-parse"
+            )
+        )
+
+        self._download_queue: asyncio.Queue = asyncio.Queue(queue_size)
+        self._parse_queue: asyncio.Queue = asyncio.Queue(queue_size)
+        self._index_queue: asyncio.Queue = asyncio.Queue(queue_size)
+
+        self._stats = {
+            name: StageStats(name) for name in ("download", "parse", "index")
+        }
+        self._workers: List[asyncio.Task] = []
+        self._session: Optional["aiohttp.ClientSession"] = None
+
+    @classmethod
+    def from_config(cls) -> "PaperPipeline":
+        config = Config()
+
+        return cls(
+            download_concurrency=config.get(
+                "ARXIV_PDF_DOWNLOADS", coerce=int, default=4
+            ),
+            parse_workers=config.get("ARXIV_PARSE_WORKERS", coerce=int, default=2),
+            parse_executor=config.get("ARXIV_PARSE_EXECUTOR", default="thread"),
+            batch_size=config.get("ARXIV_INDEX_BATCH_SIZE", coerce=int, default=16),
+            batch_wait=config.get("ARXIV_INDEX_BATCH_WAIT", coerce=float, default=1.0),
+            rate_limiter=shared_token_bucket(
+                "arxiv.org", config.get("ARXIV_PDF_RATE", coerce=float, default=4.0)
+            ),
+        )
+
+    def _start(self) -> None:
+        if self._workers:
+            return
+
+        self._workers = [
+            *(
+                asyncio.create_task(self._download_worker())
+                for _ in range(self._download_concurrency)
+            ),
+            *(
+                asyncio.create_task(self._parse_worker())
+                for _ in range(self._parse_workers)
+            ),
+            asyncio.create_task(self._index_worker()),
+        ]
+
+    async def submit(
+        self,
+        pdf_url: str,
+        doc_id: str,
+        metadata: Mapping[str, Any],
+        summary: str,
+        index,
+    ) -> asyncio.Future:
+        """Queue a paper, waits if the pipeline is saturated
+
+        Args:
+            pdf_url: the paper pdf
+            doc_id: the document id of the pages in the index
+            metadata: metadata of the pages and of the summary
+            summary: the paper summary, indexed as text
+            index: a TwoStepsVectorIndex
+
+        Returns:
+            asyncio.Future: resolved once the paper is indexed
+        """
+        self._start()
+
+        job = PaperJob(pdf_url, doc_id, metadata, summary, index)
+        await self._download_queue.put(job)
+
+        return job.done
+
+    async def _download_pdf(self, job: PaperJob) -> None:
+        import aiohttp
+
+        session = self._session
+        if session is None:
+            session = self._session = aiohttp.ClientSession()
+
+        if self._rate_limiter is not None:
+            await self._rate_limiter.acquire()
+
+        async with session.get(job.pdf_url) as resp:
+            resp.raise_for_status()
+            with open(cast(str, job.path), "wb") as file:
+                async for chunk in resp.content.iter_chunked(64 * 1024):
+                    file.write(chunk)
+
+    def _cleanup(self, job: PaperJob) -> None:
+        if job.directory:
+            shutil.rmtree(job.directory, ignore_errors=True)
+            job.directory = None
+
+    async def _download_worker(self) -> None:
+        while True:
+            job: PaperJob = await self._download_queue.get()
+            start = time.monotonic()
+            try:
+                os.makedirs(self._download_folder, exist_ok=True)
+                job.directory = tempfile.mkdtemp(dir=self._download_folder)
+                job.path = os.path.join(job.directory, "paper.pdf")
+
+                await self._download(job)
+            except Exception as e:
+                self._stats["download"].record(time.monotonic() - start, False)
+                logger.warning("Unable to download %s: %s", job.pdf_url, e)
+                self._cleanup(job)
+                job.fail(e)
+                continue
+
+            self._stats["download"].record(time.monotonic() - start)
+            await self._parse_queue.put(job)
+
+    async def _parse_worker(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        while True:
+            job: PaperJob = await self._parse_queue.get()
+            start = time.monotonic()
+            try:
+                job.pages = await loop.run_in_executor(
+                    self._executor, self._parse, cast(str, job.path), job.metadata
+                )
+            except Exception as e:
+                self._stats["parse"].record(time.monotonic() - start, False)
+                logger.warning("Unable to parse %s: %s", job.pdf_url, e)
+                job.fail(e)
+                continue
+            finally:
+                self._cleanup(job)
+
+            self._stats["parse"].record(time.monotonic() - start)
+            await self._index_queue.put(job)
+
+    async def _next_batch(self) -> List[PaperJob]:
+        batch = [await self._index_queue.get()]
+        deadline = time.monotonic() + self._batch_wait
+
+        while len(batch) < self._batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._index_queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _index_worker(self) -> None:
+        while True:
+            batch = await self._next_batch()
+
+            by_index: Dict[int, List[PaperJob]] = {}
+            for job in batch:
+                by_index.setdefault(id(job.index), []).append(job)
+
+            for jobs in by_index.values():
+                start = time.monotonic()
+                try:
+                    # embedding and vector store calls are blocking
+                    await asyncio.to_thread(self._index, jobs[0].index, jobs)
+                except Exception as e:
+                    logger.exception("Unable to index %d papers", len(jobs))
+                    for job in jobs:
+                        self._stats["index"].record(0.0, False)
+                        job.fail(e)
+                    continue
+
+                duration = (time.monotonic() - start) / len(jobs)
+                for job in jobs:
+                    self._stats["index"].record(duration)
+                    if not job.done.done():
+                        job.done.set_result(None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": {
+                "download": self._download_queue.qsize(),
+                "parse": self._parse_queue.qsize(),
+                "index": self._index_queue.qsize(),
+            },
+            **{name: stats.as_json() for name, stats in self._stats.items()},
+        }
+
+    async def close(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# pipelines of the event loops, closed when their loop shuts down
+_pipelines: Dict[int, PaperPipeline] = {}
+
+
+async def _close_paper_pipeline(loop_id: int) -> None:
+    pipeline = _pipelines.pop(loop_id, None)
+    if pipeline is not None:
+        await pipeline.close()
+
+
+def paper_pipeline() -> PaperPipeline:
+    """The pipeline of the running event loop, shared by its tasks
+
+    Raises:
+        RuntimeError: when the running loop isn't managed, see on_loop_shutdown
+    """
+    loop_id = id(asyncio.get_running_loop())
+
+    pipeline = _pipelines.get(loop_id)
+    if pipeline is None:
+        on_loop_shutdown(functools.partial(_close_paper_pipeline, loop_id))
+        pipeline = PaperPipeline.from_config()
+        _pipelines[loop_id] = pipeline
+
+    return pipeline
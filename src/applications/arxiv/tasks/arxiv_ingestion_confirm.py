@@ -1,17 +1,26 @@
-from typing import TYPE_CHECKING, Mapping, Any
+from typing import TYPE_CHECKING, Mapping, Any, Dict, List, Tuple, cast
 
 import arxiv
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from core.context.composite_context import CompositeContext
 from core.tasks.task import Task
-from models.ingestion import IngestedDocument, Ingestion
+from models.ingestion import IngestedDocument, Ingestion, IngestionStatus
+from models.ingestion_documents import (
+    INGESTION_DOCUMENTS_COLLECTION,
+    IngestionDocumentStore,
+)
 
 if TYPE_CHECKING:
     from core.context.context import Context
 
 
 class ArxivIngestionConfirm(Task):
+    class Parameters(BaseModel):
+        db_link: str = Field(default="mongodb")
+        database: str = Field(default="pinceau6")
+        documents_collection: str = Field(default=INGESTION_DOCUMENTS_COLLECTION)
+
     class InputModel(BaseModel):
         class Config:
             arbitrary_types_allowed = True
@@ -28,11 +37,46 @@ class ArxivIngestionConfirm(Task):
                 f"{self.__class__.__name__} context should be a CompositeContext"
             )
 
-        ingestion = data_input["ingestion"]
-        result = data_input["result"]
-        success = data_input["success"]
+        return (await self._process_batch(context, [data_input]))[0]
+
+    async def _process_batch(
+        self, context: "Context", data_in_list: List[Mapping[str, Any]]
+    ) -> List[Mapping[str, Any]]:
+        """Record the status of a batch of papers, one bulk write per
+        ingestion"""
+        if not isinstance(context, CompositeContext):
+            raise ValueError(
+                f"{self.__class__.__name__} context should be a CompositeContext"
+            )
+
+        stores: Dict[Tuple[str, str, str], IngestionDocumentStore] = {}
+        documents: Dict[
+            Tuple[Tuple[str, str, str], str], Dict[str, IngestedDocument]
+        ] = {}
+
+        for data_input in data_in_list:
+            ingestion = data_input["ingestion"]
+            result = data_input["result"]
+            success = data_input["success"]
+
+            params = cast(
+                ArxivIngestionConfirm.Parameters, self.merge_params(data_input)
+            )
+            store_key = (params.db_link, params.database, params.documents_collection)
+            if store_key not in stores:
+                stores[store_key] = IngestionDocumentStore.from_default(
+                    context,
+                    db_link=params.db_link,
+                    database=params.database,
+                    collection=params.documents_collection,
+                )
+
+            status = IngestionStatus.INGESTED if success else IngestionStatus.FAILED
+            documents.setdefault((store_key, ingestion.oid), {})[result.entry_id] = (
+                IngestedDocument(date=result.updated, status=status)
+            )
 
-        if success:
-            ingestion.documents[result.entry_id] = IngestedDocument(date=result.updated)
+        for (store_key, ingestion_id), ingestion_documents in documents.items():
+            await stores[store_key].upsert(ingestion_id, ingestion_documents)
 
-        return {**data_input}
+        return [{**data_input} for data_input in data_in_list]
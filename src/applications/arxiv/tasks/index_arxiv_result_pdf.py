@@ -1,30 +1,44 @@
-import hashlib
+import asyncio
 import logging
-import os
-import shutil
-from pathlib import Path
-from typing import Mapping, Any
+from typing import Mapping, Any, Set, cast
 
 import arxiv
-from llama_index.core import SimpleDirectoryReader, Document
+from pydantic import BaseModel, Field
 
+from applications.arxiv.paper_pipeline import paper_pipeline
 from applications.arxiv.tasks.index_arxiv_result import IndexArxivResult
-from core.database.mongodb import MongoDBHandler
 from models.ingestion import IngestedDocument
+from models.ingestion_documents import (
+    INGESTION_DOCUMENTS_COLLECTION,
+    IngestionDocumentStore,
+)
 
 logging.basicConfig(level=logging.DEBUG)
 
-PAPERS_DOWNLOAD_FOLDER = ".papers"
+logger = logging.getLogger(__name__)
 
-
-def _hacky_hash(some_string):
-    return hashlib.md5(some_string.encode("utf-8")).hexdigest()
+# references to the recordings of papers which are still being indexed
+_pending_recordings: Set[asyncio.Task] = set()
 
 
 class IndexArxivResultPDF(IndexArxivResult):
+    class Parameters(BaseModel):
+        wait_for_indexing: bool = Field(
+            default=True,
+            description="Wait until the paper is indexed, else only until it is queued",
+        )
+        db_link: str = Field(default="mongodb")
+        database: str = Field(default="pinceau6")
+        documents_collection: str = Field(default=INGESTION_DOCUMENTS_COLLECTION)
+
+    class UI(BaseModel):
+        download_rate: str = Field(title="Downloaded papers per minute")
+        parse_rate: str = Field(title="Parsed papers per minute")
+        index_rate: str = Field(title="Indexed papers per minute")
 
     async def _process(self, context, data_in: Mapping[str, Any]) -> Mapping[str, Any]:
         data_object = self.input_object(data_in)
+        params = cast(IndexArxivResultPDF.Parameters, self.merge_params(data_in))
 
         result: arxiv.Result = data_object.result
 
@@ -38,41 +52,53 @@ class IndexArxivResultPDF(IndexArxivResult):
             "Categories": ", ".join(result.categories),
         }
 
-        filename = f"{_hacky_hash(result.title)}.pdf"
-        os.makedirs(PAPERS_DOWNLOAD_FOLDER, exist_ok=True)
-        written_path = Path(
-            result.download_pdf(dirpath=PAPERS_DOWNLOAD_FOLDER, filename=filename)
-        )
-
         index_vector_store = data_in["index"]()
         ingestion = data_in["ingestion"]
-
-        summary_doc = Document(
-            doc_id=result.entry_id, text=result.summary, extra_info=metadata
+        store = IngestionDocumentStore.from_default(
+            context,
+            db_link=params.db_link,
+            database=params.database,
+            collection=params.documents_collection,
+        )
+        pipeline = paper_pipeline()
+
+        done = await pipeline.submit(
+            result.pdf_url,
+            result.entry_id,
+            metadata,
+            result.summary,
+            index_vector_store,
         )
 
-        def get_paper_metadata(*args):
-            return metadata
-
-        docs = SimpleDirectoryReader.load_file(written_path, get_paper_metadata, {})
-        shutil.rmtree(PAPERS_DOWNLOAD_FOLDER)
-        for doc in docs:
-            metadata = {**doc.metadata}
-            doc.id_ = f"{result.entry_id}"
-            work_doc = Document(
-                doc_id=f"{result.entry_id}",
-                text=doc.text,
-                extra_info=metadata,
+        async def record_ingestion() -> None:
+            await done
+            await store.upsert(
+                ingestion.oid,
+                {result.entry_id: IngestedDocument(date=result.updated)},
             )
 
-            index_vector_store.insert_vector(work_doc)
-
-        index_vector_store.insert_text(summary_doc)
+        if params.wait_for_indexing:
+            await record_ingestion()
+        else:
+            recording = asyncio.create_task(record_ingestion())
+            _pending_recordings.add(recording)
+            recording.add_done_callback(_recording_done)
+
+        stats = pipeline.stats()
+        await context.event(
+            self,
+            "data",
+            {
+                "download_rate": f"{stats['download']['papersPerMinute']:.1f}",
+                "parse_rate": f"{stats['parse']['papersPerMinute']:.1f}",
+                "index_rate": f"{stats['index']['papersPerMinute']:.1f}",
+            },
+        )
 
-        ingestion.documents[result.entry_id] = IngestedDocument(date=result.updated)
-        db_handler = MongoDBHandler.from_default(context)
-        db_handler.update_object(context, ingestion, "ingestion")
+        return {}
 
-        del result
 
-        return {}
+def _recording_done(task: asyncio.Task) -> None:
+    _pending_recordings.discard(task)
+    if not task.cancelled() and task.exception():
+        logger.warning("Arxiv paper indexing failed: %s", task.exception())
@@ -2,17 +2,29 @@ import asyncio
 import datetime
 import logging
 from enum import Enum
-from typing import TYPE_CHECKING, Optional, cast
+from typing import (
+    TYPE_CHECKING,
+    AsyncIterable,
+    AsyncIterator,
+    List,
+    Optional,
+    Tuple,
+    cast,
+)
 
 import arxiv
 from pydantic import BaseModel
 from pydantic import Field
 
-from core.database.mongodb import MongoDBHandler
+from core.database.mongodb_async import AsyncMongoDBHandler
 from core.tasks.task import Task
 from core.tasks.types import TaskData, TaskDataAsyncIterator
-from misc.arxiv_client import Client
-from models.ingestion import Ingestion
+from misc.arxiv_client import AsyncClient
+from models.ingestion import IngestedDocument, Ingestion
+from models.ingestion_documents import (
+    INGESTION_DOCUMENTS_COLLECTION,
+    IngestionDocumentStore,
+)
 
 if TYPE_CHECKING:
     from core.context.context import Context
@@ -28,6 +40,7 @@ class SearchMode(Enum):
 
 
 class SearchArxivTask(Task["SearchArxivTask.InputModel"]):
+    CONCURRENCY_RESOURCES = {"arxiv-api": 1}
 
     class OutputModel(BaseModel):
         class Config:
@@ -52,14 +65,24 @@ class SearchArxivTask(Task["SearchArxivTask.InputModel"]):
         collection: str = Field(default="ingestion3")
         db_link: str = Field(default="mongodb")
         database: str = Field(default="pinceau6")
+        documents_collection: str = Field(default=INGESTION_DOCUMENTS_COLLECTION)
+        check_batch_size: int = Field(200, ge=1)
 
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
         self._ingestion: Optional[Ingestion] = None
+        self._ingestion_store: Optional[IngestionDocumentStore] = None
         self._skipped_count = 0
         self._ingestion_count = 0
         self._search_mode: SearchMode = SearchMode.UPDATED_DOCS
 
+    def _reset_run_state(self) -> None:
+        super()._reset_run_state()
+        self._ingestion = None
+        self._ingestion_store = None
+        self._skipped_count = 0
+        self._ingestion_count = 0
+
     async def _generator_process_before(
         self, context: "Context", data_in: TaskData
     ) -> TaskData:
@@ -71,10 +94,10 @@ class SearchArxivTask(Task["SearchArxivTask.InputModel"]):
         subject = data_input_object.subject.lower()
 
         now = datetime.datetime.now()
-        db_handler = MongoDBHandler.from_default(
+        db_handler = AsyncMongoDBHandler.from_default(
             context, db_link=params.db_link, database=params.database
         )
-        ingestion: Ingestion = db_handler.load_one(
+        ingestion: Ingestion = await db_handler.load_one(
             params.collection, {"data.keyword": subject}
         )
 
@@ -88,12 +111,59 @@ class SearchArxivTask(Task["SearchArxivTask.InputModel"]):
         else:
             ingestion.last_ingestion_run_date = now
 
-        db_handler.save_object(context, ingestion, params.collection)
+        await db_handler.save_object(context, ingestion, params.collection)
 
         self._ingestion = ingestion
+        self._ingestion_store = IngestionDocumentStore.from_default(
+            context,
+            db_link=params.db_link,
+            database=params.database,
+            collection=params.documents_collection,
+        )
+        await self._ingestion_store.ensure_indexes()
 
         return data_in
 
+    async def _check_batch(
+        self, batch: List[Tuple[arxiv.Result, int, int]]
+    ) -> List[Tuple[arxiv.Result, int, int, Optional[IngestedDocument]]]:
+        ingestion = cast(Ingestion, self._ingestion)
+        store = cast(IngestionDocumentStore, self._ingestion_store)
+
+        tracked = await store.fetch(
+            ingestion.oid,
+            (result.entry_id for result, _, _ in batch if result is not None),
+        )
+
+        return [
+            (
+                result,
+                result_index,
+                result_total,
+                tracked.get(result.entry_id) if result is not None else None,
+            )
+            for result, result_index, result_total in batch
+        ]
+
+    async def _tracked_results(
+        self,
+        results: AsyncIterable[Tuple[arxiv.Result, int, int]],
+        batch_size: int,
+    ) -> AsyncIterator[Tuple[arxiv.Result, int, int, Optional[IngestedDocument]]]:
+        # the tracked documents of a batch of results are fetched in one query
+        batch = []
+        async for item in results:
+            batch.append(item)
+            if len(batch) < batch_size:
+                continue
+
+            for tracked_item in await self._check_batch(batch):
+                yield tracked_item
+            batch = []
+
+        for tracked_item in await self._check_batch(batch):
+            yield tracked_item
+
     async def _generator_process_after(
         self, context: "Context", data_in: TaskData
     ) -> TaskData:
@@ -101,12 +171,12 @@ class SearchArxivTask(Task["SearchArxivTask.InputModel"]):
         await asyncio.sleep(3)  # TODO: find another way
         params = cast(SearchArxivTask.Parameters, self.merge_params(data_in))
 
-        db_handler = MongoDBHandler.from_default(
+        db_handler = AsyncMongoDBHandler.from_default(
             context, db_link=params.db_link, database=params.database
         )
 
         if self._ingestion:
-            db_handler.save_object(context, self._ingestion, params.collection)
+            await db_handler.save_object(context, self._ingestion, params.collection)
 
         return data_in
 
@@ -117,14 +187,16 @@ class SearchArxivTask(Task["SearchArxivTask.InputModel"]):
 
         await asyncio.sleep(0)
 
-        big_slow_client = Client(page_size=2000, delay_seconds=3.0, num_retries=5)
+        big_slow_client = AsyncClient(page_size=2000, delay_seconds=3.0, num_retries=5)
         subject = data_input_object.subject.lower()
 
         ingestion = self._ingestion
 
-        if not ingestion:
+        if not ingestion or not self._ingestion_store:
             return
 
+        tracked_count = await self._ingestion_store.count(ingestion.oid)
+
         await context.event(
             self,
             "data",
@@ -132,7 +204,7 @@ class SearchArxivTask(Task["SearchArxivTask.InputModel"]):
                 "skipped_count": f"{self._skipped_count:_}",
                 "ingest_count": f"{self._ingestion_count:_}",
                 "current_article": "-",
-                "ingest_state": f"{len(ingestion.documents)} / ??",
+                "ingest_state": f"{tracked_count} / ??",
             },
         )
 
@@ -141,11 +213,16 @@ class SearchArxivTask(Task["SearchArxivTask.InputModel"]):
         )
 
         try:
-            documents = ingestion.documents
             if self._search_mode == SearchMode.RELEVANCE:
 
-                for result, result_index, result_total in big_slow_client.results(
-                    arxiv.Search(query=subject)
+                async for (
+                    result,
+                    result_index,
+                    result_total,
+                    ingestion_data,
+                ) in self._tracked_results(
+                    big_slow_client.results(arxiv.Search(query=subject)),
+                    params.check_batch_size,
                 ):
                     if result_total == 0:
                         break
@@ -155,12 +232,11 @@ class SearchArxivTask(Task["SearchArxivTask.InputModel"]):
                             self,
                             "data",
                             {
-                                "ingest_state": f"{len(ingestion.documents)} / {result_total}"
+                                "ingest_state": f"{tracked_count + self._ingestion_count} / {result_total}"
                             },
                         )
 
-                    ingestion_data = documents.get(result.entry_id)
-                    if ingestion_data and ingestion_data.date == result.updated:
+                    if ingestion_data and ingestion_data.is_ingested(result.updated):
                         self._skipped_count += 1
 
                         if result_index % params.logging_steps == 0:
@@ -199,12 +275,20 @@ class SearchArxivTask(Task["SearchArxivTask.InputModel"]):
                     ):
                         break
             else:
-                current_doc_count = len(documents)
+                current_doc_count = tracked_count
                 search_ingested_docs = 0
-                for result, result_index, result_total in big_slow_client.results(
-                    arxiv.Search(
-                        query=subject, sort_by=arxiv.SortCriterion.LastUpdatedDate
-                    )
+                async for (
+                    result,
+                    result_index,
+                    result_total,
+                    ingestion_data,
+                ) in self._tracked_results(
+                    big_slow_client.results(
+                        arxiv.Search(
+                            query=subject, sort_by=arxiv.SortCriterion.LastUpdatedDate
+                        )
+                    ),
+                    params.check_batch_size,
                 ):
                     if result_total == 0:
                         break
@@ -213,14 +297,10 @@ class SearchArxivTask(Task["SearchArxivTask.InputModel"]):
                         await context.event(
                             self,
                             "data",
-                            {
-                                "ingest_state": f"> {len(ingestion.documents)} / {result_total}"
-                            },
+                            {"ingest_state": f"> {current_doc_count} / {result_total}"},
                         )
 
-                    ingestion_data = documents.get(result.entry_id)
-
-                    if ingestion_data and ingestion_data.date == result.updated:
+                    if ingestion_data and ingestion_data.is_ingested(result.updated):
 
                         if result_total == current_doc_count:
                             # same update date + same number of results: all docs are already ingested!
@@ -32,6 +32,8 @@ class TitleClassificationEvaluationTask(
     Task["TitleClassificationEvaluationTask.InputModel"]
 ):
 
+    EXECUTION_POOL = "thread"
+
     class UI(BaseModel):
         results: str = Field(title="Results")
 
@@ -1,15 +1,16 @@
 import json
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, Mapping
 
 from pydantic import BaseModel, Field
-from transformers import pipeline, AutoModelForSequenceClassification, AutoTokenizer
 
+from applications.huggingface.batch_inference import batch_inference
 from applications.huggingface.models.training_arguments_model import (
     TrainingArgumentsModel,
 )
 from applications.huggingface.models.training_label_provider import (
     TrainingLabelProvider,
 )
+from applications.huggingface.pipeline_registry import lease_pipeline, pipeline_key
 from core.tasks.task import Task
 from core.tasks.types import TaskData
 
@@ -18,6 +19,7 @@ if TYPE_CHECKING:
 
 
 class TitleClassificationTask(Task["TitleClassificationTask.InputModel"]):
+    RESULT_CACHE = "memory"
 
     class UI(BaseModel):
         results: str = Field(title="Results")
@@ -34,20 +36,50 @@ class TitleClassificationTask(Task["TitleClassificationTask.InputModel"]):
     class OutputModel(BaseModel):
         result: str
 
-    async def _process(self, context: "Context", data_in: TaskData) -> TaskData:
-        try:
-            data_object = self.input_object(data_in)
+    @staticmethod
+    def _classify_batch(group: tuple, titles: list[str]) -> list[list]:
+        output_dir, pretrained_model = group
+        # the trained model is reloaded when its folder changes
+        with lease_pipeline(
+            "text-classification", output_dir, tokenizer=pretrained_model
+        ) as entry:
+            with entry.lock:
+                results = entry.value(titles, batch_size=len(titles))
 
-            tokenizer = AutoTokenizer.from_pretrained(data_object.pretrained_model)
+        # one list of labels per title, as for a single title call
+        return [[result] for result in results]
 
-            pretrained_model = AutoModelForSequenceClassification.from_pretrained(
+    def result_cache_key_data(self, data_in: TaskData) -> Mapping[str, Any]:
+        data_object = self.input_object(data_in)
+
+        # the key of the trained model changes with its folder
+        return {
+            "title": data_object.title,
+            "model": pipeline_key(
+                "text-classification",
                 data_object.arguments.output_dir,
-            )
+                tokenizer=data_object.pretrained_model,
+            ),
+        }
+
+    async def result_cache_hit(
+        self, context: "Context", data_in: TaskData, data_out: TaskData
+    ) -> None:
+        # the score isn't part of the output
+        await context.event(
+            self, "data", {"results": json.dumps([{"label": data_out["result"]}])}
+        )
+
+    async def _process(self, context: "Context", data_in: TaskData) -> TaskData:
+        try:
+            data_object = self.input_object(data_in)
 
-            pipe = pipeline(
-                "text-classification", model=pretrained_model, tokenizer=tokenizer
+            results = await batch_inference(
+                "text-classification", self._classify_batch
+            ).infer(
+                (data_object.arguments.output_dir, data_object.pretrained_model),
+                data_object.title,
             )
-            results = pipe(data_object.title)
         except Exception as e:
             print(e)
             results = str(e)
@@ -0,0 +1,230 @@
+import asyncio
+import concurrent.futures
+import logging
+import queue
+import threading
+import time
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+from conf import Config
+
+logger = logging.getLogger(__name__)
+
+Group = TypeVar("Group", bound=Hashable)
+Item = TypeVar("Item")
+
+# runs the inputs of one group as a batch, returns one result per input
+BatchFunction = Callable[[Group, List[Item]], Sequence[Any]]
+
+
+class BatchInference(Generic[Group, Item]):
+    """Gather inference requests of concurrent tasks into batched calls
+
+    Requests are queued from any thread or event loop. A worker thread takes
+    the first waiting request, gathers the others for up to ``max_wait``
+    seconds or ``max_batch_size`` requests, and runs one call per group of
+    requests sharing the same model and options, the group key. When a call
+    fails its inputs run again one at a time, only the requests of the
+    failing inputs get the error.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        run_batch: BatchFunction[Group, Item],
+        *,
+        max_batch_size: int = 16,
+        max_wait: float = 0.01,
+    ) -> None:
+        self._name = name
+        self._run_batch = run_batch
+        self._max_batch_size = max(1, max_batch_size)
+        self._max_wait = max_wait
+        self._queue: "queue.Queue[Tuple[Group, Item, concurrent.futures.Future]]" = (
+            queue.Queue()
+        )
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._closed = False
+
+        self._batch_count = 0
+        self._item_count = 0
+        self._error_count = 0
+        self._split_count = 0
+        self._busy_time = 0.0
+
+    @classmethod
+    def from_config(
+        cls, name: str, run_batch: BatchFunction[Group, Item]
+    ) -> "BatchInference[Group, Item]":
+        config = Config()
+
+        return cls(
+            name,
+            run_batch,
+            max_batch_size=config.get("HF_BATCH_MAX_SIZE", coerce=int, default=16),
+            max_wait=config.get("HF_BATCH_MAX_WAIT_MS", coerce=float, default=10.0)
+            / 1000,
+        )
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError(f"Batch inference {self._name} is closed")
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._work, name=f"batch-{self._name}", daemon=True
+                )
+                self._worker.start()
+
+    def submit(self, group: Group, item: Item) -> concurrent.futures.Future:
+        """Queue an input
+
+        Args:
+            group: inputs of a group are run together, the model and options
+            item: the input
+
+        Returns:
+            concurrent.futures.Future: resolved with the result of the input
+        """
+        self._start()
+
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        self._queue.put((group, item, future))
+
+        return future
+
+    async def infer(self, group: Group, item: Item) -> Any:
+        return await asyncio.wrap_future(self.submit(group, item))
+
+    def _next_batch(self) -> List[Tuple[Group, Item, concurrent.futures.Future]]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self._max_wait
+
+        while len(batch) < self._max_batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                if timeout > 0:
+                    batch.append(self._queue.get(timeout=timeout))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _work(self) -> None:
+        while True:
+            batch = self._next_batch()
+
+            groups: Dict[Group, List[Tuple[Item, concurrent.futures.Future]]] = {}
+            for group, item, future in batch:
+                if future.set_running_or_notify_cancel():
+                    groups.setdefault(group, []).append((item, future))
+
+            for group, requests in groups.items():
+                self._run_group(group, requests)
+
+    def _run_group(
+        self, group: Group, requests: List[Tuple[Item, concurrent.futures.Future]]
+    ) -> None:
+        start = time.monotonic()
+        try:
+            results = self._run_batch(group, [item for item, _ in requests])
+            if len(results) != len(requests):
+                raise ValueError(
+                    f"{len(results)} results for a batch of {len(requests)} inputs"
+                )
+        except Exception as e:
+            if len(requests) == 1:
+                logger.exception("Batch inference %s failed", self._name)
+                self._error_count += 1
+                requests[0][1].set_exception(e)
+                return
+
+            logger.warning(
+                "Batch inference %s failed, running its %d inputs one at a time",
+                self._name,
+                len(requests),
+                exc_info=True,
+            )
+            self._split_count += 1
+            results = None
+        finally:
+            self._busy_time += time.monotonic() - start
+
+        if results is None:
+            for request in requests:
+                self._run_group(group, [request])
+            return
+
+        self._batch_count += 1
+        self._item_count += len(requests)
+        for (_, future), result in zip(requests, results):
+            future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self._name,
+            "maxBatchSize": self._max_batch_size,
+            "maxWait": self._max_wait,
+            "queued": self._queue.qsize(),
+            "batches": self._batch_count,
+            "items": self._item_count,
+            "errors": self._error_count,
+            "splitBatches": self._split_count,
+            "meanBatchSize": (
+                self._item_count / self._batch_count if self._batch_count else 0.0
+            ),
+            "busyTime": self._busy_time,
+        }
+
+    def close(self) -> None:
+        """Stop accepting inputs, queued ones are still run"""
+        with self._lock:
+            self._closed = True
+
+
+_batchers: Dict[str, BatchInference[Any, Any]] = {}
+_batchers_lock = threading.Lock()
+
+
+def batch_inference(
+    name: str, run_batch: BatchFunction[Group, Item]
+) -> BatchInference[Group, Item]:
+    """Process-wide batcher of an inference, shared by every event loop
+
+    Args:
+        name: the inference name
+        run_batch: runs a group of inputs, used when the batcher is created
+
+    Returns:
+        BatchInference: the batcher
+    """
+    with _batchers_lock:
+        batcher = _batchers.get(name)
+        if batcher is None:
+            batcher = BatchInference.from_config(name, run_batch)
+            _batchers[name] = batcher
+
+        return batcher
+
+
+def batch_inference_stats() -> List[Dict[str, Any]]:
+    with _batchers_lock:
+        return [batcher.stats() for batcher in _batchers.values()]
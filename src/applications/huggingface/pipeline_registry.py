@@ -0,0 +1,160 @@
+import json
+import logging
+import os
+import threading
+from typing import TYPE_CHECKING, Any, ContextManager, Dict, Optional, Tuple
+
+from conf import Config
+from core.context.global_context import GlobalContext
+from core.managers.model_pool_manager import PooledModel
+
+if TYPE_CHECKING:
+    from core.context.global_context import GlobalContext as GlobalContextType
+
+logger = logging.getLogger(__name__)
+
+TRANSFORMERS_POOL = "transformers"
+
+KEYBERT_TASK = "keybert"
+KEYBERT_DEFAULT_MODEL = "all-MiniLM-L6-v2"
+
+
+# revision of the local models, with the mtimes of the folder and of the
+# config it was computed for
+_revisions: Dict[str, Tuple[Tuple[float, float], Tuple[float, int]]] = {}
+_revisions_lock = threading.Lock()
+
+
+def _model_revision(model: str) -> Optional[Tuple[float, int]]:
+    # a local model is reloaded when it is trained again, overwriting its
+    # files doesn't change the mtime of the folder but saving a model writes
+    # its config again, its files are only walked when one of them changes
+    if not os.path.isdir(model):
+        return None
+
+    config_path = os.path.join(model, "config.json")
+    stamp = (
+        os.path.getmtime(model),
+        os.path.getmtime(config_path) if os.path.isfile(config_path) else 0.0,
+    )
+
+    with _revisions_lock:
+        cached = _revisions.get(model)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    last_modified = stamp[0]
+    size = 0
+    for folder, _, files in os.walk(model):
+        for file in files:
+            stat = os.stat(os.path.join(folder, file))
+            last_modified = max(last_modified, stat.st_mtime)
+            size += stat.st_size
+
+    with _revisions_lock:
+        _revisions[model] = (stamp, (last_modified, size))
+
+    return last_modified, size
+
+
+def pipeline_key(task: Optional[str], model: str, **options: Any) -> str:
+    """Pool key of a pipeline, the task, model and options it is built with
+
+    Returns:
+        str: the key, stable for equal options
+    """
+    return json.dumps(
+        {
+            "task": task,
+            "model": model,
+            "revision": _model_revision(model),
+            "options": options,
+        },
+        sort_keys=True,
+        default=str,
+    )
+
+
+def torch_model_size(model: Any) -> int:
+    """Size in bytes of the parameters and buffers of a torch module"""
+    parameters = getattr(model, "parameters", None)
+    if not callable(parameters):
+        return 0
+
+    size = sum(param.numel() * param.element_size() for param in parameters())
+    buffers = getattr(model, "buffers", None)
+    if callable(buffers):
+        size += sum(buffer.numel() * buffer.element_size() for buffer in buffers())
+
+    return size
+
+
+def _build_pipeline(task: Optional[str], model: str, **options: Any) -> Any:
+    if task == KEYBERT_TASK:
+        from keybert import KeyBERT
+
+        return KeyBERT(model=model)
+
+    from transformers import pipeline
+
+    return pipeline(task, model=model, **options)
+
+
+def _pipeline_size(value: Any) -> int:
+    # transformers pipeline, or KeyBERT wrapping a sentence transformer
+    model = getattr(value, "model", None)
+    model = getattr(model, "embedding_model", model)
+
+    return torch_model_size(model)
+
+
+def lease_pipeline(
+    task: Optional[str], model: str, **options: Any
+) -> ContextManager[PooledModel]:
+    """Lease a pipeline shared by the whole process, loading it if needed
+
+    Pipelines aren't thread safe, call them while holding the entry lock.
+
+    Args:
+        task: the transformers pipeline task, "keybert" for a KeyBERT model
+        model: the model name or local path
+        **options: other pipeline arguments, the tokenizer for example
+
+    Returns:
+        ContextManager[PooledModel]: the pooled pipeline
+    """
+    pool = GlobalContext.get_instance().model_pool_manager.pool(TRANSFORMERS_POOL)
+
+    return pool.lease(
+        pipeline_key(task, model, **options),
+        lambda: _build_pipeline(task, model, **options),
+        _pipeline_size,
+    )
+
+
+def preload_pipelines(context: "GlobalContextType") -> None:
+    """Load the pipelines listed in TRANSFORMERS_PRELOAD
+
+    The value is a ``;`` separated list of ``task=model`` entries.
+
+    Args:
+        context: the global context
+    """
+    raw_value = Config().get("TRANSFORMERS_PRELOAD", default="")
+    entries = [entry.strip() for entry in raw_value.split(";") if entry.strip()]
+
+    pool = context.model_pool_manager.pool(TRANSFORMERS_POOL)
+
+    for entry in entries:
+        task, _, model = entry.rpartition("=")
+        task = task.strip() or None
+        model = model.strip()
+
+        try:
+            pool.warm_up(
+                pipeline_key(task, model),
+                lambda: _build_pipeline(task, model),
+                _pipeline_size,
+            )
+        except Exception:
+            logger.exception("Unable to preload pipeline %s", entry)
@@ -1,4 +1,5 @@
 import asyncio
+import concurrent.futures
 import logging
 import os
 import weakref
@@ -31,6 +32,7 @@ from applications.huggingface.models.training_finetuning_sequence_classification
 from applications.huggingface.models.training_label_provider import (
     TrainingLabelProvider,
 )
+from core.context.forwarding_context import dispatch_loop
 from core.database.mongodb import MongoDBHandler
 from core.tasks.task import Task
 from core.tasks.types import TaskData
@@ -111,11 +113,11 @@ class ProgressionCallBack(TrainerCallback):
         self._total_epoch = total_epoch
         self._model = weakref.ref(model)
         self._trainer = weakref.ref(trainer)
-        self._futures: Set["asyncio.Future"] = set()
+        self._futures: Set[concurrent.futures.Future] = set()
         self._loop = loop
         super().__init__()
 
-    def _keep_future_until_done(self, future: "asyncio.Future"):
+    def _keep_future_until_done(self, future: concurrent.futures.Future):
         self._futures.add(future)
         future.add_done_callback(lambda fut: self._futures.remove(fut))
 
@@ -130,7 +132,7 @@ class ProgressionCallBack(TrainerCallback):
             return
 
         self._keep_future_until_done(
-            asyncio.ensure_future(
+            asyncio.run_coroutine_threadsafe(
                 context.event(
                     task,
                     "data",
@@ -142,7 +144,7 @@ class ProgressionCallBack(TrainerCallback):
                         "memory": f"RSS {bytes2human(mem_info.rss)}  USS {bytes2human(mem_info.uss)}",
                     },
                 ),
-                loop=self._loop,
+                self._loop,
             )
         )
 
@@ -182,7 +184,7 @@ class ProgressionCallBack(TrainerCallback):
 
         if state.epoch > 0 and "loss" in logs and "grad_norm" in logs:
             self._keep_future_until_done(
-                asyncio.ensure_future(
+                asyncio.run_coroutine_threadsafe(
                     context.event(
                         task,
                         "stream",
@@ -193,7 +195,7 @@ class ProgressionCallBack(TrainerCallback):
                             ),
                         },
                     ),
-                    loop=self._loop,
+                    self._loop,
                 )
             )
 
@@ -201,7 +203,7 @@ class ProgressionCallBack(TrainerCallback):
 
         if state.epoch > 0 and "eval_accuracy" in logs and "eval_loss" in logs:
             self._keep_future_until_done(
-                asyncio.ensure_future(
+                asyncio.run_coroutine_threadsafe(
                     context.event(
                         task,
                         "stream",
@@ -218,7 +220,7 @@ class ProgressionCallBack(TrainerCallback):
                             ),
                         },
                     ),
-                    loop=self._loop,
+                    self._loop,
                 )
             )
 
@@ -333,6 +335,8 @@ class ArxivTrainPrepareTask(Task["ArxivTrainPrepareTask.InputModel"]):
 
 class ArxivTrainTask(Task["ArxivTrainTask.InputModel"]):
 
+    EXECUTION_POOL = "thread"
+
     class UI(BaseModel):
         step_grid: FieldGrid = Field(FieldGrid(), title="Step")
         global_step: str = WrappedP6Field("step_grid", title="Global Step")
@@ -472,7 +476,8 @@ class ArxivTrainTask(Task["ArxivTrainTask.InputModel"]):
             data_object.arguments.nƒum_train_epochs,
             trained_model,
             trainer,
-            asyncio.get_running_loop(),
+            # training blocks its thread, events are sent from the DAG loop
+            dispatch_loop(context),
         )
         try:
             trainer.add_callback(callback)
@@ -5,6 +5,7 @@ from llama_index.core.data_structs.data_structs import EmptyIndexStruct
 from llama_index.core.embeddings import resolve_embed_model
 from llama_index.core.indices.base import BaseIndex
 from llama_index.core.indices.base_retriever import BaseRetriever
+from llama_index.core.ingestion import run_transformations
 from llama_index.core.llms import LLM
 from llama_index.core.node_parser import SemanticSplitterNodeParser
 from llama_index.core.schema import BaseNode, Document
@@ -114,6 +115,40 @@ class TwoStepsVectorIndex(BaseIndex[EmptyIndexStruct]):
         )
         self._first_vector_doc = False
 
+    @staticmethod
+    def _insert_documents(
+        index: VectorStoreIndex,
+        documents: Sequence[Document],
+        create_index_if_not_exists: bool,
+        **insert_kwargs: Any,
+    ) -> None:
+        # same as VectorStoreIndex.insert, for all the documents at once so the
+        # nodes are embedded by batches
+        nodes = run_transformations(documents, index._transformations)
+        index.insert_nodes(
+            nodes,
+            create_index_if_not_exists=create_index_if_not_exists,
+            **insert_kwargs,
+        )
+        for document in documents:
+            index.docstore.set_document_hash(document.get_doc_id(), document.hash)
+
+    def insert_texts(self, documents: Sequence[Document], **insert_kwargs: Any):
+        if not documents:
+            return
+        self._insert_documents(
+            self.text_index, documents, self._first_text_doc, **insert_kwargs
+        )
+        self._first_text_doc = False
+
+    def insert_vectors(self, documents: Sequence[Document], **insert_kwargs: Any):
+        if not documents:
+            return
+        self._insert_documents(
+            self.vector_index, documents, self._first_vector_doc, **insert_kwargs
+        )
+        self._first_vector_doc = False
+
     def insert(self, document: Document, **insert_kwargs: Any) -> None:
         # split document into two
 
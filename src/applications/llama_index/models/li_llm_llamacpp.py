@@ -1,4 +1,7 @@
-from typing import TYPE_CHECKING, Any, Optional, List, Dict, cast
+import json
+import logging
+import os
+from typing import TYPE_CHECKING, Any, ContextManager, Optional, List, Dict, cast
 
 from llama_index.core import BasePromptTemplate
 from llama_index.core.constants import (
@@ -6,62 +9,86 @@ from llama_index.core.constants import (
     DEFAULT_NUM_OUTPUTS,
     DEFAULT_CONTEXT_WINDOW,
 )
-from llama_index.core.llms import LLM
 from llama_index.llms.llama_cpp import LlamaCPP
-from pydantic import BaseModel
 
 from applications.llama_index.models.li_llm import LiLlm, PredictFn
+from conf import Config
+from core.context.global_context import GlobalContext
+from core.database.mongodb import MongoDBHandler
+from core.managers.model_pool_manager import PooledModel
 from core.models.types import ModelUsageMode
 
 if TYPE_CHECKING:
     from llama_index.core.llms.utils import LLMType
 
+logger = logging.getLogger(__name__)
 
-class LlamaCppPredictor(BaseModel):
-    stop: Optional[List[str]] = None
-    max_tokens: Optional[int] = None
-    temperature: Optional[float] = None
-    llm: LLM
+LLAMACPP_POOL = "llamacpp"
 
-    def predict(
-        self,
-        prompt: BasePromptTemplate,
-        **prompt_args: Any,
-    ) -> str:
-        """Predict."""
 
-        llama_cpp_llm = cast(LlamaCPP, self.llm)
+class LlamaCppPredictor:
+    """Predictor running on a LlamaCPP instance leased from the model pool
 
-        llama_cpp_llm._log_template_data(prompt, **prompt_args)
+    The pooled instance is shared, the per-request generation parameters are
+    only set on the instance while the generation holds its lock, and
+    restored afterwards.
+    """
 
-        default_generate_kwargs = llama_cpp_llm.generate_kwargs.copy()
+    def __init__(
+        self,
+        model: "LiLlmLlamacpp",
+        stop: Optional[List[str]] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+    ) -> None:
+        self._model = model
+        self._generate_kwargs: Dict[str, Any] = {}
+        if stop is not None:
+            self._generate_kwargs["stop"] = stop
+        if max_tokens is not None:
+            self._generate_kwargs["max_tokens"] = max_tokens
+        if temperature is not None:
+            self._generate_kwargs["temperature"] = temperature
 
-        if self.stop is not None:
-            llama_cpp_llm.generate_kwargs["stop"] = self.stop
-        if self.max_tokens is not None:
-            llama_cpp_llm.generate_kwargs["max_tokens"] = self.max_tokens
-        if self.temperature is not None:
-            llama_cpp_llm.generate_kwargs["temperature"] = self.temperature
+        self._lease: Optional[ContextManager[PooledModel]] = None
+        self._entry: Optional[PooledModel] = None
 
-        if self.llm.metadata.is_chat_model:
-            messages = llama_cpp_llm._get_messages(prompt, **prompt_args)
-            chat_response = llama_cpp_llm.chat(messages)
-            output = chat_response.message.content or ""
-        else:
-            formatted_prompt = llama_cpp_llm._get_prompt(prompt, **prompt_args)
-            response = self.llm.complete(formatted_prompt, formatted=True)
-            output = response.text
+    def _predict(
+        self, entry: PooledModel, prompt: BasePromptTemplate, **prompt_args: Any
+    ) -> str:
+        llama_cpp_llm = cast(LlamaCPP, entry.value)
+
+        # a llama.cpp context can't run several generations at once, and
+        # LlamaCPP.complete() only reads the parameters of the instance
+        with entry.lock:
+            generate_kwargs = llama_cpp_llm.generate_kwargs
+            llama_cpp_llm.generate_kwargs = {**generate_kwargs, **self._generate_kwargs}
+            try:
+                return llama_cpp_llm.predict(prompt, **prompt_args)
+            finally:
+                llama_cpp_llm.generate_kwargs = generate_kwargs
 
-        llama_cpp_llm.generate_kwargs.clear()
-        llama_cpp_llm.generate_kwargs.update(default_generate_kwargs)
+    def predict(
+        self,
+        prompt: BasePromptTemplate,
+        **prompt_args: Any,
+    ) -> str:
+        """Predict."""
+        if self._entry is not None:
+            return self._predict(self._entry, prompt, **prompt_args)
 
-        return llama_cpp_llm._parse_output(output)
+        with self._model.lease() as entry:
+            return self._predict(entry, prompt, **prompt_args)
 
     def __enter__(self) -> PredictFn:
+        self._lease = self._model.lease()
+        self._entry = self._lease.__enter__()
         return self.predict
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        pass
+        lease, self._lease, self._entry = self._lease, None, None
+        if lease is not None:
+            lease.__exit__(exc_type, exc_val, exc_tb)
 
 
 class LiLlmLlamacpp(LiLlm):
@@ -99,8 +126,7 @@ class LiLlmLlamacpp(LiLlm):
             },
         ]
 
-    def build_llm(self) -> "LLMType":
-
+    def _build_params(self) -> Dict[str, Any]:
         allowed_parameters = {
             "model_path",
             "model_kwargs",
@@ -118,20 +144,52 @@ class LiLlmLlamacpp(LiLlm):
                 params[param_name] = param_value
 
         if "model_kwargs" in params:
-            import json
-
             model_kwargs = params.pop("model_kwargs")
             model_kwargs_dict = json.loads(model_kwargs)
             params["model_kwargs"] = model_kwargs_dict
 
         if "generate_kwargs" in params:
-            import json
-
             model_kwargs = params.pop("generate_kwargs")
             model_kwargs_dict = json.loads(model_kwargs)
             params["generate_kwargs"] = model_kwargs_dict
 
-        return LlamaCPP(**params)
+        return params
+
+    def build_llm(self) -> "LLMType":
+        return LlamaCPP(**self._build_params())
+
+    def pool_key(self) -> str:
+        """Key of the model in the pool, its effective configuration
+
+        Returns:
+            str: the pool key
+        """
+        return json.dumps(self._build_params(), sort_keys=True)
+
+    @staticmethod
+    def _model_size(llm: Any) -> int:
+        # the file loaded by the instance, downloaded when built from a url
+        model_path = getattr(llm, "model_path", None)
+        if model_path and os.path.isfile(model_path):
+            return os.path.getsize(model_path)
+
+        return 0
+
+    def lease(self) -> ContextManager[PooledModel]:
+        """Lease the shared LlamaCPP instance of this configuration
+
+        Returns:
+            ContextManager[PooledModel]: the pooled LlamaCPP instance
+        """
+        pool = GlobalContext.get_instance().model_pool_manager.pool(
+            LLAMACPP_POOL, unload=_unload_llamacpp
+        )
+
+        return pool.lease(self.pool_key(), self.build_llm, self._model_size)
+
+    def warm_up(self) -> None:
+        with self.lease():
+            pass
 
     def predictor(
         self,
@@ -139,13 +197,40 @@ class LiLlmLlamacpp(LiLlm):
         max_tokens: Optional[int] = None,
         temperature: Optional[float] = None,
     ):
-
-        params: Dict[str, Any] = {}
-        if stop is not None:
-            params["stop"] = stop
-        if max_tokens is not None:
-            params["max_tokens"] = max_tokens
-        if temperature is not None:
-            params["temperature"] = temperature
-
-        return LlamaCppPredictor(llm=cast(LlamaCPP, self.build_llm()), **params)
+        return LlamaCppPredictor(
+            self, stop=stop, max_tokens=max_tokens, temperature=temperature
+        )
+
+
+def _unload_llamacpp(llm: Any) -> None:
+    llama_model = getattr(llm, "_model", None)
+    close = getattr(llama_model, "close", None)
+    if callable(close):
+        close()
+
+
+def preload_llamacpp_models(context: "GlobalContext") -> None:
+    """Warm up the LlamaCPP models listed in LLAMACPP_PRELOAD
+
+    Args:
+        context: the global context
+    """
+    config = Config()
+    raw_value = config.get("LLAMACPP_PRELOAD", default="")
+    model_ids = [model_id for model_id in raw_value.split(";") if model_id]
+    if not model_ids:
+        return
+
+    collection = config.get("LLAMACPP_PRELOAD_COLLECTION", default="llamaindex_llm")
+    db_handler = MongoDBHandler.from_default(context)
+
+    for model_id in model_ids:
+        try:
+            model = db_handler.load_one(collection, {"_id": model_id})
+            if not isinstance(model, LiLlmLlamacpp):
+                logger.warning("%s is not a LlamaCPP model", model_id)
+                continue
+
+            model.warm_up()
+        except Exception:
+            logger.exception("Unable to preload LlamaCPP model %s", model_id)
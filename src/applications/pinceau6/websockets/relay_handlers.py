@@ -1,6 +1,6 @@
 from typing import TYPE_CHECKING, Mapping, Any, Optional, Dict, List, Tuple
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from api.websocket_decorator import register_websocket_event
 from core.tasks.types import JSONParam, Status
@@ -24,6 +24,24 @@ class RelayPayload(BaseModel):
     event: Optional[str] = None
 
 
+class RemoteTaskResultPayload(BaseModel):
+
+    task_id: str = Field(alias="taskId")
+    result: Optional[Any] = None
+    error: Optional[str] = None
+
+
+@register_websocket_event()
+async def remote_task_result(payload: JSONParam, context: "GlobalContext", **kwargs):
+    result_payload = RemoteTaskResultPayload.model_validate(payload)
+
+    context.remote_result_manager.notify(
+        result_payload.task_id,
+        result=result_payload.result,
+        error=result_payload.error,
+    )
+
+
 @register_websocket_event()
 async def worker_relay(
     payload: JSONParam, websocket: "SocketIO", context: "GlobalContext", **kwargs
@@ -63,6 +81,10 @@ async def worker_relay(
         if dag_id in dag_context_map:
             return dag_context_map[dag_id]
 
+        if context.dag_manager.get(dag_id) is None:
+            # evicted job, its updates are dropped
+            return None
+
         composite_context = CompositeContext(context)
         if context.websocket_manager:
 
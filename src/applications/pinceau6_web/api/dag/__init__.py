@@ -1,6 +1,7 @@
 from typing import TYPE_CHECKING, List, Mapping, Any, cast, Dict
 
 from flask import jsonify, request, Response
+from werkzeug.exceptions import abort
 
 from api.blueprint_decorator import register_route
 from api.helpers import get_filters, get_range, get_sort
@@ -11,6 +12,7 @@ from core.callbacks.dag_ws_callback_handler import DagWebsocketCallbackHandler
 from core.context.global_context import GlobalContext
 from core.context.user_context import UserContext
 from core.database.mongodb import MongoDBHandler
+from core.managers.dag_runtime_manager import RuntimeSaturatedError
 from core.tasks.dag_calling_task import DAGCallingTask
 from core.tasks.remote_task_wrapper import RemoteTaskWrapper
 from core.tasks.task_dag import TaskDAG
@@ -52,6 +54,13 @@ def graphs(context: "CompositeContext") -> Response:
 def dag(dag_id: str, context: "CompositeContext") -> Response:
     dag_identifier, dag_variant, _ = extract_dag_id(dag_id)
 
+    job_summary = context.dag_manager.get_job_summary(dag_id)
+    if job_summary is not None:
+        # evicted job, don't recreate an empty instance
+        response = jsonify(job_summary)
+        response.status_code = 410
+        return response
+
     if dag_id not in context.dag_manager and dag_identifier in context.dag_manager:
         parent_dag_object = context.dag_manager[dag_identifier]
 
@@ -214,89 +223,126 @@ def delete_params(dag_id: str, context: "CompositeContext") -> Response:
     return jsonify({"status": "OK"})
 
 
-@register_route("/<string:dag_id>/run", methods=["POST"])
-@authentication()
-def run_dag(dag_id: str, context: "CompositeContext") -> Response:
-    dag_instance = context.dag_manager[dag_id]
-
-    used_dag = dag_instance.clone()
-    payload = request.json
-
-    direct_mode = True
-
-    required_worker_tag = used_dag.required_worker_tag or payload.pop(
-        "__required_worker_tag__", ""
-    )
+def _runs_locally(required_worker_tag: str) -> bool:
+    """Whether the DAGs requiring a worker tag run on this process"""
+    if not required_worker_tag:
+        return True
 
-    if required_worker_tag:
-        config = Config()
-        queues = config.get("WORKER_TAGS", default="celery").split(";")
-        direct_mode = required_worker_tag in queues
+    queues = Config().get("WORKER_TAGS", default="celery").split(";")
+    return required_worker_tag in queues
 
-    if not isinstance(payload, dict):
-        return jsonify("KO")
 
+def _start_run(
+    context: "CompositeContext",
+    used_dag: TaskDAG,
+    payload: Dict[str, Any],
+    required_worker_tag: str,
+    resume: bool = False,
+) -> None:
+    """Start a job DAG on this process, or on a worker with its required tag,
+    its changes are sent to the websocket room of the DAG"""
     global_context = context.cast_as(GlobalContext)
     user_context = context.cast_as(UserContext)
     from core.context.composite_context import CompositeContext
 
     work_context = CompositeContext(global_context)
 
-    if direct_mode:
-        if global_context.websocket_manager:
-            web_socket_callback = DagWebsocketCallbackHandler(
-                global_context.websocket_manager.websocket,
-                to=f"dag_{used_dag.original_id}",
-            )
-
-            dag_execution_callback = global_context.dag_manager.get_memory(
-                used_dag.original_id
-            )
-
-            work_context.create_local_context(
-                callbacks=[dag_execution_callback, web_socket_callback]
-            )
-
-        work_context.add_layer(user_context)
-
-        GlobalContext.run_task(context.run_dag(used_dag, payload, work_context))
+    if _runs_locally(required_worker_tag):
+        started_dag = used_dag
     else:
         with TaskDAG(
             id=f"{used_dag.id}-remote",
             original_id=used_dag.id,
             tags=[*used_dag.tags, "remote"],
             parent_id=used_dag.id,
-        ) as remote_dag:
+        ) as started_dag:
             RemoteTaskWrapper(
-                DAGCallingTask(used_dag.id, id="dag_calling", _register_task=False),
+                DAGCallingTask(
+                    used_dag.id, resume=resume, id="dag_calling", _register_task=False
+                ),
                 worker_tag=required_worker_tag,
                 id="remote_call",
             )
 
-        if global_context.websocket_manager:
-            web_socket_callback = DagWebsocketCallbackHandler(
-                global_context.websocket_manager.websocket,
-                to=f"dag_{remote_dag.original_id}",
-            )
+        print(f"context run task remote {started_dag} {payload=}")
 
-            dag_execution_callback = global_context.dag_manager.get_memory(
-                remote_dag.original_id
-            )
+    if global_context.websocket_manager:
+        web_socket_callback = DagWebsocketCallbackHandler(
+            global_context.websocket_manager.websocket,
+            to=f"dag_{started_dag.original_id}",
+        )
+
+        dag_execution_callback = global_context.dag_manager.get_memory(
+            started_dag.original_id
+        )
+
+        work_context.create_local_context(
+            callbacks=[dag_execution_callback, web_socket_callback]
+        )
+
+    work_context.add_layer(user_context)
+
+    # a remote run is resumed by the worker, from its own checkpoint store
+    local_resume = resume and started_dag is used_dag
+
+    try:
+        # job clones share no loop bound state, runs go to the least
+        # loaded loop
+        GlobalContext.run_task(
+            context.run_dag(started_dag, payload, work_context, resume=local_resume)
+        )
+    except RuntimeSaturatedError:
+        abort(503)
 
-            work_context.create_local_context(
-                callbacks=[dag_execution_callback, web_socket_callback]
-            )
 
-        work_context.add_layer(user_context)
+@register_route("/<string:dag_id>/run", methods=["POST"])
+@authentication()
+def run_dag(dag_id: str, context: "CompositeContext") -> Response:
+    dag_instance = context.dag_manager[dag_id]
 
-        print(f"context run task remote {remote_dag} {payload=}")
-        GlobalContext.run_task(context.run_dag(remote_dag, payload, work_context))
+    used_dag = dag_instance.clone()
+    payload = request.json
+
+    if not isinstance(payload, dict):
+        return jsonify("KO")
+
+    required_worker_tag = used_dag.required_worker_tag or payload.pop(
+        "__required_worker_tag__", ""
+    )
+
+    _start_run(context, used_dag, payload, required_worker_tag)
 
     return_value = {"dagId": used_dag.id, "parentId": used_dag.parent_id}
 
     return jsonify(return_value)
 
 
+@register_route("/<string:run_id>/resume", methods=["POST"])
+@authentication()
+def resume_dag(run_id: str, context: "CompositeContext") -> Response:
+    """Resume a checkpointed run where its DAG runs, only its unfinished tasks
+    run"""
+    global_context = context.cast_as(GlobalContext)
+
+    dag_id, _, _ = run_id.rpartition(":")
+    dag_instance = context.dag_manager.get(dag_id) if dag_id else None
+    if dag_instance is None:
+        abort(404)
+
+    required_worker_tag = dag_instance.required_worker_tag or ""
+    # the checkpoints of the remote runs are in the store of their worker
+    if _runs_locally(required_worker_tag) and not (
+        global_context.checkpoint_manager.has_run(run_id)
+    ):
+        abort(404)
+
+    used_dag = dag_instance.clone(run_id)
+
+    _start_run(context, used_dag, {}, required_worker_tag, resume=True)
+
+    return jsonify({"dagId": used_dag.id, "parentId": used_dag.parent_id})
+
+
 @register_route("/<string:dag_id>/persist", methods=["POST"])
 @authentication()
 def persist_dag(dag_id: str, context: "CompositeContext") -> Response:
@@ -1,9 +1,101 @@
+from typing import TYPE_CHECKING
+
 from flask import jsonify, Response
 
 from api.blueprint_decorator import register_route
+from api.security_wrapper import authentication
+from applications.huggingface.batch_inference import batch_inference_stats
+from core.callbacks.subscriptions import callback_stats
+from core.context.global_context import GlobalContext
+from core.context.telemetry_channel import telemetry_stats
+
+if TYPE_CHECKING:
+    from core.context.composite_context import CompositeContext
 
 
 @register_route("/", enabled=lambda **params: params.get("version", 1) > 1)
 def status(*, version: int = 1) -> Response:
 
     return jsonify({"status": "OK", "version": version})
+
+
+@register_route("/concurrency")
+@authentication()
+def concurrency(context: "CompositeContext", **kwargs) -> Response:
+    global_context = context.cast_as(GlobalContext)
+
+    return jsonify(global_context.concurrency_manager.stats())
+
+
+@register_route("/runtime")
+@authentication()
+def runtime(context: "CompositeContext", **kwargs) -> Response:
+    global_context = context.cast_as(GlobalContext)
+
+    return jsonify(global_context.dag_runtime_manager.stats())
+
+
+@register_route("/jobs")
+@authentication()
+def jobs(context: "CompositeContext", **kwargs) -> Response:
+    global_context = context.cast_as(GlobalContext)
+
+    return jsonify(global_context.dag_manager.job_stats())
+
+
+@register_route("/model-pools")
+@authentication()
+def model_pools(context: "CompositeContext", **kwargs) -> Response:
+    global_context = context.cast_as(GlobalContext)
+
+    return jsonify(global_context.model_pool_manager.stats())
+
+
+@register_route("/execution-pools")
+@authentication()
+def execution_pools(context: "CompositeContext", **kwargs) -> Response:
+    global_context = context.cast_as(GlobalContext)
+
+    return jsonify(global_context.execution_manager.stats())
+
+
+@register_route("/result-cache")
+@authentication()
+def result_cache(context: "CompositeContext", **kwargs) -> Response:
+    global_context = context.cast_as(GlobalContext)
+
+    return jsonify(global_context.result_cache_manager.stats())
+
+
+@register_route("/checkpoints")
+@authentication()
+def checkpoints(context: "CompositeContext", **kwargs) -> Response:
+    global_context = context.cast_as(GlobalContext)
+
+    return jsonify(global_context.checkpoint_manager.stats())
+
+
+@register_route("/memory-flush")
+@authentication()
+def memory_flush(context: "CompositeContext", **kwargs) -> Response:
+    global_context = context.cast_as(GlobalContext)
+
+    return jsonify(global_context.memory_flush_manager.stats())
+
+
+@register_route("/callbacks")
+@authentication()
+def callbacks(**kwargs) -> Response:
+    return jsonify(callback_stats())
+
+
+@register_route("/telemetry")
+@authentication()
+def telemetry(**kwargs) -> Response:
+    return jsonify(telemetry_stats())
+
+
+@register_route("/batch-inference")
+@authentication()
+def batch_inference(**kwargs) -> Response:
+    return jsonify(batch_inference_stats())
@@ -1,10 +1,15 @@
-from typing import TYPE_CHECKING, List
+from typing import TYPE_CHECKING, List, Literal, Optional
 
 import flask
 from flask_socketio import join_room, leave_room
 from pydantic import BaseModel
 
 from api.websocket_decorator import register_websocket_event
+from core.callbacks.dag_subscription import (
+    ENCODING_JSON,
+    available_encoding,
+    encoding_room,
+)
 from core.callbacks.dag_ws_callback_handler import DagWebsocketCallbackHandler
 from core.context.composite_context import CompositeContext
 from core.tasks.types import JSONParam
@@ -18,10 +23,13 @@ if TYPE_CHECKING:
 class DAGPayload(BaseModel):
 
     dag: str
+    # last sequence number seen by a reconnecting client
+    seq: Optional[int] = None
+    encoding: Literal["json", "msgpack"] = ENCODING_JSON
 
     @property
     def room_name(self) -> str:
-        return f"dag_{self.dag}"
+        return encoding_room(f"dag_{self.dag}", available_encoding(self.encoding))
 
 
 @register_websocket_event()
@@ -36,24 +44,30 @@ async def subscribe_dag(
         print("NOT DAG")
         return
 
-    room_name = dag_payload.room_name
-    join_room(room_name)
-
     work_context = CompositeContext(context)
 
     dag_callback = context.dag_manager.get_memory(dag_id)
+    encoding = available_encoding(dag_payload.encoding)
 
     # send only to subscriber
     callbacks: List["Callback"] = [dag_callback]
     if context.websocket_manager:
         web_socket_callback = DagWebsocketCallbackHandler(
-            context.websocket_manager.websocket, to=getattr(flask.request, "sid")
+            context.websocket_manager.websocket,
+            to=getattr(flask.request, "sid"),
+            encoding=encoding,
         )
         callbacks.append(web_socket_callback)
 
     work_context.create_local_context(callbacks=callbacks)
 
-    await work_context.event(dag, "subscription", {})
+    # a snapshot, or the deltas following seq for a reconnecting client, the
+    # room deltas newer than them wait until they are sent
+    with dag_callback.room_lock:
+        join_room(dag_payload.room_name)
+        await work_context.event(
+            dag, "subscription", {"seq": dag_payload.seq, "encoding": encoding}
+        )
 
 
 @register_websocket_event()
@@ -75,7 +89,9 @@ async def unsubscribe_dag(payload: "JSONParam", context: "GlobalContext", **kwar
 
     work_context.create_local_context(callbacks=[dag_callback])
 
-    await work_context.event(dag, "unsubscription", {})
+    await work_context.event(
+        dag, "unsubscription", {"encoding": available_encoding(dag_payload.encoding)}
+    )
 
 
 @register_websocket_event()
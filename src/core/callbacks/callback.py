@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Optional, Mapping, Any, TYPE_CHECKING
+from typing import FrozenSet, Optional, Mapping, Any, TYPE_CHECKING
 
 from core.callbacks.types import EventSenderParam
 
@@ -8,6 +8,12 @@ if TYPE_CHECKING:
 
 
 class Callback(ABC):
+    # events and sender kinds (see core.callbacks.subscriptions) the callback
+    # subscribes to, None for any; the events are only dispatched to the
+    # subscribed callbacks, which may still filter them in is_event_handled
+    EVENTS: Optional[FrozenSet[str]] = None
+    SENDERS: Optional[FrozenSet[str]] = None
+
     def __init__(self, **kwargs):
         # empty implementation
         pass
@@ -38,3 +44,9 @@ class Callback(ABC):
         self, context: "Context", sender: EventSenderParam, event=False
     ) -> bool:
         return True
+
+    def subscribes(self, event: str, kind: str) -> bool:
+        """Whether the events of a sender kind are dispatched to the callback"""
+        return (self.EVENTS is None or event in self.EVENTS) and (
+            self.SENDERS is None or kind in self.SENDERS
+        )
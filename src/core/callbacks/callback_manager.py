@@ -1,6 +1,18 @@
-from typing import Union, Optional, Sequence, TYPE_CHECKING, Mapping, Any, List
+import time
+from typing import (
+    Union,
+    Optional,
+    Sequence,
+    TYPE_CHECKING,
+    Mapping,
+    Any,
+    List,
+    Dict,
+    Tuple,
+)
 
 from core.callbacks.callback import Callback
+from core.callbacks.subscriptions import handler_timings, sender_kind
 from core.callbacks.types import EventSenderParam
 from core.utils import deserialize_instance
 
@@ -10,9 +22,13 @@ if TYPE_CHECKING:
 
 
 class CallbackManager(Callback):
+    # distinct (event, sender kind) keys kept in the subscription index
+    MAX_INDEX_SIZE = 1024
+
     def __init__(self, handlers, **kwargs) -> None:
         super().__init__(**kwargs)
         self._handlers: List["CallbackHandler"] = list(handlers)
+        self._index: Dict[Tuple[str, str], Tuple["CallbackHandler", ...]] = {}
 
     def serialize(self) -> Mapping[str, Any]:
         serialize_value = {
@@ -42,12 +58,39 @@ class CallbackManager(Callback):
         if not self.is_event_handled(context, sender, event):
             return False  # do not stop propagation
 
-        for handler in self._handlers:
-            if await handler.on_event(context, sender, event, payload, raw_payload):
+        for handler in self.handlers_for(event, sender_kind(sender)):
+            start = time.perf_counter()
+            try:
+                handled = await handler.on_event(
+                    context, sender, event, payload, raw_payload
+                )
+            finally:
+                handler_timings.record(handler, event, time.perf_counter() - start)
+
+            if handled:
                 return True  # stop propagation
 
         return False  # continue propagation
 
+    def handlers_for(self, event: str, kind: str) -> Tuple["CallbackHandler", ...]:
+        """Handlers subscribed to an event of a sender kind, in their order"""
+        key = (event, kind)
+
+        handlers = self._index.get(key)
+        if handlers is None:
+            if len(self._index) >= self.MAX_INDEX_SIZE:
+                self._index.clear()
+
+            handlers = tuple(
+                handler for handler in self._handlers if handler.subscribes(event, kind)
+            )
+            self._index[key] = handlers
+
+        return handlers
+
+    def subscribes(self, event: str, kind: str) -> bool:
+        return bool(self.handlers_for(event, kind))
+
     @classmethod
     def from_list(
         cls, manager: Union["CallbackManager", Sequence["CallbackHandler"]]
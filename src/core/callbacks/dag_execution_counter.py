@@ -3,6 +3,7 @@ from typing import Dict, Optional, TYPE_CHECKING, Any, List, Mapping, Tuple, cas
 import flask
 
 from core.callbacks.callback_handler import CallbackHandler
+from core.callbacks.subscriptions import SENDER_DAG, SENDER_STR
 from core.callbacks.types import EventSenderParam
 from core.tasks.types import Status
 
@@ -15,6 +16,8 @@ StatusTimeStampListMap = Dict[str, StatusTimeStampList]
 
 
 class DAGExecutionCounter(CallbackHandler):
+    EVENTS = frozenset({"status", "subscribe_running_dag_count"})
+    SENDERS = frozenset({SENDER_DAG, SENDER_STR})
 
     def __init__(self, **kwargs) -> None:
         super().__init__(**kwargs)
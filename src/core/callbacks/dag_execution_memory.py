@@ -1,20 +1,42 @@
-import asyncio
 import datetime
 import threading
-from typing import Dict, Optional, TYPE_CHECKING, Any, List, Mapping, cast
+from typing import Dict, Optional, TYPE_CHECKING, Any, List, Mapping, Set, Tuple, cast
 
 from conf import Config
 from conf.config import RunMode
 from core.callbacks.callback_handler import CallbackHandler
+from core.callbacks.dag_subscription import (
+    ENCODING_JSON,
+    ENCODING_MSGPACK,
+    SubscriptionLog,
+    available_encoding,
+    encode_message,
+)
+from core.callbacks.stream_store import (
+    StreamPolicy,
+    StreamSpill,
+    TaskStream,
+    configured_stream_spill,
+)
+from core.callbacks.subscriptions import SENDER_DAG, SENDER_TASK
 from core.callbacks.types import EventSenderParam
 from core.tasks.types import Status
+from misc.functions import deep_getsizeof
 
 if TYPE_CHECKING:
     from core.context.context import Context
+    from core.managers.memory_flush_manager import MemoryFlushManager
 
 
 class ExecutionMemoryBuffer:
-    def __init__(self, dag_id: str, status: Optional[Status] = None):
+    def __init__(
+        self,
+        dag_id: str,
+        status: Optional[Status] = None,
+        max_stream_items: int = 10000,
+        stream_policy: StreamPolicy = StreamPolicy.RING,
+        stream_spill: Optional[StreamSpill] = None,
+    ):
         self._dag_id = dag_id
         self._task_status: Dict[str, Status] = {}
         self._task_error: Dict[str, str] = {}
@@ -23,7 +45,10 @@ class ExecutionMemoryBuffer:
         self._progress: Optional[float] = None
 
         self._task_data: Dict[str, Dict[str, Any]] = {}
-        self._task_stream: Dict[str, Dict[str, Any]] = {}
+        self._task_stream: Dict[str, Dict[str, TaskStream]] = {}
+        self._max_stream_items = max_stream_items
+        self._stream_policy = stream_policy
+        self._stream_spill = stream_spill
 
         self._has_content = False
 
@@ -69,18 +94,35 @@ class ExecutionMemoryBuffer:
     def add_task_stream(self, sender: str, key: str, value: Any, reset: bool):
         sender_dict = self._task_stream.setdefault(sender, {})
 
-        if reset:
-            sender_dict.pop(key, None)
+        stream = sender_dict.get(key)
+        if stream is None:
+            stream = TaskStream(
+                f"{self._dag_id}/{sender}/{key}",
+                max_items=self._max_stream_items,
+                policy=self._stream_policy,
+                spill=self._stream_spill,
+            )
+            sender_dict[key] = stream
+
+        stream.append(value, reset)
+        self._has_content = True
 
-        if key in sender_dict:
-            previous_val, reset = sender_dict[key]
-        else:
-            previous_val = [] if isinstance(value, list) else ""
+    def flush_stream_spill(self) -> None:
+        if self._stream_spill is not None:
+            self._stream_spill.flush()
 
-        new_value = previous_val + value
+    def retained_bytes(self, seen: Optional[Set[int]] = None) -> int:
+        if seen is None:
+            seen = set()
 
-        sender_dict[key] = (new_value, reset)
-        self._has_content = True
+        size = deep_getsizeof(
+            [self._task_status, self._task_error, self._task_data], seen
+        )
+        for sender_dict in self._task_stream.values():
+            for stream in sender_dict.values():
+                size += stream.retained_bytes(seen)
+
+        return size
 
     def as_payload(self) -> Mapping[str, Any]:
         ws_data: Dict[str, Any] = {}
@@ -113,14 +155,14 @@ class ExecutionMemoryBuffer:
                         {"task": sender_event_id, "id": key, "data": value}
                     )
 
-            for sender_event_id, data_map in self._task_stream.items():
-                for key, (value, reset) in data_map.items():
+            for sender_event_id, stream_map in self._task_stream.items():
+                for key, stream in stream_map.items():
                     delta_values.append(
                         {
                             "task": sender_event_id,
                             "id": key,
-                            "stream": value,
-                            "reset": reset,
+                            "stream": stream.value(),
+                            "reset": stream.reset,
                         }
                     )
 
@@ -133,20 +175,45 @@ class ExecutionMemoryBuffer:
 
 class DagExecutionMemory(CallbackHandler):
 
-    def __init__(self, dag_id: str):
+    def __init__(
+        self, dag_id: str, flush_manager: Optional["MemoryFlushManager"] = None
+    ):
         super().__init__()
 
         self._dag_id = dag_id
-        self._acc_buffer = ExecutionMemoryBuffer(dag_id, Status.IDLE)
-        self._tmp_buffer = ExecutionMemoryBuffer(dag_id)
-
-        self._data_lock = asyncio.Lock()
-        self._sent_lock = threading.Lock()
-        self._is_scheduled = False
+        self._flush_manager = flush_manager
 
         conf = Config()
+        max_stream_items = conf.get("STREAM_MAX_ITEMS", coerce=int, default=10000)
+        stream_policy = getattr(
+            StreamPolicy, conf.get("STREAM_POLICY", default="RING").upper()
+        )
+
+        # only the accumulated buffer spills, deltas are a copy of its tail
+        self._acc_buffer = ExecutionMemoryBuffer(
+            dag_id,
+            Status.IDLE,
+            max_stream_items=max_stream_items,
+            stream_policy=stream_policy,
+            stream_spill=configured_stream_spill(),
+        )
+        self._tmp_buffer = ExecutionMemoryBuffer(
+            dag_id, max_stream_items=max_stream_items, stream_policy=stream_policy
+        )
+
+        # guards the delta buffer, written on the DAG loop and flushed on the
+        # flush manager loop
+        self._data_lock = threading.Lock()
+        # orders the room pushes with the subscribers joining the room, so
+        # that a subscriber gets its snapshot before the newer deltas
+        self._room_lock = threading.RLock()
+        # context and sender of the websocket room pushes
+        self._flush_target: Optional[Tuple["Context", EventSenderParam]] = None
 
         self._subscription_count = 1 if conf.run_mode == RunMode.WORKER else 0
+        self._subscriptions = SubscriptionLog(
+            conf.get("SUBSCRIPTION_HISTORY", coerce=int, default=256)
+        )
 
         self._ui_elements: List[Dict[str, Any]] = []
 
@@ -156,9 +223,109 @@ class DagExecutionMemory(CallbackHandler):
     def set_ui_elements(self, ui_elements: List[Dict[str, Any]]):
         self._ui_elements = ui_elements
 
+    def retained_bytes(self, seen: Optional[Set[int]] = None) -> int:
+        if seen is None:
+            seen = set()
+
+        return (
+            self._acc_buffer.retained_bytes(seen)
+            + self._tmp_buffer.retained_bytes(seen)
+            + deep_getsizeof(self._subscriptions.history(), seen)
+        )
+
     def serialize(self) -> Mapping[str, Any]:
         return {**super().serialize(), "dag_id": self._dag_id}
 
+    @property
+    def dag_id(self) -> str:
+        return self._dag_id
+
+    @property
+    def flush_manager(self) -> "MemoryFlushManager":
+        if self._flush_manager is None:
+            from core.context.global_context import GlobalContext
+
+            self._flush_manager = GlobalContext.get_instance().memory_flush_manager
+
+        return self._flush_manager
+
+    @property
+    def seq(self) -> int:
+        return self._subscriptions.seq
+
+    @property
+    def room_lock(self) -> threading.RLock:
+        """Held while joining the room and sending the subscription state"""
+        return self._room_lock
+
+    async def flush(self) -> Optional[Mapping[str, Any]]:
+        """Send the changes since the last flush to the websocket room
+
+        Returns:
+            Optional[Mapping[str, Any]]: the sent payload, None if there
+                were no changes
+        """
+        with self._room_lock:
+            with self._data_lock:
+                if not self._tmp_buffer.has_content or self._flush_target is None:
+                    return None
+
+                ws_data = self._tmp_buffer.as_payload()
+                self._tmp_buffer.clear()
+                seq = self._subscriptions.append(ws_data)
+                binary = self._subscriptions.has_subscribers(ENCODING_MSGPACK)
+                context, sender = self._flush_target
+
+            ws_data = {**ws_data, "seq": seq}
+            await context.on_event(context, sender, "ws_dag_room", ws_data)
+
+            if binary:
+                message = encode_message(
+                    {"sender": str(sender), "payload": ws_data}, ENCODING_MSGPACK
+                )
+                await context.on_event(
+                    context,
+                    sender,
+                    "ws_dag_room_binary",
+                    {"message": message},
+                    raw_payload=True,
+                )
+
+            return ws_data
+
+    async def _send_subscription_state(
+        self,
+        context: "Context",
+        sender: EventSenderParam,
+        seq: Optional[int],
+        encoding: str,
+    ) -> None:
+        """Send the deltas following seq, or a snapshot, to a subscriber
+
+        The room pushes wait until the state is sent, a subscriber joining
+        the room under the room lock gets no delta newer than its state first.
+        """
+        with self._room_lock:
+            # pending changes get their sequence number before the snapshot
+            await self.flush()
+
+            with self._data_lock:
+                deltas = self._subscriptions.since(seq) if seq is not None else None
+                if deltas is None:
+                    snapshot = {
+                        **self._acc_buffer.as_payload(),
+                        "seq": self._subscriptions.seq,
+                        "snapshot": True,
+                        "encoding": encoding,
+                    }
+
+            if deltas is None:
+                await context.event(sender, "ws", snapshot)
+                return
+
+            for delta_seq, delta in deltas:
+                await context.event(sender, "ws", {**delta, "seq": delta_seq})
+
     @property
     def start_date(self) -> Optional[datetime.datetime]:
         return self._start_date
@@ -182,6 +349,11 @@ class DagExecutionMemory(CallbackHandler):
         dag_id = data["dag_id"]
         return GlobalContext.get_instance().dag_manager.get_memory(dag_id)
 
+    EVENTS = frozenset(
+        {"data", "status", "stream", "progress", "subscription", "unsubscription"}
+    )
+    SENDERS = frozenset({SENDER_TASK, SENDER_DAG})
+
     def is_event_handled(
         self, context: "Context", sender: EventSenderParam, event=False
     ) -> bool:
@@ -217,12 +389,12 @@ class DagExecutionMemory(CallbackHandler):
 
                 self._acc_buffer.set_task_status(sender_event_id, status, error)
                 if self._subscription_count:
-                    async with self._data_lock:
+                    with self._data_lock:
                         self._tmp_buffer.set_task_status(sender_event_id, status, error)
 
             elif event == "data":
                 if self._subscription_count:
-                    async with self._data_lock:
+                    with self._data_lock:
                         for key, value in payload.items():
                             prev_value = self._acc_buffer.get_task_data_value(
                                 sender_event_id, key
@@ -237,11 +409,15 @@ class DagExecutionMemory(CallbackHandler):
                     self._acc_buffer.set_task_data(sender_event_id, key, value)
 
             elif event == "stream":
-                for key, (value, reset) in payload.items():
-                    self._acc_buffer.add_task_stream(sender_event_id, key, value, reset)
+                # snapshots are built under the same lock, an item is either in
+                # a snapshot or in the following delta, never in both
+                with self._data_lock:
+                    for key, (value, reset) in payload.items():
+                        self._acc_buffer.add_task_stream(
+                            sender_event_id, key, value, reset
+                        )
 
-                if self._subscription_count:
-                    async with self._data_lock:
+                    if self._subscription_count:
                         for key, (value, reset) in payload.items():
                             self._tmp_buffer.add_task_stream(
                                 sender_event_id, key, value, reset
@@ -249,16 +425,24 @@ class DagExecutionMemory(CallbackHandler):
 
         elif isinstance(sender, TaskDAG):
             if event == "subscription":
-                self._subscription_count += 1
+                encoding = available_encoding(payload.get("encoding", ENCODING_JSON))
+                with self._data_lock:
+                    self._subscription_count += 1
+                    self._subscriptions.subscribe(encoding)
 
-                await context.event(sender, "ws", self._acc_buffer.as_payload())
+                await self._send_subscription_state(
+                    context, sender, payload.get("seq"), encoding
+                )
 
             elif event == "unsubscription":
-                self._subscription_count -= 1
+                encoding = available_encoding(payload.get("encoding", ENCODING_JSON))
+                with self._data_lock:
+                    self._subscription_count -= 1
+                    self._subscriptions.unsubscribe(encoding)
 
-                if not self._subscription_count:
-                    async with self._data_lock:
+                    if not self._subscription_count:
                         self._tmp_buffer.clear()
+                        self._subscriptions.clear()
 
             elif event == "status":
                 raw_status = payload.get("status")
@@ -272,7 +456,7 @@ class DagExecutionMemory(CallbackHandler):
 
                 self._acc_buffer.set_dag_status(raw_status, payload.get("error"))
                 if self._subscription_count:
-                    async with self._data_lock:
+                    with self._data_lock:
                         self._tmp_buffer.set_dag_status(
                             raw_status, payload.get("error")
                         )
@@ -281,6 +465,7 @@ class DagExecutionMemory(CallbackHandler):
                     self._start_date = datetime.datetime.now()
                 elif raw_status in {Status.FINISHED, Status.ERROR}:
                     self._end_date = datetime.datetime.now()
+                    self._acc_buffer.flush_stream_spill()
 
             elif event == "progress":
                 progress_value = cast(float, payload["progress"])
@@ -288,32 +473,17 @@ class DagExecutionMemory(CallbackHandler):
 
                 self._acc_buffer.set_progress(new_progress)
                 if self._subscription_count:
-                    async with self._data_lock:
+                    with self._data_lock:
                         self._tmp_buffer.set_progress(new_progress)
 
-        async with self._data_lock:
+        with self._data_lock:
             should_send = self._tmp_buffer.has_content
+            if should_send and event not in {"subscription", "unsubscription"}:
+                # subscription events come from the context of a subscriber
+                self._flush_target = (context, sender)
 
         if should_send:
-            with self._sent_lock:
-                if not self._is_scheduled:
-                    self._is_scheduled = True
-
-                    async def schedule_function():
-                        await asyncio.sleep(0.3)
-
-                        async with self._data_lock:
-                            ws_data = self._tmp_buffer.as_payload()
-                            self._tmp_buffer.clear()
-
-                            with self._sent_lock:
-                                self._is_scheduled = False
-
-                        await context.event(sender, "ws_dag_room", ws_data)
-
-                    from core.context.global_context import GlobalContext
-
-                    GlobalContext.run_task(schedule_function())
+            self.flush_manager.mark_dirty(self)
 
         return False
 
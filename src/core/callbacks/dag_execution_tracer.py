@@ -1,6 +1,7 @@
 from typing import Dict, Optional, TYPE_CHECKING, Any, List, Mapping, Tuple, cast
 
 from core.callbacks.callback_handler import CallbackHandler
+from core.callbacks.subscriptions import SENDER_DAG
 from core.callbacks.types import EventSenderParam
 from core.tasks.types import Status
 
@@ -14,6 +15,8 @@ StatusTimeStampListMap = Dict[str, StatusTimeStampList]
 
 
 class DAGExecutionTracer(CallbackHandler):
+    EVENTS = frozenset({"status"})
+    SENDERS = frozenset({SENDER_DAG})
 
     def __init__(self, dag_id: str, **kwargs):
         super().__init__()
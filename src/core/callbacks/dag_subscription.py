@@ -0,0 +1,120 @@
+import logging
+from collections import deque
+from typing import Any, Deque, Dict, Final, List, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ENCODING_JSON: Final = "json"
+ENCODING_MSGPACK: Final = "msgpack"
+
+ENCODINGS = (ENCODING_JSON, ENCODING_MSGPACK)
+
+
+def available_encoding(encoding: Optional[str]) -> str:
+    """Encoding used for a subscriber asking for an encoding
+
+    msgpack is optional, subscribers asking for it get JSON payloads when it
+    isn't installed, the snapshot tells them which encoding is used.
+    """
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Unknown subscription encoding {encoding!r}")
+
+    if encoding == ENCODING_MSGPACK:
+        try:
+            import msgpack  # noqa: F401
+        except ModuleNotFoundError:
+            logger.warning("msgpack is not installed, using JSON payloads")
+            return ENCODING_JSON
+
+    return encoding
+
+
+def encode_message(message: Mapping[str, Any], encoding: str) -> Any:
+    """Encode a websocket message
+
+    Returns:
+        Any: the message for JSON, its bytes for msgpack
+    """
+    if encoding == ENCODING_MSGPACK:
+        import msgpack
+
+        return msgpack.packb(message, default=str)
+
+    return message
+
+
+def encoding_room(room: str, encoding: str) -> str:
+    """Room of the subscribers of a DAG room using an encoding"""
+    return room if encoding == ENCODING_JSON else f"{room}/{encoding}"
+
+
+class SubscriptionLog:
+    """Sequence numbers and recent deltas of a DAG subscription room
+
+    Each delta sent to the room gets the next sequence number. A client
+    reconnecting with the last sequence number it saw gets the deltas it
+    missed, or a snapshot when they are not in the history anymore.
+    """
+
+    def __init__(self, history: int = 256) -> None:
+        self._seq = 0
+        self._history: Deque[Tuple[int, Mapping[str, Any]]] = deque(maxlen=history)
+        self._encodings: Dict[str, int] = {}
+
+    @property
+    def seq(self) -> int:
+        return self._seq
+
+    def append(self, delta: Mapping[str, Any]) -> int:
+        """Record a delta
+
+        Returns:
+            int: the sequence number of the delta
+        """
+        self._seq += 1
+        self._history.append((self._seq, delta))
+
+        return self._seq
+
+    def since(self, seq: int) -> Optional[List[Tuple[int, Mapping[str, Any]]]]:
+        """Deltas following a sequence number
+
+        Returns:
+            Optional[List[Tuple[int, Mapping[str, Any]]]]: the deltas, None
+                if some of them are not in the history anymore
+        """
+        if seq > self._seq or seq < 0:
+            return None
+        if seq == self._seq:
+            return []
+        if not self._history or self._history[0][0] > seq + 1:
+            return None
+
+        return [
+            (delta_seq, delta) for delta_seq, delta in self._history if delta_seq > seq
+        ]
+
+    def subscribe(self, encoding: str) -> None:
+        self._encodings[encoding] = self._encodings.get(encoding, 0) + 1
+
+    def unsubscribe(self, encoding: str) -> None:
+        count = self._encodings.get(encoding, 0) - 1
+        if count > 0:
+            self._encodings[encoding] = count
+        else:
+            self._encodings.pop(encoding, None)
+
+    def has_subscribers(self, encoding: str) -> bool:
+        return encoding in self._encodings
+
+    def history(self) -> List[Tuple[int, Mapping[str, Any]]]:
+        return list(self._history)
+
+    def clear(self) -> None:
+        """Forget the deltas, when the room stops recording them
+
+        The sequence number moves on so that clients resuming from an older
+        one get a snapshot.
+        """
+        self._seq += 1
+        self._history.clear()
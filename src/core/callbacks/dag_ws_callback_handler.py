@@ -1,28 +1,39 @@
+import logging
 from threading import Lock
 from typing import Optional, TYPE_CHECKING, Mapping, Any
 
 from conf import Config
 from conf.config import RunMode
 from core.callbacks.callback_handler import CallbackHandler
+from core.callbacks.dag_subscription import (
+    ENCODING_JSON,
+    ENCODING_MSGPACK,
+    encode_message,
+    encoding_room,
+)
 from core.callbacks.types import EventSenderParam
 
 if TYPE_CHECKING:
     from core.context.context import Context
 
+logger = logging.getLogger(__name__)
+
 
 class DagWebsocketCallbackHandler(CallbackHandler):
+    EVENTS = frozenset({"ws", "ws_dag_room", "ws_dag_room_binary"})
 
-    def __init__(self, socket, to, **kwargs):
+    def __init__(self, socket, to, encoding: str = ENCODING_JSON, **kwargs):
         super().__init__(**kwargs)
 
         self._socket = socket
         self._to = to
+        self._encoding = encoding
         conf = Config()
         self._run_mode = conf.run_mode
         self._lock = Lock()
 
     def serialize(self) -> Mapping[str, Any]:
-        return {**super().serialize(), "to": self._to}
+        return {**super().serialize(), "to": self._to, "encoding": self._encoding}
 
     @classmethod
     def deserialize(cls, data: Mapping[str, Any]) -> Any:
@@ -33,12 +44,12 @@ class DagWebsocketCallbackHandler(CallbackHandler):
         if conf.run_mode == RunMode.WORKER:
             socket = global_context.websocket_client
 
-            return cls(socket, data["to"])
+            return cls(socket, data["to"], data.get("encoding", ENCODING_JSON))
         else:
             websocket_manager = global_context.websocket_manager
             socket = websocket_manager.websocket if websocket_manager else None
 
-            return cls(socket, data["to"])
+            return cls(socket, data["to"], data.get("encoding", ENCODING_JSON))
 
     async def on_handled_event(
         self,
@@ -48,20 +59,35 @@ class DagWebsocketCallbackHandler(CallbackHandler):
         payload: Optional[Mapping[str, Any]],
         raw_payload=False,
     ) -> bool:
-        emit = event in {"ws", "ws_dag_room"}
+        emit = event in {"ws", "ws_dag_room", "ws_dag_room_binary"}
         work_event = ""
 
-        to = None if event == "ws" else self._to
-
         if not emit:
             return False
 
-        data = (
+        to = self._to
+
+        data: Mapping[str, Any] = (
             {"sender": str(sender), "payload": payload if payload else {}}
             if not raw_payload
-            else payload
+            else payload or {}
         )
 
+        if event == "ws_dag_room_binary":
+            if self._run_mode == RunMode.WORKER:
+                # the API server memory encodes the relayed changes itself
+                return False
+
+            with self._lock:
+                try:
+                    self._socket.send(
+                        data["message"], to=encoding_room(to, ENCODING_MSGPACK)
+                    )
+                except Exception:
+                    logger.exception("Unable to send the binary changes to %s", to)
+
+            return True
+
         if self._run_mode == RunMode.WORKER:
             with self._lock:
                 try:
@@ -77,12 +103,14 @@ class DagWebsocketCallbackHandler(CallbackHandler):
                     pass
                 return False
 
+        message = encode_message(data, self._encoding)
+
         with self._lock:
             try:
                 if work_event and isinstance(work_event, str):
-                    self._socket.emit(work_event, data, to=to)
+                    self._socket.emit(work_event, message, to=to)
                 else:
-                    self._socket.send(data, to=to)
+                    self._socket.send(message, to=to)
             except Exception as e:
                 print(e)
 
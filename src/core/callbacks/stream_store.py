@@ -0,0 +1,250 @@
+import functools
+import itertools
+import json
+import logging
+import os
+import threading
+from collections import deque
+from enum import Enum
+from typing import Any, Deque, Dict, List, Optional, Protocol, Set, Union, cast
+
+from conf import Config
+from misc.functions import deep_getsizeof
+from misc.mongo_json_encoder import MongoEncoder
+
+logger = logging.getLogger(__name__)
+
+StreamChunk = Union[str, List[Any]]
+
+
+class StreamPolicy(Enum):
+    RING = 0
+    DOWNSAMPLE = 1
+
+
+class StreamSpill(Protocol):
+    """Destination of the chunks dropped from a bounded stream"""
+
+    def spill(self, stream_id: str, chunk: StreamChunk) -> None: ...
+
+    def flush(self) -> None: ...
+
+
+class FileStreamSpill:
+    """Append dropped chunks as JSON lines, one file per stream"""
+
+    def __init__(self, directory: str) -> None:
+        self._directory = directory
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, stream_id: str) -> str:
+        file_name = "".join(
+            char if char.isalnum() or char in "-_." else "_" for char in stream_id
+        )
+        return os.path.join(self._directory, f"{file_name}.jsonl")
+
+    def spill(self, stream_id: str, chunk: StreamChunk) -> None:
+        line = json.dumps(chunk, cls=MongoEncoder)
+        with self._lock:
+            with open(self.path_for(stream_id), "a", encoding="utf-8") as file:
+                file.write(line + "\n")
+
+    def flush(self) -> None:
+        pass
+
+
+class MongoStreamSpill:
+    """Insert dropped chunks in a mongodb collection, by batches"""
+
+    def __init__(self, collection: Any, batch_size: int = 64) -> None:
+        self._collection = collection
+        self._batch_size = batch_size
+        self._pending: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def spill(self, stream_id: str, chunk: StreamChunk) -> None:
+        with self._lock:
+            self._pending.append({"stream": stream_id, "chunk": chunk})
+            if len(self._pending) < self._batch_size:
+                return
+            pending, self._pending = self._pending, []
+
+        self._insert(pending)
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, []
+
+        if pending:
+            self._insert(pending)
+
+    def _insert(self, documents: List[Dict[str, Any]]) -> None:
+        try:
+            self._collection.insert_many(documents, ordered=False)
+        except Exception:
+            logger.exception("Unable to spill %d stream chunks", len(documents))
+
+
+class TaskStream:
+    """Bounded, append-only stream of a task output key
+
+    Values are kept as a queue of chunks, appending is O(1) and the full
+    value is only built when read. Once more than ``max_items`` list items
+    (or characters for text streams) are retained, the oldest chunks are
+    dropped (RING policy, handed over to the optional spill) or, for list
+    streams, the retained series is decimated (DOWNSAMPLE policy).
+    """
+
+    def __init__(
+        self,
+        stream_id: str,
+        max_items: int = 10000,
+        policy: StreamPolicy = StreamPolicy.RING,
+        spill: Optional[StreamSpill] = None,
+    ) -> None:
+        if max_items < 1:
+            raise ValueError("max_items must be >= 1")
+
+        self._stream_id = stream_id
+        self._max_items = max_items
+        self._policy = policy
+        self._spill = spill
+
+        self._chunks: Deque[StreamChunk] = deque()
+        self._is_text: Optional[bool] = None
+        self._size = 0
+        self._reset = False
+
+        self._dropped = 0
+        self._stride = 1
+        self._raw_count = 0
+
+    @property
+    def stream_id(self) -> str:
+        return self._stream_id
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def dropped(self) -> int:
+        return self._dropped
+
+    @property
+    def stride(self) -> int:
+        return self._stride
+
+    @property
+    def reset(self) -> bool:
+        """True if the value replaces what the client got before"""
+        return self._reset or self._dropped > 0
+
+    def clear(self, reset: bool = False) -> None:
+        self._chunks.clear()
+        self._is_text = None
+        self._size = 0
+        self._reset = reset
+        self._dropped = 0
+        self._stride = 1
+        self._raw_count = 0
+
+    def append(self, value: StreamChunk, reset: bool = False) -> None:
+        if reset:
+            self.clear(reset=True)
+
+        if self._is_text is None:
+            self._is_text = not isinstance(value, list)
+
+        if isinstance(value, list):
+            # keep the resolution of an already decimated history
+            start = -self._raw_count % self._stride
+            self._raw_count += len(value)
+            # copy, the caller may keep mutating its list
+            value = value[start :: self._stride]
+
+        if not value:
+            return
+
+        self._chunks.append(value)
+        self._size += len(value)
+
+        if self._size > self._max_items:
+            if self._policy == StreamPolicy.DOWNSAMPLE and not self._is_text:
+                self._downsample()
+            else:
+                self._trim()
+
+    def _trim(self) -> None:
+        excess = self._size - self._max_items
+
+        while excess > 0:
+            oldest = self._chunks[0]
+            if len(oldest) <= excess:
+                self._chunks.popleft()
+                dropped = oldest
+            else:
+                dropped = oldest[:excess]
+                self._chunks[0] = oldest[excess:]
+
+            self._size -= len(dropped)
+            self._dropped += len(dropped)
+            excess -= len(dropped)
+
+            if self._spill is not None:
+                self._spill.spill(self._stream_id, dropped)
+
+    def _downsample(self) -> None:
+        # retained items are the raw items whose index is a multiple of the
+        # stride, keeping one out of two doubles it
+        items = list(itertools.chain.from_iterable(self._chunks))
+        kept = items[::2]
+
+        self._dropped += len(items) - len(kept)
+        self._stride *= 2
+
+        self._chunks.clear()
+        self._chunks.append(kept)
+        self._size = len(kept)
+
+    def value(self) -> StreamChunk:
+        if self._is_text is None:
+            return ""
+
+        if self._is_text:
+            # text streams only hold str chunks
+            return "".join(cast(Deque[str], self._chunks))
+
+        return list(itertools.chain.from_iterable(self._chunks))
+
+    def retained_bytes(self, seen: Optional[Set[int]] = None) -> int:
+        return deep_getsizeof(self._chunks, seen)
+
+
+@functools.lru_cache(maxsize=1)
+def configured_stream_spill() -> Optional[StreamSpill]:
+    """Spill shared by every execution memory, from STREAM_SPILL configuration
+
+    Returns:
+        Optional[StreamSpill]: the spill, None if dropped chunks are discarded
+    """
+    config = Config()
+    spill_kind = config.get("STREAM_SPILL", default="").lower()
+
+    if not spill_kind:
+        return None
+
+    if spill_kind == "file":
+        return FileStreamSpill(config.get("STREAM_SPILL_DIR", default="streams"))
+
+    if spill_kind == "mongodb":
+        from core.context.global_context import GlobalContext
+        from misc.mongodb_helper import mongodb_collection
+
+        collection = mongodb_collection(
+            GlobalContext.get_instance(), "mongodb", "pinceau6", "_stream_spill"
+        )
+        return MongoStreamSpill(collection)
+
+    raise ValueError(f"Unknown STREAM_SPILL value {spill_kind!r}")
@@ -0,0 +1,93 @@
+import threading
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple
+
+from core.callbacks.types import EventSenderParam
+
+if TYPE_CHECKING:
+    from core.callbacks.callback import Callback
+
+SENDER_TASK = "task"
+SENDER_DAG = "dag"
+SENDER_STR = "str"
+SENDER_OBJECT = "object"
+
+_sender_kinds: Dict[type, str] = {}
+
+
+def sender_kind(sender: EventSenderParam) -> str:
+    """Kind of an event sender, the key of the callback subscriptions
+
+    Returns:
+        str: ``task``, ``dag``, ``str`` or ``object`` for the other senders
+    """
+    sender_type = type(sender)
+
+    kind = _sender_kinds.get(sender_type)
+    if kind is None:
+        from core.tasks.task import Task
+        from core.tasks.task_dag import TaskDAG
+
+        if issubclass(sender_type, Task):
+            kind = SENDER_TASK
+        elif issubclass(sender_type, TaskDAG):
+            kind = SENDER_DAG
+        elif issubclass(sender_type, str):
+            kind = SENDER_STR
+        else:
+            kind = SENDER_OBJECT
+        _sender_kinds[sender_type] = kind
+
+    return kind
+
+
+class HandlerTimings:
+    """Calls and time of the callback handlers, per handler class and event"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # [calls, total time, max time]
+        self._timings: Dict[Tuple[str, str], List[float]] = {}
+
+    def record(self, handler: "Callback", event: str, elapsed: float) -> None:
+        key = (handler.__class__.__name__, str(event))
+
+        with self._lock:
+            timing = self._timings.get(key)
+            if timing is None:
+                self._timings[key] = [1, elapsed, elapsed]
+                return
+
+            timing[0] += 1
+            timing[1] += elapsed
+            if elapsed > timing[2]:
+                timing[2] = elapsed
+
+    def reset(self) -> None:
+        with self._lock:
+            self._timings.clear()
+
+    def stats(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            timings = [(key, list(timing)) for key, timing in self._timings.items()]
+
+        stats: List[Dict[str, Any]] = [
+            {
+                "handler": handler,
+                "event": event,
+                "calls": int(calls),
+                "totalTime": total_time,
+                "meanTime": total_time / calls,
+                "maxTime": max_time,
+            }
+            for (handler, event), (calls, total_time, max_time) in timings
+        ]
+        stats.sort(key=lambda stat: stat["totalTime"], reverse=True)
+
+        return stats
+
+
+handler_timings = HandlerTimings()
+
+
+def callback_stats() -> List[Dict[str, Any]]:
+    return handler_timings.stats()
@@ -2,6 +2,7 @@ import time
 from typing import Dict, Optional, TYPE_CHECKING, Any, List, Mapping, Tuple, Union, cast
 
 from core.callbacks.callback_handler import CallbackHandler
+from core.callbacks.subscriptions import SENDER_TASK
 from core.callbacks.types import EventSenderParam
 from core.tasks.task import Task
 from core.tasks.types import Status
@@ -16,6 +17,8 @@ StatusTimeStampListMap = Dict[str, StatusTimeStampList]
 
 
 class TasksExecutionTracer(CallbackHandler):
+    EVENTS = frozenset({"status"})
+    SENDERS = frozenset({SENDER_TASK})
 
     def __init__(self, dag_id: str):
         super().__init__()
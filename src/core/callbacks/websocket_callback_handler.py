@@ -3,6 +3,7 @@ from typing import Optional, Mapping, Any, TYPE_CHECKING
 from conf import Config
 from conf.config import RunMode
 from core.callbacks.callback_handler import CallbackHandler
+from core.callbacks.subscriptions import SENDER_STR
 from core.callbacks.types import EventSenderParam
 
 if TYPE_CHECKING:
@@ -10,6 +11,8 @@ if TYPE_CHECKING:
 
 
 class WebsocketCallbackHandler(CallbackHandler):
+    SENDERS = frozenset({SENDER_STR})
+
     def __init__(self, socket, to, **kwargs):
         super().__init__(**kwargs)
         self._socket = socket
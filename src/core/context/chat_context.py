@@ -1,3 +1,4 @@
+import asyncio
 from typing import Optional, List, Dict, cast, Callable, Mapping, Any
 
 from llama_index.core.base.llms.types import ChatMessage, MessageRole
@@ -68,10 +69,12 @@ class ChatContext(Context):
         return self._chat_id
 
     async def update_message(self, context: "Context", message: AChatMessage):
+        # the websocket handler loops aren't managed, the shared pymongo
+        # client is used away from the loop
         db_manager = MongoDBHandler.from_default(context)
 
-        db_manager.update_object(
-            context, message, "chat_messages"
+        await asyncio.to_thread(
+            db_manager.update_object, context, message, "chat_messages"
         )  # TODO: check context
 
         await context.event(
@@ -89,7 +92,9 @@ class ChatContext(Context):
         self._message_list.append(message)
 
         db_manager = MongoDBHandler.from_default(context)
-        db_manager.save_object(context, message, "chat_messages")  # TODO: check context
+        await asyncio.to_thread(
+            db_manager.save_object, context, message, "chat_messages"
+        )  # TODO: check context
 
         print("context onEvent chatResponse")
         await context.event(
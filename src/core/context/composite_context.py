@@ -1,8 +1,10 @@
 from typing import List, Optional, Any, Type, Self, Mapping
 
+from core.callbacks.subscriptions import sender_kind
 from core.callbacks.types import EventSenderParam
 from core.context.context import Context, CastContext
 from core.context.local_context import LocalContext
+from core.context.telemetry_channel import TelemetryChannel
 from core.utils import deserialize_instance
 
 
@@ -10,6 +12,7 @@ class CompositeContext(Context):
     def __init__(self, *children, **kwargs) -> None:
         super().__init__(**kwargs)
         self._children: List[Context] = list(children)
+        self._telemetry: Optional[TelemetryChannel] = None
 
     def serialize(self) -> Mapping[str, Any]:
         serialized_value = {
@@ -37,6 +40,30 @@ class CompositeContext(Context):
 
         return f"{str_value}[{' > '.join(children_context_names[::-1])}]"
 
+    @property
+    def telemetry(self) -> Optional[TelemetryChannel]:
+        return self._telemetry
+
+    def set_telemetry(self, telemetry: Optional[TelemetryChannel]) -> None:
+        """Route the events sent to the context through a telemetry channel
+
+        Args:
+            telemetry: the channel, None sends the events right away
+        """
+        self._telemetry = telemetry
+
+    async def event(
+        self,
+        sender: EventSenderParam,
+        event: str,
+        payload: Optional[Mapping[str, Any]] = None,
+        raw_payload=False,
+    ) -> bool:
+        if self._telemetry is not None:
+            return await self._telemetry.send(sender, event, payload, raw_payload)
+
+        return await super().event(sender, event, payload, raw_payload=raw_payload)
+
     async def on_handled_event(
         self,
         context: "Context",
@@ -51,12 +78,20 @@ class CompositeContext(Context):
             # self callback manager stopped propagation
             return True
 
+        kind = sender_kind(sender)
         for sub_context in self._children[::-1]:
+            if not sub_context.subscribes(event, kind):
+                continue
             if await sub_context.on_event(context, sender, event, payload, raw_payload):
                 return True
 
         return False
 
+    def subscribes(self, event: str, kind: str) -> bool:
+        return self._callback_manager.subscribes(event, kind) or any(
+            sub_context.subscribes(event, kind) for sub_context in self._children
+        )
+
     def has(self, key: str) -> bool:
         return self._children[-1].has(key)
 
@@ -3,6 +3,7 @@ from typing import Optional
 
 from core.callbacks.callback_handler import CallbackHandler
 from core.callbacks.callback_manager import CallbackManager
+from core.callbacks.subscriptions import sender_kind
 from core.callbacks.types import EventSender, EventSenderObject, EventSenderParam
 from core.utils import deserialize_instance
 
@@ -38,10 +39,20 @@ class Context(CallbackHandler):
         payload: Optional[Mapping[str, Any]] = None,
         raw_payload=False,
     ) -> bool:
+        if not self.subscribes(event, sender_kind(sender)):
+            return False
+
         return await self.on_event(
             self, sender, event, payload, raw_payload=raw_payload
         )
 
+    def subscribes(self, event: str, kind: str) -> bool:
+        if type(self).on_handled_event is not Context.on_handled_event:
+            # the context handles the events itself
+            return True
+
+        return self._callback_manager.subscribes(event, kind)
+
     async def on_handled_event(
         self,
         context: "Context",
@@ -0,0 +1,179 @@
+import asyncio
+from typing import Any, Mapping, Optional, Type
+
+from core.callbacks.subscriptions import sender_kind
+from core.callbacks.types import EventSenderParam
+from core.context.context import CastContext, Context
+
+
+class LoopForwardingContext(Context):
+    """Context of a task body running on another thread's event loop
+
+    Events are dispatched on the loop of the DAG run, where the callbacks and
+    the websocket live, and awaited by the task body. Values and casts are
+    read from the DAG context directly.
+    """
+
+    def __init__(
+        self, context: Context, loop: asyncio.AbstractEventLoop, **kwargs
+    ) -> None:
+        super().__init__(**kwargs)
+        self._context = context
+        self._loop = loop
+
+    @property
+    def dispatch_loop(self) -> asyncio.AbstractEventLoop:
+        return self._loop
+
+    async def _forward(self, coroutine) -> Any:
+        return await asyncio.wrap_future(
+            asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+        )
+
+    async def event(
+        self,
+        sender: EventSenderParam,
+        event: str,
+        payload: Optional[Mapping[str, Any]] = None,
+        raw_payload=False,
+    ) -> bool:
+        # the subscriptions are read here to spare the loop hop
+        if not self._context.subscribes(event, sender_kind(sender)):
+            return False
+
+        return await self._forward(
+            self._context.event(sender, event, payload, raw_payload=raw_payload)
+        )
+
+    def subscribes(self, event: str, kind: str) -> bool:
+        return self._context.subscribes(event, kind)
+
+    async def on_event(
+        self,
+        context: "Context",
+        sender: EventSenderParam,
+        event: str,
+        payload: Optional[Mapping[str, Any]],
+        raw_payload=False,
+    ) -> bool:
+        target_context = self._context if context is self else context
+
+        return await self._forward(
+            self._context.on_event(
+                target_context, sender, event, payload, raw_payload=raw_payload
+            )
+        )
+
+    async def on_handled_event(
+        self,
+        context: "Context",
+        sender: EventSenderParam,
+        event: str,
+        payload: Optional[Mapping[str, Any]],
+        raw_payload=False,
+    ) -> bool:
+        return await self.on_event(context, sender, event, payload, raw_payload)
+
+    def has(self, key: str) -> bool:
+        return self._context.has(key)
+
+    def get(self, key: str, default: Optional[Any] = None) -> Any:
+        return self._context.get(key, default)
+
+    def set(self, key: str, value: Any):
+        return self._context.set(key, value)
+
+    def update(self, key: str, value: Any) -> bool:
+        return self._context.update(key, value)
+
+    def cast_as(self, context_type: Type[CastContext]) -> CastContext:
+        return self._context.cast_as(context_type)
+
+    def __getattr__(self, item: str) -> Any:
+        return getattr(self._context, item)
+
+
+class QueueEventContext(Context):
+    """Context of a task body running in a worker process
+
+    Events are put on a queue read by the parent process, which emits them
+    from the DAG run. Senders are sent as ``"task"`` for the task itself and
+    ``"dag"`` for its DAG, other senders must be strings.
+    """
+
+    def __init__(self, queue, task, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self._queue = queue
+        self._task = task
+        self._values: dict = {}
+
+    def _sender_key(self, sender: EventSenderParam) -> str:
+        if sender is self._task:
+            return "task"
+        if sender is self._task.dag():
+            return "dag"
+        if isinstance(sender, str):
+            return sender
+
+        raise ValueError(f"{sender} events can't be sent from a worker process")
+
+    async def on_event(
+        self,
+        context: "Context",
+        sender: EventSenderParam,
+        event: str,
+        payload: Optional[Mapping[str, Any]],
+        raw_payload=False,
+    ) -> bool:
+        return await self.on_handled_event(context, sender, event, payload, raw_payload)
+
+    async def on_handled_event(
+        self,
+        context: "Context",
+        sender: EventSenderParam,
+        event: str,
+        payload: Optional[Mapping[str, Any]],
+        raw_payload=False,
+    ) -> bool:
+        message = (self._sender_key(sender), event, payload, raw_payload)
+        await asyncio.to_thread(self._queue.put, message)
+
+        return False
+
+    def subscribes(self, event: str, kind: str) -> bool:
+        # the parent process dispatches the events
+        return True
+
+    def has(self, key: str) -> bool:
+        return key in self._values
+
+    def get(self, key: str, default: Optional[Any] = None) -> Any:
+        return self._values.get(key, default)
+
+    def set(self, key: str, value: Any):
+        self._values[key] = value
+
+    def update(self, key: str, value: Any) -> bool:
+        if self.has(key):
+            self.set(key, value)
+            return True
+
+        return False
+
+
+def dispatch_loop(context: Context) -> asyncio.AbstractEventLoop:
+    """Event loop where the events of a task body are dispatched
+
+    Blocking code of a task body, a training callback for example, may
+    schedule its events on it with ``asyncio.run_coroutine_threadsafe``.
+
+    Args:
+        context: the context given to the task body
+
+    Returns:
+        asyncio.AbstractEventLoop: the DAG run loop
+    """
+    if isinstance(context, LoopForwardingContext):
+        return context.dispatch_loop
+
+    return asyncio.get_running_loop()
@@ -1,7 +1,7 @@
 import asyncio
+import concurrent.futures
 import logging
-import threading
-from typing import Optional, Any, TYPE_CHECKING, Mapping, List
+from typing import Optional, Any, TYPE_CHECKING, Mapping, List, Coroutine
 
 import cachetools.func
 
@@ -10,10 +10,22 @@ from core.callbacks.dag_execution_counter import DAGExecutionCounter
 from core.callbacks.dag_ws_callback_handler import DagWebsocketCallbackHandler
 from core.context.composite_context import CompositeContext
 from core.context.context import Context
+from core.context.telemetry_channel import TelemetryChannel, parse_telemetry_events
 from core.managers.applications_manager import ApplicationsManager
+from core.managers.checkpoint_manager import CheckpointManager
+from core.managers.concurrency_manager import ConcurrencyManager
+from core.managers.dag_runtime_manager import (
+    DagRuntimeManager,
+    RuntimeSaturatedError,
+)
 from core.managers.dbms_manager import DBMSManager
+from core.managers.execution_manager import ExecutionManager
+from core.managers.memory_flush_manager import MemoryFlushManager
 from core.managers.model_manager import ModelsManager
+from core.managers.model_pool_manager import MB, ModelPoolManager
 from core.managers.object_lock_manager import ObjectLockManager
+from core.managers.remote_result_manager import RemoteResultManager
+from core.managers.result_cache_manager import ResultCacheManager
 from core.managers.scheduler_manager import SchedulerManager
 from core.managers.websocket_manager import WebsocketManager
 from core.tasks.types import Status, TaskData
@@ -55,6 +67,52 @@ class GlobalContext(Context):
 
         self.models_manager: ModelsManager = ModelsManager()
         self._object_lock_manager = ObjectLockManager()
+        self._concurrency_manager = ConcurrencyManager(
+            ConcurrencyManager.parse_limits(self._config.get("CONCURRENCY_LIMITS"))
+        )
+
+        self._dag_runtime_manager: Optional[DagRuntimeManager] = None
+        self._remote_result_manager = RemoteResultManager(
+            poll_interval=self._config.get(
+                "REMOTE_RESULT_POLL_INTERVAL", coerce=float, default=30.0
+            )
+        )
+
+        self._model_pool_manager = ModelPoolManager(
+            ModelPoolManager.parse_budgets(self._config.get("MODEL_POOL_BUDGETS")),
+            default_budget=self._config.get(
+                "MODEL_POOL_DEFAULT_BUDGET", coerce=int, default=8192
+            )
+            * MB,
+        )
+
+        self._execution_manager = ExecutionManager(
+            ExecutionManager.parse_pools(self._config.get("EXECUTION_POOLS")),
+            ExecutionManager.parse_task_pools(self._config.get("EXECUTION_TASK_POOLS")),
+            start_method=self._config.get(
+                "EXECUTION_PROCESS_START_METHOD", default="spawn"
+            ),
+        )
+
+        self._result_cache_manager = ResultCacheManager(
+            ResultCacheManager.parse_task_caches(
+                self._config.get("RESULT_CACHE_TASKS")
+            ),
+            default_ttl=self._config.get("RESULT_CACHE_TTL", coerce=float),
+            max_value_bytes=self._config.get(
+                "RESULT_CACHE_MAX_VALUE_MB", coerce=int, default=16
+            )
+            * MB,
+        )
+
+        self._checkpoint_manager = CheckpointManager.from_config()
+        self._memory_flush_manager = MemoryFlushManager(
+            self._config.get("MEMORY_FLUSH_INTERVAL", coerce=float, default=0.3)
+        )
+
+        self._telemetry_events = parse_telemetry_events(
+            self._config.get("TELEMETRY_EVENTS")
+        )
 
         self.celery = None
         self._flask_app = None
@@ -81,6 +139,51 @@ class GlobalContext(Context):
     def object_lock_manager(self) -> "ObjectLockManager":
         return self._object_lock_manager
 
+    @property
+    def concurrency_manager(self) -> "ConcurrencyManager":
+        return self._concurrency_manager
+
+    @property
+    def memory_flush_manager(self) -> "MemoryFlushManager":
+        return self._memory_flush_manager
+
+    @property
+    def remote_result_manager(self) -> "RemoteResultManager":
+        return self._remote_result_manager
+
+    @property
+    def model_pool_manager(self) -> "ModelPoolManager":
+        return self._model_pool_manager
+
+    @property
+    def execution_manager(self) -> "ExecutionManager":
+        return self._execution_manager
+
+    @property
+    def result_cache_manager(self) -> "ResultCacheManager":
+        return self._result_cache_manager
+
+    @property
+    def checkpoint_manager(self) -> "CheckpointManager":
+        return self._checkpoint_manager
+
+    @property
+    def dag_runtime_manager(self) -> "DagRuntimeManager":
+        if self._dag_runtime_manager is None:
+            config = self._config
+            self._dag_runtime_manager = DagRuntimeManager(
+                loop_count=config.get("RUNTIME_LOOPS", coerce=int, default=4),
+                max_in_flight=config.get(
+                    "RUNTIME_MAX_IN_FLIGHT", coerce=int, default=64
+                ),
+                max_queued=config.get("RUNTIME_MAX_QUEUED", coerce=int, default=1024),
+                drain_timeout=config.get(
+                    "RUNTIME_DRAIN_TIMEOUT", coerce=float, default=30.0
+                ),
+            )
+
+        return self._dag_runtime_manager
+
     @classmethod
     def deserialize(cls, data: Mapping[str, Any]) -> Any:
         if hasattr(cls, "INSTANCE"):
@@ -158,8 +261,22 @@ class GlobalContext(Context):
         self.dag_manager[dag.id] = dag
 
     async def run_dag(
-        self, dag: "TaskDAG", data_input: TaskData, context: Optional["Context"] = None
+        self,
+        dag: "TaskDAG",
+        data_input: TaskData,
+        context: Optional["Context"] = None,
+        resume: bool = False,
     ) -> None:
+        """Run a DAG
+
+        Args:
+            dag: the DAG to run, its id is the run id
+            data_input: the DAG input
+            context: the run context, a composite context sending the DAG
+                events to its websocket room by default
+            resume: resume the checkpointed run of the DAG id, its recorded
+                input replaces data_input
+        """
 
         work_context = None
         try:
@@ -188,10 +305,26 @@ class GlobalContext(Context):
         if not work_context:
             return
 
+        telemetry = None
+        telemetry_context: Optional[CompositeContext] = None
+        if self._telemetry_events and isinstance(work_context, CompositeContext):
+            if work_context.telemetry is None:
+                telemetry = TelemetryChannel(work_context, self._telemetry_events)
+                telemetry_context = work_context
+                telemetry_context.set_telemetry(telemetry)
+
+        checkpoint = None
         try:
             await dag.set_status(work_context, Status.RUNNING, send_value=False)
             await dag.reset_task_status(work_context)
 
+            checkpoint = await self._checkpoint_manager.open_run(
+                dag, data_input, resume=resume
+            )
+            if checkpoint is not None:
+                data_input = checkpoint.data_input
+            dag.set_checkpoint(checkpoint)
+
             async with asyncio.TaskGroup() as tg:
                 dag.set_task_group(tg)
                 root_tasks = dag.get_root_tasks()
@@ -202,19 +335,47 @@ class GlobalContext(Context):
             dag.set_task_group(None)
 
             await dag.dag_did_finish()
+            if checkpoint is not None:
+                await checkpoint.close(finished=True)
             await dag.set_status(work_context, Status.FINISHED)
         except Exception as e:
             logger.exception("run_dag")
             print(e)
+            if checkpoint is not None:
+                await checkpoint.close(finished=False)
             await dag.set_status(work_context, Status.ERROR, error=e)
+        finally:
+            dag.set_checkpoint(None)
+            if telemetry is not None and telemetry_context is not None:
+                await telemetry.close()
+                telemetry_context.set_telemetry(None)
 
     @staticmethod
-    def run_task(coroutine) -> None:
+    def run_task(
+        coroutine: Coroutine, key: Optional[str] = None
+    ) -> Optional[concurrent.futures.Future]:
+        """Run a coroutine on the shared DAG runtime
+
+        Args:
+            coroutine: the coroutine to run
+            key: optional affinity key, coroutines sharing a key run on the
+                same event loop
+
+        Returns:
+            Optional[concurrent.futures.Future]: the coroutine future
+
+        Raises:
+            RuntimeSaturatedError: when the runtime can't accept more work
+        """
         try:
-            thread = threading.Thread(target=asyncio.run, args=(coroutine,))
+            runtime = GlobalContext.get_instance().dag_runtime_manager
+            return runtime.submit(coroutine, key=key)
 
-            thread.start()
+        except RuntimeSaturatedError:
+            logger.warning("run_task rejected, DAG runtime saturated")
+            raise
 
-        except Exception as e:
-            print(e)
+        except Exception:
             logger.exception("run_task")
+
+        return None
@@ -0,0 +1,309 @@
+import asyncio
+import logging
+import numbers
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping, Optional, Tuple
+
+from core.callbacks.subscriptions import SENDER_DAG, sender_kind
+from core.callbacks.types import EventSenderParam
+
+if TYPE_CHECKING:
+    from core.context.context import Context
+
+logger = logging.getLogger(__name__)
+
+# keep the last payload
+MODE_LAST = "last"
+# merge the payload keys, the last value of a key wins
+MODE_MERGE = "merge"
+# concatenate the (chunk, reset) values of stream payloads
+MODE_BATCH = "batch"
+# send count / min / max / mean / last of numeric values as data
+MODE_SUMMARY = "summary"
+
+TELEMETRY_MODES = {MODE_LAST, MODE_MERGE, MODE_BATCH, MODE_SUMMARY}
+
+DEFAULT_TELEMETRY_EVENTS = (
+    "progress=last:0.25;data=merge:0.25;stream=batch:0.25;metrics=summary:1"
+)
+
+_totals_lock = threading.Lock()
+# [received, sent] per event
+_totals: Dict[str, List[int]] = {}
+
+
+def parse_telemetry_events(raw_value: Optional[str]) -> Dict[str, Tuple[str, float]]:
+    """Parse an ``event=mode:interval;...`` value
+
+    Args:
+        raw_value: the raw configuration value, ``none`` disables the
+            telemetry channel
+
+    Returns:
+        Dict[str, Tuple[str, float]]: mode and flush interval per event
+    """
+    policies: Dict[str, Tuple[str, float]] = {}
+    if raw_value is None:
+        raw_value = DEFAULT_TELEMETRY_EVENTS
+    if raw_value.strip().lower() == "none":
+        return policies
+
+    for part in raw_value.split(";"):
+        if not part.strip():
+            continue
+        event, _, policy = part.partition("=")
+        mode, _, interval = policy.partition(":")
+        mode = mode.strip()
+        if not event.strip() or mode not in TELEMETRY_MODES:
+            raise ValueError(f"Invalid telemetry event {part!r}")
+        policies[event.strip()] = (
+            mode,
+            float(interval) if interval.strip() else 0.25,
+        )
+
+    return policies
+
+
+def telemetry_stats() -> Dict[str, Dict[str, int]]:
+    with _totals_lock:
+        return {
+            event: {"received": received, "sent": sent}
+            for event, (received, sent) in _totals.items()
+        }
+
+
+def _count(event: str, received: int = 0, sent: int = 0) -> None:
+    with _totals_lock:
+        totals = _totals.setdefault(event, [0, 0])
+        totals[0] += received
+        totals[1] += sent
+
+
+def _join(chunks: List[Any]) -> Any:
+    if len(chunks) == 1:
+        return chunks[0]
+    if isinstance(chunks[0], str):
+        return "".join(chunks)
+
+    return [item for chunk in chunks for item in chunk]
+
+
+class _Pending:
+    """Events of a sender and kind waiting for their flush"""
+
+    def __init__(self, sender: EventSenderParam, event: str, mode: str) -> None:
+        self.sender = sender
+        self.event = event
+        self.mode = mode
+        self.payload: Dict[str, Any] = {}
+        self.summaries: Dict[str, List[Any]] = {}
+        # type, chunks and reset of the stream keys
+        self.chunks: Dict[str, Tuple[type, List[Any], bool]] = {}
+
+    def add(self, payload: Mapping[str, Any]) -> bool:
+        """Coalesce a payload
+
+        Returns:
+            bool: False when the payload can't be coalesced with the pending
+                ones, they must be flushed first
+        """
+        if self.mode == MODE_LAST:
+            self.payload = dict(payload)
+        elif self.mode == MODE_MERGE:
+            self.payload.update(payload)
+        elif self.mode == MODE_BATCH:
+            return self._add_chunks(payload)
+        else:
+            self._add_values(payload)
+
+        return True
+
+    def _add_chunks(self, payload: Mapping[str, Any]) -> bool:
+        for key, (value, reset) in payload.items():
+            pending = self.chunks.get(key)
+            if (
+                pending is not None
+                and not reset
+                and not (isinstance(value, (list, str)) and type(value) is pending[0])
+            ):
+                return False
+
+        for key, (value, reset) in payload.items():
+            pending = self.chunks.get(key)
+            if reset or pending is None:
+                self.chunks[key] = (type(value), [value], reset)
+            else:
+                pending[1].append(value)
+
+        return True
+
+    def _add_values(self, payload: Mapping[str, Any]) -> None:
+        for key, value in payload.items():
+            if not isinstance(value, numbers.Real) or isinstance(value, bool):
+                self.payload[key] = value
+                continue
+
+            summary = self.summaries.get(key)
+            if summary is None:
+                # count, total, min, max, last
+                self.summaries[key] = [1, value, value, value, value]
+            else:
+                summary[0] += 1
+                summary[1] += value
+                summary[2] = min(summary[2], value)
+                summary[3] = max(summary[3], value)
+                summary[4] = value
+
+    def event_and_payload(self) -> Tuple[str, Dict[str, Any]]:
+        if self.mode == MODE_BATCH:
+            return self.event, {
+                key: (_join(chunks), reset)
+                for key, (_, chunks, reset) in self.chunks.items()
+            }
+        if self.mode != MODE_SUMMARY:
+            return self.event, self.payload
+
+        payload = dict(self.payload)
+        for key, (count, total, minimum, maximum, last) in self.summaries.items():
+            payload[key] = {
+                "count": count,
+                "mean": total / count,
+                "min": minimum,
+                "max": maximum,
+                "last": last,
+            }
+
+        return "data", payload
+
+
+class TelemetryChannel:
+    """Coalesces the high frequency events of a DAG run
+
+    Progress, data, stream and metrics events are kept per sender and sent
+    at the flush interval of their event, so the event volume reaching the
+    callbacks and the websockets stays bounded whatever the rate of the
+    loop emitting them. Any other event of a sender flushes its pending
+    events first, a DAG event flushes all of them, so the UI sees the last
+    values before a status change.
+    """
+
+    def __init__(
+        self, context: "Context", policies: Mapping[str, Tuple[str, float]]
+    ) -> None:
+        self._context = context
+        self._policies = dict(policies)
+        self._tick = min((interval for _, interval in policies.values()), default=1)
+
+        self._pending: Dict[Tuple[int, str], _Pending] = {}
+        self._last_flush: Dict[str, float] = {}
+        self._flusher: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    async def send(
+        self,
+        sender: EventSenderParam,
+        event: str,
+        payload: Optional[Mapping[str, Any]] = None,
+        raw_payload=False,
+    ) -> bool:
+        """Coalesce an event, or send it with the pending events of its sender
+
+        Returns:
+            bool: True if a handler stopped the propagation of a sent event
+        """
+        kind = sender_kind(sender)
+        if not self._context.subscribes(event, kind):
+            return False
+
+        policy = self._policies.get(event)
+        if policy is None or raw_payload or not isinstance(payload, Mapping):
+            if self._pending:
+                await self.flush(None if kind == SENDER_DAG else sender)
+
+            return await self._emit(sender, event, payload, raw_payload)
+
+        _count(event, received=1)
+
+        key = (id(sender), event)
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = self._pending[key] = _Pending(sender, event, policy[0])
+
+        if not pending.add(payload):
+            await self.flush(sender)
+            pending = self._pending[key] = _Pending(sender, event, policy[0])
+            pending.add(payload)
+
+        if self._flusher is None:
+            self._flusher = asyncio.get_running_loop().create_task(self._flush_loop())
+
+        return False
+
+    async def _emit(
+        self,
+        sender: EventSenderParam,
+        event: str,
+        payload: Optional[Mapping[str, Any]],
+        raw_payload=False,
+    ) -> bool:
+        return await self._context.on_event(
+            self._context, sender, event, payload, raw_payload=raw_payload
+        )
+
+    async def _flush_loop(self) -> None:
+        try:
+            while self._pending:
+                await asyncio.sleep(self._tick)
+                # a close must not drop the events of a running flush
+                await asyncio.shield(self.flush(due_only=True))
+        finally:
+            self._flusher = None
+
+    async def flush(
+        self, sender: Optional[EventSenderParam] = None, due_only: bool = False
+    ) -> None:
+        """Send the pending events
+
+        Args:
+            sender: only send the events of this sender
+            due_only: only send the events whose flush interval elapsed
+        """
+        async with self._flush_lock:
+            now = time.monotonic()
+            due_events = {
+                event
+                for event, (_, interval) in self._policies.items()
+                if not due_only or now - self._last_flush.get(event, 0.0) >= interval
+            }
+
+            flushed: List[_Pending] = []
+            for key, pending in list(self._pending.items()):
+                if pending.event not in due_events:
+                    continue
+                if sender is not None and pending.sender is not sender:
+                    continue
+                flushed.append(self._pending.pop(key))
+
+            if due_only:
+                for event in due_events:
+                    self._last_flush[event] = now
+
+            for pending in flushed:
+                event, payload = pending.event_and_payload()
+                _count(pending.event, sent=1)
+                try:
+                    await self._emit(pending.sender, event, payload)
+                except Exception:
+                    logger.exception("Unable to send the %s telemetry", pending.event)
+
+    async def close(self) -> None:
+        """Send all the pending events and stop the flushes"""
+        flusher = self._flusher
+        if flusher is not None:
+            flusher.cancel()
+        await self.flush()
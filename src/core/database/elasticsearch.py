@@ -1,3 +1,4 @@
+import logging
 from typing import (
     Any,
     Iterable,
@@ -7,14 +8,28 @@ from typing import (
     TYPE_CHECKING,
     List,
     Tuple,
+    Dict,
 )
 
+from elasticsearch import helpers
+
+from conf import Config
 from core.models.a_model import AModel
 from misc.elastic_helper import elasticsearch_client
 
 if TYPE_CHECKING:
     from core.context.context import Context
 
+logger = logging.getLogger(__name__)
+
+
+class BulkIndexReport:
+    """Outcome of a bulk indexing, errors are (object, bulk item result) pairs"""
+
+    def __init__(self) -> None:
+        self.indexed = 0
+        self.errors: List[Tuple[AModel, Mapping[str, Any]]] = []
+
 
 class EsIndexHandler:
     def __init__(self, elastic, index):
@@ -78,21 +93,119 @@ class EsIndexHandler:
             f"Unsupported model type {type(model)} expected dict or AModel instance"
         )
 
-    def insert_objects(self, context: "Context", data_list: List[AModel], index: str):
+    def insert_objects(
+        self,
+        context: "Context",
+        data_list: List[AModel],
+        index: str,
+        *,
+        chunk_size: Optional[int] = None,
+        max_chunk_bytes: Optional[int] = None,
+        thread_count: Optional[int] = None,
+        refresh: Optional[str] = None,
+        raise_on_error: bool = True,
+    ) -> "BulkIndexReport":
+        """Index the objects with the bulk API
+
+        Requests are split by object count and by payload size, with
+        ``thread_count`` > 1 the chunks are sent concurrently.
+
+        Args:
+            context: the running context
+            data_list: objects to index
+            index: not used for elasticsearch
+            chunk_size: max objects per bulk request, ES_BULK_CHUNK_SIZE
+            max_chunk_bytes: max bytes per bulk request, ES_BULK_MAX_MB
+            thread_count: concurrent bulk requests, ES_BULK_THREADS
+            refresh: "true" refreshes the index once all chunks are sent,
+                "wait_for" waits for each chunk to be searchable, ES_BULK_REFRESH
+            raise_on_error: raise a BulkIndexError when some objects failed,
+                once the indexed ones went through their after save hook
+
+        Returns:
+            BulkIndexReport: indexed count and per object errors
+        """
         del index  # not used for elasticsearch
 
+        config = Config()
+        if chunk_size is None:
+            chunk_size = config.get("ES_BULK_CHUNK_SIZE", coerce=int, default=500)
+        if max_chunk_bytes is None:
+            max_chunk_bytes = (
+                config.get("ES_BULK_MAX_MB", coerce=int, default=10) * 1024 * 1024
+            )
+        if thread_count is None:
+            thread_count = config.get("ES_BULK_THREADS", coerce=int, default=1)
+        if refresh is None:
+            refresh = config.get("ES_BULK_REFRESH", default="false").lower()
+
+        if refresh not in ("true", "false", "wait_for"):
+            raise ValueError(f"Unknown elasticsearch refresh policy {refresh!r}")
+
         for model_object in data_list:
             model_object.before_save_handler(context)
 
-        # TODO: use bulk !!!!!
-        for model_object in data_list:
-            result = self._elastic.index(
-                index=self._index, body=dict(EsIndexHandler.es_payload(model_object))
+        bulk_kwargs: Dict[str, Any] = {
+            "chunk_size": chunk_size,
+            "max_chunk_bytes": max_chunk_bytes,
+            "raise_on_error": False,
+            "raise_on_exception": False,
+        }
+        if refresh == "wait_for":
+            bulk_kwargs["refresh"] = "wait_for"
+
+        actions = (self._bulk_action(model_object) for model_object in data_list)
+
+        if thread_count > 1:
+            results = helpers.parallel_bulk(
+                self._elastic, actions, thread_count=thread_count, **bulk_kwargs
             )
-            # TODO:
+        else:
+            results = helpers.streaming_bulk(self._elastic, actions, **bulk_kwargs)
+
+        report = BulkIndexReport()
+
+        # results are yielded in the order of the actions
+        for model_object, (success, item) in zip(data_list, results):
+            item_result = next(iter(item.values()))
+
+            if not success:
+                report.errors.append((model_object, item_result))
+                continue
+
+            model_object.set_oid(item_result.get("_id"))
+            report.indexed += 1
 
             model_object.after_save_handler(context)
 
+        if refresh == "true":
+            self._elastic.indices.refresh(index=self._index)
+
+        if report.errors:
+            logger.error(
+                "%d of %d objects failed to be indexed in %s",
+                len(report.errors),
+                len(data_list),
+                self._index,
+            )
+            if raise_on_error:
+                raise helpers.BulkIndexError(
+                    f"{len(report.errors)} document(s) failed to index.",
+                    [dict(error) for _, error in report.errors],
+                )
+
+        return report
+
+    def _bulk_action(self, model_object: AModel) -> Dict[str, Any]:
+        es_data = dict(EsIndexHandler.es_payload(model_object))
+        object_id = es_data.pop("_id", None)
+
+        action = {"_index": self._index, "_source": es_data}
+        if object_id:
+            action["_id"] = object_id
+
+        return action
+
     def save_object(
         self, context: "Context", data: AModel, index: Optional[str] = None
     ):
@@ -154,8 +267,45 @@ class EsIndexHandler:
 
         return self.__class__.load_object(data, as_model=as_model) if data else None
 
-    def load_multiples(self, collection: str, query: dict) -> Iterable[Any]:
-        raise NotImplementedError
+    def load_multiples(
+        self, collection: str, query: dict, as_model=None, chunk_size: int = 500
+    ) -> Iterable[Any]:
+        """Load objects by ids, with multi get requests
+
+        Args:
+            collection: not used for elasticsearch
+            query: ``{"_id": id}``, ``{"_id": [ids]}`` or ``{"_id": {"$in": [ids]}}``
+            as_model: model of the loaded objects, from the documents if None
+            chunk_size: max ids per multi get request
+
+        Returns:
+            Iterable[Any]: the found objects, in the order of the ids
+        """
+        del collection  # not used for elasticsearch
+
+        if set(query.keys()) != {"_id"}:
+            raise ValueError("Elasticsearch load_multiples only supports _id queries")
+
+        ids = query["_id"]
+        if isinstance(ids, Mapping):
+            ids = ids["$in"]
+        elif isinstance(ids, str):
+            ids = [ids]
+
+        ids = [str(object_id) for object_id in ids]
+
+        for chunk_start in range(0, len(ids), chunk_size):
+            response = self._elastic.mget(
+                index=self._index, ids=ids[chunk_start : chunk_start + chunk_size]
+            )
+
+            for doc in response["docs"]:
+                if not doc.get("found"):
+                    continue
+
+                yield self.__class__.load_object(
+                    {"_id": doc["_id"], **doc["_source"]}, as_model=as_model
+                )
 
     def search(
         self,
@@ -28,6 +28,13 @@ logger = logging.getLogger(__name__)
 
 ModelClass = TypeVar("ModelClass", bound="AModel")
 
+TEXT_INDEX = {
+    "keys": [("_meta.label", pymongo.TEXT)],
+    "name": "text",
+    "unique": False,
+    "sparse": True,
+}
+
 
 class MongoDBHandler:
     def __init__(self, database):
@@ -247,19 +254,22 @@ class MongoDBHandler:
         for row in cursor:
             yield self.__class__.load_object(row)
 
-    def search(
-        self,
-        collection: str,
-        /,
-        *,
-        start: int = 0,
-        end: int = 25,
-        filters: Optional[Mapping[str, str]] = None,
-    ) -> Tuple[Tuple[int, int, int], Iterable[Any]]:
-        filters = dict(filters or {})
-
-        db_collection = self._database[collection]
-        filter_arg_object = filters if filters else {}
+    @staticmethod
+    def search_pipeline(
+        start: int, end: int, filters: Optional[Mapping[str, str]]
+    ) -> Tuple[List[Mapping[str, Any]], bool]:
+        """Build the aggregation pipeline of a paginated search
+
+        Args:
+            start: index of the first item
+            end: index of the last item
+            filters: field filters, "q" for a full text search on the label
+
+        Returns:
+            Tuple[List[Mapping[str, Any]], bool]: the pipeline and whether it
+                needs the text index
+        """
+        filter_arg_object = dict(filters or {})
 
         filter_dict = {}
 
@@ -268,12 +278,6 @@ class MongoDBHandler:
         q_filter = filter_arg_object.pop("q", None)
 
         if q_filter:
-            db_collection.create_index(
-                [("_meta.label", pymongo.TEXT)],
-                name="text",
-                unique=False,
-                sparse=True,
-            )
             search_dict = {"$match": {"$text": {"$search": q_filter}}}
 
         and_list: list[Mapping[str, Any]] = list()
@@ -333,10 +337,12 @@ class MongoDBHandler:
             },
         )
 
-        values = db_collection.aggregate(aggregate_pipeline)
-
-        value = next(values)
+        return aggregate_pipeline, search_dict is not None
 
+    @staticmethod
+    def search_result(
+        start: int, value: Mapping[str, Any]
+    ) -> Tuple[Tuple[int, int, int], Iterable[Any]]:
         db_data = value["data"]
 
         total_count = value["metadata"][0]["totalCount"] if db_data else 0
@@ -351,3 +357,25 @@ class MongoDBHandler:
         end = start + len(items) - 1
 
         return (start, end, total_count), items
+
+    def search(
+        self,
+        collection: str,
+        /,
+        *,
+        start: int = 0,
+        end: int = 25,
+        filters: Optional[Mapping[str, str]] = None,
+    ) -> Tuple[Tuple[int, int, int], Iterable[Any]]:
+        db_collection = self._database[collection]
+
+        aggregate_pipeline, text_search = MongoDBHandler.search_pipeline(
+            start, end, filters
+        )
+
+        if text_search:
+            db_collection.create_index(**TEXT_INDEX)
+
+        values = db_collection.aggregate(aggregate_pipeline)
+
+        return MongoDBHandler.search_result(start, next(values))
@@ -0,0 +1,215 @@
+import logging
+from typing import (
+    Any,
+    AsyncIterator,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    TYPE_CHECKING,
+    Tuple,
+    Type,
+)
+
+from bson import ObjectId
+
+from core.database.mongodb import MongoDBHandler, ModelClass, TEXT_INDEX
+from core.models.a_model import AModel
+from misc.mongodb_helper import async_mongodb_database
+
+if TYPE_CHECKING:
+    from core.context.context import Context
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncMongoDBHandler:
+    """Asyncio counterpart of MongoDBHandler, built on motor
+
+    Queries don't block the event loop. The database must be used from the
+    event loop it was opened on, use ``from_default`` in the coroutine
+    issuing the queries.
+    """
+
+    def __init__(self, database):
+        self._database = database
+
+    @classmethod
+    def from_default(
+        cls, context: "Context", *, db_link="mongodb", database="pinceau6"
+    ) -> "AsyncMongoDBHandler":
+        database = async_mongodb_database(context, db_link, database)
+
+        return cls(database)
+
+    @classmethod
+    def load_object(cls, row: dict) -> "AModel":
+        return MongoDBHandler.load_object(row)
+
+    async def insert_objects(
+        self, context: "Context", data_list: List[AModel], collection: str
+    ):
+        for data in data_list:
+            data.before_save_handler(context)
+
+        mongo_data_list = [
+            dict(MongoDBHandler.mongo_payload(data)) for data in data_list
+        ]
+
+        db_collection = self._database[collection]
+        results = await db_collection.insert_many(mongo_data_list)
+
+        for data, result_id in zip(data_list, results.inserted_ids):
+            data.set_oid(result_id)
+
+            data.after_save_handler(context)
+
+    async def save_object(
+        self,
+        context: "Context",
+        data: AModel,
+        collection: Optional[str] = None,
+        skip_hooks: bool = False,
+    ):
+        if not skip_hooks:
+            data.before_save_handler(context)
+
+        mongo_data = dict(MongoDBHandler.mongo_payload(data))
+
+        if not collection:
+            collection = mongo_data.get("_model")
+
+        db_collection = self._database[collection]
+        object_id = mongo_data.pop("_id", None)
+        if object_id:
+            await db_collection.update_one(
+                {"_id": ObjectId(object_id)}, {"$set": mongo_data}, upsert=True
+            )
+        else:
+            result = await db_collection.insert_one(mongo_data)
+
+            if isinstance(data, AModel):
+                data.set_oid(result.inserted_id)
+
+        if not skip_hooks:
+            data.after_save_handler(context)
+
+    async def delete_model_objects(
+        self, context: "Context", model_objects: List[AModel], collection: str
+    ):
+        db_collection = self._database[collection]
+
+        for model_object in model_objects:
+            model_object.before_delete_handler(context)
+
+        await db_collection.delete_many(
+            {
+                "_id": {
+                    "$in": [ObjectId(model_object.id) for model_object in model_objects]
+                }
+            }
+        )
+
+        for model_object in model_objects:
+            model_object.after_delete_handler(context)
+
+    async def delete_model_object(
+        self, context: "Context", model_object: AModel, collection: str
+    ):
+        db_collection = self._database[collection]
+
+        model_object.before_delete_handler(context)
+
+        await db_collection.delete_one({"_id": ObjectId(model_object.id)})
+
+        model_object.after_delete_handler(context)
+
+    async def delete_object(self, context: "Context", object_id: str, collection: str):
+        db_collection = self._database[collection]
+
+        value = await db_collection.find_one({"_id": ObjectId(object_id)})
+
+        model_object = MongoDBHandler.load_object(value)
+
+        await self.delete_model_object(context, model_object, collection)
+
+    async def update_object(
+        self,
+        context: "Context",
+        model: AModel,
+        collection: Optional[str] = None,
+        skip_hooks: bool = False,
+    ):
+        if not skip_hooks:
+            model.before_save_handler(context)
+
+        data = dict(MongoDBHandler.mongo_payload(model))
+
+        if not collection:
+            collection = data.get("_meta", {}).get("model")
+
+        db_collection = self._database[collection]
+        object_id = data.pop("id") if "id" in data else data.pop("_id")
+
+        await db_collection.update_one(
+            {"_id": ObjectId(object_id)}, {"$set": data}, upsert=True
+        )
+
+        if not skip_hooks:
+            model.after_save_handler(context)
+
+    async def get_instance(
+        self, cls: Type[ModelClass], collection: str, object_id: str
+    ) -> Optional[ModelClass]:
+        single_object = await self.load_one(collection, {"_id": ObjectId(object_id)})
+
+        if not single_object:
+            return None
+
+        if not isinstance(single_object, cls):
+            raise ValueError(
+                f"Object {object_id} from {collection} is not of type {cls.__name__} ({single_object.__class__.__name__})"
+            )
+
+        return single_object
+
+    async def load_one(self, collection: str, query: dict) -> Any:
+        db_collection = self._database[collection]
+
+        if "_id" in query and isinstance(query["_id"], str):
+            query["_id"] = ObjectId(query["_id"])
+
+        data = await db_collection.find_one(query)
+
+        return self.__class__.load_object(data) if data else None
+
+    async def load_multiples(self, collection: str, query: dict) -> AsyncIterator[Any]:
+        db_collection = self._database[collection]
+
+        if "_id" in query and isinstance(query["_id"], str):
+            query["_id"] = ObjectId(query["_id"])
+
+        async for row in db_collection.find(query):
+            yield self.__class__.load_object(row)
+
+    async def search(
+        self,
+        collection: str,
+        /,
+        *,
+        start: int = 0,
+        end: int = 25,
+        filters: Optional[Mapping[str, str]] = None,
+    ) -> Tuple[Tuple[int, int, int], Iterable[Any]]:
+        db_collection = self._database[collection]
+
+        aggregate_pipeline, text_search = MongoDBHandler.search_pipeline(
+            start, end, filters
+        )
+
+        if text_search:
+            await db_collection.create_index(**TEXT_INDEX)
+
+        values = await db_collection.aggregate(aggregate_pipeline).to_list(1)
+
+        return MongoDBHandler.search_result(start, values[0])
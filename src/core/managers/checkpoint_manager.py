@@ -0,0 +1,507 @@
+import asyncio
+import datetime
+import logging
+import os
+import pickle
+import shutil
+import threading
+import time
+import uuid
+import zlib
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Protocol, Tuple
+
+from conf import Config
+from core.managers.model_pool_manager import MB
+from core.tasks.types import TaskData
+from misc.functions import strtobool
+
+if TYPE_CHECKING:
+    from core.tasks.task_dag import TaskDAG
+
+logger = logging.getLogger(__name__)
+
+# record kinds of a run checkpoint
+INPUT_RECORD = "input"
+OUTPUT_RECORD = "output"
+POSITION_RECORD = "position"
+
+# a record is (kind, task id, payload), the input record has no task id
+CheckpointRecord = Tuple[str, str, bytes]
+
+
+class CheckpointStore(Protocol):
+    """Durable records of the DAG runs, by run id
+
+    Stores are thread safe and blocking, they are called from a worker thread.
+    """
+
+    def write(self, run_id: str, kind: str, task_id: str, payload: bytes) -> None: ...
+
+    def read(self, run_id: str) -> List[CheckpointRecord]: ...
+
+    def has_input(self, run_id: str) -> bool:
+        """Whether the input of a run is recorded, without reading it"""
+        ...
+
+    def delete(self, run_id: str) -> None: ...
+
+    def prune(self, max_age: float) -> int: ...
+
+
+class DiskCheckpointStore:
+    """One directory per run, one file per record"""
+
+    def __init__(self, directory: str) -> None:
+        self._directory = directory
+
+    def _run_directory(self, run_id: str) -> str:
+        name = "".join(
+            char if char.isalnum() or char in "-_." else "_" for char in run_id
+        )
+        return os.path.join(self._directory, name)
+
+    def write(self, run_id: str, kind: str, task_id: str, payload: bytes) -> None:
+        run_directory = self._run_directory(run_id)
+        os.makedirs(run_directory, exist_ok=True)
+
+        path = os.path.join(run_directory, f"{kind}-{task_id}.pkl")
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(temp_path, "wb") as file:
+            pickle.dump((kind, task_id, payload), file)
+        os.replace(temp_path, path)
+
+    def read(self, run_id: str) -> List[CheckpointRecord]:
+        run_directory = self._run_directory(run_id)
+        if not os.path.isdir(run_directory):
+            return []
+
+        records = []
+        for name in os.listdir(run_directory):
+            if not name.endswith(".pkl"):
+                continue
+            with open(os.path.join(run_directory, name), "rb") as file:
+                records.append(pickle.load(file))
+
+        return records
+
+    def has_input(self, run_id: str) -> bool:
+        return os.path.isfile(
+            os.path.join(self._run_directory(run_id), f"{INPUT_RECORD}-.pkl")
+        )
+
+    def delete(self, run_id: str) -> None:
+        shutil.rmtree(self._run_directory(run_id), ignore_errors=True)
+
+    def prune(self, max_age: float) -> int:
+        if not os.path.isdir(self._directory):
+            return 0
+
+        pruned = 0
+        limit = time.time() - max_age
+        for name in os.listdir(self._directory):
+            run_directory = os.path.join(self._directory, name)
+            if os.path.isdir(run_directory) and os.path.getmtime(run_directory) < limit:
+                shutil.rmtree(run_directory, ignore_errors=True)
+                pruned += 1
+
+        return pruned
+
+
+class MongoCheckpointStore:
+    """Records in a mongodb collection, shared by the workers
+
+    Runs are removed by a TTL index once they haven't been written for
+    ``max_age`` seconds.
+    """
+
+    def __init__(self, collection: Any, max_age: float) -> None:
+        self._collection = collection
+        self._max_age = max_age
+        self._indexes_ready = False
+
+    def _ensure_indexes(self) -> None:
+        if self._indexes_ready:
+            return
+
+        self._collection.create_index("run_id", name="run_id")
+        self._collection.create_index(
+            "updated_at", name="updated_at", expireAfterSeconds=int(self._max_age)
+        )
+        self._indexes_ready = True
+
+    def write(self, run_id: str, kind: str, task_id: str, payload: bytes) -> None:
+        self._ensure_indexes()
+
+        self._collection.replace_one(
+            {"_id": f"{run_id}::{kind}::{task_id}"},
+            {
+                "run_id": run_id,
+                "kind": kind,
+                "task_id": task_id,
+                "payload": payload,
+                "updated_at": datetime.datetime.utcnow(),
+            },
+            upsert=True,
+        )
+
+    def read(self, run_id: str) -> List[CheckpointRecord]:
+        return [
+            (row["kind"], row["task_id"], row["payload"])
+            for row in self._collection.find({"run_id": run_id})
+        ]
+
+    def has_input(self, run_id: str) -> bool:
+        return (
+            self._collection.find_one(
+                {"_id": f"{run_id}::{INPUT_RECORD}::"}, projection={"_id": True}
+            )
+            is not None
+        )
+
+    def delete(self, run_id: str) -> None:
+        self._collection.delete_many({"run_id": run_id})
+
+    def prune(self, max_age: float) -> int:
+        # expired runs are removed by the TTL index
+        return 0
+
+
+def build_store(name: str, max_age: float) -> Optional[CheckpointStore]:
+    """Build the checkpoint store from the CHECKPOINT_* configuration
+
+    Args:
+        name: ``disk``, ``mongodb`` or ``none``
+        max_age: seconds a run checkpoint is kept
+
+    Returns:
+        Optional[CheckpointStore]: the store, None when runs aren't checkpointed
+    """
+    config = Config()
+
+    if name == "none":
+        return None
+
+    if name == "disk":
+        return DiskCheckpointStore(config.get("CHECKPOINT_DIR", default="checkpoints"))
+
+    if name == "mongodb":
+        from core.context.global_context import GlobalContext
+        from misc.mongodb_helper import mongodb_collection
+
+        return MongoCheckpointStore(
+            mongodb_collection(
+                GlobalContext.get_instance(),
+                config.get("CHECKPOINT_MONGODB_LINK", default="mongodb"),
+                config.get("CHECKPOINT_MONGODB_DATABASE", default="pinceau6"),
+                config.get("CHECKPOINT_MONGODB_COLLECTION", default="_dag_checkpoints"),
+            ),
+            max_age,
+        )
+
+    raise ValueError(f"Unknown checkpoint store {name!r}")
+
+
+class RunCheckpoint:
+    """Checkpoint of a DAG run, written while the run progresses
+
+    Outputs of the tasks running once per run and the positions of the
+    generators are recorded; a resumed run reuses the outputs instead of
+    running the tasks again, and skips the items its generators had already
+    handed over.
+    """
+
+    def __init__(
+        self,
+        manager: "CheckpointManager",
+        run_id: str,
+        data_input: TaskData,
+        outputs: Optional[Dict[str, TaskData]] = None,
+        positions: Optional[Dict[str, int]] = None,
+    ) -> None:
+        self._manager = manager
+        self._run_id = run_id
+        self._data_input = data_input
+        self._outputs: Dict[str, TaskData] = dict(outputs or {})
+        self._positions: Dict[str, int] = dict(positions or {})
+        self._position_times: Dict[str, float] = {}
+        self._written_positions: Dict[str, int] = dict(self._positions)
+        self._position_lock = asyncio.Lock()
+        self._failed = False
+
+    @property
+    def run_id(self) -> str:
+        return self._run_id
+
+    @property
+    def data_input(self) -> TaskData:
+        return self._data_input
+
+    @property
+    def is_resumed(self) -> bool:
+        return bool(self._outputs or self._positions)
+
+    def output(self, task_id: str) -> Optional[TaskData]:
+        """Recorded output of a finished task, None when it must run"""
+        return self._outputs.get(task_id)
+
+    def position(self, task_id: str) -> int:
+        """Items of a generator whose processing is recorded as done"""
+        return self._positions.get(task_id, 0)
+
+    async def task_finished(self, task_id: str, output: TaskData) -> None:
+        if task_id in self._outputs:
+            return
+
+        if await self._manager.write(self._run_id, OUTPUT_RECORD, task_id, output):
+            self._outputs[task_id] = output
+
+    async def position_reached(
+        self, task_id: str, position: int, force: bool = False
+    ) -> None:
+        """Record that the first ``position`` items of a generator are done,
+        at most once per position interval unless forced"""
+        if position <= self._positions.get(task_id, 0):
+            return
+
+        now = time.monotonic()
+        if (
+            not force
+            and now - self._position_times.get(task_id, 0.0)
+            < self._manager.position_interval
+        ):
+            return
+
+        self._position_times[task_id] = now
+        self._positions[task_id] = position
+
+        # writes run on threads, they are serialized so that an older
+        # position never overwrites a newer one
+        async with self._position_lock:
+            position = self._positions[task_id]
+            if position <= self._written_positions.get(task_id, 0):
+                return
+
+            if await self._manager.write(
+                self._run_id, POSITION_RECORD, task_id, position
+            ):
+                self._written_positions[task_id] = position
+
+    def task_failed(self) -> None:
+        self._failed = True
+
+    async def close(self, finished: bool) -> None:
+        """End of the run, successful runs don't need their checkpoint"""
+        await self._manager.run_closed(self, finished and not self._failed)
+
+
+class CheckpointManager:
+    """Durable checkpoints of the DAG runs created with ``checkpoint=True``
+
+    ``CHECKPOINT_STORE`` selects the store, ``disk`` by default, ``none``
+    disables checkpoints. The footprint is bounded by
+    ``CHECKPOINT_MAX_OUTPUT_MB``, larger outputs aren't recorded and their
+    task runs again on resume, and ``CHECKPOINT_RETENTION_HOURS``. The
+    overhead of the generators is bounded by ``CHECKPOINT_POSITION_INTERVAL``,
+    the seconds between two writes of a generator position.
+    """
+
+    def __init__(
+        self,
+        store: Optional[CheckpointStore],
+        *,
+        max_output_bytes: int = 64 * MB,
+        position_interval: float = 5.0,
+        max_age: float = 7 * 24 * 3600,
+        compression_level: int = 1,
+        keep_finished: bool = False,
+    ) -> None:
+        self._store = store
+        self._max_output_bytes = max_output_bytes
+        self._position_interval = position_interval
+        self._max_age = max_age
+        self._compression_level = compression_level
+        self._keep_finished = keep_finished
+        self._lock = threading.Lock()
+        self._runs: Dict[str, RunCheckpoint] = {}
+
+        self._resumed_count = 0
+        self._completed_count = 0
+        self._write_count = 0
+        self._skipped_count = 0
+        self._error_count = 0
+        self._bytes_written = 0
+        self._write_time = 0.0
+
+    @classmethod
+    def from_config(cls) -> "CheckpointManager":
+        config = Config()
+        max_age = config.get("CHECKPOINT_RETENTION_HOURS", coerce=float, default=168.0)
+        max_age *= 3600
+
+        return cls(
+            build_store(config.get("CHECKPOINT_STORE", default="disk"), max_age),
+            max_output_bytes=config.get(
+                "CHECKPOINT_MAX_OUTPUT_MB", coerce=int, default=64
+            )
+            * MB,
+            position_interval=config.get(
+                "CHECKPOINT_POSITION_INTERVAL", coerce=float, default=5.0
+            ),
+            max_age=max_age,
+            compression_level=config.get(
+                "CHECKPOINT_COMPRESSION_LEVEL", coerce=int, default=1
+            ),
+            keep_finished=config.get(
+                "CHECKPOINT_KEEP_FINISHED",
+                coerce=strtobool,
+                default=False,
+            ),
+        )
+
+    @property
+    def is_enabled(self) -> bool:
+        return self._store is not None
+
+    @property
+    def position_interval(self) -> float:
+        return self._position_interval
+
+    def _dumps(self, value: Any) -> bytes:
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if self._compression_level:
+            payload = zlib.compress(payload, self._compression_level)
+
+        return payload
+
+    def _loads(self, payload: bytes) -> Any:
+        if self._compression_level:
+            payload = zlib.decompress(payload)
+
+        return pickle.loads(payload)
+
+    async def write(self, run_id: str, kind: str, task_id: str, value: Any) -> bool:
+        """Record a value of a run
+
+        Returns:
+            bool: False when the value isn't recorded, too large or not
+                picklable
+        """
+        store = self._store
+        if store is None:
+            return False
+
+        start = time.monotonic()
+        try:
+            payload = self._dumps(value)
+        except Exception:
+            logger.warning(
+                "%s %s of run %s can't be checkpointed", kind, task_id, run_id
+            )
+            self._skipped_count += 1
+            return False
+
+        if len(payload) > self._max_output_bytes:
+            self._skipped_count += 1
+            return False
+
+        try:
+            await asyncio.to_thread(store.write, run_id, kind, task_id, payload)
+        except Exception:
+            logger.exception(
+                "Unable to checkpoint %s %s of run %s", kind, task_id, run_id
+            )
+            self._error_count += 1
+            return False
+
+        self._write_count += 1
+        self._bytes_written += len(payload)
+        self._write_time += time.monotonic() - start
+
+        return True
+
+    def has_run(self, run_id: str) -> bool:
+        """Whether a run can be resumed, blocking but reads no record"""
+        if self._store is None:
+            return False
+
+        return self._store.has_input(run_id)
+
+    async def open_run(
+        self, dag: "TaskDAG", data_input: TaskData, resume: bool = False
+    ) -> Optional[RunCheckpoint]:
+        """Start the checkpoint of a run, or load it to resume the run
+
+        Args:
+            dag: the DAG run, its id is the run id
+            data_input: the DAG input, the recorded one is used on resume
+            resume: resume the recorded run
+
+        Returns:
+            Optional[RunCheckpoint]: the checkpoint, None when the DAG isn't
+                checkpointed
+
+        Raises:
+            ValueError: when resuming a run without checkpoint
+        """
+        if self._store is None or not dag.checkpoint_enabled:
+            if resume:
+                raise ValueError(f"{dag.id} runs aren't checkpointed")
+            return None
+
+        run_id = dag.id
+        store = self._store
+
+        if not resume:
+            await asyncio.to_thread(store.delete, run_id)
+            await asyncio.to_thread(store.prune, self._max_age)
+
+            checkpoint = RunCheckpoint(self, run_id, data_input)
+            await self.write(run_id, INPUT_RECORD, "", data_input)
+        else:
+            records = await asyncio.to_thread(store.read, run_id)
+
+            values: Dict[str, Dict[str, Any]] = {}
+            for kind, task_id, payload in records:
+                values.setdefault(kind, {})[task_id] = self._loads(payload)
+
+            if "" not in values.get(INPUT_RECORD, {}):
+                raise ValueError(f"No checkpoint for run {run_id}")
+
+            checkpoint = RunCheckpoint(
+                self,
+                run_id,
+                values[INPUT_RECORD][""],
+                values.get(OUTPUT_RECORD),
+                values.get(POSITION_RECORD),
+            )
+            self._resumed_count += 1
+
+        with self._lock:
+            self._runs[run_id] = checkpoint
+
+        return checkpoint
+
+    async def run_closed(self, checkpoint: RunCheckpoint, succeeded: bool) -> None:
+        with self._lock:
+            self._runs.pop(checkpoint.run_id, None)
+
+        if succeeded:
+            self._completed_count += 1
+            if self._store is not None and not self._keep_finished:
+                await asyncio.to_thread(self._store.delete, checkpoint.run_id)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            runs = list(self._runs)
+
+        return {
+            "enabled": self.is_enabled,
+            "runs": runs,
+            "resumed": self._resumed_count,
+            "completed": self._completed_count,
+            "writes": self._write_count,
+            "skipped": self._skipped_count,
+            "errors": self._error_count,
+            "bytesWritten": self._bytes_written,
+            "writeTime": self._write_time,
+        }
@@ -0,0 +1,287 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import (
+    Any,
+    AsyncIterator,
+    Deque,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    TYPE_CHECKING,
+    Tuple,
+)
+
+if TYPE_CHECKING:
+    from core.tasks.task import Task
+
+logger = logging.getLogger(__name__)
+
+_Waiter = Tuple[asyncio.AbstractEventLoop, asyncio.Future, float]
+
+
+class AsyncConcurrencyLimiter:
+    """Fair (FIFO) concurrency limiter, awaitable from any event loop
+
+    Slots are handed over directly from the releasing task to the oldest
+    waiter, so a saturated limiter only suspends the coroutines waiting on it
+    and never blocks the event loop they run on. State is guarded by a thread
+    lock because DAG runs may live on different loops / threads.
+    """
+
+    def __init__(self, name: str, limit: int) -> None:
+        if limit < 1:
+            raise ValueError(f"Limiter {name} limit must be >= 1, {limit} given")
+
+        self._name = name
+        self._limit = limit
+        self._in_flight = 0
+        self._waiters: Deque[_Waiter] = deque()
+        self._lock = threading.Lock()
+
+        self._acquired_count = 0
+        self._waited_count = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._max_queue_depth = 0
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    def set_limit(self, limit: int) -> None:
+        if limit < 1:
+            raise ValueError(f"Limiter {self._name} limit must be >= 1, {limit} given")
+
+        with self._lock:
+            self._limit = limit
+            to_wake = self._pop_waiters()
+
+        for waiter in to_wake:
+            self._wake(waiter)
+
+    def _record_wait(self, wait: float) -> None:
+        # must be called with self._lock held
+        self._acquired_count += 1
+        if wait > 0:
+            self._waited_count += 1
+            self._total_wait += wait
+            self._max_wait = max(self._max_wait, wait)
+
+    def _pop_waiters(self) -> List[_Waiter]:
+        # must be called with self._lock held, reserves a slot per popped waiter
+        popped = []
+        while self._waiters and self._in_flight < self._limit:
+            waiter = self._waiters.popleft()
+            if waiter[1].cancelled():
+                continue
+            self._in_flight += 1
+            popped.append(waiter)
+        return popped
+
+    def _wake(self, waiter: _Waiter) -> None:
+        loop, future, _ = waiter
+
+        def set_result():
+            if future.done():
+                # waiter was cancelled after its slot got reserved
+                self.release()
+            else:
+                future.set_result(None)
+
+        try:
+            loop.call_soon_threadsafe(set_result)
+        except RuntimeError:
+            # the waiter loop is closed, give the slot to the next one
+            logger.warning("Limiter %s waiter loop is closed", self._name)
+            self.release()
+
+    async def acquire(self) -> None:
+        loop = asyncio.get_running_loop()
+        start = time.monotonic()
+
+        with self._lock:
+            if self._in_flight < self._limit and not self._waiters:
+                self._in_flight += 1
+                self._record_wait(0.0)
+                return
+
+            future = loop.create_future()
+            waiter = (loop, future, start)
+            self._waiters.append(waiter)
+            self._max_queue_depth = max(self._max_queue_depth, len(self._waiters))
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            owns_slot = False
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                elif future.done() and not future.cancelled():
+                    owns_slot = True
+            if owns_slot:
+                self.release()
+            raise
+
+        with self._lock:
+            self._record_wait(time.monotonic() - start)
+
+    def release(self) -> None:
+        with self._lock:
+            if self._in_flight <= 0:
+                raise RuntimeError(f"Limiter {self._name} released too many times")
+            self._in_flight -= 1
+            to_wake = self._pop_waiters()
+
+        for waiter in to_wake:
+            self._wake(waiter)
+
+    async def __aenter__(self) -> "AsyncConcurrencyLimiter":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.release()
+
+    def as_json(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "name": self._name,
+                "limit": self._limit,
+                "inFlight": self._in_flight,
+                "queueDepth": len(self._waiters),
+                "maxQueueDepth": self._max_queue_depth,
+                "acquired": self._acquired_count,
+                "waited": self._waited_count,
+                "totalWait": self._total_wait,
+                "avgWait": (
+                    self._total_wait / self._waited_count if self._waited_count else 0.0
+                ),
+                "maxWait": self._max_wait,
+            }
+
+
+class ConcurrencyManager:
+    """Registry of the limiters shared by every DAG run of the process
+
+    Limiters are either bound to a task class (``Task.MAX_CONCURRENCY``) or
+    to a named resource (``Task.CONCURRENCY_RESOURCES``) shared by several
+    task classes, e.g. ``arxiv-api``.
+    """
+
+    def __init__(self, limits: Optional[Mapping[str, int]] = None) -> None:
+        self._limits: Dict[str, int] = dict(limits) if limits else {}
+        self._limiters: Dict[str, AsyncConcurrencyLimiter] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def parse_limits(raw_value: Optional[str]) -> Dict[str, int]:
+        """Parse a ``name=limit;other name=limit`` configuration value
+
+        Args:
+            raw_value: the raw configuration value
+
+        Returns:
+            Dict[str, int]: limit per limiter name
+        """
+        limits: Dict[str, int] = {}
+        if not raw_value:
+            return limits
+
+        for part in raw_value.split(";"):
+            if not part.strip():
+                continue
+            name, _, limit = part.rpartition("=")
+            if not name:
+                raise ValueError(f"Invalid concurrency limit {part!r}")
+            limits[name.strip()] = int(limit)
+
+        return limits
+
+    @staticmethod
+    def task_limiter_name(task_class: type) -> str:
+        return f"task:{task_class.__module__}.{task_class.__name__}"
+
+    def configure(self, name: str, limit: int) -> AsyncConcurrencyLimiter:
+        with self._lock:
+            self._limits[name] = limit
+            limiter = self._limiters.get(name)
+            if limiter is None:
+                limiter = AsyncConcurrencyLimiter(name, limit)
+                self._limiters[name] = limiter
+                return limiter
+
+        limiter.set_limit(limit)
+        return limiter
+
+    def get(
+        self, name: str, default_limit: Optional[int] = None
+    ) -> Optional[AsyncConcurrencyLimiter]:
+        with self._lock:
+            limiter = self._limiters.get(name)
+            if limiter is not None:
+                return limiter
+
+            limit = self._limits.get(name, default_limit)
+            if limit is None or limit < 1:
+                return None
+
+            limiter = AsyncConcurrencyLimiter(name, limit)
+            self._limiters[name] = limiter
+            return limiter
+
+    def limiters_for_task(self, task: "Task") -> List[AsyncConcurrencyLimiter]:
+        task_class = task.__class__
+        limiters = []
+
+        class_limiter = self.get(
+            self.task_limiter_name(task_class), task_class.MAX_CONCURRENCY
+        )
+        if class_limiter:
+            limiters.append(class_limiter)
+
+        for resource, default_limit in task_class.CONCURRENCY_RESOURCES.items():
+            resource_limiter = self.get(resource, default_limit)
+            if resource_limiter:
+                limiters.append(resource_limiter)
+
+        # always acquire in the same order to avoid deadlocks between tasks
+        return sorted(limiters, key=lambda limiter: limiter.name)
+
+    @asynccontextmanager
+    async def acquire(
+        self, limiters: Sequence[AsyncConcurrencyLimiter]
+    ) -> AsyncIterator[None]:
+        acquired: List[AsyncConcurrencyLimiter] = []
+        try:
+            for limiter in limiters:
+                await limiter.acquire()
+                acquired.append(limiter)
+            yield
+        finally:
+            for limiter in reversed(acquired):
+                limiter.release()
+
+    def stats(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            limiters = list(self._limiters.values())
+
+        return [limiter.as_json() for limiter in limiters]
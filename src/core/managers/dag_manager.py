@@ -1,3 +1,4 @@
+import time
 import weakref
 from typing import (
     Mapping,
@@ -6,6 +7,7 @@ from typing import (
     Tuple,
     Dict,
     List,
+    Set,
     TYPE_CHECKING,
     Any,
     cast,
@@ -16,8 +18,16 @@ from bson import ObjectId
 from conf import Config
 from conf.config import RunMode
 from core.managers.graph_element_manager import GraphElementManager
+from core.managers.job_lifecycle_manager import JobLifecycleManager
+from core.tasks.dag_contract import DagContractAnalysis
 from core.tasks.task_dag import TaskDAG
-from misc.functions import strtobool, extract_dag_id, construct_dag_id
+from core.tasks.types import Status
+from misc.functions import (
+    strtobool,
+    extract_dag_id,
+    construct_dag_id,
+    deep_getsizeof,
+)
 from misc.mongodb_helper import mongodb_collection
 
 ModelToDAGMapping = Mapping[str, Sequence[Tuple[str, bool, TaskDAG]]]
@@ -46,6 +56,22 @@ class DagManager(GraphElementManager[TaskDAG]):
         self._dag_variants: Optional[Dict[str, List[str]]] = None
         self._dag_variant_ids: Optional[Dict[str, ObjectId]] = None
 
+        config = Config()
+        self._job_lifecycle = JobLifecycleManager(
+            ttl=config.get("JOB_TTL", coerce=float, default=3600.0),
+            max_retained=config.get("JOB_MAX_RETAINED", coerce=int, default=256),
+            max_summaries=config.get("JOB_MAX_SUMMARIES", coerce=int, default=4096),
+        )
+        # expired jobs are swept when accessing DAGs, at most once per interval
+        self._job_sweep_interval = config.get(
+            "JOB_SWEEP_INTERVAL", coerce=float, default=60.0
+        )
+        self._last_job_sweep = time.monotonic()
+
+    @property
+    def job_lifecycle(self) -> JobLifecycleManager:
+        return self._job_lifecycle
+
     @property
     def dag_variants(self) -> Dict[str, List[str]]:
         self._fetch_variant_params()
@@ -108,6 +134,8 @@ class DagManager(GraphElementManager[TaskDAG]):
             ):
                 context.dag_manager[row_dag_id].clone(row_variant_id)
 
+        DagContractAnalysis.invalidate_all()
+
     def _fetch_single_variant_params(self, dag_id: str, variant_id: str):
         if self._dag_task_parameters is not None or self._dag_variants is not None:
             return
@@ -140,6 +168,7 @@ class DagManager(GraphElementManager[TaskDAG]):
             variants.append(row_variant)
 
         self._dag_variant_ids[row_variant_id] = row_id
+        DagContractAnalysis.invalidate_all()
 
         if (
             row_variant_id not in context.dag_manager
@@ -169,6 +198,7 @@ class DagManager(GraphElementManager[TaskDAG]):
         )
 
         mongo_collection.delete_one({"dag_id": dag_id, "variant": variant})
+        DagContractAnalysis.invalidate_all()
 
         variant_id = dag_id if variant == "_default_" else f"{dag_id}[{variant}]"
 
@@ -236,6 +266,7 @@ class DagManager(GraphElementManager[TaskDAG]):
             variants.append(variant)
 
         dag_task_parameters[variant_id] = params
+        DagContractAnalysis.invalidate_all()
 
     def get_dag_task_parameters(self, dag_id: str, variant: str) -> Mapping[str, Any]:
         self._fetch_variant_params()
@@ -306,7 +337,16 @@ class DagManager(GraphElementManager[TaskDAG]):
         return self._persisted_models_list.copy()
 
     def get(self, id_: str) -> Optional["TaskDAG"]:
-        if id_ not in self._map:
+        self._sweep_jobs()
+
+        if id_ in self._job_lifecycle:
+            self._job_lifecycle.touch(id_)
+
+        elif id_ not in self._map:
+            if self._job_lifecycle.get_summary(id_) is not None:
+                # evicted job, don't recreate an empty instance
+                return None
+
             dag_identifier, dag_variant, job_id = extract_dag_id(id_)
 
             dag_id = construct_dag_id(dag_identifier, dag_variant)
@@ -328,12 +368,19 @@ class DagManager(GraphElementManager[TaskDAG]):
         return found_dag
 
     def __setitem__(self, key, value):
-        self._model_to_dag_list_map = None
+        if value is None or not value.job_id:
+            # jobs are not part of the model to DAG mapping
+            self._model_to_dag_list_map = None
         super().__setitem__(key, value)
 
         if value is None:
             return
 
+        if value.job_id:
+            self._job_lifecycle.track(key)
+            self.evict_jobs()
+            return
+
         persisted_models_map = self.persisted_models_map
 
         self._fetch_variant_params()
@@ -354,9 +401,125 @@ class DagManager(GraphElementManager[TaskDAG]):
                 task_dag.clone(dag_id)
 
     def __delitem__(self, key):
+        dag = self._map.get(key)
         super().__delitem__(key)
         self._dag_execution_memory_map.pop(key, None)
-        self._model_to_dag_list_map = None
+        self._job_lifecycle.forget(key)
+        if dag is None or not dag.job_id:
+            self._model_to_dag_list_map = None
+
+    def job_status_changed(
+        self, job_dag_id: str, status: Status, error: Optional[Exception] = None
+    ) -> None:
+        self._job_lifecycle.set_status(job_dag_id, status, error)
+
+        if status in (Status.FINISHED, Status.ERROR):
+            self.evict_jobs()
+
+    def _sweep_jobs(self) -> None:
+        now = time.monotonic()
+        if now - self._last_job_sweep < self._job_sweep_interval:
+            return
+
+        self._last_job_sweep = now
+        self.evict_jobs(now)
+
+    def evict_jobs(self, now: Optional[float] = None) -> List[str]:
+        """Evict the expired and least recently used job DAGs
+
+        The DAG instance and its execution memory are dropped, only a summary
+        of the job is kept. Jobs are evicted when they finish, when new ones
+        are created and, for the expired ones, by the periodic sweep done when
+        accessing DAGs.
+
+        Args:
+            now: monotonic reference time, defaults to the current time
+
+        Returns:
+            List[str]: identifiers of the evicted jobs
+        """
+        evicted = []
+        for job_dag_id in self._job_lifecycle.collect(now):
+            summary = self._job_summary(job_dag_id)
+            if self._job_lifecycle.expire(job_dag_id, summary) is None:
+                continue
+
+            self._map.pop(job_dag_id, None)
+            self._dag_execution_memory_map.pop(job_dag_id, None)
+            evicted.append(job_dag_id)
+
+        return evicted
+
+    def _job_summary(self, job_dag_id: str) -> Dict[str, Any]:
+        summary: Dict[str, Any] = {}
+
+        dag = self._map.get(job_dag_id)
+        if dag is not None:
+            task_status: Dict[str, int] = {}
+            for node in dag.task_node_map.values():
+                status_name = node.task.status.name
+                task_status[status_name] = task_status.get(status_name, 0) + 1
+
+            summary["parentId"] = dag.parent_id
+            summary["label"] = dag.label
+            summary["taskStatus"] = task_status
+
+        memory = self._dag_execution_memory_map.get(job_dag_id)
+        if memory is not None:
+            summary["run"] = {
+                "start": memory.start_date_iso,
+                "end": memory.end_date_iso,
+            }
+
+        return summary
+
+    def get_job_summary(self, job_dag_id: str) -> Optional[Mapping[str, Any]]:
+        """Summary of an evicted job
+
+        Args:
+            job_dag_id: the job DAG identifier
+
+        Returns:
+            Optional[Mapping[str, Any]]: the summary, None if job wasn't evicted
+        """
+        if job_dag_id in self._map:
+            return None
+
+        return self._job_lifecycle.get_summary(job_dag_id)
+
+    def retained_bytes(self, job_dag_id: str) -> int:
+        """Approximate memory retained by a job run data
+
+        Args:
+            job_dag_id: the job DAG identifier
+
+        Returns:
+            int: task data and execution memory size in bytes
+        """
+        seen: Set[int] = set()
+        size = 0
+
+        dag = self._map.get(job_dag_id)
+        if dag is not None:
+            for node in dag.task_node_map.values():
+                size += deep_getsizeof(node.task.data, seen)
+
+        memory = self._dag_execution_memory_map.get(job_dag_id)
+        if memory is not None:
+            size += memory.retained_bytes(seen)
+
+        return size
+
+    def job_stats(self) -> Dict[str, Any]:
+        job_ids = self._job_lifecycle.job_ids()
+
+        return {
+            **self._job_lifecycle.stats(),
+            "executionMemories": len(self._dag_execution_memory_map),
+            "retainedBytes": sum(
+                self.retained_bytes(job_dag_id) for job_dag_id in job_ids
+            ),
+        }
 
     def has_memory(self, key) -> bool:
         return key in self._dag_execution_memory_map
@@ -0,0 +1,314 @@
+import asyncio
+import atexit
+import concurrent.futures
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Coroutine, Deque, Dict, List, Optional, Tuple
+
+from misc.asyncio import manage_loop, shutdown_loop
+
+logger = logging.getLogger(__name__)
+
+_Submission = Tuple[Coroutine, Optional[str], concurrent.futures.Future, float]
+
+
+class RuntimeSaturatedError(RuntimeError):
+    """Raised when the runtime submission queue is full"""
+
+
+class DagRuntimeManager:
+    """Long-lived pool of event-loop threads running DAG coroutines
+
+    Coroutines are dispatched on a fixed set of loops; at most
+    ``max_in_flight`` of them run at the same time, the following ones wait
+    in a bounded FIFO queue and submissions are rejected once it is full.
+    Submissions sharing an affinity key always run on the same loop so that
+    asyncio primitives shared between runs of a DAG stay bound to one loop.
+    """
+
+    def __init__(
+        self,
+        loop_count: int = 4,
+        max_in_flight: int = 64,
+        max_queued: int = 1024,
+        drain_timeout: float = 30.0,
+    ) -> None:
+        if loop_count < 1:
+            raise ValueError("loop_count must be >= 1")
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be >= 1")
+
+        self._loop_count = loop_count
+        self._max_in_flight = max_in_flight
+        self._max_queued = max_queued
+        self._drain_timeout = drain_timeout
+
+        self._loops: List[asyncio.AbstractEventLoop] = []
+        self._threads: List[threading.Thread] = []
+        self._loop_load: List[int] = []
+
+        self._pending: Deque[_Submission] = deque()
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+
+        self._started = False
+        self._accepting = True
+
+        self._submitted_count = 0
+        self._rejected_count = 0
+        self._completed_count = 0
+        self._failed_count = 0
+        self._total_queue_wait = 0.0
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        return len(self._pending)
+
+    @property
+    def is_running(self) -> bool:
+        return self._started and self._accepting
+
+    def start(self) -> None:
+        with self._lock:
+            if self._started:
+                return
+
+            for index in range(self._loop_count):
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=self._run_loop,
+                    args=(loop,),
+                    name=f"dag-runtime-{index}",
+                    daemon=True,
+                )
+                self._loops.append(loop)
+                self._threads.append(thread)
+                self._loop_load.append(0)
+                thread.start()
+
+            self._started = True
+            self._accepting = True
+
+        atexit.register(self.shutdown)
+
+    @staticmethod
+    def _run_loop(loop: asyncio.AbstractEventLoop) -> None:
+        asyncio.set_event_loop(loop)
+        manage_loop(loop)
+        try:
+            loop.run_forever()
+        finally:
+            # releases the resources bound to the loop, see on_loop_shutdown
+            loop.run_until_complete(shutdown_loop())
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
+    def submit(
+        self, coroutine: Coroutine, key: Optional[str] = None
+    ) -> concurrent.futures.Future:
+        """Submit a coroutine to the runtime
+
+        Args:
+            coroutine: the coroutine to run
+            key: optional affinity key, submissions with the same key run on
+                the same event loop
+
+        Returns:
+            concurrent.futures.Future: future of the coroutine result
+        """
+        if not self._started:
+            self.start()
+
+        future: concurrent.futures.Future = concurrent.futures.Future()
+
+        with self._lock:
+            if not self._accepting:
+                coroutine.close()
+                raise RuntimeError("DAG runtime is shutting down")
+
+            if self._in_flight < self._max_in_flight:
+                self._in_flight += 1
+                self._submitted_count += 1
+                submission: Optional[_Submission] = (coroutine, key, future, 0.0)
+            elif len(self._pending) < self._max_queued:
+                self._submitted_count += 1
+                self._pending.append((coroutine, key, future, time.monotonic()))
+                submission = None
+            else:
+                self._rejected_count += 1
+                coroutine.close()
+                raise RuntimeSaturatedError(
+                    f"DAG runtime saturated ({self._in_flight} running, "
+                    f"{len(self._pending)} queued)"
+                )
+
+        if submission:
+            self._dispatch(*submission)
+
+        return future
+
+    def _select_loop(self, key: Optional[str]) -> int:
+        # must be called with self._lock held
+        if key is not None:
+            return hash(key) % self._loop_count
+
+        return min(range(self._loop_count), key=lambda index: self._loop_load[index])
+
+    def _dispatch(
+        self,
+        coroutine: Coroutine,
+        key: Optional[str],
+        future: concurrent.futures.Future,
+        queued_at: float,
+    ) -> None:
+        with self._lock:
+            loop_index = self._select_loop(key)
+            self._loop_load[loop_index] += 1
+            loop = self._loops[loop_index]
+            if queued_at:
+                self._total_queue_wait += time.monotonic() - queued_at
+
+        if future.cancelled():
+            # cancelled while queued
+            coroutine.close()
+            self._on_done(loop_index, None)
+            return
+
+        try:
+            run_future = asyncio.run_coroutine_threadsafe(coroutine, loop)
+        except RuntimeError as e:
+            coroutine.close()
+            future.set_exception(e)
+            self._on_done(loop_index, None)
+            return
+
+        def cancel_callback(outer_future: concurrent.futures.Future) -> None:
+            if outer_future.cancelled():
+                run_future.cancel()
+
+        future.add_done_callback(cancel_callback)
+
+        def done_callback(done_future: concurrent.futures.Future) -> None:
+            if done_future.cancelled():
+                if not future.done():
+                    future.cancel()
+            elif done_future.exception() is not None:
+                logger.error(
+                    "DAG runtime task failed",
+                    exc_info=done_future.exception(),
+                )
+                if not future.done():
+                    future.set_exception(done_future.exception())
+            elif not future.done():
+                future.set_result(done_future.result())
+
+            self._on_done(loop_index, done_future)
+
+        run_future.add_done_callback(done_callback)
+
+    def _on_done(
+        self, loop_index: int, done_future: Optional[concurrent.futures.Future]
+    ) -> None:
+        with self._lock:
+            self._loop_load[loop_index] -= 1
+            self._completed_count += 1
+            if (
+                done_future is None
+                or done_future.cancelled()
+                or done_future.exception() is not None
+            ):
+                self._failed_count += 1
+
+            if self._pending:
+                submission: Optional[_Submission] = self._pending.popleft()
+            else:
+                submission = None
+                self._in_flight -= 1
+                if not self._in_flight:
+                    self._idle.notify_all()
+
+        if submission:
+            self._dispatch(*submission)
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Wait for every submitted coroutine to finish
+
+        Args:
+            timeout: maximum time to wait in seconds, None to wait forever
+
+        Returns:
+            bool: True if the runtime is idle
+        """
+        with self._lock:
+            return self._idle.wait_for(
+                lambda: not self._in_flight and not self._pending, timeout
+            )
+
+    def shutdown(self, timeout: Optional[float] = None) -> bool:
+        """Stop accepting submissions, drain the running ones then stop loops
+
+        Args:
+            timeout: drain timeout, defaults to the configured drain timeout
+
+        Returns:
+            bool: True if every submission finished before the loops stopped
+        """
+        with self._lock:
+            if not self._started:
+                return True
+            self._accepting = False
+
+        drained = self.drain(self._drain_timeout if timeout is None else timeout)
+
+        if not drained:
+            logger.warning(
+                "DAG runtime stopped with %d running and %d queued tasks",
+                self._in_flight,
+                len(self._pending),
+            )
+            with self._lock:
+                pending = list(self._pending)
+                self._pending.clear()
+            for coroutine, _, future, _ in pending:
+                coroutine.close()
+                future.cancel()
+
+        for loop in self._loops:
+            loop.call_soon_threadsafe(loop.stop)
+
+        for thread in self._threads:
+            thread.join(timeout=5)
+
+        with self._lock:
+            self._loops.clear()
+            self._threads.clear()
+            self._loop_load.clear()
+            self._started = False
+            self._in_flight = 0
+
+        atexit.unregister(self.shutdown)
+
+        return drained
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "loops": self._loop_count,
+                "loopLoad": list(self._loop_load),
+                "maxInFlight": self._max_in_flight,
+                "maxQueued": self._max_queued,
+                "inFlight": self._in_flight,
+                "queued": len(self._pending),
+                "submitted": self._submitted_count,
+                "rejected": self._rejected_count,
+                "completed": self._completed_count,
+                "failed": self._failed_count,
+                "totalQueueWait": self._total_queue_wait,
+            }
@@ -1,24 +1,32 @@
+import asyncio
+import functools
+import threading
+from typing import Any, Dict
+
 from conf.config import Config
+from misc.asyncio import on_loop_shutdown
+
+MONGODB_URI_KEYS = {"mongodb": "MONGODB_URI", "mongodb_mm1": "MONGODB_MM1_URI"}
 
 
 class DBMSManager:
     def __init__(self):
         self._loaded_dbms = dict()
+        # motor clients are bound to the event loop they were created on, they
+        # are only served on the managed loops, which close them when they
+        # shut down
+        self._loaded_async_dbms: Dict[int, Dict[str, Any]] = {}
+        self._async_lock = threading.Lock()
 
     def __getitem__(self, item: str):
         if item not in self._loaded_dbms:
             dbms = None
-            if item == "mongodb":
+            if item in MONGODB_URI_KEYS:
                 from pymongo import MongoClient
 
-                uri = Config()["MONGODB_URI"]
+                uri = Config()[MONGODB_URI_KEYS[item]]
                 dbms = MongoClient(uri)
 
-            elif item == "mongodb_mm1":
-                from pymongo import MongoClient
-
-                uri = Config()["MONGODB_MM1_URI"]
-                dbms = MongoClient(uri)
             elif item == "elasticsearch":
                 from elasticsearch import Elasticsearch
 
@@ -28,3 +36,50 @@ class DBMSManager:
                 self._loaded_dbms[item] = dbms
 
         return self._loaded_dbms.get(item)
+
+    def get_async(self, item: str) -> Any:
+        """Get the asyncio client of a DBMS, for the running event loop
+
+        Only served on the managed loops, the DAG runtime loops and the
+        loops of misc.asyncio.run_managed(), see on_loop_shutdown.
+
+        Args:
+            item: the DBMS link, "mongodb" or "mongodb_mm1"
+
+        Returns:
+            Any: an AsyncIOMotorClient, None for an unknown link
+
+        Raises:
+            RuntimeError: when the running loop isn't managed
+        """
+        if item not in MONGODB_URI_KEYS:
+            return None
+
+        loop = asyncio.get_running_loop()
+        loop_id = id(loop)
+
+        with self._async_lock:
+            loop_dbms = self._loaded_async_dbms.get(loop_id)
+            if loop_dbms is None:
+                on_loop_shutdown(functools.partial(self.close_async, loop_id))
+                loop_dbms = self._loaded_async_dbms[loop_id] = {}
+
+            if item not in loop_dbms:
+                from motor.motor_asyncio import AsyncIOMotorClient
+
+                uri = Config()[MONGODB_URI_KEYS[item]]
+                loop_dbms[item] = AsyncIOMotorClient(uri, io_loop=loop)
+
+            return loop_dbms[item]
+
+    async def close_async(self, loop_id: int) -> None:
+        """Close the asyncio clients of an event loop
+
+        Args:
+            loop_id: id() of the event loop
+        """
+        with self._async_lock:
+            loop_dbms = self._loaded_async_dbms.pop(loop_id, {})
+
+        for dbms in loop_dbms.values():
+            dbms.close()
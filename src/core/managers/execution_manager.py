@@ -0,0 +1,438 @@
+import asyncio
+import atexit
+import concurrent.futures
+import logging
+import multiprocessing
+import threading
+import time
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    cast,
+)
+
+from core.callbacks.types import EventSenderParam
+from core.context.forwarding_context import LoopForwardingContext, QueueEventContext
+from core.tasks.types import ExecutionMode, TaskData
+from misc.asyncio import run_managed
+
+if TYPE_CHECKING:
+    from multiprocessing.managers import SyncManager
+
+    from core.context.context import Context
+    from core.tasks.task import Task
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOLS: Mapping[str, Tuple[ExecutionMode, int]] = {
+    ExecutionMode.THREAD.value: (ExecutionMode.THREAD, 4),
+    ExecutionMode.PROCESS.value: (ExecutionMode.PROCESS, 2),
+}
+
+
+class _ThreadRun:
+    """Cancellation handle of a task body running on a pool thread"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._cancelled = False
+
+    def started(self, loop: asyncio.AbstractEventLoop, task: asyncio.Task) -> bool:
+        with self._lock:
+            if self._cancelled:
+                return False
+            self._loop = loop
+            self._task = task
+            return True
+
+    def cancel(self) -> None:
+        with self._lock:
+            self._cancelled = True
+            if self._loop is None or self._task is None:
+                return
+            try:
+                self._loop.call_soon_threadsafe(self._task.cancel)
+            except RuntimeError:
+                # the body finished and its loop is closed
+                pass
+
+
+def _run_on_thread(
+    run: _ThreadRun,
+    process: Callable[["Context", TaskData], Awaitable[TaskData]],
+    context: "Context",
+    data_in: TaskData,
+    dag_loop: asyncio.AbstractEventLoop,
+) -> TaskData:
+    async def main() -> TaskData:
+        current_task = cast(asyncio.Task, asyncio.current_task())
+        if not run.started(asyncio.get_running_loop(), current_task):
+            raise asyncio.CancelledError()
+
+        return await process(LoopForwardingContext(context, dag_loop), data_in)
+
+    return run_managed(main())
+
+
+def _run_in_process(
+    task_data: Mapping[str, Any], data_in: TaskData, events, cancel_event
+) -> TaskData:
+    """Entry point of the worker processes, rebuilds the task and runs it"""
+    from core.tasks.task_dag import TaskDAG
+    from core.utils import deserialize_instance
+
+    dag = TaskDAG()
+    with dag:
+        task = deserialize_instance(task_data)
+
+    context = QueueEventContext(events, task)
+
+    async def main() -> TaskData:
+        loop = asyncio.get_running_loop()
+        current_task = cast(asyncio.Task, asyncio.current_task())
+
+        def watch_cancel() -> None:
+            while not cancel_event.wait(0.5):
+                if current_task.done():
+                    return
+            try:
+                loop.call_soon_threadsafe(current_task.cancel)
+            except RuntimeError:
+                pass
+
+        threading.Thread(target=watch_cancel, daemon=True).start()
+
+        return await task._process(context, data_in)
+
+    return run_managed(main())
+
+
+class ExecutionPool:
+    """Executor running blocking task bodies away from the DAG event loops
+
+    Thread pools run the task coroutine on a private event loop of a pool
+    thread, process pools rebuild the task from its serialized form in a
+    worker process. In both cases events are emitted from the DAG loop and
+    cancelling the DAG task cancels the body at its next await.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        mode: ExecutionMode,
+        workers: int,
+        start_method: str = "spawn",
+    ) -> None:
+        if mode == ExecutionMode.LOOP:
+            raise ValueError(f"Execution pool {name} can't run on the event loop")
+        if workers < 1:
+            raise ValueError(f"Execution pool {name} workers must be >= 1")
+
+        self._name = name
+        self._mode = mode
+        self._workers = workers
+        self._start_method = start_method
+        self._executor: Optional[concurrent.futures.Executor] = None
+        self._sync_manager: Optional["SyncManager"] = None
+        self._lock = threading.Lock()
+
+        self._submitted_count = 0
+        self._running_count = 0
+        self._completed_count = 0
+        self._error_count = 0
+        self._cancelled_count = 0
+        self._busy_time = 0.0
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def mode(self) -> ExecutionMode:
+        return self._mode
+
+    def _get_executor(self) -> concurrent.futures.Executor:
+        with self._lock:
+            if self._executor is None:
+                if self._mode == ExecutionMode.PROCESS:
+                    mp_context = multiprocessing.get_context(self._start_method)
+                    self._sync_manager = mp_context.Manager()
+                    self._executor = concurrent.futures.ProcessPoolExecutor(
+                        self._workers, mp_context=mp_context
+                    )
+                else:
+                    self._executor = concurrent.futures.ThreadPoolExecutor(
+                        self._workers, thread_name_prefix=f"exec-{self._name}"
+                    )
+
+            return self._executor
+
+    async def run(
+        self, task: "Task", context: "Context", data_in: TaskData
+    ) -> TaskData:
+        """Run the task body in the pool
+
+        Args:
+            task: the task
+            context: the DAG run context
+            data_in: the task input
+
+        Returns:
+            TaskData: the task output
+        """
+        if self._mode == ExecutionMode.PROCESS:
+            # the first call starts the sync manager process
+            executor = await asyncio.to_thread(self._get_executor)
+        else:
+            executor = self._get_executor()
+        start = time.monotonic()
+        self._submitted_count += 1
+        self._running_count += 1
+        try:
+            if self._mode == ExecutionMode.PROCESS:
+                result = await self._run_process(executor, task, context, data_in)
+            else:
+                result = await self._run_thread(executor, task, context, data_in)
+        except asyncio.CancelledError:
+            self._cancelled_count += 1
+            raise
+        except Exception:
+            self._error_count += 1
+            raise
+        finally:
+            self._running_count -= 1
+            self._busy_time += time.monotonic() - start
+
+        self._completed_count += 1
+        return result
+
+    @staticmethod
+    async def _run_thread(
+        executor: concurrent.futures.Executor,
+        task: "Task",
+        context: "Context",
+        data_in: TaskData,
+    ) -> TaskData:
+        run = _ThreadRun()
+        future = executor.submit(
+            _run_on_thread,
+            run,
+            task._process,
+            context,
+            data_in,
+            asyncio.get_running_loop(),
+        )
+
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            run.cancel()
+            raise
+
+    async def _run_process(
+        self,
+        executor: concurrent.futures.Executor,
+        task: "Task",
+        context: "Context",
+        data_in: TaskData,
+    ) -> TaskData:
+        # created with the process executor, its proxies are created and
+        # called away from the loop, each call is a round trip to its process
+        sync_manager = cast("SyncManager", self._sync_manager)
+        events, cancel_event = await asyncio.to_thread(
+            lambda: (sync_manager.Queue(), sync_manager.Event())
+        )
+
+        forward_events = asyncio.create_task(
+            self._forward_events(events, task, context)
+        )
+        future = executor.submit(
+            _run_in_process, task.serialize(), dict(data_in), events, cancel_event
+        )
+
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # not awaited, the cancellation goes on meanwhile
+            asyncio.get_running_loop().run_in_executor(None, cancel_event.set)
+            raise
+        finally:
+            # the body events are all queued once the future is resolved
+            await asyncio.to_thread(events.put, None)
+            await asyncio.shield(forward_events)
+
+    @staticmethod
+    async def _forward_events(events, task: "Task", context: "Context") -> None:
+        while True:
+            message = await asyncio.to_thread(events.get)
+            if message is None:
+                return
+
+            sender_key, event, payload, raw_payload = message
+            sender: EventSenderParam
+            if sender_key == "task":
+                sender = task
+            elif sender_key == "dag":
+                dag = task.dag()
+                if dag is None:
+                    continue
+                sender = dag
+            else:
+                sender = sender_key
+
+            try:
+                await context.event(sender, event, payload, raw_payload=raw_payload)
+            except Exception:
+                logger.exception("Unable to forward %s event of %s", event, task.id)
+
+    def as_json(self) -> Dict[str, Any]:
+        return {
+            "name": self._name,
+            "mode": self._mode.value,
+            "workers": self._workers,
+            "submitted": self._submitted_count,
+            "running": self._running_count,
+            "completed": self._completed_count,
+            "errors": self._error_count,
+            "cancelled": self._cancelled_count,
+            "busyTime": self._busy_time,
+        }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+            sync_manager, self._sync_manager = self._sync_manager, None
+
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        if sync_manager is not None:
+            sync_manager.shutdown()
+
+
+class ExecutionManager:
+    """Named execution pools of the task bodies
+
+    A task runs on the pool named by ``Task.EXECUTION_POOL``, ``"loop"`` by
+    default, which runs it directly on the DAG event loop. The ``thread``
+    and ``process`` pools always exist, others are configured with
+    ``EXECUTION_POOLS`` and task classes may be moved to another pool with
+    ``EXECUTION_TASK_POOLS``.
+    """
+
+    def __init__(
+        self,
+        pools: Optional[Mapping[str, Tuple[ExecutionMode, int]]] = None,
+        task_pools: Optional[Mapping[str, str]] = None,
+        start_method: str = "spawn",
+    ) -> None:
+        self._pool_configs: Dict[str, Tuple[ExecutionMode, int]] = {
+            **DEFAULT_POOLS,
+            **(pools or {}),
+        }
+        self._task_pools: Dict[str, str] = dict(task_pools) if task_pools else {}
+        self._start_method = start_method
+        self._pools: Dict[str, ExecutionPool] = {}
+        self._lock = threading.Lock()
+
+        atexit.register(self.shutdown)
+
+    @staticmethod
+    def parse_pools(raw_value: Optional[str]) -> Dict[str, Tuple[ExecutionMode, int]]:
+        """Parse a ``name=mode:workers;other name=mode:workers`` value
+
+        Args:
+            raw_value: the raw configuration value
+
+        Returns:
+            Dict[str, Tuple[ExecutionMode, int]]: mode and workers per pool
+        """
+        pools: Dict[str, Tuple[ExecutionMode, int]] = {}
+        if not raw_value:
+            return pools
+
+        for part in raw_value.split(";"):
+            if not part.strip():
+                continue
+            name, _, pool_config = part.rpartition("=")
+            mode, _, workers = pool_config.partition(":")
+            if not name or not workers:
+                raise ValueError(f"Invalid execution pool {part!r}")
+            pools[name.strip()] = (ExecutionMode(mode.strip()), int(workers))
+
+        return pools
+
+    @staticmethod
+    def parse_task_pools(raw_value: Optional[str]) -> Dict[str, str]:
+        """Parse a ``TaskClass=pool;module.TaskClass=pool`` value
+
+        Args:
+            raw_value: the raw configuration value
+
+        Returns:
+            Dict[str, str]: pool name per task class
+        """
+        task_pools: Dict[str, str] = {}
+        if not raw_value:
+            return task_pools
+
+        for part in raw_value.split(";"):
+            if not part.strip():
+                continue
+            task_class, _, pool_name = part.rpartition("=")
+            if not task_class:
+                raise ValueError(f"Invalid task execution pool {part!r}")
+            task_pools[task_class.strip()] = pool_name.strip()
+
+        return task_pools
+
+    def pool(self, name: str) -> Optional[ExecutionPool]:
+        """Get an execution pool, None for the event loop
+
+        Raises:
+            KeyError: when the pool isn't configured
+        """
+        if name == ExecutionMode.LOOP.value:
+            return None
+
+        with self._lock:
+            pool = self._pools.get(name)
+            if pool is None:
+                mode, workers = self._pool_configs[name]
+                pool = ExecutionPool(name, mode, workers, self._start_method)
+                self._pools[name] = pool
+
+            return pool
+
+    def pool_name_for_task(self, task: "Task") -> str:
+        task_class = task.__class__
+
+        return self._task_pools.get(
+            f"{task_class.__module__}.{task_class.__name__}",
+            self._task_pools.get(task_class.__name__, task_class.EXECUTION_POOL),
+        )
+
+    def pool_for_task(self, task: "Task") -> Optional[ExecutionPool]:
+        return self.pool(self.pool_name_for_task(task))
+
+    def stats(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            pools = list(self._pools.values())
+
+        return [pool.as_json() for pool in pools]
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+
+        for pool in pools:
+            pool.shutdown()
@@ -0,0 +1,243 @@
+import datetime
+import threading
+import time
+from collections import OrderedDict
+from enum import Enum
+from typing import Any, Dict, List, Mapping, Optional
+
+from core.tasks.types import Status
+
+
+class JobState(Enum):
+    CREATED = 0
+    RUNNING = 1
+    FINISHED = 2
+    EXPIRED = 3
+
+
+class JobRecord:
+    """Lifecycle bookkeeping of a single job DAG instance"""
+
+    def __init__(self, job_dag_id: str) -> None:
+        self.job_dag_id = job_dag_id
+        self.state = JobState.CREATED
+        self.status: Optional[Status] = None
+        self.error: Optional[str] = None
+
+        self.created_at = datetime.datetime.now()
+        self.finished_at: Optional[datetime.datetime] = None
+        self.last_access = time.monotonic()
+
+    def as_json(self) -> Dict[str, Any]:
+        return {
+            "id": self.job_dag_id,
+            "state": self.state.name,
+            "status": self.status.name if self.status else None,
+            "error": self.error,
+            "createdAt": self.created_at.isoformat(),
+            "finishedAt": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class JobLifecycleManager:
+    """Lifecycle states and eviction policy of ephemeral job DAGs
+
+    Jobs go through CREATED -> RUNNING -> FINISHED and are EXPIRED once
+    evicted. Jobs which are not running are evicted after ``ttl`` seconds
+    without activity, or in least recently used order as soon as more than
+    ``max_retained`` of them are kept. A small summary of every evicted job
+    is kept, up to ``max_summaries`` of them.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 3600.0,
+        max_retained: int = 256,
+        max_summaries: int = 4096,
+    ) -> None:
+        self._ttl = ttl
+        self._max_retained = max_retained
+        self._max_summaries = max_summaries
+
+        self._lock = threading.Lock()
+        # least recently used first
+        self._records: "OrderedDict[str, JobRecord]" = OrderedDict()
+        self._summaries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+        self._created_count = 0
+        self._evicted_count = 0
+        self._evicted_unfinished_count = 0
+
+    @property
+    def ttl(self) -> float:
+        return self._ttl
+
+    @property
+    def max_retained(self) -> int:
+        return self._max_retained
+
+    def __contains__(self, job_dag_id: str) -> bool:
+        return job_dag_id in self._records
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def job_ids(self) -> List[str]:
+        with self._lock:
+            return list(self._records.keys())
+
+    def get_record(self, job_dag_id: str) -> Optional[JobRecord]:
+        return self._records.get(job_dag_id)
+
+    def get_summary(self, job_dag_id: str) -> Optional[Mapping[str, Any]]:
+        return self._summaries.get(job_dag_id)
+
+    def track(self, job_dag_id: str) -> JobRecord:
+        with self._lock:
+            record = self._records.get(job_dag_id)
+            if record is None:
+                record = JobRecord(job_dag_id)
+                self._records[job_dag_id] = record
+                self._created_count += 1
+            else:
+                self._records.move_to_end(job_dag_id)
+                record.last_access = time.monotonic()
+
+            self._summaries.pop(job_dag_id, None)
+
+            return record
+
+    def forget(self, job_dag_id: str) -> None:
+        with self._lock:
+            self._records.pop(job_dag_id, None)
+            self._summaries.pop(job_dag_id, None)
+
+    def touch(self, job_dag_id: str) -> None:
+        with self._lock:
+            record = self._records.get(job_dag_id)
+            if record is None:
+                return
+            self._records.move_to_end(job_dag_id)
+            record.last_access = time.monotonic()
+
+    def set_status(
+        self, job_dag_id: str, status: Status, error: Optional[Exception] = None
+    ) -> None:
+        with self._lock:
+            record = self._records.get(job_dag_id)
+            if record is None:
+                return
+
+            if status == Status.RUNNING:
+                record.state = JobState.RUNNING
+                record.error = None
+                record.finished_at = None
+            elif status in (Status.FINISHED, Status.ERROR):
+                record.state = JobState.FINISHED
+                record.finished_at = datetime.datetime.now()
+                if error is not None:
+                    record.error = str(error)
+            elif status == Status.IDLE:
+                # reset before a run, keep the current state
+                return
+
+            record.status = status
+            self._records.move_to_end(job_dag_id)
+            record.last_access = time.monotonic()
+
+    def collect(self, now: Optional[float] = None) -> List[str]:
+        """Select the jobs to evict
+
+        Args:
+            now: monotonic reference time, defaults to the current time
+
+        Returns:
+            List[str]: identifiers of the jobs to evict, in eviction order
+        """
+        if now is None:
+            now = time.monotonic()
+
+        with self._lock:
+            evictable = [
+                record
+                for record in self._records.values()
+                if record.state != JobState.RUNNING
+            ]
+
+            selected = [
+                record.job_dag_id
+                for record in evictable
+                if self._ttl >= 0 and now - record.last_access >= self._ttl
+            ]
+
+            overflow = len(self._records) - len(selected) - self._max_retained
+            if overflow > 0:
+                selected_set = set(selected)
+                for record in evictable:
+                    if overflow <= 0:
+                        break
+                    if record.job_dag_id in selected_set:
+                        continue
+                    selected.append(record.job_dag_id)
+                    overflow -= 1
+
+            return selected
+
+    def expire(
+        self, job_dag_id: str, summary: Optional[Mapping[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Mark a job as expired and keep its summary
+
+        Args:
+            job_dag_id: the job DAG identifier
+            summary: extra summary fields, e.g. run dates and task statuses
+
+        Returns:
+            Optional[Dict[str, Any]]: the kept summary, None if job is unknown
+        """
+        with self._lock:
+            record = self._records.pop(job_dag_id, None)
+            if record is None:
+                return None
+
+            if record.state == JobState.RUNNING:
+                # should not happen, running jobs are never selected
+                self._records[job_dag_id] = record
+                return None
+
+            was_finished = record.state == JobState.FINISHED
+            record.state = JobState.EXPIRED
+
+            final_summary = {
+                **record.as_json(),
+                **(summary or {}),
+                "expiredAt": datetime.datetime.now().isoformat(),
+            }
+
+            self._summaries[job_dag_id] = final_summary
+            while len(self._summaries) > self._max_summaries:
+                self._summaries.popitem(last=False)
+
+            self._evicted_count += 1
+            if not was_finished:
+                self._evicted_unfinished_count += 1
+
+            return final_summary
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            states: Dict[str, int] = {state.name: 0 for state in JobState}
+            for record in self._records.values():
+                states[record.state.name] += 1
+            states[JobState.EXPIRED.name] = len(self._summaries)
+
+            return {
+                "ttl": self._ttl,
+                "maxRetained": self._max_retained,
+                "maxSummaries": self._max_summaries,
+                "live": len(self._records),
+                "states": states,
+                "created": self._created_count,
+                "evicted": self._evicted_count,
+                "evictedUnfinished": self._evicted_unfinished_count,
+            }
@@ -0,0 +1,116 @@
+import concurrent.futures
+import logging
+import uuid
+from typing import Any, Callable, Dict, Optional, Sequence, Mapping
+
+from core.managers.remote_result_manager import RemoteResultManager
+
+logger = logging.getLogger(__name__)
+
+
+class LocalAsyncResult:
+    """Minimal celery AsyncResult stand-in returned by LocalRemoteBroker"""
+
+    def __init__(self, task_id: str, future: concurrent.futures.Future) -> None:
+        self.id = task_id
+        self._future = future
+
+    def ready(self) -> bool:
+        return self._future.done()
+
+    def get(self, timeout: Optional[float] = None, **kwargs) -> Any:
+        return self._future.result(timeout=timeout)
+
+
+class _LocalInspect:
+    def __init__(self, queues: Sequence[str]) -> None:
+        self._queues = queues
+
+    def active_queues(self) -> Mapping[str, Any]:
+        return {"local": [{"name": queue} for queue in self._queues]}
+
+
+class _LocalControl:
+    def __init__(self, queues: Sequence[str]) -> None:
+        self._queues = queues
+
+    def inspect(self) -> _LocalInspect:
+        return _LocalInspect(self._queues)
+
+
+class LocalRemoteBroker:
+    """In-process stand-in for the celery client, used by tests
+
+    Exposes the ``send_task`` surface used by RemoteTaskWrapper, runs the
+    registered task functions on a small thread pool standing for the remote
+    workers and pushes completions to a RemoteResultManager, like workers do
+    through their websocket.
+    """
+
+    def __init__(
+        self,
+        result_manager: RemoteResultManager,
+        max_workers: int = 2,
+        notify: bool = True,
+        queues: Sequence[str] = ("celery",),
+    ) -> None:
+        self._result_manager = result_manager
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="local-worker"
+        )
+        self._tasks: Dict[str, Callable[..., Any]] = {}
+        self._notify = notify
+        self.sent: Dict[str, Dict[str, Any]] = {}
+        self.control = _LocalControl(queues)
+
+    def register(self, name: str) -> Callable[[Callable], Callable]:
+        def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+            self._tasks[name] = func
+            return func
+
+        return decorator
+
+    def send_task(
+        self,
+        name: str,
+        args: Optional[Sequence[Any]] = None,
+        kwargs: Optional[Mapping[str, Any]] = None,
+        queue: Optional[str] = None,
+        task_id: Optional[str] = None,
+        **options,
+    ) -> LocalAsyncResult:
+        if name not in self._tasks:
+            raise KeyError(f"Unknown task {name}")
+
+        final_task_id = task_id if task_id else str(uuid.uuid4())
+        self.sent[final_task_id] = {"name": name, "queue": queue}
+
+        func = self._tasks[name]
+        future = self._executor.submit(
+            self._run, final_task_id, func, args or [], kwargs or {}
+        )
+
+        return LocalAsyncResult(final_task_id, future)
+
+    def _run(
+        self,
+        task_id: str,
+        func: Callable[..., Any],
+        args: Sequence[Any],
+        kwargs: Mapping[str, Any],
+    ) -> Any:
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            logger.exception("Local remote task %s failed", task_id)
+            if self._notify:
+                self._result_manager.notify(task_id, error=str(e))
+            raise
+
+        if self._notify:
+            self._result_manager.notify(task_id, result=result)
+
+        return result
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
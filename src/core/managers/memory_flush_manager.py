@@ -0,0 +1,173 @@
+import asyncio
+import atexit
+import json
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from core.callbacks.dag_execution_memory import DagExecutionMemory
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryFlushManager:
+    """Single scheduler pushing the changes of the DAG execution memories
+
+    Memories with changes for their websocket room mark themselves dirty,
+    one loop thread then sends the changes of every dirty memory at each
+    interval, so the number of running DAGs doesn't change the number of
+    threads, loops or timers involved in the pushes.
+    """
+
+    def __init__(self, interval: float = 0.3) -> None:
+        if interval <= 0:
+            raise ValueError("interval must be > 0")
+
+        self._interval = interval
+        self._lock = threading.Lock()
+        # memory and time of its first unsent change, per DAG id
+        self._dirty: Dict[str, Tuple["DagExecutionMemory", float]] = {}
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+        self._flush_count = 0
+        self._sent_count = 0
+        self._failed_count = 0
+        self._total_bytes = 0
+        self._max_bytes = 0
+        self._total_latency = 0.0
+        self._max_latency = 0.0
+
+    @property
+    def interval(self) -> float:
+        return self._interval
+
+    @property
+    def dirty_count(self) -> int:
+        return len(self._dirty)
+
+    def mark_dirty(self, memory: "DagExecutionMemory") -> None:
+        """Schedule the changes of a memory for the next flush, thread safe"""
+        with self._lock:
+            if memory.dag_id not in self._dirty:
+                self._dirty[memory.dag_id] = (memory, time.monotonic())
+            start = self._thread is None
+
+        if start:
+            self.start()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(
+                target=self._run_loop,
+                args=(self._loop,),
+                name="memory-flush",
+                daemon=True,
+            )
+            self._thread.start()
+
+        atexit.register(self.shutdown)
+
+    def _run_loop(self, loop: asyncio.AbstractEventLoop) -> None:
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(self._run())
+        except asyncio.CancelledError:
+            pass
+        finally:
+            loop.close()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval)
+            await self.flush()
+
+    async def flush(self) -> int:
+        """Send the changes of the dirty memories
+
+        Returns:
+            int: the number of payloads sent
+        """
+        with self._lock:
+            dirty = list(self._dirty.values())
+            self._dirty.clear()
+
+        sent: List[Tuple[float, int]] = []
+        failed = 0
+        for memory, dirty_time in dirty:
+            try:
+                payload = await memory.flush()
+            except Exception:
+                logger.exception("Unable to flush the memory of %s", memory.dag_id)
+                failed += 1
+                continue
+
+            if payload is not None:
+                sent.append(
+                    (
+                        time.monotonic() - dirty_time,
+                        len(json.dumps(payload, default=str)),
+                    )
+                )
+
+        with self._lock:
+            self._flush_count += 1
+            self._failed_count += failed
+            for latency, size in sent:
+                self._sent_count += 1
+                self._total_bytes += size
+                self._max_bytes = max(self._max_bytes, size)
+                self._total_latency += latency
+                self._max_latency = max(self._max_latency, latency)
+
+        return len(sent)
+
+    def shutdown(self, timeout: float = 5) -> None:
+        """Stop the flush loop, the pending changes are sent first"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+
+        if loop is None or thread is None:
+            return
+
+        async def stop():
+            await self.flush()
+            for task in asyncio.all_tasks():
+                if task is not asyncio.current_task():
+                    task.cancel()
+
+        try:
+            asyncio.run_coroutine_threadsafe(stop(), loop).result(timeout)
+        except Exception:
+            logger.exception("Unable to flush the memories on shutdown")
+
+        thread.join(timeout=timeout)
+        atexit.unregister(self.shutdown)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "interval": self._interval,
+                "running": self._thread is not None,
+                "dirty": len(self._dirty),
+                "flushes": self._flush_count,
+                "sent": self._sent_count,
+                "failed": self._failed_count,
+                "totalBytes": self._total_bytes,
+                "meanBytes": (
+                    self._total_bytes / self._sent_count if self._sent_count else 0
+                ),
+                "maxBytes": self._max_bytes,
+                "meanLatency": (
+                    self._total_latency / self._sent_count if self._sent_count else 0
+                ),
+                "maxLatency": self._max_latency,
+            }
@@ -0,0 +1,300 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+
+class PooledModel:
+    """A loaded model shared by the pool users
+
+    ``lock`` serializes the use of models which aren't safe to call from
+    several threads at once, ``leases`` counts the current users, a leased
+    model is never evicted.
+    """
+
+    def __init__(self, key: Hashable, value: Any, size: int, load_time: float):
+        self.key = key
+        self.value = value
+        self.size = size
+        self.load_time = load_time
+        self.lock = threading.RLock()
+        self.leases = 0
+        self.uses = 0
+        self.last_used = time.monotonic()
+
+
+class ModelPool:
+    """Process-wide LRU pool of loaded models bounded by a memory budget
+
+    Models are loaded once per key, concurrent requests for a model being
+    loaded wait for it. When the size of the loaded models exceeds the
+    budget, the least recently used models which aren't leased are evicted.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        memory_budget: int,
+        unload: Optional[Callable[[Any], None]] = None,
+    ) -> None:
+        self._name = name
+        self._memory_budget = memory_budget
+        self._unload = unload
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, PooledModel]" = OrderedDict()
+        self._loading: Dict[Hashable, threading.Event] = {}
+
+        self._hit_count = 0
+        self._miss_count = 0
+        self._eviction_count = 0
+        self._load_error_count = 0
+        self._total_load_time = 0.0
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def memory_budget(self) -> int:
+        return self._memory_budget
+
+    @property
+    def retained_size(self) -> int:
+        return sum(entry.size for entry in self._entries.values())
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def _get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Any],
+        size: Callable[[Any], int] | int,
+    ) -> PooledModel:
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    entry.leases += 1
+                    self._hit_count += 1
+                    return entry
+
+                loading = self._loading.get(key)
+                if loading is None:
+                    loading = threading.Event()
+                    self._loading[key] = loading
+                    self._miss_count += 1
+                    break
+
+            # another thread is loading the same model
+            loading.wait()
+
+        try:
+            start = time.monotonic()
+            value = loader()
+            load_time = time.monotonic() - start
+            entry_size = size(value) if callable(size) else size
+        except Exception:
+            with self._lock:
+                self._load_error_count += 1
+                self._loading.pop(key).set()
+            raise
+
+        logger.info(
+            "Model pool %s loaded %s in %.2fs (%d MB)",
+            self._name,
+            key,
+            load_time,
+            entry_size // MB,
+        )
+
+        entry = PooledModel(key, value, entry_size, load_time)
+        entry.leases = 1
+
+        with self._lock:
+            self._entries[key] = entry
+            self._total_load_time += load_time
+            self._loading.pop(key).set()
+            evicted = self._select_evictions()
+
+        self._unload_entries(evicted)
+
+        return entry
+
+    def _select_evictions(self) -> List[PooledModel]:
+        # must be called with self._lock held
+        evicted = []
+        retained = self.retained_size
+
+        for key, entry in list(self._entries.items()):
+            if retained <= self._memory_budget:
+                break
+            if entry.leases:
+                continue
+
+            del self._entries[key]
+            retained -= entry.size
+            self._eviction_count += 1
+            evicted.append(entry)
+
+        return evicted
+
+    def _unload_entries(self, entries: List[PooledModel]) -> None:
+        for entry in entries:
+            logger.info("Model pool %s evicted %s", self._name, entry.key)
+            if self._unload is not None:
+                try:
+                    self._unload(entry.value)
+                except Exception:
+                    logger.exception("Unable to unload model %s", entry.key)
+
+    def _release(self, entry: PooledModel) -> None:
+        with self._lock:
+            entry.leases -= 1
+            entry.uses += 1
+            entry.last_used = time.monotonic()
+            evicted = self._select_evictions()
+
+        self._unload_entries(evicted)
+
+    @contextmanager
+    def lease(
+        self,
+        key: Hashable,
+        loader: Callable[[], Any],
+        size: Callable[[Any], int] | int = 0,
+    ) -> Iterator[PooledModel]:
+        """Lease a model, loading it if needed
+
+        Args:
+            key: the model key, the effective model configuration
+            loader: builds the model when it isn't loaded yet
+            size: model size in bytes, or a function computing it from the
+                loaded model
+
+        Yields:
+            PooledModel: the pooled model, not evicted until released
+        """
+        entry = self._get_or_load(key, loader, size)
+        try:
+            yield entry
+        finally:
+            self._release(entry)
+
+    def warm_up(
+        self,
+        key: Hashable,
+        loader: Callable[[], Any],
+        size: Callable[[Any], int] | int = 0,
+    ) -> None:
+        with self.lease(key, loader, size):
+            pass
+
+    def evict(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.leases:
+                return False
+            del self._entries[key]
+            self._eviction_count += 1
+
+        self._unload_entries([entry])
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            evicted = [entry for entry in self._entries.values() if not entry.leases]
+            for entry in evicted:
+                del self._entries[entry.key]
+                self._eviction_count += 1
+
+        self._unload_entries(evicted)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "name": self._name,
+                "memoryBudget": self._memory_budget,
+                "retainedSize": self.retained_size,
+                "models": [
+                    {
+                        "key": str(entry.key),
+                        "size": entry.size,
+                        "leases": entry.leases,
+                        "uses": entry.uses,
+                        "loadTime": entry.load_time,
+                    }
+                    for entry in self._entries.values()
+                ],
+                "loading": len(self._loading),
+                "hits": self._hit_count,
+                "misses": self._miss_count,
+                "evictions": self._eviction_count,
+                "loadErrors": self._load_error_count,
+                "totalLoadTime": self._total_load_time,
+            }
+
+
+class ModelPoolManager:
+    """Registry of the model pools of the process, one per model family"""
+
+    def __init__(
+        self,
+        budgets: Optional[Mapping[str, int]] = None,
+        default_budget: int = 8192 * MB,
+    ) -> None:
+        self._budgets: Dict[str, int] = dict(budgets) if budgets else {}
+        self._default_budget = default_budget
+        self._pools: Dict[str, ModelPool] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def parse_budgets(raw_value: Optional[str]) -> Dict[str, int]:
+        """Parse a ``name=megabytes;other name=megabytes`` configuration value
+
+        Args:
+            raw_value: the raw configuration value
+
+        Returns:
+            Dict[str, int]: memory budget in bytes per pool name
+        """
+        budgets: Dict[str, int] = {}
+        if not raw_value:
+            return budgets
+
+        for part in raw_value.split(";"):
+            if not part.strip():
+                continue
+            name, _, budget = part.rpartition("=")
+            if not name:
+                raise ValueError(f"Invalid model pool budget {part!r}")
+            budgets[name.strip()] = int(budget) * MB
+
+        return budgets
+
+    def pool(
+        self, name: str, unload: Optional[Callable[[Any], None]] = None
+    ) -> ModelPool:
+        with self._lock:
+            model_pool = self._pools.get(name)
+            if model_pool is None:
+                model_pool = ModelPool(
+                    name, self._budgets.get(name, self._default_budget), unload=unload
+                )
+                self._pools[name] = model_pool
+
+            return model_pool
+
+    def stats(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            pools = list(self._pools.values())
+
+        return [model_pool.stats() for model_pool in pools]
@@ -0,0 +1,177 @@
+import asyncio
+import logging
+import threading
+from typing import Any, Dict, Optional, Protocol, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class RemoteTaskError(RuntimeError):
+    """Raised when a remote task reports a failure"""
+
+
+class RemoteResult(Protocol):
+    """Subset of celery AsyncResult used as a polling safety net"""
+
+    id: str
+
+    def ready(self) -> bool: ...
+
+    def get(self, *args, **kwargs) -> Any: ...
+
+
+class RemoteResultManager:
+    """Awaitable futures for tasks running on remote workers
+
+    A future is registered for a remote task id before the task is sent,
+    workers then push the completion through a notification channel (the
+    worker websocket, or a local broker in tests) which resolves the future
+    on the loop awaiting it. Outstanding calls only cost a future each, no
+    thread is parked while waiting.
+    """
+
+    def __init__(self, poll_interval: float = 30.0) -> None:
+        self._poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._waiters: Dict[str, Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = {}
+
+        self._notified_count = 0
+        self._polled_count = 0
+        self._unknown_count = 0
+
+    @property
+    def outstanding(self) -> int:
+        return len(self._waiters)
+
+    def register(self, task_id: str) -> asyncio.Future:
+        """Register a future for a remote task, must be called from a loop
+
+        Args:
+            task_id: the remote task identifier
+
+        Returns:
+            asyncio.Future: future resolved by notify()
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        with self._lock:
+            if task_id in self._waiters:
+                raise ValueError(f"Remote task {task_id} is already registered")
+            self._waiters[task_id] = (loop, future)
+
+        return future
+
+    def forget(self, task_id: str) -> None:
+        with self._lock:
+            self._waiters.pop(task_id, None)
+
+    def notify(
+        self,
+        task_id: str,
+        result: Optional[Any] = None,
+        error: Optional[str] = None,
+    ) -> bool:
+        """Resolve the future of a remote task, callable from any thread
+
+        Args:
+            task_id: the remote task identifier
+            result: the remote task result
+            error: the remote error message if the task failed
+
+        Returns:
+            bool: True if a waiter was registered for the task
+        """
+        with self._lock:
+            waiter = self._waiters.pop(task_id, None)
+            if waiter is None:
+                self._unknown_count += 1
+            else:
+                self._notified_count += 1
+
+        if waiter is None:
+            logger.debug("No waiter for remote task %s", task_id)
+            return False
+
+        loop, future = waiter
+
+        def resolve():
+            if future.done():
+                return
+            if error is not None:
+                future.set_exception(RemoteTaskError(error))
+            else:
+                future.set_result(result)
+
+        try:
+            loop.call_soon_threadsafe(resolve)
+        except RuntimeError:
+            logger.warning("Remote task %s waiter loop is closed", task_id)
+            return False
+
+        return True
+
+    async def _poll(self, remote_result: RemoteResult) -> Any:
+        while True:
+            await asyncio.sleep(self._poll_interval)
+
+            if await asyncio.to_thread(remote_result.ready):
+                with self._lock:
+                    self._polled_count += 1
+                return await asyncio.to_thread(remote_result.get)
+
+    async def wait(
+        self,
+        task_id: str,
+        future: Optional[asyncio.Future] = None,
+        remote_result: Optional[RemoteResult] = None,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """Wait for a remote task completion
+
+        Args:
+            task_id: the remote task identifier
+            future: the future returned by register(), registered if missing
+            remote_result: optional result handle, polled at a low frequency
+                in case a notification is lost
+            timeout: optional timeout in seconds
+
+        Returns:
+            Any: the remote task result
+        """
+        if future is None:
+            future = self.register(task_id)
+
+        poll_task: Optional[asyncio.Task] = None
+        if remote_result is not None and self._poll_interval > 0:
+            poll_task = asyncio.create_task(self._poll(remote_result))
+
+        try:
+            if poll_task is None:
+                return await asyncio.wait_for(future, timeout)
+
+            done, _ = await asyncio.wait(
+                {future, poll_task},
+                timeout=timeout,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if not done:
+                raise asyncio.TimeoutError(f"Remote task {task_id} timed out")
+
+            if future in done:
+                return future.result()
+
+            return poll_task.result()
+        finally:
+            if poll_task is not None:
+                poll_task.cancel()
+            self.forget(task_id)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "outstanding": len(self._waiters),
+                "notified": self._notified_count,
+                "polled": self._polled_count,
+                "unknown": self._unknown_count,
+            }
@@ -0,0 +1,662 @@
+import asyncio
+import datetime
+import decimal
+import enum
+import hashlib
+import json
+import logging
+import os
+import pickle
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Protocol,
+    Tuple,
+    cast,
+)
+
+from pydantic import BaseModel
+
+from conf import Config
+from core.managers.model_pool_manager import MB
+from core.tasks.types import ProcessMode, TaskData
+
+if TYPE_CHECKING:
+    from core.context.context import Context
+    from core.tasks.task import Task
+
+logger = logging.getLogger(__name__)
+
+# result cache names disabling the cache of a task class
+DISABLED_CACHE = "none"
+
+
+class ResultCacheBackend(Protocol):
+    """Storage of the pickled task results, by key
+
+    Backends are thread safe, blocking ones are called from a worker thread.
+    """
+
+    blocking: bool
+
+    def get(self, key: str) -> Optional[bytes]: ...
+
+    def set(self, key: str, value: bytes, ttl: Optional[float]) -> None: ...
+
+    def stats(self) -> Dict[str, Any]: ...
+
+
+def _expires_at(ttl: Optional[float]) -> Optional[float]:
+    return time.time() + ttl if ttl else None
+
+
+class MemoryResultCache:
+    """LRU of the results in the process memory, bounded in entries and bytes"""
+
+    blocking = False
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 256 * MB) -> None:
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[Optional[float], bytes]]" = OrderedDict()
+        self._size = 0
+
+        self._eviction_count = 0
+        self._expiration_count = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at is not None and expires_at < time.time():
+                self._remove(key)
+                self._expiration_count += 1
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: Optional[float]) -> None:
+        if len(value) > self._max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (_expires_at(ttl), value)
+            self._size += len(value)
+
+            while (
+                len(self._entries) > self._max_entries or self._size > self._max_bytes
+            ):
+                self._remove(next(iter(self._entries)))
+                self._eviction_count += 1
+
+    def _remove(self, key: str) -> None:
+        # must be called with self._lock held
+        _, value = self._entries.pop(key)
+        self._size -= len(value)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "memory",
+            "entries": len(self._entries),
+            "maxEntries": self._max_entries,
+            "bytes": self._size,
+            "maxBytes": self._max_bytes,
+            "evictions": self._eviction_count,
+            "expirations": self._expiration_count,
+        }
+
+
+class DiskResultCache:
+    """Results stored as files of a local directory, bounded in bytes
+
+    Reading a result touches its file, the least recently used files are
+    removed when the directory grows over ``max_bytes``, down to
+    ``low_water`` of it so that the directory isn't scanned at every write
+    once the cache is full.
+    """
+
+    blocking = True
+
+    def __init__(
+        self, directory: str, max_bytes: int = 1024 * MB, low_water: float = 0.9
+    ) -> None:
+        if not 0 < low_water <= 1:
+            raise ValueError(f"low_water must be in ]0, 1], {low_water} given")
+
+        self._directory = directory
+        self._max_bytes = max_bytes
+        self._low_water_bytes = int(max_bytes * low_water)
+        self._lock = threading.Lock()
+        self._size: Optional[int] = None
+
+        self._eviction_count = 0
+        self._expiration_count = 0
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self._directory, key[:2], f"{key}.pkl")
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self.path_for(key)
+        try:
+            with open(path, "rb") as file:
+                expires_at, value = pickle.load(file)
+        except FileNotFoundError:
+            return None
+
+        if expires_at is not None and expires_at < time.time():
+            self._remove_file(path)
+            self._expiration_count += 1
+            return None
+
+        os.utime(path)
+        return value
+
+    def set(self, key: str, value: bytes, ttl: Optional[float]) -> None:
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(temp_path, "wb") as file:
+            pickle.dump((_expires_at(ttl), value), file)
+        size = os.path.getsize(temp_path)
+
+        with self._lock:
+            total_size = self._ensure_size()
+            if os.path.exists(path):
+                total_size -= os.path.getsize(path)
+            os.replace(temp_path, path)
+            total_size += size
+            self._size = total_size
+
+            if total_size > self._max_bytes:
+                self._evict()
+
+    def _files(self) -> List[Tuple[float, int, str]]:
+        files = []
+        for root, _, names in os.walk(self._directory):
+            for name in names:
+                if not name.endswith(".pkl"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+
+        return files
+
+    def _ensure_size(self) -> int:
+        # must be called with self._lock held
+        if self._size is None:
+            self._size = sum(size for _, size, _ in self._files())
+
+        return self._size
+
+    def _evict(self) -> None:
+        # must be called with self._lock held
+        files = sorted(self._files())
+        self._size = sum(size for _, size, _ in files)
+
+        for _, size, path in files:
+            if self._size <= self._low_water_bytes:
+                break
+            self._remove_file(path)
+            self._size -= size
+            self._eviction_count += 1
+
+    @staticmethod
+    def _remove_file(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "disk",
+            "directory": self._directory,
+            "bytes": self._size,
+            "maxBytes": self._max_bytes,
+            "evictions": self._eviction_count,
+            "expirations": self._expiration_count,
+        }
+
+
+class MongoResultCache:
+    """Results stored in a mongodb collection, shared by the workers
+
+    Expired results are removed by a TTL index on ``expires_at``.
+    """
+
+    blocking = True
+
+    def __init__(self, collection: Any) -> None:
+        self._collection = collection
+        self._indexes_ready = False
+
+    def _ensure_indexes(self) -> None:
+        if self._indexes_ready:
+            return
+
+        self._collection.create_index(
+            "expires_at", name="expires_at", expireAfterSeconds=0
+        )
+        self._indexes_ready = True
+
+    def get(self, key: str) -> Optional[bytes]:
+        row = self._collection.find_one({"_id": key})
+        if row is None:
+            return None
+
+        # the TTL monitor only runs every minute
+        expires_at = row.get("expires_at")
+        if expires_at is not None and expires_at < datetime.datetime.utcnow():
+            return None
+
+        return row["value"]
+
+    def set(self, key: str, value: bytes, ttl: Optional[float]) -> None:
+        self._ensure_indexes()
+
+        now = datetime.datetime.utcnow()
+        self._collection.replace_one(
+            {"_id": key},
+            {
+                "_id": key,
+                "value": value,
+                "created_at": now,
+                "expires_at": now + datetime.timedelta(seconds=ttl) if ttl else None,
+            },
+            upsert=True,
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "mongodb", "collection": self._collection.name}
+
+
+def build_backend(name: str) -> ResultCacheBackend:
+    """Build a named result cache from the RESULT_CACHE_* configuration
+
+    Args:
+        name: ``memory``, ``disk`` or ``mongodb``
+
+    Returns:
+        ResultCacheBackend: the backend
+    """
+    config = Config()
+
+    if name == "memory":
+        return MemoryResultCache(
+            config.get("RESULT_CACHE_MEMORY_MAX_ENTRIES", coerce=int, default=1024),
+            config.get("RESULT_CACHE_MEMORY_MAX_MB", coerce=int, default=256) * MB,
+        )
+
+    if name == "disk":
+        return DiskResultCache(
+            config.get("RESULT_CACHE_DISK_DIR", default="task_results"),
+            config.get("RESULT_CACHE_DISK_MAX_MB", coerce=int, default=1024) * MB,
+        )
+
+    if name == "mongodb":
+        from core.context.global_context import GlobalContext
+        from misc.mongodb_helper import mongodb_collection
+
+        return MongoResultCache(
+            mongodb_collection(
+                GlobalContext.get_instance(),
+                config.get("RESULT_CACHE_MONGODB_LINK", default="mongodb"),
+                config.get("RESULT_CACHE_MONGODB_DATABASE", default="pinceau6"),
+                config.get("RESULT_CACHE_MONGODB_COLLECTION", default="_task_results"),
+            )
+        )
+
+    raise ValueError(f"Unknown result cache {name!r}")
+
+
+def _canonical(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return sorted(_canonical_json(item) for item in value)
+    if isinstance(value, bytes):
+        return {"sha256": hashlib.sha256(value).hexdigest()}
+    if isinstance(value, (uuid.UUID, decimal.Decimal)):
+        return str(value)
+
+    raise TypeError(f"{type(value).__name__} values can't be part of a cache key")
+
+
+def _canonical_json(value: Any) -> str:
+    return json.dumps(
+        value,
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=_canonical,
+    )
+
+
+def result_cache_key(task: "Task", data_in: TaskData) -> str:
+    """Content address of a task result: its class, params and input
+
+    Raises:
+        TypeError: when the input holds values without a canonical form
+    """
+    task_class = task.__class__
+
+    key_data = {
+        "task": f"{task_class.__module__}.{task_class.__qualname__}",
+        "version": task_class.RESULT_CACHE_VERSION,
+        "data": task.result_cache_key_data(data_in),
+    }
+
+    return hashlib.sha256(_canonical_json(key_data).encode("utf-8")).hexdigest()
+
+
+class _TaskCacheStats:
+    def __init__(self, task_class: str, cache_name: str) -> None:
+        self.task_class = task_class
+        self.cache_name = cache_name
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.uncacheable = 0
+        self.oversized = 0
+        self.errors = 0
+        self.saved_time = 0.0
+
+    def as_json(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+
+        return {
+            "task": self.task_class,
+            "cache": self.cache_name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": self.hits / lookups if lookups else 0.0,
+            "stores": self.stores,
+            "uncacheable": self.uncacheable,
+            "oversized": self.oversized,
+            "errors": self.errors,
+            "savedTime": self.saved_time,
+        }
+
+
+class ResultCacheManager:
+    """Memoization of deterministic task results
+
+    A task class opts in with ``Task.RESULT_CACHE``, the name of the cache
+    storing its results, and may expire them after ``Task.RESULT_CACHE_TTL``
+    seconds. ``RESULT_CACHE_TASKS`` moves task classes to another cache or
+    disables it with ``none``. Results are keyed by the task class, its
+    params and a canonical hash of its input; events sent by the task body
+    aren't replayed on a hit, tasks resend them in ``result_cache_hit``.
+    """
+
+    def __init__(
+        self,
+        task_caches: Optional[Mapping[str, Tuple[str, Optional[float]]]] = None,
+        *,
+        default_ttl: Optional[float] = None,
+        max_value_bytes: int = 16 * MB,
+        backends: Optional[Mapping[str, ResultCacheBackend]] = None,
+    ) -> None:
+        self._task_caches: Dict[str, Tuple[str, Optional[float]]] = (
+            dict(task_caches) if task_caches else {}
+        )
+        self._default_ttl = default_ttl
+        self._max_value_bytes = max_value_bytes
+        self._backends: Dict[str, ResultCacheBackend] = dict(backends or {})
+        self._task_stats: Dict[str, _TaskCacheStats] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def parse_task_caches(
+        raw_value: Optional[str],
+    ) -> Dict[str, Tuple[str, Optional[float]]]:
+        """Parse a ``TaskClass=cache;module.TaskClass=cache:ttl`` value
+
+        Args:
+            raw_value: the raw configuration value
+
+        Returns:
+            Dict[str, Tuple[str, Optional[float]]]: cache and ttl per task class
+        """
+        task_caches: Dict[str, Tuple[str, Optional[float]]] = {}
+        if not raw_value:
+            return task_caches
+
+        for part in raw_value.split(";"):
+            if not part.strip():
+                continue
+            task_class, _, cache_config = part.rpartition("=")
+            cache_name, _, ttl = cache_config.partition(":")
+            if not task_class or not cache_name.strip():
+                raise ValueError(f"Invalid task result cache {part!r}")
+            task_caches[task_class.strip()] = (
+                cache_name.strip(),
+                float(ttl) if ttl.strip() else None,
+            )
+
+        return task_caches
+
+    def backend(self, name: str) -> ResultCacheBackend:
+        """Get a result cache, built from the configuration on first use"""
+        with self._lock:
+            backend = self._backends.get(name)
+            if backend is None:
+                backend = build_backend(name)
+                self._backends[name] = backend
+
+            return backend
+
+    def cache_for_task(self, task: "Task") -> Optional[Tuple[str, Optional[float]]]:
+        """Cache name and ttl of a task, None when its results aren't cached"""
+        if task.process_mode != ProcessMode.NORMAL:
+            return None
+
+        task_class = task.__class__
+        cache_name, ttl = self._task_caches.get(
+            f"{task_class.__module__}.{task_class.__name__}",
+            self._task_caches.get(
+                task_class.__name__,
+                (task_class.RESULT_CACHE, task_class.RESULT_CACHE_TTL),
+            ),
+        )
+
+        if not cache_name or cache_name == DISABLED_CACHE:
+            return None
+
+        return cache_name, ttl if ttl is not None else self._default_ttl
+
+    def _stats_for(self, task: "Task", cache_name: str) -> _TaskCacheStats:
+        task_class = task.__class__.__name__
+
+        with self._lock:
+            stats = self._task_stats.get(task_class)
+            if stats is None:
+                stats = _TaskCacheStats(task_class, cache_name)
+                self._task_stats[task_class] = stats
+
+            return stats
+
+    @staticmethod
+    async def _call(backend: ResultCacheBackend, method: Callable, *args) -> Any:
+        if backend.blocking:
+            return await asyncio.to_thread(method, *args)
+
+        return method(*args)
+
+    async def _lookup(
+        self, backend: ResultCacheBackend, stats: _TaskCacheStats, key: str
+    ) -> Optional[Tuple[float, TaskData]]:
+        try:
+            payload = await self._call(backend, backend.get, key)
+            if payload is None:
+                return None
+
+            return pickle.loads(payload)
+        except Exception:
+            logger.exception("Unable to read the result cache of %s", stats.task_class)
+            stats.errors += 1
+            return None
+
+    async def _store(
+        self,
+        backend: ResultCacheBackend,
+        stats: _TaskCacheStats,
+        key: str,
+        duration: float,
+        value: TaskData,
+        ttl: Optional[float],
+    ) -> None:
+        try:
+            payload = pickle.dumps((duration, value), protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            stats.uncacheable += 1
+            return
+
+        if len(payload) > self._max_value_bytes:
+            stats.oversized += 1
+            return
+
+        try:
+            await self._call(backend, backend.set, key, payload, ttl)
+            stats.stores += 1
+        except Exception:
+            logger.exception("Unable to write the result cache of %s", stats.task_class)
+            stats.errors += 1
+
+    def _key(self, task: "Task", stats: _TaskCacheStats, data_in: TaskData):
+        try:
+            return result_cache_key(task, data_in)
+        except TypeError:
+            stats.uncacheable += 1
+            return None
+
+    async def run(
+        self,
+        task: "Task",
+        context: "Context",
+        data_in: TaskData,
+        compute: Callable[[], Awaitable[TaskData]],
+    ) -> TaskData:
+        """Get the cached result of a task or compute and store it
+
+        Args:
+            task: the task
+            context: the DAG run context
+            data_in: the task input
+            compute: runs the task body
+
+        Returns:
+            TaskData: the task output
+        """
+        cache = self.cache_for_task(task)
+        if cache is None:
+            return await compute()
+
+        cache_name, ttl = cache
+        backend = self.backend(cache_name)
+        stats = self._stats_for(task, cache_name)
+
+        key = self._key(task, stats, data_in)
+        if key is None:
+            return await compute()
+
+        cached = await self._lookup(backend, stats, key)
+        if cached is not None:
+            duration, value = cached
+            stats.hits += 1
+            stats.saved_time += duration
+            await task.result_cache_hit(context, data_in, value)
+            return value
+
+        stats.misses += 1
+        start = time.monotonic()
+        value = await compute()
+        await self._store(backend, stats, key, time.monotonic() - start, value, ttl=ttl)
+
+        return value
+
+    async def run_batch(
+        self,
+        task: "Task",
+        context: "Context",
+        data_in_list: List[TaskData],
+        compute_batch: Callable[[List[TaskData]], Awaitable[List[TaskData]]],
+    ) -> List[TaskData]:
+        """Batched run, only the items without a cached result are computed"""
+        cache = self.cache_for_task(task)
+        if cache is None:
+            return await compute_batch(data_in_list)
+
+        cache_name, ttl = cache
+        backend = self.backend(cache_name)
+        stats = self._stats_for(task, cache_name)
+
+        keys = [self._key(task, stats, data_in) for data_in in data_in_list]
+        results: List[Optional[TaskData]] = [None] * len(data_in_list)
+
+        for index, (key, data_in) in enumerate(zip(keys, data_in_list)):
+            cached = await self._lookup(backend, stats, key) if key else None
+            if cached is None:
+                continue
+
+            duration, value = cached
+            stats.hits += 1
+            stats.saved_time += duration
+            await task.result_cache_hit(context, data_in, value)
+            results[index] = value
+
+        missing = [index for index, result in enumerate(results) if result is None]
+        stats.misses += sum(1 for index in missing if keys[index])
+
+        if missing:
+            start = time.monotonic()
+            computed = await compute_batch([data_in_list[i] for i in missing])
+            # the batch duration is shared by its items
+            duration = (time.monotonic() - start) / len(missing)
+
+            for index, value in zip(missing, computed):
+                results[index] = value
+                if keys[index] and isinstance(value, Mapping):
+                    await self._store(
+                        backend, stats, keys[index], duration, value, ttl=ttl
+                    )
+
+        # every item is either cached or computed
+        return cast(List[TaskData], results)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            backends = dict(self._backends)
+            task_stats = list(self._task_stats.values())
+
+        return {
+            "caches": {name: backend.stats() for name, backend in backends.items()},
+            "tasks": [stats.as_json() for stats in task_stats],
+        }
@@ -20,7 +20,8 @@ def run_dag(dag_persisted_model: "DAGPersistedModel"):
 
     data_input = dag_persisted_model.inputs
 
-    GlobalContext.run_task(global_context.run_dag(dag, data_input, context))
+    # scheduled runs share the DAG instance, they stay on one loop
+    GlobalContext.run_task(global_context.run_dag(dag, data_input, context), key=dag.id)
 
 
 class SchedulerManager(object):
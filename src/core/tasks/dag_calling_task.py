@@ -11,11 +11,14 @@ if TYPE_CHECKING:
 
 class DAGCallingTask(Task):
 
-    def __init__(self, dag_id: str, **kwargs) -> None:
+    def __init__(self, dag_id: str, resume: bool = False, **kwargs) -> None:
         super().__init__(**kwargs)
 
         self._dag_id = dag_id
+        # resume the checkpointed run dag_id instead of starting it
+        self._resume = resume
         self._params["dag_id"] = dag_id
+        self._params["resume"] = resume
 
     def clone(self, **kwargs) -> "Task":
         params_copy = {**self.params}
@@ -59,5 +62,5 @@ class DAGCallingTask(Task):
                 print(f"    {str(task_edge)}")
                 print(f"    params={task_node.task.params}")
 
-        await global_context.run_dag(dag, data_in, context=context)
+        await global_context.run_dag(dag, data_in, context=context, resume=self._resume)
         return {}
@@ -0,0 +1,162 @@
+import copy
+import threading
+from typing import TYPE_CHECKING, Dict, List
+
+from core.tasks.task_data import TaskDataContract
+
+if TYPE_CHECKING:
+    from core.tasks.task_dag import TaskDAG
+
+
+def _copy_contract(contract: TaskDataContract) -> TaskDataContract:
+    # contracts are merged in place, never hand out the cached key contracts
+    new_contract = TaskDataContract()
+    for key, key_contract in contract.contract_dict.items():
+        new_contract.contract_dict[key] = copy.copy(key_contract)
+
+    return new_contract
+
+
+class DagContractAnalysis:
+    """Required inputs and provided outputs of every task of a DAG
+
+    Contracts are computed once per task in a topological pass over the
+    parent edges, each task reusing the results of its parents, instead of
+    walking every path of the DAG. Getters return copies, the analysis is
+    never mutated once built.
+    """
+
+    # bumped whenever the stored task parameters change, contracts of a DAG
+    # may depend on the parameters of its variant
+    _GENERATION = 0
+    # bumped when the structure of a DAG changes, contracts of a DAG may
+    # depend on other DAGs through a DAGCallingTask
+    _DAG_GENERATIONS: Dict[str, int] = {}
+    _GENERATION_LOCK = threading.Lock()
+    # analyses being built by the current thread, innermost last
+    _BUILDING = threading.local()
+
+    @classmethod
+    def generation(cls) -> int:
+        return cls._GENERATION
+
+    @classmethod
+    def dag_generation(cls, dag_id: str) -> int:
+        return cls._DAG_GENERATIONS.get(dag_id, 0)
+
+    @classmethod
+    def invalidate_all(cls) -> None:
+        with cls._GENERATION_LOCK:
+            cls._GENERATION += 1
+
+    @classmethod
+    def invalidate_dag(cls, dag_id: str) -> None:
+        """Invalidate the analyses of a DAG and of the DAGs calling it"""
+        with cls._GENERATION_LOCK:
+            cls._DAG_GENERATIONS[dag_id] = cls._DAG_GENERATIONS.get(dag_id, 0) + 1
+
+    @classmethod
+    def used_by_current(cls, analysis: "DagContractAnalysis") -> None:
+        """Record that the analysis being built depends on another one
+
+        Called whenever the analysis of a DAG is requested, it only matters
+        while the analysis of a calling DAG is being built.
+        """
+        building = getattr(cls._BUILDING, "stack", None)
+        if building:
+            building[-1]._dependencies.update(analysis._dependencies)
+
+    def __init__(self, dag: "TaskDAG") -> None:
+        self._generation = self.generation()
+        self._dependencies: Dict[str, int] = {dag.id: self.dag_generation(dag.id)}
+        self._provided: Dict[str, TaskDataContract] = {}
+        self._required: Dict[str, TaskDataContract] = {}
+
+        building = getattr(self._BUILDING, "stack", None)
+        if building is None:
+            building = self._BUILDING.stack = []
+
+        building.append(self)
+        try:
+            for task_id in self._topological_order(dag):
+                self._analyse_task(dag, task_id)
+        finally:
+            building.pop()
+
+        required = TaskDataContract()
+        for task in dag.get_leaf_tasks():
+            required.add_all(_copy_contract(self._required[task.id]))
+        self._dag_required = required
+
+    @property
+    def is_valid(self) -> bool:
+        return self._generation == self.generation() and all(
+            generation == self.dag_generation(dag_id)
+            for dag_id, generation in self._dependencies.items()
+        )
+
+    @staticmethod
+    def _topological_order(dag: "TaskDAG") -> List[str]:
+        # iterative post-order DFS over parent edges, parents come first
+        task_node_map = dag.task_node_map
+        order: List[str] = []
+        state: Dict[str, bool] = {}  # False while visiting, True when done
+
+        for root_id in task_node_map:
+            if root_id in state:
+                continue
+
+            state[root_id] = False
+            stack = [(root_id, iter(task_node_map[root_id].parent_nodes))]
+            while stack:
+                task_id, parent_edges = stack[-1]
+
+                for parent_edge in parent_edges:
+                    parent_id = parent_edge.from_id
+                    parent_state = state.get(parent_id)
+                    if parent_state is None:
+                        state[parent_id] = False
+                        stack.append(
+                            (parent_id, iter(task_node_map[parent_id].parent_nodes))
+                        )
+                        break
+                    if parent_state is False:
+                        raise ValueError(
+                            f"DAG {dag.id} has a cycle through task {parent_id}"
+                        )
+                else:
+                    stack.pop()
+                    state[task_id] = True
+                    order.append(task_id)
+
+        return order
+
+    def _analyse_task(self, dag: "TaskDAG", task_id: str) -> None:
+        task_node = dag.task_node_map[task_id]
+        task = task_node.task
+        parent_ids = [parent_edge.from_id for parent_edge in task_node.parent_nodes]
+
+        if not parent_ids:
+            self._provided[task_id] = task.provided_outputs()
+            self._required[task_id] = task.required_inputs()
+            return
+
+        parents_provided = TaskDataContract()
+        for parent_id in parent_ids:
+            parents_provided.add_all(_copy_contract(self._provided[parent_id]))
+        self._provided[task_id] = task.provided_outputs(parents_provided)
+
+        required = task.required_inputs()
+        for parent_id in parent_ids:
+            required.subtract_all(self._provided[parent_id])
+            required.add_all(_copy_contract(self._required[parent_id]))
+        self._required[task_id] = required
+
+    def provided_outputs(self, task_id: str) -> TaskDataContract:
+        return _copy_contract(self._provided[task_id])
+
+    def required_inputs(self, task_id: str) -> TaskDataContract:
+        return _copy_contract(self._required[task_id])
+
+    def dag_required_inputs(self) -> TaskDataContract:
+        return _copy_contract(self._dag_required)
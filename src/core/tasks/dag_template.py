@@ -0,0 +1,100 @@
+from typing import TYPE_CHECKING, Dict, Tuple
+
+from misc.functions import extract_dag_id
+
+if TYPE_CHECKING:
+    from core.tasks.execution_plan import ExecutionPlan
+    from core.tasks.task import Task
+    from core.tasks.task_dag import TaskDAG
+    from core.tasks.task_node import TaskEdge
+
+
+class DagTemplate:
+    """Immutable compiled snapshot of a DAG structure
+
+    The template keeps one prototype per task and the edges of every node as
+    tuples. Instantiating it for a run only forks the prototypes, which share
+    their definition (params, input model, lazily built resources) with the
+    template copy-on-write, and references the same immutable edges; the
+    per-run execution state (status, data, locks, results) is fresh.
+    """
+
+    def __init__(self, dag: "TaskDAG") -> None:
+        self._dag_id = dag.id
+        self._label = dag.label
+        self._required_worker_tag = dag.required_worker_tag
+        self._checkpoint_enabled = dag.checkpoint_enabled
+
+        self._task_ids: Tuple[str, ...] = tuple(dag.task_node_map.keys())
+        self._prototypes: Dict[str, "Task"] = {}
+        self._sub_edges: Dict[str, Tuple["TaskEdge", ...]] = {}
+        self._parent_edges: Dict[str, Tuple["TaskEdge", ...]] = {}
+
+        for task_id, task_node in dag.task_node_map.items():
+            self._prototypes[task_id] = task_node.task
+            self._sub_edges[task_id] = tuple(task_node.sub_nodes)
+            self._parent_edges[task_id] = tuple(task_node.parent_nodes)
+
+        self._execution_plan: "ExecutionPlan" = dag.execution_plan
+
+    @property
+    def dag_id(self) -> str:
+        return self._dag_id
+
+    @property
+    def task_ids(self) -> Tuple[str, ...]:
+        return self._task_ids
+
+    def instantiate(self, new_id: str, register: bool = True) -> "TaskDAG":
+        """Create a run instance of the template
+
+        Args:
+            new_id: identifier of the new DAG
+            register: register the new DAG in the dag manager
+
+        Returns:
+            TaskDAG: the new dag instance
+        """
+        from core.tasks.task_dag import TaskDAG
+        from core.tasks.task_node import TaskNode
+
+        _, variant, job_id = extract_dag_id(new_id)
+
+        new_dag = TaskDAG(
+            id=new_id,
+            label=self._label,
+            parent_id=self._dag_id,
+            job_id=job_id,
+            variant=variant,
+            required_worker_tag=self._required_worker_tag,
+            checkpoint=self._checkpoint_enabled,
+        )
+
+        # tasks falling back to clone() register themselves in the current dag
+        TaskDAG.CURRENT.append(new_dag)
+        new_dag._instantiating = True
+        try:
+            task_node_map = new_dag.task_node_map
+            for task_id in self._task_ids:
+                task_node = TaskNode(new_id, self._prototypes[task_id].fork(new_dag))
+                task_node.sub_nodes = list(self._sub_edges[task_id])
+                task_node.parent_nodes = list(self._parent_edges[task_id])
+                task_node_map[task_id] = task_node
+        finally:
+            new_dag._instantiating = False
+            TaskDAG.CURRENT.pop()
+
+        new_dag.set_execution_plan(self._execution_plan.bind(new_dag))
+
+        if register:
+            from core.context.global_context import GlobalContext
+
+            GlobalContext.get_instance().register_dag(new_dag)
+
+        return new_dag
+
+    def __len__(self) -> int:
+        return len(self._task_ids)
+
+    def __repr__(self) -> str:
+        return f"DagTemplate({self._dag_id!r}, {len(self._task_ids)} tasks)"
@@ -0,0 +1,260 @@
+import asyncio
+import copy
+from typing import TYPE_CHECKING, Any, Dict, FrozenSet, List, Mapping, Optional, Tuple
+
+from core.tasks.types import ProcessMode, TaskEdgeKind
+
+if TYPE_CHECKING:
+    from core.tasks.task import Task
+    from core.tasks.task_dag import TaskDAG
+    from core.tasks.task_node import TaskNode
+
+# (node, edge slot) pairs, the slot indexes the per-run edge locks
+EdgeList = Tuple[Tuple[int, int], ...]
+
+_ROUTED_KINDS = (TaskEdgeKind.DEFAULT, TaskEdgeKind.LOOP_START, TaskEdgeKind.LOOP_END)
+
+_NO_RESULT = object()
+
+
+class ExecutionPlan:
+    """Integer indexed schedule of a DAG, compiled once per structure and
+    shared by the clones of the DAG
+
+    Tasks are numbered in their insertion order. Every node keeps its
+    children per edge kind and its parents as ``(node, edge slot)`` tuples,
+    the activations only walk these tuples instead of filtering the edge
+    lists and keying the locks and results by strings. Tasks overriding
+    ``tasks_after`` route their output at run time, their children are
+    resolved on each activation.
+    """
+
+    def __init__(self, dag: "TaskDAG") -> None:
+        from core.tasks.task import Task
+
+        self._dag_id = dag.id
+        self._task_ids: Tuple[str, ...] = tuple(dag.task_node_map.keys())
+        self._nodes: Tuple["TaskNode", ...] = tuple(dag.task_node_map.values())
+        self._tasks: Tuple["Task", ...] = tuple(node.task for node in self._nodes)
+        self._index: Dict[str, int] = {
+            task_id: index for index, task_id in enumerate(self._task_ids)
+        }
+        self._edge_slots: Dict[Tuple[int, int], int] = {}
+
+        self._parents: Tuple[EdgeList, ...] = tuple(
+            tuple(
+                (
+                    self._index[edge.from_id],
+                    self._edge_slot(self._index[edge.from_id], index),
+                )
+                for edge in node.parent_nodes
+            )
+            for index, node in enumerate(self._nodes)
+        )
+        self._children: Dict[TaskEdgeKind, Tuple[EdgeList, ...]] = {
+            kind: tuple(
+                tuple(
+                    (
+                        self._index[edge.to_id],
+                        self._edge_slot(index, self._index[edge.to_id]),
+                    )
+                    for edge in node.usable_sub_nodes(for_mode=kind)
+                )
+                for index, node in enumerate(self._nodes)
+            )
+            for kind in _ROUTED_KINDS
+        }
+        self._in_degree: Tuple[int, ...] = tuple(
+            len(parents) for parents in self._parents
+        )
+        self._roots: Tuple[int, ...] = tuple(
+            index for index, in_degree in enumerate(self._in_degree) if not in_degree
+        )
+        self._dynamic_routing: Tuple[bool, ...] = tuple(
+            type(task).tasks_after is not Task.tasks_after for task in self._tasks
+        )
+
+        self._loop_bodies: Optional[Mapping[str, FrozenSet[str]]] = None
+
+    def bind(self, dag: "TaskDAG") -> "ExecutionPlan":
+        """Share the plan with a DAG of the same structure, a clone
+
+        Raises:
+            ValueError: when the DAG has other tasks
+        """
+        if tuple(dag.task_node_map.keys()) != self._task_ids:
+            raise ValueError(f"{dag.id} hasn't the structure of {self._dag_id}")
+
+        plan = copy.copy(self)
+        plan._dag_id = dag.id
+        plan._nodes = tuple(dag.task_node_map.values())
+        plan._tasks = tuple(node.task for node in plan._nodes)
+
+        return plan
+
+    def _edge_slot(self, from_index: int, to_index: int) -> int:
+        return self._edge_slots.setdefault(
+            (from_index, to_index), len(self._edge_slots)
+        )
+
+    @property
+    def dag_id(self) -> str:
+        return self._dag_id
+
+    @property
+    def task_ids(self) -> Tuple[str, ...]:
+        return self._task_ids
+
+    @property
+    def tasks(self) -> Tuple["Task", ...]:
+        return self._tasks
+
+    @property
+    def roots(self) -> Tuple[int, ...]:
+        return self._roots
+
+    @property
+    def edge_count(self) -> int:
+        return len(self._edge_slots)
+
+    def index_of(self, task_id: str) -> Optional[int]:
+        return self._index.get(task_id)
+
+    def parents(self, index: int) -> EdgeList:
+        return self._parents[index]
+
+    def in_degree(self, index: int) -> int:
+        return self._in_degree[index]
+
+    def tasks_after(
+        self, index: int, for_mode: TaskEdgeKind = TaskEdgeKind.DEFAULT
+    ) -> EdgeList:
+        """Children of a node activated by an edge kind
+
+        Raises:
+            ValueError: when a task routes its output to a task it isn't
+                linked to
+        """
+        if not self._dynamic_routing[index]:
+            return self._children[for_mode][index]
+
+        task_ids = self._tasks[index].tasks_after(self._nodes[index], for_mode=for_mode)
+
+        children = []
+        for task_id in task_ids:
+            to_index = self._index[task_id]
+            slot = self._edge_slots.get((index, to_index))
+            if slot is None:
+                raise ValueError(
+                    f"{self._task_ids[index]} isn't linked to {task_id} "
+                    f"in {self._dag_id}"
+                )
+            children.append((to_index, slot))
+
+        return tuple(children)
+
+    @property
+    def loop_bodies(self) -> Mapping[str, FrozenSet[str]]:
+        """Tasks running once per generated item, with their generators"""
+        if self._loop_bodies is not None:
+            return self._loop_bodies
+
+        loop_bodies: Dict[str, set] = {}
+        for index, task in enumerate(self._tasks):
+            if task.process_mode != ProcessMode.GENERATOR:
+                continue
+
+            to_visit = [
+                child for child, _ in self._children[TaskEdgeKind.DEFAULT][index]
+            ]
+            while to_visit:
+                body_index = to_visit.pop()
+                generators = loop_bodies.setdefault(self._task_ids[body_index], set())
+                if task.id in generators:
+                    continue
+                generators.add(task.id)
+                to_visit.extend(
+                    self._index[edge.to_id]
+                    for edge in self._nodes[body_index].sub_nodes
+                )
+
+        self._loop_bodies = {
+            task_id: frozenset(generators)
+            for task_id, generators in loop_bodies.items()
+        }
+
+        return self._loop_bodies
+
+    def as_json(self) -> Dict[str, Any]:
+        return {
+            "dag": self._dag_id,
+            "tasks": len(self._task_ids),
+            "edges": len(self._edge_slots),
+            "roots": [self._task_ids[index] for index in self._roots],
+            "dynamicRouting": [
+                task_id
+                for task_id, dynamic in zip(self._task_ids, self._dynamic_routing)
+                if dynamic
+            ],
+        }
+
+    def __len__(self) -> int:
+        return len(self._task_ids)
+
+    def __repr__(self) -> str:
+        return (
+            f"ExecutionPlan({self._dag_id!r}, {len(self._task_ids)} tasks, "
+            f"{len(self._edge_slots)} edges)"
+        )
+
+
+class PlanRun:
+    """Execution state of a run of a plan, its edge locks and task results
+    indexed by the plan slots"""
+
+    def __init__(self, plan: ExecutionPlan) -> None:
+        self._plan = plan
+        self._edge_locks: List[Optional[asyncio.Lock]] = [None] * plan.edge_count
+        self._results: List[Any] = [_NO_RESULT] * len(plan)
+        self._result_events: List[Optional[asyncio.Event]] = [None] * len(plan)
+
+    @property
+    def plan(self) -> ExecutionPlan:
+        return self._plan
+
+    async def acquire_edge(self, slot: int) -> None:
+        edge_lock = self._edge_locks[slot]
+        if edge_lock is None:
+            edge_lock = self._edge_locks[slot] = asyncio.Lock()
+
+        await edge_lock.acquire()
+
+    def release_edge(self, slot: int) -> None:
+        edge_lock = self._edge_locks[slot]
+        if edge_lock is not None:
+            edge_lock.release()
+
+    def set_result(self, index: int, value: Any) -> None:
+        self._results[index] = value
+
+        result_event = self._result_events[index]
+        if result_event is not None:
+            result_event.set()
+
+    async def result(self, index: int) -> Any:
+        """Result of a task, waits for it to be handed over"""
+        value = self._results[index]
+        if value is not _NO_RESULT:
+            return value
+
+        result_event = self._result_events[index]
+        if result_event is None:
+            result_event = self._result_events[index] = asyncio.Event()
+
+        await result_event.wait()
+
+        return self._results[index]
+
+    def clear_results(self) -> None:
+        self._results = [_NO_RESULT] * len(self._plan)
+        self._result_events = [None] * len(self._plan)
@@ -0,0 +1,271 @@
+import asyncio
+import time
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Set
+
+from core.tasks.types import TaskData
+
+
+class LoopPolicy:
+    """Execution policy of the iterations sent on a loop edge
+
+    By default iterations run one at a time. With ``max_in_flight`` > 1 up to
+    that many iterations of the downstream task run concurrently and the
+    generator is suspended while the window is full. Ordered iterations may
+    run concurrently but hand their result over in the yield order.
+
+    With ``batch_size`` > 1 an iteration takes up to ``batch_size`` items,
+    gathered for at most ``batch_wait`` seconds, and the downstream tasks
+    process them in one activation.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = 1,
+        ordered: bool = False,
+        batch_size: int = 1,
+        batch_wait: float = 0.0,
+    ) -> None:
+        if max_in_flight < 1:
+            raise ValueError(f"max_in_flight must be >= 1, {max_in_flight} given")
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be >= 1, {batch_size} given")
+
+        self._max_in_flight = max_in_flight
+        self._ordered = ordered
+        self._batch_size = batch_size
+        self._batch_wait = batch_wait
+
+    @property
+    def max_in_flight(self) -> int:
+        return self._max_in_flight
+
+    @property
+    def ordered(self) -> bool:
+        return self._ordered
+
+    @property
+    def batch_size(self) -> int:
+        return self._batch_size
+
+    @property
+    def batch_wait(self) -> float:
+        return self._batch_wait
+
+    @property
+    def is_batched(self) -> bool:
+        return self._batch_size > 1
+
+    @property
+    def is_windowed(self) -> bool:
+        return self._max_in_flight > 1 or self.is_batched
+
+    def serialize(self) -> Mapping[str, Any]:
+        return {
+            "max_in_flight": self._max_in_flight,
+            "ordered": self._ordered,
+            "batch_size": self._batch_size,
+            "batch_wait": self._batch_wait,
+        }
+
+    @classmethod
+    def deserialize(cls, data: Mapping[str, Any]) -> "LoopPolicy":
+        return cls(
+            data["max_in_flight"],
+            data["ordered"],
+            data.get("batch_size", 1),
+            data.get("batch_wait", 0.0),
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"LoopPolicy(max_in_flight={self._max_in_flight}, ordered={self._ordered}, "
+            f"batch_size={self._batch_size}, batch_wait={self._batch_wait})"
+        )
+
+
+# starts an iteration of a window with its index and items, the iteration must
+# release its index once finished
+StartIteration = Callable[["LoopWindow", int, List[TaskData]], None]
+
+
+class LoopWindow:
+    """In-flight iterations of a loop edge during a DAG run"""
+
+    def __init__(self, policy: LoopPolicy, start_iteration: StartIteration) -> None:
+        self._policy = policy
+        self._start_iteration = start_iteration
+        self._slots = asyncio.Semaphore(policy.max_in_flight)
+        self._turn = asyncio.Condition()
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+        self._next_index = 0
+        self._next_turn = 0
+        self._finished: Set[int] = set()
+        self._in_flight = 0
+
+        self._buffer: List[TaskData] = []
+        self._buffer_lock = asyncio.Lock()
+        self._flush_timer: Optional[asyncio.Task] = None
+
+        self._item_count = 0
+        self._max_in_flight_seen = 0
+        self._producer_wait = 0.0
+
+    @property
+    def policy(self) -> LoopPolicy:
+        return self._policy
+
+    @property
+    def buffered(self) -> int:
+        """Items waiting for their batch"""
+        return len(self._buffer)
+
+    async def put(self, item: TaskData) -> None:
+        """Send an item on the edge, suspends the producer when the window is
+        full"""
+        self._item_count += 1
+
+        if not self._policy.is_batched:
+            index = await self.acquire()
+            self._start_iteration(self, index, [item])
+            return
+
+        async with self._buffer_lock:
+            self._buffer.append(item)
+
+            if len(self._buffer) >= self._policy.batch_size:
+                await self._flush()
+            elif len(self._buffer) == 1:
+                self._flush_timer = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self._policy.batch_wait)
+
+        async with self._buffer_lock:
+            await self._flush()
+
+    async def _flush(self) -> None:
+        flush_timer, self._flush_timer = self._flush_timer, None
+        if flush_timer is not None and flush_timer is not asyncio.current_task():
+            flush_timer.cancel()
+
+        if not self._buffer:
+            return
+
+        batch, self._buffer = self._buffer, []
+        index = await self.acquire()
+        self._start_iteration(self, index, batch)
+
+    async def close(self) -> None:
+        """Send the pending batch and wait for the in-flight iterations"""
+        async with self._buffer_lock:
+            await self._flush()
+
+        await self.join()
+
+    async def acquire(self) -> int:
+        """Wait for a free slot, suspends the producer when the window is full
+
+        Returns:
+            int: the index of the iteration
+        """
+        start = time.monotonic()
+        await self._slots.acquire()
+        self._producer_wait += time.monotonic() - start
+
+        index = self._next_index
+        self._next_index += 1
+        self._in_flight += 1
+        self._max_in_flight_seen = max(self._max_in_flight_seen, self._in_flight)
+        self._idle.clear()
+
+        return index
+
+    async def wait_turn(self, index: int) -> None:
+        """Wait for the previous iterations to hand their result over"""
+        if not self._policy.ordered:
+            return
+
+        async with self._turn:
+            await self._turn.wait_for(lambda: self._next_turn == index)
+
+    async def release(self, index: int) -> None:
+        """Free the slot of a finished or failed iteration"""
+        async with self._turn:
+            self._finished.add(index)
+            while self._next_turn in self._finished:
+                self._finished.remove(self._next_turn)
+                self._next_turn += 1
+            self._turn.notify_all()
+
+        self._in_flight -= 1
+        if not self._in_flight:
+            self._idle.set()
+        self._slots.release()
+
+    async def join(self) -> None:
+        """Wait for the in-flight iterations"""
+        await self._idle.wait()
+
+    def as_json(self) -> Dict[str, Any]:
+        return {
+            **self._policy.serialize(),
+            "items": self._item_count,
+            "iterations": self._next_index,
+            "inFlight": self._in_flight,
+            "maxInFlight": self._max_in_flight_seen,
+            "producerWait": self._producer_wait,
+        }
+
+
+class LoopProgress:
+    """Items of a generator processed by its loop body during a DAG run
+
+    An item is held by the activations working on it, it is done once none
+    holds it anymore. Items processed concurrently finish in any order, the
+    low watermark is the last position such that this item and every item
+    before it are done.
+    """
+
+    def __init__(self, start: int = 0) -> None:
+        self._watermark = start
+        self._holds: Dict[int, int] = {}
+        # done items past the watermark, waiting for the items before them
+        self._done: Set[int] = set()
+        self._first_failed: Optional[int] = None
+
+    @property
+    def watermark(self) -> int:
+        return self._watermark
+
+    def hold(self, positions: Iterable[int]) -> None:
+        for position in positions:
+            self._holds[position] = self._holds.get(position, 0) + 1
+
+    def release(self, positions: Iterable[int]) -> None:
+        for position in positions:
+            count = self._holds[position] - 1
+            if count:
+                self._holds[position] = count
+                continue
+
+            del self._holds[position]
+            if self._first_failed is None or position < self._first_failed:
+                self._done.add(position)
+
+        while self._watermark + 1 in self._done:
+            self._watermark += 1
+            self._done.remove(self._watermark)
+
+    def fail(self, positions: Iterable[int]) -> None:
+        """The watermark stops before the first failed item"""
+        first_failed = min(positions, default=None)
+        if first_failed is None:
+            return
+
+        if self._first_failed is None or first_failed < self._first_failed:
+            self._first_failed = first_failed
+            self._done = {
+                position for position in self._done if position < first_failed
+            }
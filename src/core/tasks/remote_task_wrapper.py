@@ -1,4 +1,5 @@
 import json
+import uuid
 from enum import Enum
 from typing import Mapping, Any, Optional, TYPE_CHECKING, Sequence
 
@@ -69,8 +70,13 @@ class RemoteTaskWrapper(Task):
                 # Let the base class default method raise the TypeError
                 return super().default(obj)
 
+        remote_result_manager = global_context.remote_result_manager
+
+        # register the future before sending, the worker may answer right away
+        remote_task_id = str(uuid.uuid4())
+        future = remote_result_manager.register(remote_task_id)
+
         try:
-            print("before sending task to celery")
             result = global_context.celery.send_task(
                 "worker.run_task",
                 [
@@ -79,12 +85,17 @@ class RemoteTaskWrapper(Task):
                     json.loads(json.dumps(data_in, cls=PydanticEncoder)),
                 ],
                 queue=self._worker_tag,
+                task_id=remote_task_id,
             )
-            print("celery task sent!")
-        except Exception as e:
-            print(e)
+        except Exception:
+            remote_result_manager.forget(remote_task_id)
+            raise
+
+        remote_data = await remote_result_manager.wait(
+            remote_task_id, future=future, remote_result=result
+        )
 
-        final_data = {**data_in, **result.get()}
+        final_data = {**data_in, **remote_data}
 
         return final_data
 
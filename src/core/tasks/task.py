@@ -1,9 +1,10 @@
 import asyncio
+import copy
+import functools
 import inspect
 import logging
 import weakref
 from abc import ABCMeta
-from threading import Semaphore
 from typing import (
     Optional,
     TYPE_CHECKING,
@@ -15,6 +16,7 @@ from typing import (
     cast,
     Type,
     Dict,
+    List,
 )
 
 from pydantic import BaseModel, create_model
@@ -23,6 +25,7 @@ from core.callbacks.types import EventSenderObject, EventSender
 from core.tasks.graph_element_with_parameters import GraphElementWithParameters
 from core.tasks.task_node import TaskNode
 from core.tasks.types import (
+    ExecutionMode,
     ProcessMode,
     TaskData,
     TaskDataAsyncIterator,
@@ -32,6 +35,8 @@ from core.tasks.types import (
 
 if TYPE_CHECKING:
     from core.context.context import Context
+    from core.managers.concurrency_manager import AsyncConcurrencyLimiter
+    from core.tasks.loop_policy import LoopPolicy
     from core.tasks.task_dag import TaskDAG
     from core.tasks.task_data import TaskDataContract
 
@@ -45,8 +50,8 @@ class TaskConcurrencyMetaclass(ABCMeta):
         if "MAX_CONCURRENCY" not in dct:
             x.MAX_CONCURRENCY = -1
 
-        if x.MAX_CONCURRENCY > 1:
-            x.TASK_SEMAPHORE = Semaphore(x.MAX_CONCURRENCY)
+        if "CONCURRENCY_RESOURCES" not in dct:
+            x.CONCURRENCY_RESOURCES = {}
 
         return x
 
@@ -72,7 +77,21 @@ class Task(
         pass
 
     MAX_CONCURRENCY = -1
-    TASK_SEMAPHORE: Optional[Semaphore] = None
+    CONCURRENCY_RESOURCES: Mapping[str, int] = {}
+
+    # execution pool of _process: "loop", "thread", "process" or a pool of
+    # EXECUTION_POOLS
+    EXECUTION_POOL: str = ExecutionMode.LOOP.value
+
+    # policy of the loop edges of a generator without their own policy
+    LOOP_POLICY: Optional["LoopPolicy"] = None
+
+    # result cache of deterministic tasks: "memory", "disk" or "mongodb",
+    # results expire after RESULT_CACHE_TTL seconds, bump the version when
+    # the results of the same input change
+    RESULT_CACHE: Optional[str] = None
+    RESULT_CACHE_TTL: Optional[float] = None
+    RESULT_CACHE_VERSION: int = 1
 
     def __init__(self, dag=None, is_passthrough=False, **kwargs) -> None:
         kwargs.setdefault("description", f"{self.__class__.__name__} task")
@@ -88,10 +107,6 @@ class Task(
         if kwargs.get("_register_task", True):
             final_dag.register_task(self)
 
-        self._max_concurrent_tasks = kwargs.get("max_concurrency", self.MAX_CONCURRENCY)
-
-        self._semaphore = None
-
         self._input_model = cast(Type[Input], self.process_input_model())
 
         self._process_mode: ProcessMode
@@ -105,6 +120,19 @@ class Task(
                 f"{self.__class__.__name__} must implement either _process or _generator_process"
             )
 
+        if (
+            self._process_mode == ProcessMode.GENERATOR
+            and self.EXECUTION_POOL != ExecutionMode.LOOP.value
+        ):
+            raise ValueError(
+                f"{self.__class__.__name__} generator must run on the event loop"
+            )
+
+        if self._process_mode == ProcessMode.GENERATOR and self.RESULT_CACHE:
+            raise ValueError(
+                f"{self.__class__.__name__} generator results can't be cached"
+            )
+
         self._is_conditional_out = type(self).tasks_after != Task.tasks_after
 
         self._data: Dict[str, Any] = {}
@@ -214,6 +242,41 @@ class Task(
             is_passthrough=self.is_passthrough, **self._params, **other_params
         )
 
+    def fork(self, dag: "TaskDAG") -> "Task":
+        """Cheap per-run copy of the task, sharing its definition
+
+        The fork is a shallow copy: params, input model and any lazily built
+        resource are shared with the original until the fork rebinds them,
+        only the run state is reset. Tasks overriding clone() are cloned,
+        their clone may copy the run state of the prototype so it is reset too.
+
+        Args:
+            dag: the dag the fork belongs to
+
+        Returns:
+            Task: the forked task
+        """
+        if type(self).clone is not Task.clone:
+            forked = self.clone(id=self.id)
+        else:
+            forked = copy.copy(self)
+            forked._params = dict(self._params)
+
+        forked.dag = weakref.ref(dag)
+        forked._reset_run_state()
+
+        return forked
+
+    def _reset_run_state(self) -> None:
+        """Reset the state a task accumulates while running
+
+        Subclasses keeping per-run state must extend this method.
+        """
+        self._status = Status.IDLE
+        self._error = None
+        self._data = {}
+        self._lock = asyncio.Lock()
+
     @property
     def node(self) -> Optional["TaskNode"]:
         work_dag = self.dag()
@@ -313,34 +376,118 @@ class Task(
     ) -> Sequence[str]:
         return [sub_node.to_id for sub_node in node.usable_sub_nodes(for_mode=for_mode)]
 
-    def _get_semaphore(self) -> Optional[Semaphore]:
-        """Get a semaphore from the task class
+    def _get_limiters(self) -> List["AsyncConcurrencyLimiter"]:
+        """Get the concurrency limiters the task must acquire before running
 
         Returns:
-            Optional[Semaphore]: the defined semaphore or None
+            List[AsyncConcurrencyLimiter]: task class and resource limiters
         """
-        return self.__class__.TASK_SEMAPHORE
+        from core.context.global_context import GlobalContext
+
+        return GlobalContext.get_instance().concurrency_manager.limiters_for_task(self)
 
     async def process(
         self, context: "Context", data_in: Mapping[str, Any]
     ) -> Mapping[str, Any]:
-        semaphore = self._get_semaphore()
-        sem_acquired = False
-
-        try:
-            if semaphore:
-                semaphore.acquire()
-                sem_acquired = True
-
-            value = await self._process(context, data_in)
-        except Exception as e:
-            print(e)
-            raise e
-        finally:
-            if semaphore and sem_acquired:
-                semaphore.release()
+        from core.context.global_context import GlobalContext
 
-        return value
+        result_cache_manager = GlobalContext.get_instance().result_cache_manager
+
+        return await result_cache_manager.run(
+            self,
+            context,
+            data_in,
+            functools.partial(self._process_with_limiters, context, data_in),
+        )
+
+    async def _process_with_limiters(
+        self, context: "Context", data_in: TaskData
+    ) -> TaskData:
+        limiters = self._get_limiters()
+
+        if not limiters:
+            return await self._execute(context, data_in)
+
+        from core.context.global_context import GlobalContext
+
+        concurrency_manager = GlobalContext.get_instance().concurrency_manager
+
+        async with concurrency_manager.acquire(limiters):
+            return await self._execute(context, data_in)
+
+    async def process_batch(
+        self, context: "Context", data_in_list: List[TaskData]
+    ) -> List[TaskData]:
+        """Process the items of a batched loop edge in one activation
+
+        Limiters are acquired once for the whole batch, items with a cached
+        result aren't processed.
+
+        Args:
+            context: the DAG run context
+            data_in_list: the task input of each item
+
+        Returns:
+            List[TaskData]: the task output of each item
+        """
+        from core.context.global_context import GlobalContext
+
+        result_cache_manager = GlobalContext.get_instance().result_cache_manager
+
+        return await result_cache_manager.run_batch(
+            self,
+            context,
+            data_in_list,
+            functools.partial(self._process_batch_with_limiters, context),
+        )
+
+    async def _process_batch_with_limiters(
+        self, context: "Context", data_in_list: List[TaskData]
+    ) -> List[TaskData]:
+        limiters = self._get_limiters()
+
+        if not limiters:
+            return await self._process_batch(context, data_in_list)
+
+        from core.context.global_context import GlobalContext
+
+        concurrency_manager = GlobalContext.get_instance().concurrency_manager
+
+        async with concurrency_manager.acquire(limiters):
+            return await self._process_batch(context, data_in_list)
+
+    async def _process_batch(
+        self, context: "Context", data_in_list: List[TaskData]
+    ) -> List[TaskData]:
+        """Batch-aware tasks override this method, by default the items are
+        processed one by one"""
+        return [await self._execute(context, data_in) for data_in in data_in_list]
+
+    def result_cache_key_data(self, data_in: TaskData) -> Mapping[str, Any]:
+        """What the result of the task depends on, hashed into its cache key
+
+        Tasks configured outside of their params, or reading only part of
+        their input, override this method.
+        """
+        return {"params": self.params, "input": data_in}
+
+    async def result_cache_hit(
+        self, context: "Context", data_in: TaskData, data_out: TaskData
+    ) -> None:
+        """Called instead of _process when the result is cached, tasks
+        sending events from _process resend them from the cached output"""
+
+    async def _execute(self, context: "Context", data_in: TaskData) -> TaskData:
+        """Run _process on the event loop or in the task execution pool"""
+        from core.context.global_context import GlobalContext
+
+        execution_manager = GlobalContext.get_instance().execution_manager
+        pool = execution_manager.pool_for_task(self)
+
+        if pool is None:
+            return await self._process(context, data_in)
+
+        return await pool.run(self, context, data_in)
 
     async def _generator_process_before(
         self, context: "Context", data_in: TaskData
@@ -370,23 +517,32 @@ class Task(
     async def generator_process(
         self, context: "Context", data_in: TaskData
     ) -> TaskDataAsyncIterator:
-        semaphore = self._get_semaphore()
-        sem_acquired = False
+        limiters = self._get_limiters()
 
-        try:
-            if semaphore:
-                semaphore.acquire()
-                sem_acquired = True
+        value = self._generator_process(context, data_in)
 
-            value = self._generator_process(context, data_in)
+        if not limiters:
+            return value
 
-        except Exception as e:
-            raise e
-        finally:
-            if semaphore and sem_acquired:
-                semaphore.release()
+        return self._limited_generator(value, limiters)
 
-        return value
+    @staticmethod
+    async def _limited_generator(
+        iterator: TaskDataAsyncIterator, limiters: List["AsyncConcurrencyLimiter"]
+    ) -> TaskDataAsyncIterator:
+        from core.context.global_context import GlobalContext
+
+        concurrency_manager = GlobalContext.get_instance().concurrency_manager
+
+        # limiters are only held while the generator computes the next item,
+        # not while downstream tasks consume it
+        while True:
+            async with concurrency_manager.acquire(limiters):
+                try:
+                    item = await anext(iterator)
+                except StopAsyncIteration:
+                    return
+            yield item
 
     async def _process(self, context: "Context", data_in: TaskData) -> TaskData:
         raise NotImplementedError
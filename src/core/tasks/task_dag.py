@@ -1,7 +1,10 @@
 import asyncio
+import functools
 import logging
 import uuid
-from collections import OrderedDict
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
 from typing import (
     Optional,
     List,
@@ -9,55 +12,88 @@ from typing import (
     Mapping,
     Any,
     Self,
+    Set,
     cast,
     Type,
     Dict,
+    Tuple,
+    Coroutine,
+    Deque,
+    FrozenSet,
+    Iterator,
 )
 
 from pydantic import BaseModel, Field, ConfigDict, create_model
 
 from core.callbacks.types import EventSenderObject, EventSender
-from core.managers.async_event_manager import AsyncEventManager
+from core.tasks.dag_contract import DagContractAnalysis
+from core.tasks.dag_template import DagTemplate
+from core.tasks.execution_plan import ExecutionPlan, PlanRun
 from core.tasks.graph_element_with_parameters import GraphElementWithParameters
+from core.tasks.loop_policy import LoopPolicy, LoopProgress, LoopWindow
 from core.tasks.task_data import TaskDataContract
 from core.tasks.task_node import TaskNode
 from core.tasks.task_path import TaskPath
-from core.tasks.types import JSONParam, Status, ProcessMode, TaskEdgeKind
+from core.tasks.types import (
+    JSONParam,
+    Status,
+    ProcessMode,
+    TaskData,
+    TaskDataBatch,
+    TaskEdgeKind,
+)
 from misc.functions import extract_dag_id
 
 if TYPE_CHECKING:
     from core.tasks.task import Task
     from core.context.context import Context
+    from core.managers.checkpoint_manager import RunCheckpoint
     from core.tasks.task_node import TaskEdge
     import pydot
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
+# positions of the generator items the current activation works on, per
+# generator id, inherited by the activations it creates
+_LOOP_POSITIONS: ContextVar[Mapping[str, Tuple[int, ...]]] = ContextVar(
+    "loop_positions", default={}
+)
+
+
+@functools.lru_cache(maxsize=16)
+def _parameters_model(worker_tags: Tuple[str, ...]) -> Type[BaseModel]:
+    import enum
+
+    enum_values: Dict[str, str] = {k: k for k in worker_tags}
+    dynamic_worker_tag_enum = enum.Enum("RequiredWorkerTag", enum_values)
+
+    class Parameters(BaseModel):
+        model_config = ConfigDict(extra="ignore")
+        required_worker_tag: Optional[dynamic_worker_tag_enum | str] = None
+        tags: List[str] = Field(default_factory=list)
+
+    return Parameters
+
 
 class TaskDAG(GraphElementWithParameters, EventSenderObject):
     CURRENT: List["TaskDAG"] = []
 
     @staticmethod
     def parameters_factory() -> Type[BaseModel]:
-        import enum
         from core.context.global_context import GlobalContext
 
         global_context = GlobalContext.get_instance()
 
-        enum_values: Dict[str, str] = (
-            {k: k for k in global_context.celery_workers}
+        worker_tags = (
+            tuple(sorted(global_context.celery_workers))
             if global_context.celery
-            else {}
+            else ()
         )
-        dynamic_worker_tag_enum = enum.Enum("RequiredWorkerTag", enum_values)
-
-        class Parameters(BaseModel):
-            model_config = ConfigDict(extra="ignore")
-            required_worker_tag: Optional[dynamic_worker_tag_enum | str] = None
-            tags: List[str] = Field(default_factory=list)
 
-        return Parameters
+        # the model only depends on the worker tags, avoid rebuilding it on
+        # every DAG instantiation
+        return _parameters_model(worker_tags)
 
     def __init__(self, **kwargs) -> None:
         self._parameters = TaskDAG.parameters_factory().model_validate(kwargs)
@@ -69,19 +105,33 @@ class TaskDAG(GraphElementWithParameters, EventSenderObject):
 
         self._variant = kwargs.pop("variant", None)
         self._job_id = kwargs.pop("job_id", None)
+        self._checkpoint_enabled = kwargs.pop("checkpoint", False)
         super().__init__(**kwargs)
         self.task_node_map: dict[str, TaskNode] = OrderedDict()
 
-        self._result_event_manager = AsyncEventManager()
-
         self._dag_paths: Optional[list[TaskPath]] = None
         if not self._original_id:
             self._original_id = self.id
 
         self._progress: Optional[float] = None
         self._task_group: Optional[asyncio.TaskGroup] = None
-        self._edge_lock_map: Dict[str, asyncio.Lock] = {}
-        self._edge_lock_map_lock = asyncio.Lock()
+        self._plan_run: Optional[PlanRun] = None
+        self._loop_windows: Dict[str, Dict[str, LoopWindow]] = {}
+
+        self._checkpoint: Optional["RunCheckpoint"] = None
+        # generators of each loop body task and their run progress, tracked
+        # for the checkpoint of their positions
+        self._loop_bodies: Mapping[str, FrozenSet[str]] = {}
+        self._loop_progress: Dict[str, LoopProgress] = {}
+        # positions of the items waiting in a batched window, in order
+        self._loop_buffered: Dict[LoopWindow, Deque[Mapping[str, Tuple[int, ...]]]] = {}
+
+        self._template: Optional[DagTemplate] = None
+        self._execution_plan: Optional[ExecutionPlan] = None
+        self._contract_analysis: Optional[DagContractAnalysis] = None
+        # set while a job DAG is built from the template of its parent, no
+        # other DAG can depend on it yet
+        self._instantiating = False
 
     @property
     def params(self) -> Mapping[str, Any]:
@@ -107,23 +157,6 @@ class TaskDAG(GraphElementWithParameters, EventSenderObject):
 
         return create_model("RequiredParams", **final_fields)
 
-    async def __acquire_edge_lock(self, from_task: "Task", to_task: "Task") -> None:
-        lock_key = f"{from_task.id}::{to_task.id}"
-        async with self._edge_lock_map_lock:
-            edge_lock = self._edge_lock_map.get(lock_key)
-            if edge_lock is None:
-                edge_lock = asyncio.Lock()
-            self._edge_lock_map[lock_key] = edge_lock
-        await edge_lock.acquire()
-
-    async def __release_edge_lock(self, from_task: "Task", to_task: "Task") -> None:
-        lock_key = f"{from_task.id}::{to_task.id}"
-
-        async with self._edge_lock_map_lock:
-            edge_lock = self._edge_lock_map.get(lock_key)
-            if edge_lock is not None:
-                edge_lock.release()
-
     def serialize(self) -> Mapping[str, Any]:
         return {
             "_meta": {
@@ -150,6 +183,7 @@ class TaskDAG(GraphElementWithParameters, EventSenderObject):
 
             new_task_node_map = OrderedDict({node.task.id: node for node in task_nodes})
             work_dag.task_node_map = new_task_node_map
+            work_dag._structure_changed()
 
         return work_dag
 
@@ -210,6 +244,111 @@ class TaskDAG(GraphElementWithParameters, EventSenderObject):
 
         return dag_name
 
+    @property
+    def checkpoint_enabled(self) -> bool:
+        return self._checkpoint_enabled
+
+    @property
+    def checkpoint(self) -> Optional["RunCheckpoint"]:
+        return self._checkpoint
+
+    def set_checkpoint(self, checkpoint: Optional["RunCheckpoint"]) -> None:
+        """Attach the checkpoint of the current run, None to detach it"""
+        self._checkpoint = checkpoint
+        self._loop_bodies = self.execution_plan.loop_bodies if checkpoint else {}
+        self._loop_progress = {}
+        self._loop_buffered = {}
+
+    def _loop_positions(self, task: "Task") -> Mapping[str, Tuple[int, ...]]:
+        """Items of the tracked generators an activation of a task works on"""
+        generators = self._loop_bodies.get(task.id)
+        if not generators:
+            return {}
+
+        current = _LOOP_POSITIONS.get()
+        return {
+            generator_id: current[generator_id]
+            for generator_id in generators
+            if generator_id in current and generator_id in self._loop_progress
+        }
+
+    def _hold_loop_positions(self, positions: Mapping[str, Tuple[int, ...]]) -> None:
+        for generator_id, generator_positions in positions.items():
+            self._loop_progress[generator_id].hold(generator_positions)
+
+    def _release_loop_positions(self, positions: Mapping[str, Tuple[int, ...]]) -> None:
+        for generator_id, generator_positions in positions.items():
+            self._loop_progress[generator_id].release(generator_positions)
+
+    @contextmanager
+    def _loop_item(self, generator_id: str, position: int) -> Iterator[None]:
+        """Hold an item of a generator while it is handed over, the
+        activations created meanwhile work on it"""
+        progress = self._loop_progress.get(generator_id)
+        if progress is None:
+            yield
+            return
+
+        positions = (position,)
+        progress.hold(positions)
+        token = _LOOP_POSITIONS.set({**_LOOP_POSITIONS.get(), generator_id: positions})
+        try:
+            yield
+        except BaseException:
+            progress.fail(positions)
+            raise
+        finally:
+            _LOOP_POSITIONS.reset(token)
+            progress.release(positions)
+
+    def _create_activation(self, task: "Task", coroutine: Coroutine) -> None:
+        positions = self._loop_positions(task)
+        if not positions:
+            self.task_group.create_task(coroutine)
+            return
+
+        # held when created, an activation waiting to start isn't done
+        self._hold_loop_positions(positions)
+        self.task_group.create_task(self._track_loop_activation(positions, coroutine))
+
+    async def _track_loop_activation(
+        self, positions: Mapping[str, Tuple[int, ...]], coroutine: Coroutine
+    ) -> None:
+        try:
+            await coroutine
+        finally:
+            self._release_loop_positions(positions)
+
+        await self._checkpoint_positions(frozenset(positions))
+
+    def _checkpoint_failure(self, task: "Task") -> None:
+        if self._checkpoint is None:
+            return
+
+        self._checkpoint.task_failed()
+        # the position of a generator stops before its first failed item
+        for generator_id, positions in self._loop_positions(task).items():
+            self._loop_progress[generator_id].fail(positions)
+
+    async def _checkpoint_positions(
+        self, generators: FrozenSet[str], force: bool = False
+    ) -> None:
+        """Record the low watermark of the generators, the items up to it are
+        fully processed whatever is still in flight after them"""
+        checkpoint = self._checkpoint
+        if checkpoint is None:
+            return
+
+        for generator_id in generators:
+            progress = self._loop_progress.get(generator_id)
+            if progress is None:
+                # nested generators start over for each item
+                continue
+
+            await checkpoint.position_reached(
+                generator_id, progress.watermark, force=force
+            )
+
     @property
     def required_worker_tag(self) -> Optional[str]:
         return self.params.get("required_worker_tag")
@@ -245,6 +384,68 @@ class TaskDAG(GraphElementWithParameters, EventSenderObject):
 
         GlobalContext.get_instance().register_dag(self)
 
+    @property
+    def template(self) -> DagTemplate:
+        """Compiled template of the DAG, rebuilt only when its structure changes
+
+        Returns:
+            DagTemplate: the compiled template
+        """
+        if self._template is None:
+            self._template = DagTemplate(self)
+
+        return self._template
+
+    @property
+    def execution_plan(self) -> ExecutionPlan:
+        """Compiled schedule of the DAG, rebuilt only when its structure changes
+
+        Returns:
+            ExecutionPlan: the compiled plan
+        """
+        if self._execution_plan is None:
+            self._execution_plan = ExecutionPlan(self)
+
+        return self._execution_plan
+
+    def set_execution_plan(self, plan: ExecutionPlan) -> None:
+        """Use a plan compiled for the same structure, by the template"""
+        self._execution_plan = plan
+
+    def _current_plan_run(self) -> PlanRun:
+        """Execution state of the current run, the plan is pinned for the run
+        even when tasks register themselves during it"""
+        if self._plan_run is None:
+            self._plan_run = PlanRun(self.execution_plan)
+
+        return self._plan_run
+
+    @property
+    def contract_analysis(self) -> DagContractAnalysis:
+        """Memoized required inputs / provided outputs of the DAG tasks
+
+        Returns:
+            DagContractAnalysis: the contract analysis
+        """
+        analysis = self._contract_analysis
+        if analysis is None or not analysis.is_valid:
+            analysis = DagContractAnalysis(self)
+            self._contract_analysis = analysis
+
+        DagContractAnalysis.used_by_current(analysis)
+
+        return analysis
+
+    def _structure_changed(self) -> None:
+        """Invalidate structure derived caches, called when tasks or edges change"""
+        self._template = None
+        self._execution_plan = None
+        self._dag_paths = None
+        self._contract_analysis = None
+        if not self._instantiating:
+            # other DAGs may depend on this one through a DAGCallingTask
+            DagContractAnalysis.invalidate_dag(self.id)
+
     def clone(self, new_id: Optional[str] = None) -> "TaskDAG":
         """Helper method to clone a DAG
 
@@ -256,24 +457,7 @@ class TaskDAG(GraphElementWithParameters, EventSenderObject):
         """
         final_id = new_id if new_id else self.id + ":" + str(uuid.uuid4())
 
-        required_worker_tag = self.required_worker_tag
-
-        _, variant, job_id = extract_dag_id(final_id)
-
-        with TaskDAG(
-            id=final_id,
-            label=self.label,
-            parent_id=self.id,
-            job_id=job_id,
-            variant=variant,
-            required_worker_tag=required_worker_tag,
-        ) as new_dag:
-            for task_id, task_node in self.task_node_map.items():
-                new_dag.task_node_map[task_id] = task_node.clone(
-                    task_id=task_node.task.id, dag_id=final_id
-                )
-
-        return new_dag
+        return self.template.instantiate(final_id)
 
     def get_root_tasks(self) -> List["Task"]:
         """Helper method to get root tasks
@@ -282,11 +466,9 @@ class TaskDAG(GraphElementWithParameters, EventSenderObject):
             List["Task"]: root tasks
         """
 
-        root_task_nodes = (
-            node for node in self.task_node_map.values() if not node.parent_nodes
-        )
+        plan = self.execution_plan
 
-        return [node.task for node in root_task_nodes]
+        return [plan.tasks[index] for index in plan.roots]
 
     def get_leaf_tasks(self) -> List["Task"]:
         """Helper method to get leaf tasks
@@ -326,6 +508,45 @@ class TaskDAG(GraphElementWithParameters, EventSenderObject):
 
         child_node.add_parent_node(parent_node.task.id, edge_type=edge_type)
 
+        self._structure_changed()
+
+    def set_loop_policy(
+        self,
+        parent_task: "Task",
+        child_task: "Task",
+        max_in_flight: int = 1,
+        ordered: bool = False,
+        batch_size: int = 1,
+        batch_wait: float = 0.0,
+    ) -> None:
+        """Set how the iterations of a loop edge run
+
+        Args:
+            parent_task: the generator task
+            child_task: the loop body task
+            max_in_flight: iterations running concurrently, the generator is
+                suspended while they are all busy
+            ordered: hand the iteration results over in the yield order
+            batch_size: items given to the loop body in one activation
+            batch_wait: seconds a partial batch waits for more items
+
+        Raises:
+            ValueError: when the tasks aren't linked by a loop edge
+        """
+        parent_node: TaskNode = self.task_node_map[parent_task.id]
+        loop_policy = LoopPolicy(max_in_flight, ordered, batch_size, batch_wait)
+
+        for index, edge in enumerate(parent_node.sub_nodes):
+            if edge.to_id == child_task.id and edge.type == TaskEdgeKind.LOOP:
+                parent_node.sub_nodes[index] = edge.with_loop_policy(loop_policy)
+                break
+        else:
+            raise ValueError(
+                f"{parent_task.id} and {child_task.id} aren't linked by a loop edge"
+            )
+
+        self._structure_changed()
+
     def remove_parent_task(self, task_id: str, parent_task: "Task"):
         """Remove an edge between a task and a parent task
 
@@ -348,6 +569,8 @@ class TaskDAG(GraphElementWithParameters, EventSenderObject):
             sub_node for sub_node in parent_node.sub_nodes if sub_node.to_id != task_id
         ]
 
+        self._structure_changed()
+
     def register_task(self, task: "Task"):
         """Helper method to register a task as a task node
 
@@ -357,6 +580,8 @@ class TaskDAG(GraphElementWithParameters, EventSenderObject):
         task_node = TaskNode(self._id, task)
         self.task_node_map[task.id] = task_node
 
+        self._structure_changed()
+
     def swap_task(self, task: "Task"):
         """Helper method to replace a task by another one
 
@@ -366,8 +591,10 @@ class TaskDAG(GraphElementWithParameters, EventSenderObject):
         task_node = self.task_node_map[task.id]
         task_node.task = task
 
+        self._structure_changed()
+
     async def dag_did_finish(self):
-        await self._result_event_manager.async_clear()
+        self._current_plan_run().clear_results()
 
     @property
     def task_group(self) -> asyncio.TaskGroup:
@@ -378,24 +605,60 @@ class TaskDAG(GraphElementWithParameters, EventSenderObject):
 
     async def _lock_edges_after(
         self, task: "Task", for_mode=TaskEdgeKind.DEFAULT, release=False
-    ) -> List["Task"]:
-        task_node = self.task_node_map.get(task.id)
-
-        if task_node is None:
-            return []
+    ) -> None:
+        plan_run = self._current_plan_run()
+        index = plan_run.plan.index_of(task.id)
 
-        task_ids = task.tasks_after(task_node, for_mode=for_mode)
+        if index is None:
+            return
 
-        tasks = [self.task_node_map[task_id].task for task_id in task_ids]
+        children = plan_run.plan.tasks_after(index, for_mode=for_mode)
 
-        for task_after in tasks:
-            await self.__acquire_edge_lock(task, task_after)
+        for _, slot in children:
+            await plan_run.acquire_edge(slot)
 
         if release:
-            for task_after in tasks:
-                await self.__release_edge_lock(task, task_after)
+            for _, slot in children:
+                plan_run.release_edge(slot)
 
-        return tasks
+    def _open_loop_windows(
+        self, context: "Context", task: "Task"
+    ) -> Dict[str, LoopWindow]:
+        task_node = self.task_node_map[task.id]
+        windows: Dict[str, LoopWindow] = {}
+
+        for edge in task_node.sub_nodes:
+            if edge.type != TaskEdgeKind.LOOP:
+                continue
+
+            loop_policy = edge.loop_policy or task.LOOP_POLICY
+            if loop_policy is None or not loop_policy.is_windowed:
+                continue
+
+            task_after = self.task_node_map[edge.to_id].task
+            if task_after.process_mode != ProcessMode.NORMAL:
+                logger.warning(
+                    "%s iterations run one at a time, %s is a generator",
+                    edge,
+                    task_after.id,
+                )
+                continue
+
+            windows[edge.to_id] = LoopWindow(
+                loop_policy,
+                functools.partial(
+                    self._start_loop_iteration, context, task, task_after
+                ),
+            )
+
+        return windows
+
+    def loop_windows_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            f"{task_id}::{task_after_id}": window.as_json()
+            for task_id, windows in self._loop_windows.items()
+            for task_after_id, window in windows.items()
+        }
 
     async def _lock_tasks_after(
         self, task: "Task", for_mode=TaskEdgeKind.DEFAULT, release: bool = False
@@ -425,63 +688,277 @@ class TaskDAG(GraphElementWithParameters, EventSenderObject):
         data_output: Mapping[str, Any],
         edge_kind: TaskEdgeKind = TaskEdgeKind.DEFAULT,
     ):
-        tasks = await self._lock_edges_after(task, for_mode=edge_kind)
+        plan_run = self._current_plan_run()
+        plan = plan_run.plan
+        index = plan.index_of(task.id)
+
+        if index is None:
+            return
+
+        children = plan.tasks_after(index, for_mode=edge_kind)
+        windows = (
+            self._loop_windows.get(task.id)
+            if edge_kind == TaskEdgeKind.DEFAULT
+            else None
+        )
+        if windows:
+            # windowed loop edges are throttled by their window
+            scheduled = tuple(
+                (child, slot)
+                for child, slot in children
+                if plan.task_ids[child] not in windows
+            )
+        else:
+            scheduled = children
 
-        value = data_output if data_output else {}
-        await self._result_event_manager.async_value_received(task.id, value)
+        for _, slot in scheduled:
+            await plan_run.acquire_edge(slot)
 
-        for task_after in tasks:
+        if isinstance(data_output, TaskDataBatch):
+            # results are read per task, the last item of the batch stands
+            # for the activation
+            value = data_output[-1] if data_output else {}
+        else:
+            value = data_output if data_output else {}
+        plan_run.set_result(index, value)
+
+        if windows:
+            for child, _ in children:
+                window = windows.get(plan.task_ids[child])
+                if window is not None:
+                    await self._put_loop_window(window, data_output)
+
+        for child, _ in scheduled:
+            task_after = plan.tasks[child]
             if task_after.status == Status.WAITING:
                 continue
                 # it is already waiting
 
             await task_after.set_status(context, Status.WAITING)
 
-            self.task_group.create_task(
-                self.schedule_task(context, task_after, data_output)
+            self._create_activation(
+                task_after,
+                self.schedule_task(
+                    context, task_after, data_output, source_task_id=task.id
+                ),
             )
 
+    async def _put_loop_window(self, window: LoopWindow, item: TaskData) -> None:
+        if not self._loop_progress or not window.policy.is_batched:
+            # unbatched iterations start within the put, they get the
+            # positions of the item from its context
+            await window.put(item)
+            return
+
+        # held while waiting for its batch, whose iteration may start from
+        # the context of another item
+        positions = {
+            generator_id: generator_positions
+            for generator_id, generator_positions in _LOOP_POSITIONS.get().items()
+            if generator_id in self._loop_progress
+        }
+        self._hold_loop_positions(positions)
+        self._loop_buffered.setdefault(window, deque()).append(positions)
+
+        await window.put(item)
+
+    def _start_loop_iteration(
+        self,
+        context: "Context",
+        source_task: "Task",
+        task: "Task",
+        window: LoopWindow,
+        index: int,
+        items: List[TaskData],
+    ) -> None:
+        coroutine = self._run_loop_iteration(
+            context, source_task, task, items, window, index
+        )
+
+        buffered = self._loop_buffered.get(window)
+        if buffered is None:
+            self._create_activation(task, coroutine)
+            return
+
+        # a batch works on the items of all its positions
+        batch_positions = [buffered.popleft() for _ in items]
+        merged: Dict[str, Tuple[int, ...]] = {}
+        for positions in batch_positions:
+            for generator_id, generator_positions in positions.items():
+                merged[generator_id] = (
+                    merged.get(generator_id, ()) + generator_positions
+                )
+
+        token = _LOOP_POSITIONS.set(merged)
+        try:
+            self._create_activation(task, coroutine)
+        finally:
+            _LOOP_POSITIONS.reset(token)
+
+        for positions in batch_positions:
+            self._release_loop_positions(positions)
+
+    async def _run_loop_iteration(
+        self,
+        context: "Context",
+        source_task: "Task",
+        task: "Task",
+        items: List[TaskData],
+        window: LoopWindow,
+        index: int,
+    ) -> None:
+        """Run the loop body for the items of a windowed loop edge"""
+        try:
+            data_inputs = await self._task_data_inputs(task, items, source_task.id)
+
+            await task.set_status(context, Status.RUNNING)
+
+            task_output: TaskData
+            if window.policy.is_batched:
+                # batches are sent downstream in place of an output, see
+                # task_did_finish
+                task_output = cast(
+                    TaskData, await self._process_batch(context, task, data_inputs)
+                )
+            else:
+                task_output = await task.process(context, data_inputs[0])
+                if not isinstance(task_output, Mapping):
+                    raise ValueError("data_output must be a mapping")
+
+            await window.wait_turn(index)
+            await self.task_did_finish(context, task, task_output)
+
+            await task.set_status(context, Status.FINISHED)
+        except Exception as e:
+            logger.exception("Exception during task %s iteration %d", task.id, index)
+            self._checkpoint_failure(task)
+            await task.set_status(context, Status.ERROR, error=e)
+        finally:
+            await window.release(index)
+
+    @staticmethod
+    async def _process_batch(
+        context: "Context", task: "Task", data_inputs: List[TaskData]
+    ) -> TaskDataBatch:
+        data_outputs = await task.process_batch(context, data_inputs)
+
+        if len(data_outputs) != len(data_inputs):
+            raise ValueError(
+                f"{len(data_outputs)} outputs for a batch of {len(data_inputs)} inputs"
+            )
+        if not all(isinstance(data_output, Mapping) for data_output in data_outputs):
+            raise ValueError("data_output must be a mapping")
+
+        return TaskDataBatch(data_outputs)
+
     async def get_task_result(self, task_id: str) -> JSONParam:
-        result = await self._result_event_manager.value(task_id)
+        plan_run = self._current_plan_run()
+        index = plan_run.plan.index_of(task_id)
+        if index is None:
+            raise ValueError(f"{task_id} isn't a task of {self.id}")
+
+        result = await plan_run.result(index)
 
         return cast(JSONParam, result)
 
-    async def schedule_task(
+    async def _task_data_input(
         self,
-        context: "Context",
         task: "Task",
         data_input: Optional[Mapping[str, Any]] = None,
-    ):
+        source_task_id: Optional[str] = None,
+    ) -> Mapping[str, Any]:
+        data_inputs = await self._task_data_inputs(
+            task, [data_input if data_input else {}], source_task_id
+        )
 
-        data_input = data_input if data_input else {}
+        return data_inputs[0]
 
-        task_node: TaskNode = self.task_node_map[task.id]
+    async def _task_data_inputs(
+        self,
+        task: "Task",
+        items: List[TaskData],
+        source_task_id: Optional[str] = None,
+    ) -> List[TaskData]:
+        """Merge each item with the results of the other parent tasks, read
+        once for all the items"""
+        plan_run = self._current_plan_run()
+        plan = plan_run.plan
+        index = plan.index_of(task.id)
+
+        if index is None or not plan.in_degree(index):
+            return list(items)
+
+        source_index = (
+            plan.index_of(source_task_id) if source_task_id is not None else None
+        )
 
-        if task_node.parent_nodes:
-            tasks = [
-                self.task_group.create_task(self.get_task_result(parent_edge.from_id))
-                for parent_edge in task_node.parent_nodes
-            ]
+        # the output of the source task is the one it was scheduled with, its
+        # last result may already belong to another iteration; the other
+        # results are all needed, waiting for them in turn costs no more than
+        # gathering them
+        parent_results: Dict[int, Any] = {}
+        for parent, _ in plan.parents(index):
+            if parent != source_index and parent not in parent_results:
+                parent_results[parent] = await plan_run.result(parent)
+
+        merge_data_in = task.__class__.merge_data_in
+
+        return [
+            merge_data_in(
+                data_input,
+                *(
+                    data_input if parent == source_index else parent_results[parent]
+                    for parent, _ in plan.parents(index)
+                ),
+            )
+            for data_input in items
+        ]
 
-            await asyncio.gather(*tasks)
+    async def schedule_task(
+        self,
+        context: "Context",
+        task: "Task",
+        data_input: Optional[Mapping[str, Any]] = None,
+        source_task_id: Optional[str] = None,
+    ):
+        mode = task.process_mode
 
-            results = [item.result() for item in tasks]
+        if isinstance(data_input, TaskDataBatch):
+            # the outputs of a batched activation are processed together
+            if mode != ProcessMode.NORMAL:
+                raise ValueError(f"{task.id} generator can't process a batch")
 
-            data_input = task_node.task.__class__.merge_data_in(data_input, *results)
+            data_inputs = await self._task_data_inputs(task, data_input, source_task_id)
+        else:
+            data_input = await self._task_data_input(task, data_input, source_task_id)
 
         await task.set_status(context, Status.RUNNING)
 
-        mode = task.process_mode
+        # tasks running once per run are checkpointed, not the loop bodies
+        checkpoint = self._checkpoint if task.id not in self._loop_bodies else None
 
         if mode == ProcessMode.NORMAL:
             try:
-                data_output = await task.process(context, data_input)
-                if not isinstance(data_output, Mapping):
-                    raise ValueError("data_output must be a mapping")
+                restored = (
+                    checkpoint.output(task.id) if checkpoint is not None else None
+                )
+
+                if restored is not None:
+                    data_output = restored
+                elif isinstance(data_input, TaskDataBatch):
+                    data_output = await self._process_batch(context, task, data_inputs)
+                else:
+                    data_output = await task.process(context, data_input)
+                    if not isinstance(data_output, Mapping):
+                        raise ValueError("data_output must be a mapping")
+
+                if checkpoint is not None and restored is None:
+                    await checkpoint.task_finished(task.id, data_output)
                 await self.task_did_finish(context, task, data_output)
 
             except Exception as e:
                 logger.exception("Exception during task %s processing %s", task.id, e)
+                self._checkpoint_failure(task)
                 await task.set_status(context, Status.ERROR, error=e)
 
         elif mode == ProcessMode.GENERATOR:
@@ -503,16 +980,38 @@ class TaskDAG(GraphElementWithParameters, EventSenderObject):
 
             data_output_iter = await task.generator_process(context, data_input)
 
+            windows = self._open_loop_windows(context, task)
+            self._loop_windows[task.id] = windows
+
+            # items processed before the checkpoint are skipped on resume
+            skipped = 0
+            if checkpoint is not None:
+                skipped = checkpoint.position(task.id)
+                self._loop_progress[task.id] = LoopProgress(skipped)
+            position = 0
+
             async for data_output_value in data_output_iter:
-                await self.task_did_finish(
-                    context, task, data_output_value, edge_kind=TaskEdgeKind.DEFAULT
-                )
+                position += 1
+                if position <= skipped:
+                    continue
+
+                with self._loop_item(task.id, position):
+                    await self.task_did_finish(
+                        context, task, data_output_value, edge_kind=TaskEdgeKind.DEFAULT
+                    )
+                await self._checkpoint_positions(frozenset({task.id}))
+
+            for window in windows.values():
+                await window.close()
 
             # we ensure all tasks launched as part of LOOP are finished at that point
             await self._lock_edges_after(
                 task, for_mode=TaskEdgeKind.DEFAULT, release=True
             )
 
+            if checkpoint is not None:
+                await self._checkpoint_positions(frozenset({task.id}), force=True)
+
             loop_start_data_input = await task.generator_process_after(
                 context, data_input
             )
@@ -526,14 +1025,11 @@ class TaskDAG(GraphElementWithParameters, EventSenderObject):
 
         await task.set_status(context, Status.FINISHED)
 
-        if task_node.parent_nodes:
-
-            tasks_before = [
-                self.task_node_map[parent_edge.from_id].task
-                for parent_edge in task_node.parent_nodes
-            ]
-            for task_before in tasks_before:
-                await self.__release_edge_lock(task_before, task)
+        plan_run = self._current_plan_run()
+        index = plan_run.plan.index_of(task.id)
+        if index is not None:
+            for _, slot in plan_run.plan.parents(index):
+                plan_run.release_edge(slot)
 
     def as_graph(self) -> "pydot.Dot":
         import pydot
@@ -620,48 +1116,13 @@ class TaskDAG(GraphElementWithParameters, EventSenderObject):
         return params_dict
 
     def get_required_inputs(self) -> TaskDataContract:
-        leaf_tasks = self.get_leaf_tasks()
-
-        full_contract = TaskDataContract()
-        for task in leaf_tasks:
-            full_contract.add_all(self._required_inputs_for_task(task))
-
-        return full_contract
+        return self.contract_analysis.dag_required_inputs()
 
     def _provided_outputs_for_task(self, task: "Task") -> TaskDataContract:
-        parent_task_nodes = self.task_node_map[task.id].parent_nodes
-
-        if not parent_task_nodes:
-            return task.provided_outputs()
-
-        parents_task_data_contract = TaskDataContract()
-        for parent_node in parent_task_nodes:
-            parent_task = self.task_node_map[parent_node.from_id].task
-            parents_task_data_contract.add_all(
-                self._provided_outputs_for_task(parent_task)
-            )
-
-        return task.provided_outputs(parents_task_data_contract)
+        return self.contract_analysis.provided_outputs(task.id)
 
     def _required_inputs_for_task(self, task: "Task") -> TaskDataContract:
-
-        contract = task.required_inputs()
-
-        parent_task_nodes = self.task_node_map[task.id].parent_nodes
-
-        for parent_node in parent_task_nodes:
-            parent_task = self.task_node_map[parent_node.from_id].task
-
-            provided_output_for_parent_tasks = self._provided_outputs_for_task(
-                parent_task
-            )
-            contract.subtract_all(provided_output_for_parent_tasks)
-
-            required_input_for_task = self._required_inputs_for_task(parent_task)
-
-            contract.add_all(required_input_for_task)
-
-        return contract
+        return self.contract_analysis.required_inputs(task.id)
 
     def get_required_inputs_old(self) -> TaskDataContract:
         contract = TaskDataContract()
@@ -692,8 +1153,8 @@ class TaskDAG(GraphElementWithParameters, EventSenderObject):
         from core.tasks.types import Status
 
         if value == Status.RUNNING:
-            self._edge_lock_map.clear()
-            self._edge_lock_map_lock = asyncio.Lock()
+            self._plan_run = PlanRun(self.execution_plan)
+            self._loop_windows.clear()
 
         await context.event(
             self,
@@ -703,6 +1164,13 @@ class TaskDAG(GraphElementWithParameters, EventSenderObject):
 
         super().set_status(context, value, error=error, **kwargs)
 
+        if self._job_id:
+            from core.context.global_context import GlobalContext
+
+            GlobalContext.get_instance().dag_manager.job_status_changed(
+                self.id, value, error
+            )
+
     async def reset_task_status(self, context: "Context"):
         for node in self.task_node_map.values():
             await node.task.set_status(context, Status.IDLE, send_value=False)
@@ -1,5 +1,6 @@
-from typing import TYPE_CHECKING, Optional, List, Mapping, Any
+from typing import TYPE_CHECKING, Optional, List, Mapping, Any, Dict
 
+from core.tasks.loop_policy import LoopPolicy
 from core.tasks.types import TaskEdgeKind, ProcessMode
 from core.utils import deserialize_instance
 
@@ -10,28 +11,50 @@ if TYPE_CHECKING:
 
 class TaskEdge:
     def __init__(
-        self, from_id: str, to_id: str, edge_type: TaskEdgeKind = TaskEdgeKind.DEFAULT
+        self,
+        from_id: str,
+        to_id: str,
+        edge_type: TaskEdgeKind = TaskEdgeKind.DEFAULT,
+        loop_policy: Optional[LoopPolicy] = None,
     ):
         self._from_id = from_id
         self._to_id = to_id
         self._type = edge_type
+        self._loop_policy = loop_policy
 
     def serialize(self) -> Mapping[str, Any]:
-        return {"from_id": self._from_id, "to_id": self._to_id, "type": self._type.name}
+        data: Dict[str, Any] = {
+            "from_id": self._from_id,
+            "to_id": self._to_id,
+            "type": self._type.name,
+        }
+        if self._loop_policy is not None:
+            data["loop_policy"] = self._loop_policy.serialize()
+
+        return data
 
     @classmethod
     def deserialize(cls, data: Mapping[str, Any]) -> "TaskEdge":
         from_id = data["from_id"]
         to_id = data["to_id"]
         edge_type = data["type"]
+        loop_policy = data.get("loop_policy")
 
-        return TaskEdge(from_id, to_id, getattr(TaskEdgeKind, edge_type))
+        return TaskEdge(
+            from_id,
+            to_id,
+            getattr(TaskEdgeKind, edge_type),
+            LoopPolicy.deserialize(loop_policy) if loop_policy else None,
+        )
 
     def __str__(self) -> str:
         return f"{self._from_id} -> {self._to_id} ({self._type})"
 
     def clone(self) -> "TaskEdge":
-        return TaskEdge(self._from_id, self._to_id, self._type)
+        return TaskEdge(self._from_id, self._to_id, self._type, self._loop_policy)
+
+    def with_loop_policy(self, loop_policy: Optional[LoopPolicy]) -> "TaskEdge":
+        return TaskEdge(self._from_id, self._to_id, self._type, loop_policy)
 
     @property
     def from_id(self) -> str:
@@ -45,6 +68,10 @@ class TaskEdge:
     def type(self) -> TaskEdgeKind:
         return self._type
 
+    @property
+    def loop_policy(self) -> Optional[LoopPolicy]:
+        return self._loop_policy
+
     def as_json(self) -> List[str]:
         return [self._from_id, self._to_id, self._type.name]
 
@@ -11,6 +11,10 @@ TaskData = Mapping[str, Any]
 TaskDataAsyncIterator = AsyncIterator[TaskData]
 
 
+class TaskDataBatch(List[TaskData]):
+    """Outputs of a batched task activation, sent downstream together"""
+
+
 class Status(Enum):
     IDLE = 0
     WAITING = 1
@@ -33,3 +37,9 @@ class ProcessMode(Enum):
     UNKNOWN = 0
     NORMAL = 1
     GENERATOR = 2
+
+
+class ExecutionMode(Enum):
+    LOOP = "loop"
+    THREAD = "thread"
+    PROCESS = "process"
@@ -67,6 +67,26 @@ def create_app():
     global_context = GlobalContext.get_instance()
     global_context.set_scheduler(scheduler)
 
+    from applications.llama_index.models.li_llm_llamacpp import (
+        preload_llamacpp_models,
+    )
+
+    threading.Thread(
+        target=preload_llamacpp_models,
+        args=(global_context,),
+        name="llamacpp-preload",
+        daemon=True,
+    ).start()
+
+    from applications.huggingface.pipeline_registry import preload_pipelines
+
+    threading.Thread(
+        target=preload_pipelines,
+        args=(global_context,),
+        name="transformers-preload",
+        daemon=True,
+    ).start()
+
     story_dag()
     return app
 
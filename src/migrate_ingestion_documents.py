@@ -0,0 +1,41 @@
+"""Move the ingested documents out of the Ingestion documents
+
+    python migrate_ingestion_documents.py --collection ingestion3 --collection ingestion
+"""
+
+import argparse
+
+from core.context.global_context import GlobalContext
+from misc.asyncio import run_managed
+from models.ingestion_documents import (
+    INGESTION_DOCUMENTS_COLLECTION,
+    migrate_ingestion_documents,
+)
+
+
+async def main(args: argparse.Namespace) -> None:
+    global_context = GlobalContext.get_instance()
+
+    for collection in args.collection:
+        migrated_count = await migrate_ingestion_documents(
+            global_context,
+            db_link=args.db_link,
+            database=args.database,
+            collection=collection,
+            documents_collection=args.documents_collection,
+        )
+        print(f"{collection}: {migrated_count} documents migrated")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--db-link", default="mongodb")
+    parser.add_argument("--database", default="pinceau6")
+    parser.add_argument("--collection", action="append", default=None)
+    parser.add_argument(
+        "--documents-collection", default=INGESTION_DOCUMENTS_COLLECTION
+    )
+    parsed_args = parser.parse_args()
+    parsed_args.collection = parsed_args.collection or ["ingestion3"]
+
+    run_managed(main(parsed_args))
@@ -1,14 +1,27 @@
+import asyncio
 import itertools
 import logging
 import time
+from contextlib import aclosing
 from datetime import datetime, timedelta
-from typing import Generator, Tuple, Optional, Iterator
-from urllib.parse import urlencode
+from typing import (
+    AsyncGenerator,
+    AsyncIterator,
+    Generator,
+    List,
+    Tuple,
+    Optional,
+    Iterator,
+)
+from urllib.parse import urlencode, urlparse
 
+import aiohttp
 import feedparser
 import requests
 from arxiv import Result, Search, _classname, HTTPError, UnexpectedEmptyPageError
 
+from misc.rate_limiter import TokenBucket, shared_token_bucket
+
 logger = logging.getLogger(__name__)
 
 
@@ -206,3 +219,233 @@ class Client(object):
             )
 
         return feed
+
+
+class ArxivPage:
+    """A parsed page of results"""
+
+    def __init__(self, results: List[Result], total_results: int, entry_count: int):
+        self.results = results
+        self.total_results = total_results
+        # entries, including the partial ones which were skipped
+        self.entry_count = entry_count
+
+
+class AsyncClient:
+    """
+    Asyncio counterpart of `Client`.
+
+    Requests go through a token bucket shared by every client of the same
+    API host, the next page is fetched and parsed while the current one is
+    consumed, failing requests are retried with a bounded exponential backoff.
+    """
+
+    query_url_format = "http://export.arxiv.org/api/query?{}"
+
+    def __init__(
+        self,
+        page_size: int = 100,
+        delay_seconds: float = 3.0,
+        num_retries: int = 3,
+        *,
+        prefetch: bool = True,
+        backoff_seconds: float = 1.0,
+        max_backoff_seconds: float = 30.0,
+        request_timeout: float = 60.0,
+        rate_limiter: Optional[TokenBucket] = None,
+        query_url_format: Optional[str] = None,
+    ):
+        """
+        Args:
+            page_size: maximum number of results fetched in a single request
+            delay_seconds: seconds between two requests to the API host
+            num_retries: retries of a failing request before raising
+            prefetch: fetch the next page while the current one is consumed
+            backoff_seconds: delay before the first retry, doubled every retry
+            max_backoff_seconds: upper bound of the retry delay
+            request_timeout: total timeout of a request, in seconds
+            rate_limiter: the request rate limiter, shared by API host if None
+            query_url_format: the query API endpoint format
+        """
+        self.page_size = page_size
+        self.delay_seconds = delay_seconds
+        self.num_retries = num_retries
+        self.prefetch = prefetch
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.request_timeout = request_timeout
+
+        if query_url_format:
+            self.query_url_format = query_url_format
+
+        self._rate_limiter = rate_limiter or shared_token_bucket(
+            urlparse(self.query_url_format).netloc, 1.0 / delay_seconds
+        )
+
+    def __repr__(self) -> str:
+        return "{}(page_size={}, delay_seconds={}, num_retries={})".format(
+            _classname(self),
+            repr(self.page_size),
+            repr(self.delay_seconds),
+            repr(self.num_retries),
+        )
+
+    async def results(
+        self, search: Search, offset: int = 0
+    ) -> AsyncIterator[Tuple[Optional[Result], int, int]]:
+        """
+        Fetch the search results page by page, yielding the parsed `Result`s
+        with their index and the total result count, like `Client.results`.
+
+        If all tries fail, raises an `UnexpectedEmptyPageError` or `HTTPError`.
+        """
+        limit = search.max_results - offset if search.max_results else None
+        if limit is not None and limit < 0:
+            yield None, 0, 0
+            return
+
+        timeout = aiohttp.ClientTimeout(total=self.request_timeout)
+        async with aiohttp.ClientSession(
+            headers={"user-agent": "arxiv.py/2.1.0"}, timeout=timeout
+        ) as session:
+            yielded = 0
+            async with aclosing(self._results(session, search, offset)) as results:
+                async for item in results:
+                    if limit is not None and yielded >= limit:
+                        break
+                    yield item
+                    yielded += 1
+
+    async def _results(
+        self, session, search: Search, offset: int
+    ) -> AsyncGenerator[Tuple[Optional[Result], int, int], None]:
+        page = await self._fetch_page(
+            session, self._format_url(search, offset, self.page_size), True
+        )
+        if not page.entry_count:
+            logger.info("Got empty first page; stopping generation")
+            yield None, 0, 0
+            return
+
+        total_results = page.total_results
+        logger.info(
+            "Got first page: %d of %d total results", page.entry_count, total_results
+        )
+
+        next_page: Optional[asyncio.Future] = None
+        result_index = -1
+        try:
+            while True:
+                offset += page.entry_count
+                next_url = (
+                    self._format_url(search, offset, self.page_size)
+                    if offset < total_results
+                    else None
+                )
+
+                if next_url and self.prefetch:
+                    next_page = asyncio.ensure_future(
+                        self._fetch_page(session, next_url, False)
+                    )
+
+                for result in page.results:
+                    result_index += 1
+                    yield result, result_index, total_results
+
+                if not next_url:
+                    break
+
+                if next_page is not None:
+                    page = await next_page
+                    next_page = None
+                else:
+                    page = await self._fetch_page(session, next_url, False)
+
+                if not page.entry_count:
+                    break
+        finally:
+            # the consumer stopped before the prefetched page was used
+            if next_page is not None:
+                if next_page.done() and not next_page.cancelled():
+                    next_page.exception()
+                next_page.cancel()
+
+    def _format_url(self, search: Search, start: int, page_size: int) -> str:
+        url_args = search._url_args()
+        url_args.update(
+            {
+                "start": start,
+                "max_results": page_size,
+            }
+        )
+        return self.query_url_format.format(urlencode(url_args))
+
+    async def _fetch_page(self, session, url: str, first_page: bool) -> ArxivPage:
+        try_index = 0
+        while True:
+            try:
+                return await self._try_fetch_page(session, url, first_page, try_index)
+            except (
+                HTTPError,
+                UnexpectedEmptyPageError,
+                aiohttp.ClientError,
+                asyncio.TimeoutError,
+            ) as err:
+                if try_index >= self.num_retries:
+                    logger.debug("Giving up (try %d): %s", try_index, err)
+                    raise
+
+                backoff = min(
+                    self.max_backoff_seconds, self.backoff_seconds * 2**try_index
+                )
+                logger.debug(
+                    "Got error (try %d), retrying in %.1fs: %s",
+                    try_index,
+                    backoff,
+                    err,
+                )
+                await asyncio.sleep(backoff)
+                try_index += 1
+
+    async def _try_fetch_page(
+        self, session, url: str, first_page: bool, try_index: int
+    ) -> ArxivPage:
+        await self._rate_limiter.acquire()
+
+        logger.info(
+            "Requesting page (first: %r, try: %d): %s", first_page, try_index, url
+        )
+
+        async with session.get(url) as resp:
+            if resp.status != 200:
+                raise HTTPError(url, try_index, resp.status)
+            content = await resp.read()
+
+        # parsing a page of 2000 entries takes a while, keep it off the loop
+        feed, page = await asyncio.to_thread(self._parse_page, content)
+
+        if not page.entry_count and not first_page:
+            raise UnexpectedEmptyPageError(url, try_index, feed)
+
+        return page
+
+    @staticmethod
+    def _parse_page(content: bytes) -> Tuple[feedparser.FeedParserDict, ArxivPage]:
+        feed = feedparser.parse(content)
+
+        if feed.bozo:
+            logger.warning(
+                "Bozo feed; consider handling: %s",
+                feed.bozo_exception if "bozo_exception" in feed else None,
+            )
+
+        results = []
+        for entry in feed.entries:
+            try:
+                results.append(Result._from_feed_entry(entry))
+            except Result.MissingFieldError as e:
+                logger.warning("Skipping partial result: %s", e)
+
+        total_results = int(feed.feed.get("opensearch_totalresults", 0))
+
+        return feed, ArxivPage(results, total_results, len(feed.entries))
@@ -1,4 +1,20 @@
 import asyncio
+import logging
+import threading
+import weakref
+from typing import Any, Awaitable, Callable, Coroutine, List, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+ShutdownCallback = Callable[[], Awaitable[None]]
+
+# callbacks awaited when a managed event loop shuts down, by loop
+_shutdown_callbacks: (
+    "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, List[ShutdownCallback]]"
+) = weakref.WeakKeyDictionary()
+_shutdown_lock = threading.Lock()
 
 
 def async_to_sync(awaitable):
@@ -12,3 +28,67 @@ def async_to_sync(awaitable):
             raise e
 
     return loop.run_until_complete(awaitable)
+
+
+def manage_loop(loop: asyncio.AbstractEventLoop) -> None:
+    """Declare an event loop as managed, its owner awaits shutdown_loop()
+    on it before closing it"""
+    with _shutdown_lock:
+        _shutdown_callbacks.setdefault(loop, [])
+
+
+def is_managed_loop(loop: asyncio.AbstractEventLoop) -> bool:
+    with _shutdown_lock:
+        return loop in _shutdown_callbacks
+
+
+def on_loop_shutdown(callback: ShutdownCallback) -> None:
+    """Await a callback on the running event loop when it shuts down
+
+    Used to release resources bound to a loop. Only the managed loops
+    support it: the DAG runtime loops and the loops of run_managed().
+
+    Args:
+        callback: coroutine function releasing the resources
+
+    Raises:
+        RuntimeError: when the running loop isn't managed
+    """
+    loop = asyncio.get_running_loop()
+
+    with _shutdown_lock:
+        callbacks = _shutdown_callbacks.get(loop)
+        if callbacks is None:
+            raise RuntimeError(
+                "Loop bound resources are only served on the DAG runtime loops "
+                "and the loops of run_managed()"
+            )
+        callbacks.append(callback)
+
+
+async def shutdown_loop() -> None:
+    """Await the shutdown callbacks of the running managed loop"""
+    loop = asyncio.get_running_loop()
+
+    with _shutdown_lock:
+        callbacks = _shutdown_callbacks.pop(loop, [])
+
+    for callback in callbacks:
+        try:
+            await callback()
+        except Exception:
+            logger.exception("Unable to release the resources of an event loop")
+
+
+def run_managed(coroutine: Coroutine[Any, Any, T], debug: bool = False) -> T:
+    """asyncio.run() on a managed loop, the resources bound to the loop are
+    released before it closes"""
+
+    async def main() -> T:
+        manage_loop(asyncio.get_running_loop())
+        try:
+            return await coroutine
+        finally:
+            await shutdown_loop()
+
+    return asyncio.run(main(), debug=debug)
@@ -1,4 +1,15 @@
-from typing import Tuple, Optional, TYPE_CHECKING, Type, Dict, Mapping, cast, Any
+import sys
+from typing import (
+    Tuple,
+    Optional,
+    TYPE_CHECKING,
+    Type,
+    Dict,
+    Mapping,
+    Set,
+    cast,
+    Any,
+)
 
 from pydantic import BaseModel, create_model
 from pydantic.fields import FieldInfo
@@ -52,6 +63,41 @@ def construct_full_dag_id(
     return dag_id if not job_id else f"{dag_id}:{job_id}"
 
 
+def deep_getsizeof(value: Any, seen: Optional[Set[int]] = None) -> int:
+    """Approximate the memory retained by a value and what it references
+
+    Args:
+        value: the value to measure
+        seen: ids of the objects already counted
+
+    Returns:
+        int: approximate size in bytes
+    """
+    if seen is None:
+        seen = set()
+
+    value_id = id(value)
+    if value_id in seen:
+        return 0
+    seen.add(value_id)
+
+    size = sys.getsizeof(value, 0)
+
+    if isinstance(value, (str, bytes, bytearray, int, float, bool)) or value is None:
+        return size
+
+    if isinstance(value, Mapping):
+        for key, item in value.items():
+            size += deep_getsizeof(key, seen) + deep_getsizeof(item, seen)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        for item in value:
+            size += deep_getsizeof(item, seen)
+    elif isinstance(value, BaseModel):
+        size += deep_getsizeof(value.__dict__, seen)
+
+    return size
+
+
 class DagChatAdaptation:
     def __init__(
         self, input_key: str, input_type: str, output_key: str, output_type: str
@@ -2,6 +2,21 @@ from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from core.context.context import Context
+    from core.context.global_context import GlobalContext
+
+
+def _global_context(context: "Context") -> "GlobalContext":
+    from core.context.global_context import GlobalContext
+    from core.context.composite_context import CompositeContext
+
+    if isinstance(context, GlobalContext):
+        return context
+    elif isinstance(context, CompositeContext):
+        return context.cast_as(GlobalContext)
+
+    raise ValueError(
+        f"mongo_collection, bad context parameter, use an instance of GlobalContext or CompositeContext, {type(context)} given"
+    )
 
 
 def mongodb_database(context: "Context", db_link: str, db_name: str):
@@ -16,19 +31,7 @@ def mongodb_database(context: "Context", db_link: str, db_name: str):
     Returns:
 
     """
-    from core.context.global_context import GlobalContext
-    from core.context.composite_context import CompositeContext
-
-    if isinstance(context, GlobalContext):
-        global_context = context
-    elif isinstance(context, CompositeContext):
-        global_context = context.cast_as(GlobalContext)
-    else:
-        raise ValueError(
-            f"mongo_collection, bad context parameter, use an instance of GlobalContext or CompositeContext, {type(context)} given"
-        )
-
-    dbms = global_context.dbms[db_link]
+    dbms = _global_context(context).dbms[db_link]
     return dbms[db_name]
 
 
@@ -49,3 +52,43 @@ def mongodb_collection(
     """
     mongo_database = mongodb_database(context, db_link, db_name)
     return mongo_database[collection_name]
+
+
+def async_mongodb_database(context: "Context", db_link: str, db_name: str):
+    """
+    Helper function to get a motor database from the context, bound to the
+    running event loop
+
+    Args:
+        context:
+        db_link:
+        db_name:
+
+    Returns:
+
+    """
+    dbms = _global_context(context).dbms.get_async(db_link)
+    if dbms is None:
+        raise ValueError(f"No asyncio client for db link {db_link}")
+
+    return dbms[db_name]
+
+
+def async_mongodb_collection(
+    context: "Context", db_link: str, db_name: str, collection_name: str
+):
+    """
+    Helper function to get a motor collection from the context, bound to the
+    running event loop
+
+    Args:
+        context:
+        db_link:
+        db_name:
+        collection_name:
+
+    Returns:
+
+    """
+    mongo_database = async_mongodb_database(context, db_link, db_name)
+    return mongo_database[collection_name]
@@ -0,0 +1,80 @@
+import asyncio
+import threading
+import time
+from typing import Dict
+
+
+class TokenBucket:
+    """Thread safe token bucket, usable from any event loop
+
+    Tokens are reserved under a thread lock and the caller sleeps until its
+    reservation is due, so concurrent callers of several threads and event
+    loops share the same rate.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0) -> None:
+        """
+        Args:
+            rate: tokens added per second
+            capacity: max tokens accumulated while idle, the allowed burst
+        """
+        if rate <= 0:
+            raise ValueError("rate must be > 0")
+
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self) -> float:
+        return self._rate
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """Take tokens, possibly borrowing on the next refills
+
+        Returns:
+            float: seconds to wait before the tokens may be used
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self._capacity, self._tokens + (now - self._updated_at) * self._rate
+            )
+            self._updated_at = now
+
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+
+            return -self._tokens / self._rate
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        delay = self.reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+_shared_buckets: Dict[str, TokenBucket] = {}
+_shared_buckets_lock = threading.Lock()
+
+
+def shared_token_bucket(key: str, rate: float, capacity: float = 1.0) -> TokenBucket:
+    """Process-wide token bucket of a remote service
+
+    Args:
+        key: the service, for example the API host
+        rate: tokens per second, used when the bucket is created
+        capacity: max burst, used when the bucket is created
+
+    Returns:
+        TokenBucket: the bucket shared by every client of the service
+    """
+    with _shared_buckets_lock:
+        bucket = _shared_buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(rate, capacity)
+            _shared_buckets[key] = bucket
+
+        return bucket
@@ -1,5 +1,6 @@
 import datetime
 import json
+from enum import Enum
 from typing import ClassVar, Dict, Any, Optional, Mapping
 
 from pydantic import BaseModel
@@ -8,8 +9,18 @@ from core.models.a_model import AModel
 from core.models.types import ModelUsageMode
 
 
+class IngestionStatus(str, Enum):
+    INGESTED = "ingested"
+    FAILED = "failed"
+
+
 class IngestedDocument(BaseModel):
     date: datetime.datetime
+    status: IngestionStatus = IngestionStatus.INGESTED
+
+    def is_ingested(self, date: datetime.datetime) -> bool:
+        """True if the document was ingested in its ``date`` version"""
+        return self.status == IngestionStatus.INGESTED and self.date == date
 
 
 class Ingestion(AModel):
@@ -19,14 +30,15 @@ class Ingestion(AModel):
     data: Dict[str, Any]
     pipeline: str
 
-    documents: Dict[str, IngestedDocument] = {}
     first_ingestion_date: datetime.datetime
     last_ingestion_run_date: datetime.datetime
     last_ingestion_finish_date: Optional[datetime.datetime] = None
 
     def as_dict(self, **kwargs) -> Mapping[str, Any]:
         return {
-            **self.model_dump(mode="json", by_alias=True),
+            # documents are tracked in their own collection, don't rewrite the
+            # legacy dict of a not yet migrated ingestion
+            **self.model_dump(mode="json", by_alias=True, exclude={"documents"}),
             "_meta": {"label": self.meta_label},
         }
 
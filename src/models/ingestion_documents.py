@@ -0,0 +1,191 @@
+import datetime
+import logging
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Mapping
+
+from pymongo import ASCENDING, UpdateOne
+
+from misc.mongodb_helper import async_mongodb_collection
+from models.ingestion import IngestedDocument, IngestionStatus
+
+if TYPE_CHECKING:
+    from core.context.context import Context
+
+logger = logging.getLogger(__name__)
+
+INGESTION_DOCUMENTS_COLLECTION = "ingestion_documents"
+
+
+class IngestionDocumentStore:
+    """Ingested documents of the ingestions, one row per document
+
+    Rows are ``{ingestion_id, document_id, date, status, updated_at}``,
+    unique on (ingestion_id, document_id). Built on motor, use it from the
+    event loop it was created on.
+    """
+
+    def __init__(self, collection) -> None:
+        self._collection = collection
+        self._indexes_ready = False
+
+    @classmethod
+    def from_default(
+        cls,
+        context: "Context",
+        *,
+        db_link: str = "mongodb",
+        database: str = "pinceau6",
+        collection: str = INGESTION_DOCUMENTS_COLLECTION,
+    ) -> "IngestionDocumentStore":
+        return cls(async_mongodb_collection(context, db_link, database, collection))
+
+    async def ensure_indexes(self) -> None:
+        if self._indexes_ready:
+            return
+
+        await self._collection.create_index(
+            [("ingestion_id", ASCENDING), ("document_id", ASCENDING)],
+            name="ingestion_document",
+            unique=True,
+        )
+        self._indexes_ready = True
+
+    @staticmethod
+    def _row(
+        ingestion_id: str, document_id: str, document: IngestedDocument
+    ) -> Dict[str, Any]:
+        # dates are kept as the json iso strings, aware datetimes would be
+        # loaded back naive
+        return {
+            "ingestion_id": ingestion_id,
+            "document_id": document_id,
+            **document.model_dump(mode="json"),
+            "updated_at": datetime.datetime.now(),
+        }
+
+    async def count(
+        self, ingestion_id: str, status: IngestionStatus = IngestionStatus.INGESTED
+    ) -> int:
+        return await self._collection.count_documents(
+            {"ingestion_id": ingestion_id, "status": status.value}
+        )
+
+    async def fetch(
+        self, ingestion_id: str, document_ids: Iterable[str]
+    ) -> Dict[str, IngestedDocument]:
+        """Get the tracked documents of a page of results, in one query
+
+        Args:
+            ingestion_id: the ingestion
+            document_ids: ids of the documents to check
+
+        Returns:
+            Dict[str, IngestedDocument]: tracked documents by id, unknown ones
+                are missing
+        """
+        document_ids = list(document_ids)
+        if not document_ids:
+            return {}
+
+        cursor = self._collection.find(
+            {"ingestion_id": ingestion_id, "document_id": {"$in": document_ids}},
+            {"_id": False, "document_id": True, "date": True, "status": True},
+        )
+
+        return {
+            row["document_id"]: IngestedDocument(date=row["date"], status=row["status"])
+            async for row in cursor
+        }
+
+    async def upsert(
+        self, ingestion_id: str, documents: Mapping[str, IngestedDocument]
+    ) -> None:
+        """Insert or update the status of documents, in one bulk write
+
+        Args:
+            ingestion_id: the ingestion
+            documents: the documents by id
+        """
+        if not documents:
+            return
+
+        await self.ensure_indexes()
+
+        await self._collection.bulk_write(
+            [
+                UpdateOne(
+                    {"ingestion_id": ingestion_id, "document_id": document_id},
+                    {"$set": self._row(ingestion_id, document_id, document)},
+                    upsert=True,
+                )
+                for document_id, document in documents.items()
+            ],
+            ordered=False,
+        )
+
+
+async def migrate_ingestion_documents(
+    context: "Context",
+    *,
+    db_link: str = "mongodb",
+    database: str = "pinceau6",
+    collection: str = "ingestion3",
+    documents_collection: str = INGESTION_DOCUMENTS_COLLECTION,
+    batch_size: int = 1000,
+) -> int:
+    """Move the ``documents`` dict of the Ingestion documents to their own
+    collection
+
+    Ingestions are migrated one by one, the dict is removed once its rows are
+    written, running it again resumes an interrupted migration.
+
+    Args:
+        context: the running context
+        db_link: the mongodb link
+        database: the database
+        collection: the collection of the Ingestion documents
+        documents_collection: the collection of the ingested documents rows
+        batch_size: rows per bulk write
+
+    Returns:
+        int: number of migrated documents
+    """
+    ingestion_collection = async_mongodb_collection(
+        context, db_link, database, collection
+    )
+    store = IngestionDocumentStore.from_default(
+        context,
+        db_link=db_link,
+        database=database,
+        collection=documents_collection,
+    )
+    await store.ensure_indexes()
+
+    migrated_count = 0
+    cursor = ingestion_collection.find(
+        {"documents": {"$exists": True}}, {"documents": True}
+    )
+
+    async for ingestion in cursor:
+        ingestion_id = str(ingestion["_id"])
+        documents = ingestion.get("documents") or {}
+
+        batch: Dict[str, IngestedDocument] = {}
+        for document_id, document in documents.items():
+            batch[document_id] = IngestedDocument(**document)
+
+            if len(batch) >= batch_size:
+                await store.upsert(ingestion_id, batch)
+                batch = {}
+
+        await store.upsert(ingestion_id, batch)
+
+        await ingestion_collection.update_one(
+            {"_id": ingestion["_id"]}, {"$unset": {"documents": ""}}
+        )
+
+        logger.info(
+            "Migrated %d documents of ingestion %s", len(documents), ingestion_id
+        )
+        migrated_count += len(documents)
+
+    return migrated_count
@@ -1,16 +1,19 @@
 import copy
-from typing import TYPE_CHECKING, Mapping, Any, Optional, Type, Dict, cast
+import logging
+from typing import TYPE_CHECKING, Mapping, Any, Optional, Type, Dict, List, Tuple, cast
 
 from pydantic import BaseModel, create_model, Field
 
 from core.context.composite_context import CompositeContext
 from core.tasks.task import Task
-from misc.mongodb_helper import mongodb_collection
+from misc.mongodb_helper import async_mongodb_collection
 
 if TYPE_CHECKING:
     from core.context.context import Context
     from core.tasks.task_data import TaskDataContract
 
+logger = logging.getLogger(__name__)
+
 
 class AgentMongoDBUpsert(Task):
 
@@ -51,6 +54,18 @@ class AgentMongoDBUpsert(Task):
 
         return TaskDataContract(self.process_input_model().model_fields)
 
+    def _params_object(
+        self, data_input: Mapping[str, Any]
+    ) -> "AgentMongoDBUpsert.Parameters":
+        params_object = cast(
+            AgentMongoDBUpsert.Parameters, self.merge_params(data_input)
+        )
+
+        if not params_object.database or not params_object.collection:
+            raise ValueError("Missing database and/or collection")
+
+        return params_object
+
     async def _process(
         self, context: "Context", data_input: Mapping[str, Any]
     ) -> Mapping[str, Any]:
@@ -60,25 +75,68 @@ class AgentMongoDBUpsert(Task):
             )
 
         input_model_object = self.input_object(data_input)
-        params_object = cast(
-            AgentMongoDBUpsert.Parameters, self.merge_params(data_input)
-        )
+        params_object = self._params_object(data_input)
 
-        if not params_object.database or not params_object.collection:
-            raise ValueError("Missing database and/or collection")
-
-        collection = mongodb_collection(
+        collection = async_mongodb_collection(
             context,
             params_object.db_link,
-            params_object.database,
-            params_object.collection,
+            cast(str, params_object.database),
+            cast(str, params_object.collection),
         )
 
         success = False
         try:
-            collection.insert_one(input_model_object.data)
+            await collection.insert_one(input_model_object.data)
             success = True
         except Exception as e:
             print(e)
 
         return {**data_input, "success": success}
+
+    async def _process_batch(
+        self, context: "Context", data_in_list: List[Mapping[str, Any]]
+    ) -> List[Mapping[str, Any]]:
+        """Insert the documents of a batch with one insert_many per collection"""
+        if not isinstance(context, CompositeContext):
+            raise ValueError(
+                f"{self.__class__.__name__} context should be a CompositeContext"
+            )
+
+        collections: Dict[Tuple[str, str, str], List[int]] = {}
+        for index, data_input in enumerate(data_in_list):
+            params_object = self._params_object(data_input)
+            key = (
+                params_object.db_link,
+                cast(str, params_object.database),
+                cast(str, params_object.collection),
+            )
+            collections.setdefault(key, []).append(index)
+
+        success = [True] * len(data_in_list)
+        for (db_link, database, collection_name), indexes in collections.items():
+            collection = async_mongodb_collection(
+                context, db_link, database, collection_name
+            )
+
+            try:
+                await collection.insert_many(
+                    [self.input_object(data_in_list[i]).data for i in indexes],
+                    ordered=False,
+                )
+            except Exception as e:
+                logger.exception("Unable to insert documents in %s", collection_name)
+                # unordered inserts report the documents that failed
+                details = getattr(e, "details", None) or {}
+                write_errors = details.get("writeErrors")
+                failed = (
+                    [indexes[error["index"]] for error in write_errors]
+                    if write_errors
+                    else indexes
+                )
+                for i in failed:
+                    success[i] = False
+
+        return [
+            {**data_input, "success": data_success}
+            for data_input, data_success in zip(data_in_list, success)
+        ]
@@ -1,9 +1,14 @@
+import asyncio
 import json
 from typing import Mapping, Any, TYPE_CHECKING
 
-from keybert import KeyBERT
 from pydantic import BaseModel, Field
 
+from applications.huggingface.pipeline_registry import (
+    KEYBERT_DEFAULT_MODEL,
+    KEYBERT_TASK,
+    lease_pipeline,
+)
 from core.tasks.task import Task
 
 if TYPE_CHECKING:
@@ -11,6 +16,7 @@ if TYPE_CHECKING:
 
 
 class ExtractKeywordsBertTask(Task):
+    RESULT_CACHE = "memory"
 
     class UI(BaseModel):
         keywords: str = Field("Keywords")
@@ -18,13 +24,39 @@ class ExtractKeywordsBertTask(Task):
     class InputModel(BaseModel):
         message: str
 
+    def __init__(self, model: str = KEYBERT_DEFAULT_MODEL, **kwargs):
+        super().__init__(**kwargs)
+        self._model = model
+
+    def clone(self, **kwargs) -> "Task":
+        return self.__class__(self._model, **self.params, **kwargs)
+
+    def result_cache_key_data(self, data_in: Mapping[str, Any]) -> Mapping[str, Any]:
+        return {**super().result_cache_key_data(data_in), "model": self._model}
+
+    async def result_cache_hit(
+        self,
+        context: "Context",
+        data_in: Mapping[str, Any],
+        data_out: Mapping[str, Any],
+    ) -> None:
+        await context.event(
+            self, "data", {"keywords": json.dumps(data_out["keywords"])}
+        )
+
+    def _extract_keywords(self, message: str):
+        with lease_pipeline(KEYBERT_TASK, self._model) as entry:
+            with entry.lock:
+                return entry.value.extract_keywords(message)
+
     async def _process(
         self, context: "Context", data_input: Mapping[str, Any]
     ) -> Mapping[str, Any]:
         data_input_object = self.input_object(data_input)
 
-        kw_model = KeyBERT()
-        keywords = kw_model.extract_keywords(data_input_object.message)
+        keywords = await asyncio.to_thread(
+            self._extract_keywords, data_input_object.message
+        )
 
         result_as_json = json.dumps(keywords)
         await context.event(self, "data", {"keywords": result_as_json})
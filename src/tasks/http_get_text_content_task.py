@@ -10,6 +10,9 @@ if TYPE_CHECKING:
 
 
 class HttpGetTextContentTask(Task["HttpGetTextContentTask.InputModel"]):
+    # pages change, they are only reused for a few minutes
+    RESULT_CACHE = "memory"
+    RESULT_CACHE_TTL = 600.0
 
     class InputModel(BaseModel):
         url: str
@@ -2,8 +2,9 @@ import json
 from typing import Mapping, Any, TYPE_CHECKING
 
 from pydantic import BaseModel, Field
-from transformers import pipeline
 
+from applications.huggingface.batch_inference import batch_inference
+from applications.huggingface.pipeline_registry import lease_pipeline
 from core.tasks.task import Task
 
 if TYPE_CHECKING:
@@ -11,6 +12,7 @@ if TYPE_CHECKING:
 
 
 class ZeroShotClassificationTask(Task):
+    RESULT_CACHE = "memory"
 
     class UI(BaseModel):
         result: str = Field(title="Result")
@@ -29,6 +31,32 @@ class ZeroShotClassificationTask(Task):
     def clone(self, **kwargs) -> "Task":
         return self.__class__(self._model, **self.params, **kwargs)
 
+    def result_cache_key_data(self, data_in: Mapping[str, Any]) -> Mapping[str, Any]:
+        return {**super().result_cache_key_data(data_in), "model": self._model}
+
+    @staticmethod
+    def _result(data_out: Mapping[str, Any]) -> dict:
+        return {key: data_out[key] for key in ("sequence", "labels", "scores")}
+
+    async def result_cache_hit(
+        self,
+        context: "Context",
+        data_in: Mapping[str, Any],
+        data_out: Mapping[str, Any],
+    ) -> None:
+        await context.event(
+            self, "data", {"result": json.dumps(self._result(data_out))}
+        )
+
+    @staticmethod
+    def _classify_batch(group: tuple, queries: list[str]) -> list[dict]:
+        model, classes = group
+        with lease_pipeline("zero-shot-classification", model) as entry:
+            with entry.lock:
+                return entry.value(
+                    queries, candidate_labels=list(classes), batch_size=len(queries)
+                )
+
     async def _process(
         self, context: "Context", data_input: Mapping[str, Any]
     ) -> Mapping[str, Any]:
@@ -39,11 +67,11 @@ class ZeroShotClassificationTask(Task):
         if isinstance(classes, str):
             classes = classes.split(",")
 
-        pipe = pipeline(model=self._model)
-        result = pipe(
-            query,
-            candidate_labels=classes,
-        )
+        # queries of concurrent runs sharing the model and classes are
+        # classified together
+        result = await batch_inference(
+            "zero-shot-classification", self._classify_batch
+        ).infer((self._model, tuple(classes)), query)
 
         result_as_json = json.dumps(result)
         await context.event(self, "data", {"result": result_as_json})
@@ -1,5 +1,5 @@
-import asyncio
 import json
+import logging
 import os
 
 import socketio
@@ -11,9 +11,12 @@ from core.context.global_context import GlobalContext
 from core.tasks.task_dag import TaskDAG
 from core.tasks.types import JSONParam
 from core.utils import deserialize_instance, load_local_application
+from misc.asyncio import run_managed
 
 os.environ["P6_RUN_MODE"] = "worker"
 
+logger = logging.getLogger(__name__)
+
 app = celery_factory()
 
 global_context = GlobalContext()
@@ -40,6 +43,18 @@ global_context.set_websocket_client(sio)
 print(f"global-context {hex(id(global_context))}")
 
 
+def notify_remote_result(task_id: str, result=None, error=None) -> None:
+    """Push a task completion to the API, which resolves the awaiting future"""
+    try:
+        sio.emit(
+            "remote_task_result",
+            {"taskId": task_id, "result": result, "error": error},
+        )
+    except Exception:
+        # the API falls back to polling the result backend
+        logger.exception("Unable to notify the result of %s", task_id)
+
+
 @app.task(bind=True)
 def run_task(
     self, task_data: JSONParam, task_context: JSONParam, task_input: JSONParam
@@ -51,15 +66,23 @@ def run_task(
 
     print(json.dumps(task_data))
 
-    with TaskDAG():
-        task_instance = deserialize_instance(task_data)
-        work_context = deserialize_instance(task_context)
+    remote_task_id = self.request.id
 
-        result = asyncio.run(
-            task_instance.process(work_context, task_input), debug=True
-        )
+    try:
+        with TaskDAG():
+            task_instance = deserialize_instance(task_data)
+            work_context = deserialize_instance(task_context)
+
+            result = run_managed(
+                task_instance.process(work_context, task_input), debug=True
+            )
+    except Exception as e:
+        notify_remote_result(remote_task_id, error=str(e))
+        raise
+
+    notify_remote_result(remote_task_id, result=result)
 
-        return result
+    return result
 
 
 print(app.tasks)
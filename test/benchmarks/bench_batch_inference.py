@@ -0,0 +1,107 @@
+"""Items/s of the classification pipelines, per call against micro-batched
+
+Concurrent runs submit their inputs from several event loops, as DAG runs
+of the scheduler do. Needs transformers, run from the repository root with:
+
+    PYTHONPATH=src python test/benchmarks/bench_batch_inference.py \
+        --model distilbert-base-uncased-finetuned-sst-2-english
+"""
+
+import argparse
+import asyncio
+import os
+import pathlib
+import sys
+import threading
+import time
+
+os.environ["P6_LOAD_PERSIST_MODELS"] = "False"
+os.environ["P6_RUN_MODE"] = "TEST"
+os.chdir(os.path.join(pathlib.Path(__file__).parent, "../../src"))
+sys.path.insert(0, os.getcwd())
+
+from applications.huggingface.batch_inference import BatchInference  # noqa: E402
+from applications.huggingface.pipeline_registry import lease_pipeline  # noqa: E402
+
+TITLES = [
+    "Attention is all you need",
+    "A survey of large language models",
+    "Deep residual learning for image recognition",
+    "Scaling laws for neural language models",
+    "Denoising diffusion probabilistic models",
+    "Graph neural networks: a review of methods and applications",
+]
+
+
+def per_call(model: str, title: str):
+    with lease_pipeline("text-classification", model) as entry:
+        with entry.lock:
+            return entry.value(title)
+
+
+def run_batch(model: str, titles: list):
+    with lease_pipeline("text-classification", model) as entry:
+        with entry.lock:
+            return entry.value(titles, batch_size=len(titles))
+
+
+def run_loops(infer, loop_count: int, runs_per_loop: int, items_per_run: int):
+    async def dag_run(run_index: int):
+        for item_index in range(items_per_run):
+            await infer(TITLES[(run_index + item_index) % len(TITLES)])
+
+    def loop_main():
+        async def runs():
+            await asyncio.gather(*(dag_run(index) for index in range(runs_per_loop)))
+
+        asyncio.run(runs())
+
+    threads = [threading.Thread(target=loop_main) for _ in range(loop_count)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return loop_count * runs_per_loop * items_per_run / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--model", default="distilbert-base-uncased-finetuned-sst-2-english"
+    )
+    parser.add_argument("--loops", type=int, default=4)
+    parser.add_argument("--runs", type=int, default=8)
+    parser.add_argument("--items", type=int, default=16)
+    args = parser.parse_args()
+
+    # load once, the pool keeps it
+    per_call(args.model, TITLES[0])
+
+    def per_call_infer(title):
+        return asyncio.to_thread(per_call, args.model, title)
+
+    print(f"{'mode':>22} {'items/s':>9} {'mean batch':>11}")
+    items_per_second = run_loops(per_call_infer, args.loops, args.runs, args.items)
+    print(f"{'per call':>22} {items_per_second:>9.1f} {1.0:>11.1f}")
+
+    for max_batch_size, max_wait_ms in ((8, 5), (16, 10), (32, 20)):
+        batcher = BatchInference(
+            f"bench_{max_batch_size}",
+            run_batch,
+            max_batch_size=max_batch_size,
+            max_wait=max_wait_ms / 1000,
+        )
+
+        def batched_infer(title):
+            return batcher.infer(args.model, title)
+
+        items_per_second = run_loops(batched_infer, args.loops, args.runs, args.items)
+        mode = f"batch {max_batch_size} / {max_wait_ms}ms"
+        mean_batch_size = batcher.stats()["meanBatchSize"]
+        print(f"{mode:>22} {items_per_second:>9.1f} {mean_batch_size:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
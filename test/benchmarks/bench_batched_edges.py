@@ -0,0 +1,102 @@
+"""Items/s of a generator loop, one activation per item against batched edges
+
+The loop body simulates a store round trip of ``--latency`` ms per call, a
+batch-aware body pays it once per batch. With ``--latency 0`` the numbers
+measure the engine overhead per item. Run from the repository root with:
+
+    PYTHONPATH=src python test/benchmarks/bench_batched_edges.py --items 2000
+"""
+
+import argparse
+import asyncio
+import os
+import pathlib
+import sys
+import time
+
+os.environ["P6_LOAD_PERSIST_MODELS"] = "False"
+os.environ["P6_RUN_MODE"] = "TEST"
+os.chdir(os.path.join(pathlib.Path(__file__).parent, "../../src"))
+sys.path.insert(0, os.getcwd())
+
+from pydantic import BaseModel  # noqa: E402
+
+from core.context.composite_context import CompositeContext  # noqa: E402
+from core.context.global_context import GlobalContext  # noqa: E402
+from core.tasks.task import Task  # noqa: E402
+from core.tasks.task_dag import TaskDAG  # noqa: E402
+
+
+class ItemsTask(Task):
+    class InputModel(BaseModel):
+        pass
+
+    def __init__(self, count: int = 1000, **kwargs):
+        super().__init__(**kwargs)
+        self.count = count
+
+    async def _generator_process(self, context, data_in):
+        for index in range(self.count):
+            yield {"index": index}
+
+
+class StoreTask(Task):
+    class InputModel(BaseModel):
+        index: int
+
+    def __init__(self, latency: float = 0.0, **kwargs):
+        super().__init__(**kwargs)
+        self.latency = latency
+
+    async def _process(self, context, data_in):
+        await asyncio.sleep(self.latency)
+        return {"index": data_in["index"], "stored": True}
+
+    async def _process_batch(self, context, data_in_list):
+        await asyncio.sleep(self.latency)
+        return [{"index": data_in["index"], "stored": True} for data_in in data_in_list]
+
+
+class ConfirmTask(Task):
+    class InputModel(BaseModel):
+        index: int
+        stored: bool
+
+    async def _process(self, context, data_in):
+        return data_in
+
+
+def run(global_context, items: int, latency: float, batch_size: int) -> float:
+    with TaskDAG(id=f"bench_batched_edges_{batch_size}") as dag:
+        source = ItemsTask(id="items", count=items)
+        store = StoreTask(id="store", latency=latency)
+        confirm = ConfirmTask(id="confirm")
+
+        source >> store >> confirm
+        if batch_size > 1:
+            dag.set_loop_policy(source, store, batch_size=batch_size, batch_wait=0.05)
+
+    start = time.perf_counter()
+    asyncio.run(global_context.run_dag(dag, {}, CompositeContext(global_context)))
+
+    return items / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=1.0, help="ms per call")
+    parser.add_argument("--batch-sizes", default="1,8,32,128")
+    args = parser.parse_args()
+
+    global_context = GlobalContext.get_instance()
+
+    for batch_size in (int(value) for value in args.batch_sizes.split(",")):
+        items_per_second = run(
+            global_context, args.items, args.latency / 1000, batch_size
+        )
+        print(f"batch_size={batch_size:4d} {items_per_second:10.1f} items/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Per-run DAG clone and start cost as the node count grows
+
+Compares the template based clone with the previous implementation which
+re-instantiated every task and edge. Run from the repository root with:
+
+    PYTHONPATH=src python test/benchmarks/bench_dag_clone.py
+"""
+
+import asyncio
+import os
+import pathlib
+import sys
+import time
+import uuid
+
+os.environ["P6_LOAD_PERSIST_MODELS"] = "False"
+os.environ["P6_RUN_MODE"] = "TEST"
+os.chdir(os.path.join(pathlib.Path(__file__).parent, "../../src"))
+sys.path.insert(0, os.getcwd())
+
+from pydantic import BaseModel  # noqa: E402
+
+from core.context.composite_context import CompositeContext  # noqa: E402
+from core.context.global_context import GlobalContext  # noqa: E402
+from core.tasks.task import Task  # noqa: E402
+from core.tasks.task_dag import TaskDAG  # noqa: E402
+
+global_context = GlobalContext.get_instance()
+
+
+class NoopTask(Task):
+    class InputModel(BaseModel):
+        pass
+
+    async def _process(self, context, data_in):
+        return data_in
+
+
+def build_layered_dag(dag_id: str, node_count: int, width: int = 4) -> TaskDAG:
+    with TaskDAG(id=dag_id) as dag:
+        previous_layer = []
+        layer = []
+        for index in range(node_count):
+            task = NoopTask(id=f"task_{index}")
+            layer.append(task)
+            for parent in previous_layer:
+                parent >> task
+            if len(layer) == width:
+                previous_layer, layer = layer, []
+
+    return dag
+
+
+def legacy_clone(dag: TaskDAG) -> TaskDAG:
+    final_id = f"{dag.id}:{uuid.uuid4()}"
+    with TaskDAG(id=final_id, label=dag.label, parent_id=dag.id) as new_dag:
+        for task_id, task_node in dag.task_node_map.items():
+            new_dag.task_node_map[task_id] = task_node.clone(
+                task_id=task_node.task.id, dag_id=final_id
+            )
+    return new_dag
+
+
+def measure(func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    print(
+        f"{'nodes':>6} {'legacy clone ms':>16} {'template clone ms':>18} {'start ms':>9}"
+    )
+    for node_count in (10, 50, 100, 250):
+        dag = build_layered_dag(f"bench_{node_count}", node_count)
+        repeat = max(5, 2000 // node_count)
+
+        legacy = measure(lambda: legacy_clone(dag), repeat)
+        template = measure(dag.clone, repeat)
+
+        def start():
+            clone = dag.clone()
+            asyncio.run(
+                global_context.run_dag(clone, {}, CompositeContext(global_context))
+            )
+
+        start_cost = measure(start, max(3, repeat // 4))
+
+        print(f"{node_count:>6} {legacy:>16.3f} {template:>18.3f} {start_cost:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Load test of the DAG subscription protocol with simulated subscribers
+
+A long running DAG streams training logs to its room while many simulated
+subscribers follow it and reconnect periodically, once asking for a full
+snapshot (the previous protocol) and once resuming from their last
+sequence number. Prints the bytes and time spent sending the reconnection
+payloads, with JSON and msgpack (when installed) encodings. Run from the
+repository root with:
+
+    PYTHONPATH=src python test/benchmarks/bench_dag_subscriptions.py
+"""
+
+import asyncio
+import json
+import os
+import pathlib
+import sys
+import time
+
+os.environ["P6_LOAD_PERSIST_MODELS"] = "False"
+os.environ["P6_RUN_MODE"] = "TEST"
+os.chdir(os.path.join(pathlib.Path(__file__).parent, "../../src"))
+sys.path.insert(0, os.getcwd())
+
+from core.callbacks.dag_execution_memory import DagExecutionMemory  # noqa: E402
+from core.callbacks.dag_subscription import (  # noqa: E402
+    ENCODING_JSON,
+    ENCODING_MSGPACK,
+    available_encoding,
+)
+from core.callbacks.dag_ws_callback_handler import (  # noqa: E402
+    DagWebsocketCallbackHandler,
+)
+from core.context.composite_context import CompositeContext  # noqa: E402
+from core.context.global_context import GlobalContext  # noqa: E402
+from core.managers.memory_flush_manager import MemoryFlushManager  # noqa: E402
+from core.tasks.task import Task  # noqa: E402
+from core.tasks.task_dag import TaskDAG  # noqa: E402
+
+global_context = GlobalContext.get_instance()
+
+SUBSCRIBERS = 200
+STEPS = 2000
+RECONNECT_EVERY = 100
+
+
+class CountingSocket:
+    def __init__(self):
+        self.bytes_per_room = {}
+
+    def send(self, data, to=None):
+        size = len(data) if isinstance(data, bytes) else len(json.dumps(data))
+        self.bytes_per_room[to] = self.bytes_per_room.get(to, 0) + size
+
+
+class TrainTask(Task):
+    async def _process(self, context, data_in):
+        return data_in
+
+
+async def run(resume: bool, encoding: str) -> tuple:
+    with TaskDAG(id="bench_dag_subscriptions") as dag:
+        task = TrainTask(id="train")
+
+    socket = CountingSocket()
+    flush_manager = MemoryFlushManager(interval=60)
+    memory = DagExecutionMemory(dag.id, flush_manager=flush_manager)
+
+    run_context = CompositeContext(global_context)
+    run_context.create_local_context(
+        callbacks=[memory, DagWebsocketCallbackHandler(socket, f"dag_{dag.id}")]
+    )
+
+    subscribers = []
+    for index in range(SUBSCRIBERS):
+        context = CompositeContext(global_context)
+        context.create_local_context(
+            callbacks=[
+                memory,
+                DagWebsocketCallbackHandler(socket, f"sid_{index}", encoding=encoding),
+            ]
+        )
+        subscribers.append(context)
+
+    async def subscribe(context, seq=None):
+        await context.event(dag, "subscription", {"seq": seq, "encoding": encoding})
+
+    for context in subscribers:
+        await subscribe(context)
+
+    reconnect_time = 0.0
+    for step in range(STEPS):
+        await run_context.event(
+            task, "stream", {"logs": ([[step, 1 / (step + 1), 0.5]], False)}
+        )
+        await run_context.event(task, "data", {"step": step})
+        await flush_manager.flush()
+
+        if step % RECONNECT_EVERY == RECONNECT_EVERY - 1:
+            start = time.perf_counter()
+            for context in subscribers:
+                seq = memory.seq - 3 if resume else None
+                await context.event(dag, "unsubscription", {"encoding": encoding})
+                await subscribe(context, seq)
+            reconnect_time += time.perf_counter() - start
+
+    flush_manager.shutdown()
+
+    reconnect_bytes = sum(
+        size for room, size in socket.bytes_per_room.items() if room.startswith("sid_")
+    )
+    reconnects = SUBSCRIBERS * (STEPS // RECONNECT_EVERY)
+
+    return reconnect_bytes / reconnects, reconnect_time / reconnects * 1e6
+
+
+def main():
+    encodings = [ENCODING_JSON]
+    if available_encoding(ENCODING_MSGPACK) == ENCODING_MSGPACK:
+        encodings.append(ENCODING_MSGPACK)
+
+    print(f"subscribers={SUBSCRIBERS} steps={STEPS} reconnect every={RECONNECT_EVERY}")
+    print(
+        f"{'encoding':>8} {'protocol':>9} {'bytes/reconnect':>16} {'us/reconnect':>13}"
+    )
+    for encoding in encodings:
+        for resume in (False, True):
+            size, cost = asyncio.run(run(resume, encoding))
+            protocol = "resume" if resume else "snapshot"
+            print(f"{encoding:>8} {protocol:>9} {size:>16.0f} {cost:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
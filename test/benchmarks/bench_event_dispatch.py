@@ -0,0 +1,102 @@
+"""Event dispatch cost through the context layers of a DAG run
+
+Builds the context of a websocket started run (global context, execution
+memory and websocket room handler) with extra tracer layers, and sends the
+events of a training loop: handled data and status events, and metrics
+events no handler subscribes to, then the timings of the handlers. Run from
+the repository root with:
+
+    PYTHONPATH=src python test/benchmarks/bench_event_dispatch.py
+"""
+
+import asyncio
+import os
+import pathlib
+import sys
+import time
+
+os.environ["P6_LOAD_PERSIST_MODELS"] = "False"
+os.environ["P6_RUN_MODE"] = "TEST"
+os.chdir(os.path.join(pathlib.Path(__file__).parent, "../../src"))
+sys.path.insert(0, os.getcwd())
+
+from pydantic import BaseModel  # noqa: E402
+
+from core.callbacks.dag_execution_tracer import DAGExecutionTracer  # noqa: E402
+from core.callbacks.subscriptions import callback_stats  # noqa: E402
+from core.callbacks.dag_ws_callback_handler import (  # noqa: E402
+    DagWebsocketCallbackHandler,
+)
+from core.callbacks.tasks_execution_tracer import TasksExecutionTracer  # noqa: E402
+from core.context.composite_context import CompositeContext  # noqa: E402
+from core.context.global_context import GlobalContext  # noqa: E402
+from core.tasks.task import Task  # noqa: E402
+from core.tasks.task_dag import TaskDAG  # noqa: E402
+from core.tasks.types import Status  # noqa: E402
+
+global_context = GlobalContext.get_instance()
+
+
+class TrainTask(Task):
+    class InputModel(BaseModel):
+        pass
+
+    async def _process(self, context, data_in):
+        return data_in
+
+
+def build_context(dag: TaskDAG, extra_layers: int) -> CompositeContext:
+    context = CompositeContext(global_context)
+    for _ in range(extra_layers):
+        context.create_local_context(
+            callbacks=[DAGExecutionTracer(dag.id), TasksExecutionTracer(dag.id)]
+        )
+    context.create_local_context(
+        callbacks=[
+            global_context.dag_manager.get_memory(dag.id),
+            DagWebsocketCallbackHandler(None, f"dag_{dag.id}"),
+        ]
+    )
+
+    return context
+
+
+async def dispatch(context, task: Task, event: str, payload, count: int) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        await context.event(task, event, payload)
+
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def main():
+    with TaskDAG(id="bench_event_dispatch") as dag:
+        task = TrainTask(id="train")
+
+    count = 20000
+    events = (
+        ("data", {"loss": 0.5}),
+        ("status", {"id": task.full_id, "status": Status.RUNNING, "error": None}),
+        ("metrics", {"step": 1, "loss": 0.5}),
+    )
+
+    print(f"{'layers':>6} " + " ".join(f"{event + ' us':>12}" for event, _ in events))
+    for extra_layers in (0, 2, 8):
+        context = build_context(dag, extra_layers)
+        costs = [
+            asyncio.run(dispatch(context, task, event, payload, count))
+            for event, payload in events
+        ]
+        print(f"{extra_layers + 2:>6} " + " ".join(f"{cost:>12.2f}" for cost in costs))
+
+    print()
+    print(f"{'handler':>24} {'event':>8} {'calls':>8} {'mean us':>8} {'max us':>8}")
+    for stat in callback_stats()[:6]:
+        print(
+            f"{stat['handler']:>24} {stat['event']:>8} {stat['calls']:>8} "
+            f"{stat['meanTime'] * 1e6:>8.2f} {stat['maxTime'] * 1e6:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Per-activation scheduling overhead of a DAG run as the node count grows
+
+Runs layered DAGs of no-op tasks, every task of a layer depends on all the
+tasks of the previous one, and reports the run time divided by the number of
+activations, and the time spent in the scheduler hooks alone (edge locks,
+parent results and routing). Run from the repository root with:
+
+    PYTHONPATH=src python test/benchmarks/bench_execution_plan.py
+"""
+
+import asyncio
+import os
+import pathlib
+import sys
+import time
+
+os.environ["P6_LOAD_PERSIST_MODELS"] = "False"
+os.environ["P6_RUN_MODE"] = "TEST"
+os.chdir(os.path.join(pathlib.Path(__file__).parent, "../../src"))
+sys.path.insert(0, os.getcwd())
+
+from pydantic import BaseModel  # noqa: E402
+
+from core.context.composite_context import CompositeContext  # noqa: E402
+from core.context.global_context import GlobalContext  # noqa: E402
+from core.tasks.task import Task  # noqa: E402
+from core.tasks.task_dag import TaskDAG  # noqa: E402
+from core.tasks.types import Status  # noqa: E402
+
+global_context = GlobalContext.get_instance()
+
+
+class NoopTask(Task):
+    class InputModel(BaseModel):
+        pass
+
+    async def _process(self, context, data_in):
+        return data_in
+
+
+def build_layered_dag(dag_id: str, node_count: int, width: int = 4) -> TaskDAG:
+    with TaskDAG(id=dag_id) as dag:
+        previous_layer = []
+        layer = []
+        for index in range(node_count):
+            task = NoopTask(id=f"task_{index}")
+            layer.append(task)
+            for parent in previous_layer:
+                parent >> task
+            if len(layer) == width:
+                previous_layer, layer = layer, []
+
+    return dag
+
+
+async def scheduler_pass(dag: TaskDAG) -> float:
+    """Time the scheduler hooks of every activation, uncontended
+
+    The tasks are walked in their topological order, each one reads the
+    results of its parents and hands its own over, the children are marked
+    as waiting so that no activation is created.
+    """
+    context = CompositeContext(global_context)
+    await dag.set_status(context, Status.RUNNING, send_value=False)
+    for task_node in dag.task_node_map.values():
+        await task_node.task.set_status(context, Status.WAITING, send_value=False)
+
+    async with asyncio.TaskGroup() as tg:
+        dag.set_task_group(tg)
+
+        start = time.perf_counter()
+        for task_node in dag.task_node_map.values():
+            source_task_id = (
+                task_node.parent_nodes[0].from_id if task_node.parent_nodes else None
+            )
+            await dag._task_data_input(task_node.task, {}, source_task_id)
+            await dag.task_did_finish(context, task_node.task, {})
+        elapsed = time.perf_counter() - start
+
+    dag.set_task_group(None)
+    await dag.dag_did_finish()
+
+    return elapsed
+
+
+def run(dag: TaskDAG) -> None:
+    asyncio.run(global_context.run_dag(dag, {}, CompositeContext(global_context)))
+
+
+def main():
+    print(
+        f"{'nodes':>6} {'edges':>6} {'run ms':>9} {'us/activation':>14} "
+        f"{'scheduler us/activation':>24}"
+    )
+    for node_count in (10, 100, 1000):
+        dag = build_layered_dag(f"bench_plan_{node_count}", node_count)
+        edge_count = sum(len(node.sub_nodes) for node in dag.task_node_map.values())
+        repeat = max(3, 2000 // node_count)
+
+        # warm up the caches compiled once per structure
+        run(dag.clone())
+
+        total = 0.0
+        scheduler = 0.0
+        for _ in range(repeat):
+            clone = dag.clone()
+
+            start = time.perf_counter()
+            run(clone)
+            total += time.perf_counter() - start
+
+            scheduler += asyncio.run(scheduler_pass(dag.clone()))
+
+        per_run = total / repeat
+        print(
+            f"{node_count:>6} {edge_count:>6} {per_run * 1000:>9.3f} "
+            f"{per_run / node_count * 1e6:>14.1f} "
+            f"{scheduler / repeat / node_count * 1e6:>24.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Websocket pushes of many running DAGs through the memory flush manager
+
+Sends data and progress events to the execution memories of many
+subscribed DAGs at once, then prints the cost per event, the threads
+alive during the run and the flush manager latency and payload sizes. Run
+from the repository root with:
+
+    PYTHONPATH=src python test/benchmarks/bench_memory_flush.py
+"""
+
+import asyncio
+import os
+import pathlib
+import sys
+import threading
+import time
+
+os.environ["P6_LOAD_PERSIST_MODELS"] = "False"
+os.environ["P6_RUN_MODE"] = "TEST"
+os.chdir(os.path.join(pathlib.Path(__file__).parent, "../../src"))
+sys.path.insert(0, os.getcwd())
+
+from core.callbacks.callback_handler import CallbackHandler  # noqa: E402
+from core.callbacks.dag_execution_memory import DagExecutionMemory  # noqa: E402
+from core.context.composite_context import CompositeContext  # noqa: E402
+from core.context.global_context import GlobalContext  # noqa: E402
+from core.managers.memory_flush_manager import MemoryFlushManager  # noqa: E402
+from core.tasks.task import Task  # noqa: E402
+from core.tasks.task_dag import TaskDAG  # noqa: E402
+
+global_context = GlobalContext.get_instance()
+
+DAGS = 50
+STEPS = 2000
+
+
+class RoomHandler(CallbackHandler):
+    EVENTS = frozenset({"ws", "ws_dag_room"})
+
+    async def on_handled_event(
+        self, context, sender, event, payload, raw_payload=False
+    ):
+        return True
+
+
+class TrainTask(Task):
+    async def _process(self, context, data_in):
+        return data_in
+
+
+async def train(index: int, flush_manager: MemoryFlushManager) -> None:
+    with TaskDAG(id=f"bench_memory_flush_{index}") as dag:
+        task = TrainTask(id="train")
+
+    context = CompositeContext(global_context)
+    context.create_local_context(
+        callbacks=[DagExecutionMemory(dag.id, flush_manager), RoomHandler()]
+    )
+
+    await context.event(dag, "subscription", {})
+    for step in range(STEPS):
+        await context.event(task, "data", {"step": step, "loss": 1 / (step + 1)})
+        await context.event(dag, "progress", {"progress": step / STEPS})
+        if step % 100 == 0:
+            await asyncio.sleep(0.01)
+
+
+async def run(flush_manager: MemoryFlushManager) -> int:
+    tasks = [asyncio.create_task(train(index, flush_manager)) for index in range(DAGS)]
+    threads = threading.active_count()
+    while not all(task.done() for task in tasks):
+        threads = max(threads, threading.active_count())
+        await asyncio.sleep(0.05)
+
+    return threads
+
+
+def main():
+    flush_manager = MemoryFlushManager(interval=0.3)
+
+    start = time.perf_counter()
+    threads = asyncio.run(run(flush_manager))
+    elapsed = time.perf_counter() - start
+    flush_manager.shutdown()
+
+    stats = flush_manager.stats()
+    print(f"dags={DAGS} events={DAGS * STEPS * 2} threads={threads}")
+    print(f"event us: {elapsed / (DAGS * STEPS * 2) * 1e6:.2f}")
+    print(
+        f"flushes={stats['flushes']} sent={stats['sent']} "
+        f"mean bytes={stats['meanBytes']:.0f} max bytes={stats['maxBytes']} "
+        f"mean latency ms={stats['meanLatency'] * 1e3:.1f} "
+        f"max latency ms={stats['maxLatency'] * 1e3:.1f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
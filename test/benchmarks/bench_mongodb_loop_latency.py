@@ -0,0 +1,118 @@
+"""Event loop latency while tasks query mongodb, sync vs motor handler
+
+A ticker coroutine measures how late the event loop wakes it up while
+concurrent coroutines run queries through MongoDBHandler (blocking pymongo)
+and AsyncMongoDBHandler (motor). Needs a local mongod, run from the
+repository root with:
+
+    P6_MONGODB_URI=mongodb://localhost:27017 \
+        PYTHONPATH=src python test/benchmarks/bench_mongodb_loop_latency.py
+"""
+
+import asyncio
+import os
+import pathlib
+import statistics
+import sys
+import time
+
+os.environ["P6_LOAD_PERSIST_MODELS"] = "False"
+os.environ["P6_RUN_MODE"] = "TEST"
+os.environ.setdefault("P6_MONGODB_URI", "mongodb://localhost:27017")
+os.chdir(os.path.join(pathlib.Path(__file__).parent, "../../src"))
+sys.path.insert(0, os.getcwd())
+
+from core.context.global_context import GlobalContext  # noqa: E402
+from core.database.mongodb import MongoDBHandler  # noqa: E402
+from core.database.mongodb_async import AsyncMongoDBHandler  # noqa: E402
+
+DATABASE = "pinceau6_bench"
+COLLECTION = "loop_latency"
+DOCUMENT_COUNT = 2000
+WORKERS = 16
+QUERIES_PER_WORKER = 50
+TICK = 0.001
+
+global_context = GlobalContext.get_instance()
+
+
+async def ticker(lags, stop: asyncio.Event) -> None:
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + TICK
+        await asyncio.sleep(TICK)
+        lags.append(max(0.0, loop.time() - expected))
+
+
+def seed() -> None:
+    collection = global_context.dbms["mongodb"][DATABASE][COLLECTION]
+    collection.drop()
+    collection.insert_many(
+        [
+            {"index": index, "payload": "x" * 512, "tag": f"tag_{index % 32}"}
+            for index in range(DOCUMENT_COUNT)
+        ]
+    )
+
+
+async def sync_worker(worker: int) -> None:
+    handler = MongoDBHandler.from_default(global_context, database=DATABASE)
+    raw = handler._database[COLLECTION]
+    for query in range(QUERIES_PER_WORKER):
+        list(raw.find({"tag": f"tag_{(worker + query) % 32}"}))
+        await asyncio.sleep(0)
+
+
+async def async_worker(worker: int) -> None:
+    handler = AsyncMongoDBHandler.from_default(global_context, database=DATABASE)
+    raw = handler._database[COLLECTION]
+    for query in range(QUERIES_PER_WORKER):
+        await raw.find({"tag": f"tag_{(worker + query) % 32}"}).to_list(None)
+
+
+async def measure(worker) -> dict:
+    lags: list = []
+    stop = asyncio.Event()
+    ticker_task = asyncio.create_task(ticker(lags, stop))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(index) for index in range(WORKERS)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await ticker_task
+
+    lags_ms = sorted(lag * 1000 for lag in lags) or [0.0]
+    return {
+        "elapsed": elapsed,
+        "ticks": len(lags),
+        "p50": statistics.median(lags_ms),
+        "p99": lags_ms[min(len(lags_ms) - 1, int(len(lags_ms) * 0.99))],
+        "max": lags_ms[-1],
+    }
+
+
+def main() -> None:
+    seed()
+
+    print(
+        f"{WORKERS} workers x {QUERIES_PER_WORKER} queries, "
+        f"{DOCUMENT_COUNT} documents"
+    )
+    print(
+        f"{'handler':>8} {'total s':>9} {'ticks':>7} "
+        f"{'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}"
+    )
+
+    for name, worker in (("sync", sync_worker), ("motor", async_worker)):
+        result = asyncio.run(measure(worker))
+        print(
+            f"{name:>8} {result['elapsed']:>9.3f} {result['ticks']:>7} "
+            f"{result['p50']:>8.2f} {result['p99']:>8.2f} {result['max']:>8.2f}"
+        )
+
+    global_context.dbms["mongodb"].drop_database(DATABASE)
+
+
+if __name__ == "__main__":
+    main()
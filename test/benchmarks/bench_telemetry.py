@@ -0,0 +1,92 @@
+"""Event volume and cost of a training loop with the telemetry channel
+
+Runs a DAG whose task sends a data, a progress and a stream event per step
+to the context of a websocket started run (execution memory and websocket
+room handler), without and with the telemetry channel, and prints the
+events reaching the handlers and the time per step. Run from the
+repository root with:
+
+    PYTHONPATH=src python test/benchmarks/bench_telemetry.py
+"""
+
+import asyncio
+import os
+import pathlib
+import sys
+import time
+
+os.environ["P6_LOAD_PERSIST_MODELS"] = "False"
+os.environ["P6_RUN_MODE"] = "TEST"
+os.chdir(os.path.join(pathlib.Path(__file__).parent, "../../src"))
+sys.path.insert(0, os.getcwd())
+
+from pydantic import BaseModel  # noqa: E402
+
+from core.callbacks.dag_ws_callback_handler import (  # noqa: E402
+    DagWebsocketCallbackHandler,
+)
+from core.callbacks.subscriptions import callback_stats, handler_timings  # noqa: E402
+from core.context.composite_context import CompositeContext  # noqa: E402
+from core.context.global_context import GlobalContext  # noqa: E402
+from core.context.telemetry_channel import parse_telemetry_events  # noqa: E402
+from core.tasks.task import Task  # noqa: E402
+from core.tasks.task_dag import TaskDAG  # noqa: E402
+
+global_context = GlobalContext.get_instance()
+
+STEPS = 20000
+
+
+class TrainTask(Task):
+    class InputModel(BaseModel):
+        pass
+
+    async def _process(self, context, data_in):
+        for step in range(STEPS):
+            await context.event(self, "data", {"step": step, "loss": 1 / (step + 1)})
+            await self.dag().set_progress(context, step / STEPS)
+            await context.event(self, "stream", {"logs": ([[step, 0.5]], False)})
+        return data_in
+
+
+def build_context(dag: TaskDAG) -> CompositeContext:
+    context = CompositeContext(global_context)
+    context.create_local_context(
+        callbacks=[
+            global_context.dag_manager.get_memory(dag.id),
+            DagWebsocketCallbackHandler(None, f"dag_{dag.id}"),
+        ]
+    )
+
+    return context
+
+
+def run(dag: TaskDAG, telemetry_events: str) -> tuple:
+    global_context._telemetry_events = parse_telemetry_events(telemetry_events)
+    handler_timings.reset()
+
+    start = time.perf_counter()
+    asyncio.run(global_context.run_dag(dag, {}, build_context(dag)))
+    elapsed = time.perf_counter() - start
+
+    calls = sum(
+        stat["calls"]
+        for stat in callback_stats()
+        if stat["handler"] == "DagExecutionMemory"
+    )
+
+    return calls, elapsed / STEPS * 1e6
+
+
+def main():
+    with TaskDAG(id="bench_telemetry") as dag:
+        TrainTask(id="train")
+
+    print(f"{'telemetry':>10} {'events':>8} {'us/step':>8}")
+    for name, telemetry_events in (("none", "none"), ("default", None)):
+        calls, cost = run(dag, telemetry_events)
+        print(f"{name:>10} {calls:>8} {cost:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
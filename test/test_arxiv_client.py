@@ -0,0 +1,180 @@
+import asyncio
+import os
+import pathlib
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from misc.rate_limiter import TokenBucket
+
+os.environ["P6_LOAD_PERSIST_MODELS"] = "False"
+os.environ["P6_RUN_MODE"] = "TEST"
+
+os.chdir(os.path.join(pathlib.Path(__file__).parent, "../src"))
+
+TOTAL_RESULTS = 7
+
+ENTRY = """
+  <entry>
+    <id>http://arxiv.org/abs/2401.{index:05d}v1</id>
+    <updated>2024-01-02T00:00:00Z</updated>
+    <published>2024-01-01T00:00:00Z</published>
+    <title>Paper {index}</title>
+    <summary>Summary {index}</summary>
+    <author><name>Author {index}</name></author>
+    <link href="http://arxiv.org/abs/2401.{index:05d}v1" rel="alternate" type="text/html"/>
+    <link title="pdf" href="http://arxiv.org/pdf/2401.{index:05d}v1" rel="related" type="application/pdf"/>
+    <arxiv:primary_category xmlns:arxiv="http://arxiv.org/schemas/atom" term="cs.CL" scheme="http://arxiv.org/schemas/atom"/>
+    <category term="cs.CL" scheme="http://arxiv.org/schemas/atom"/>
+  </entry>"""
+
+FEED = """<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom" xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">
+  <title>ArXiv Query</title>
+  <opensearch:totalResults>{total}</opensearch:totalResults>
+  <opensearch:startIndex>{start}</opensearch:startIndex>
+  <opensearch:itemsPerPage>{size}</opensearch:itemsPerPage>{entries}
+</feed>"""
+
+
+class FeedHandler(BaseHTTPRequestHandler):
+    """Serves pages of a fake arxiv feed, the first request of each page
+    fails when ``flaky`` is set"""
+
+    requests = []
+    flaky = False
+
+    def do_GET(self):
+        args = parse_qs(urlparse(self.path).query)
+        start = int(args["start"][0])
+        size = int(args["max_results"][0])
+
+        FeedHandler.requests.append((time.monotonic(), start))
+        if FeedHandler.flaky and [s for _, s in FeedHandler.requests].count(start) == 1:
+            self.send_response(503)
+            self.end_headers()
+            return
+
+        entries = "".join(
+            ENTRY.format(index=index)
+            for index in range(start, min(start + size, TOTAL_RESULTS))
+        )
+        body = FEED.format(
+            total=TOTAL_RESULTS, start=start, size=size, entries=entries
+        ).encode()
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/atom+xml")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def feed_server():
+    FeedHandler.requests = []
+    FeedHandler.flaky = False
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FeedHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield f"http://127.0.0.1:{server.server_port}/api/query?{{}}"
+
+    server.shutdown()
+    server.server_close()
+
+
+def build_client(url_format, **kwargs):
+    pytest.importorskip("aiohttp")
+    pytest.importorskip("arxiv")
+
+    from misc.arxiv_client import AsyncClient
+
+    return AsyncClient(
+        page_size=3,
+        delay_seconds=0.05,
+        query_url_format=url_format,
+        rate_limiter=TokenBucket(20.0),
+        **kwargs,
+    )
+
+
+async def collect(client, **search_kwargs):
+    import arxiv
+
+    return [
+        item
+        async for item in client.results(arxiv.Search(query="llm", **search_kwargs))
+    ]
+
+
+def test_pages_are_fetched_in_order(feed_server):
+    client = build_client(feed_server)
+
+    items = asyncio.run(collect(client))
+
+    assert [result.title for result, _, _ in items] == [
+        f"Paper {index}" for index in range(TOTAL_RESULTS)
+    ]
+    assert [index for _, index, _ in items] == list(range(TOTAL_RESULTS))
+    assert {total for _, _, total in items} == {TOTAL_RESULTS}
+    assert [start for _, start in FeedHandler.requests] == [0, 3, 6]
+
+    # 20 requests per second
+    times = [request_time for request_time, _ in FeedHandler.requests]
+    assert all(b - a >= 0.04 for a, b in zip(times, times[1:]))
+
+
+def test_next_page_is_prefetched(feed_server):
+    client = build_client(feed_server)
+
+    async def consume_first():
+        import arxiv
+
+        async for _ in client.results(arxiv.Search(query="llm")):
+            # let the prefetch run while the first result is consumed
+            await asyncio.sleep(0.3)
+            return len(FeedHandler.requests)
+
+    assert asyncio.run(consume_first()) == 2
+
+
+def test_failures_are_retried(feed_server):
+    FeedHandler.flaky = True
+    client = build_client(feed_server, backoff_seconds=0.01, max_backoff_seconds=0.02)
+
+    items = asyncio.run(collect(client, max_results=5))
+
+    assert len(items) == 5
+    assert [start for _, start in FeedHandler.requests] == [0, 0, 3, 3]
+
+
+def test_token_bucket_is_shared_across_loops():
+    bucket = TokenBucket(rate=50.0, capacity=1.0)
+    acquired = []
+
+    def worker():
+        async def run():
+            for _ in range(5):
+                await bucket.acquire()
+                acquired.append(time.monotonic())
+
+        asyncio.run(run())
+
+    threads = [threading.Thread(target=worker) for _ in range(2)]
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # 10 tokens at 50/s with a burst of 1
+    assert len(acquired) == 10
+    assert time.monotonic() - start >= 9 / 50 - 0.01
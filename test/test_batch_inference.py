@@ -0,0 +1,79 @@
+import asyncio
+import threading
+
+import pytest
+
+from applications.huggingface.batch_inference import BatchInference
+
+
+def test_concurrent_inputs_are_batched():
+    batches = []
+
+    def run_batch(group, items):
+        batches.append((group, list(items)))
+        return [f"{group}:{item}" for item in items]
+
+    batcher = BatchInference("test", run_batch, max_batch_size=8, max_wait=0.2)
+
+    async def main():
+        return await asyncio.gather(
+            *(batcher.infer("a" if i % 2 else "b", i) for i in range(6))
+        )
+
+    results = asyncio.run(main())
+
+    assert results == [f"{'a' if i % 2 else 'b'}:{i}" for i in range(6)]
+    assert sorted(batches) == [("a", [1, 3, 5]), ("b", [0, 2, 4])]
+    stats = batcher.stats()
+    assert stats["batches"] == 2
+    assert stats["items"] == 6
+
+
+def test_batch_size_and_errors():
+    batch_sizes = []
+    release = threading.Event()
+
+    def run_batch(group, items):
+        release.wait(1)
+        batch_sizes.append(len(items))
+        if group == "fail":
+            raise ValueError("bad input")
+        return items
+
+    batcher = BatchInference("test", run_batch, max_batch_size=2, max_wait=0.05)
+    futures = [batcher.submit("ok", i) for i in range(5)]
+    release.set()
+
+    assert [future.result(1) for future in futures] == list(range(5))
+    assert max(batch_sizes) == 2
+
+    with pytest.raises(ValueError):
+        batcher.submit("fail", 0).result(1)
+    assert batcher.stats()["errors"] == 1
+
+
+def test_a_bad_input_only_fails_its_request():
+    batch_sizes = []
+    release = threading.Event()
+
+    def run_batch(group, items):
+        release.wait(1)
+        batch_sizes.append(len(items))
+        if "bad" in items:
+            raise ValueError("bad input")
+        return [item.upper() for item in items]
+
+    batcher = BatchInference("test", run_batch, max_batch_size=3, max_wait=0.2)
+    futures = [batcher.submit("titles", item) for item in ("a", "bad", "c")]
+    release.set()
+
+    assert futures[0].result(1) == "A"
+    with pytest.raises(ValueError):
+        futures[1].result(1)
+    assert futures[2].result(1) == "C"
+
+    # the failed batch runs again one input at a time
+    assert batch_sizes == [3, 1, 1, 1]
+    stats = batcher.stats()
+    assert stats["errors"] == 1
+    assert stats["splitBatches"] == 1
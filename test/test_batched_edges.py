@@ -0,0 +1,107 @@
+import asyncio
+import os
+import pathlib
+
+from pydantic import BaseModel
+
+from core.context.composite_context import CompositeContext
+from core.context.global_context import GlobalContext
+from core.tasks.loop_policy import LoopPolicy
+from core.tasks.task import Task
+from core.tasks.task_dag import TaskDAG
+
+os.environ["P6_LOAD_PERSIST_MODELS"] = "False"
+os.environ["P6_RUN_MODE"] = "TEST"
+
+os.chdir(os.path.join(pathlib.Path(__file__).parent, "../src"))
+global_context = GlobalContext.get_instance()
+
+
+class ItemsTask(Task):
+    class InputModel(BaseModel):
+        pass
+
+    def __init__(self, count: int = 10, pause: float = 0.0, **kwargs):
+        super().__init__(**kwargs)
+        self.count = count
+        self.pause = pause
+
+    async def _generator_process(self, context, data_in):
+        for index in range(self.count):
+            if self.pause:
+                await asyncio.sleep(self.pause)
+            yield {"index": index}
+
+
+class BatchBodyTask(Task):
+    class InputModel(BaseModel):
+        index: int
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.batches = []
+
+    async def _process(self, context, data_in):
+        return {"index": data_in["index"], "squared": data_in["index"] ** 2}
+
+    async def _process_batch(self, context, data_in_list):
+        self.batches.append([data_in["index"] for data_in in data_in_list])
+        return [await self._process(context, data_in) for data_in in data_in_list]
+
+
+class SingleItemTask(Task):
+    class InputModel(BaseModel):
+        index: int
+        squared: int
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.received = []
+
+    async def _process(self, context, data_in):
+        self.received.append((data_in["index"], data_in["squared"]))
+        return data_in
+
+
+def run_batched(dag_id: str, batch_size: int, batch_wait: float, **items_params):
+    with TaskDAG(id=dag_id) as dag:
+        items = ItemsTask(id="items", **items_params)
+        body = BatchBodyTask(id="body")
+        single = SingleItemTask(id="single")
+
+        items >> body >> single
+        dag.set_loop_policy(items, body, batch_size=batch_size, batch_wait=batch_wait)
+
+    asyncio.run(global_context.run_dag(dag, {}, CompositeContext(global_context)))
+
+    return body, single, dag
+
+
+def test_items_are_delivered_in_batches():
+    body, single, dag = run_batched("batched_edges_size", 4, 10.0)
+
+    assert body.batches == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+    # the single item task is adapted to the batch
+    assert sorted(single.received) == [(i, i * i) for i in range(10)]
+
+    stats = dag.loop_windows_stats()["items::body"]
+    assert stats["items"] == 10
+    assert stats["iterations"] == 3
+
+
+def test_partial_batch_is_flushed_after_wait():
+    body, single, dag = run_batched("batched_edges_wait", 8, 0.01, count=3, pause=0.05)
+
+    assert [len(batch) for batch in body.batches] == [1, 1, 1]
+    assert sorted(single.received) == [(i, i * i) for i in range(3)]
+
+
+def test_batch_policy_serialization():
+    policy = LoopPolicy.deserialize(
+        LoopPolicy(2, batch_size=16, batch_wait=0.5).serialize()
+    )
+
+    assert policy.is_batched
+    assert policy.batch_size == 16
+    assert policy.batch_wait == 0.5
+    assert not LoopPolicy.deserialize({"max_in_flight": 1, "ordered": False}).is_batched
@@ -0,0 +1,203 @@
+import asyncio
+import os
+import pathlib
+
+import pytest
+from pydantic import BaseModel
+
+from core.context.composite_context import CompositeContext
+from core.context.global_context import GlobalContext
+from core.managers.checkpoint_manager import (
+    POSITION_RECORD,
+    CheckpointManager,
+    DiskCheckpointStore,
+)
+from core.tasks.task import Task
+from core.tasks.task_dag import TaskDAG
+
+os.environ["P6_LOAD_PERSIST_MODELS"] = "False"
+os.environ["P6_RUN_MODE"] = "TEST"
+
+os.chdir(os.path.join(pathlib.Path(__file__).parent, "../src"))
+global_context = GlobalContext.get_instance()
+
+
+class CountTask(Task):
+    class InputModel(BaseModel):
+        value: int
+
+    def __init__(self, calls: list, fail: bool = False, **kwargs):
+        super().__init__(**kwargs)
+        self.calls = calls
+        self.fail = fail
+
+    async def _process(self, context, data_in):
+        self.calls.append(self.id)
+        if self.fail:
+            raise RuntimeError(f"{self.id} failed")
+
+        return {"value": data_in["value"] + 1}
+
+
+class ItemsTask(Task):
+    class InputModel(BaseModel):
+        value: int
+
+    async def _generator_process(self, context, data_in):
+        for index in range(6):
+            yield {"value": index}
+
+
+class BodyTask(Task):
+    class InputModel(BaseModel):
+        value: int
+
+    def __init__(self, received: list, fail_on: int = -1, **kwargs):
+        super().__init__(**kwargs)
+        self.received = received
+        self.fail_on = fail_on
+
+    async def _process(self, context, data_in):
+        if data_in["value"] == self.fail_on:
+            raise RuntimeError(f"item {self.fail_on} failed")
+
+        self.received.append(data_in["value"])
+        return data_in
+
+
+class ManyItemsTask(Task):
+    class InputModel(BaseModel):
+        value: int
+
+    def __init__(self, yielded: list, **kwargs):
+        super().__init__(**kwargs)
+        self.yielded = yielded
+
+    async def _generator_process(self, context, data_in):
+        for index in range(12):
+            self.yielded.append(index)
+            yield {"value": index}
+
+
+class SlowBodyTask(BodyTask):
+    async def _process(self, context, data_in):
+        # the first item of each window finishes last, the window stays full
+        await asyncio.sleep(0.005 * (3 - data_in["value"] % 3))
+        return await super()._process(context, data_in)
+
+
+@pytest.fixture
+def checkpoint_manager(tmp_path, monkeypatch):
+    manager = CheckpointManager(DiskCheckpointStore(str(tmp_path)), position_interval=0)
+    monkeypatch.setattr(global_context, "_checkpoint_manager", manager)
+
+    return manager
+
+
+def build_chain(calls: list, fail: bool) -> TaskDAG:
+    with TaskDAG(id="checkpoint_chain", checkpoint=True) as dag:
+        first = CountTask(calls, id="first")
+        second = CountTask(calls, fail=fail, id="second")
+        third = CountTask(calls, id="third")
+
+        first >> second >> third
+
+    return dag
+
+
+def run(dag: TaskDAG, data: dict, resume: bool = False) -> None:
+    asyncio.run(
+        global_context.run_dag(
+            dag, data, CompositeContext(global_context), resume=resume
+        )
+    )
+
+
+def test_resume_skips_finished_tasks(checkpoint_manager):
+    calls = []
+    run(build_chain(calls, fail=True), {"value": 0})
+
+    assert calls == ["first", "second"]
+    assert checkpoint_manager.has_run("checkpoint_chain")
+
+    calls.clear()
+    # the recorded input is used on resume
+    run(build_chain(calls, fail=False), {"value": 100}, resume=True)
+
+    assert calls == ["second", "third"]
+    assert not checkpoint_manager.has_run("checkpoint_chain")
+
+
+def test_finished_run_deletes_its_checkpoint(checkpoint_manager):
+    calls = []
+    run(build_chain(calls, fail=False), {"value": 0})
+
+    assert calls == ["first", "second", "third"]
+    assert not checkpoint_manager.has_run("checkpoint_chain")
+
+    # nothing to resume, the run is refused
+    calls.clear()
+    run(build_chain(calls, fail=False), {"value": 0}, resume=True)
+
+    assert calls == []
+
+
+def test_resume_skips_handed_over_items(checkpoint_manager):
+    def build(received: list, fail_on: int) -> TaskDAG:
+        with TaskDAG(id="checkpoint_loop", checkpoint=True) as dag:
+            ItemsTask(id="items") >> BodyTask(received, fail_on=fail_on, id="body")
+
+        return dag
+
+    received = []
+    run(build(received, fail_on=3), {"value": 0})
+
+    # the failed item stops the position of the generator
+    assert received == [0, 1, 2, 4, 5]
+    assert checkpoint_manager.has_run("checkpoint_loop")
+
+    received = []
+    run(build(received, fail_on=-1), {"value": 0}, resume=True)
+
+    assert received == [3, 4, 5]
+    assert checkpoint_manager.stats()["writes"] > 0
+
+
+def test_positions_are_saved_while_the_window_is_full(checkpoint_manager, monkeypatch):
+    yielded = []
+    positions = []
+    write = checkpoint_manager.write
+
+    async def recording_write(run_id, kind, task_id, value):
+        if kind == POSITION_RECORD:
+            positions.append((value, len(yielded)))
+        return await write(run_id, kind, task_id, value)
+
+    monkeypatch.setattr(checkpoint_manager, "write", recording_write)
+
+    def build(received: list, fail_on: int) -> TaskDAG:
+        with TaskDAG(id="checkpoint_window", checkpoint=True) as dag:
+            items = ManyItemsTask(yielded, id="items")
+            body = SlowBodyTask(received, fail_on=fail_on, id="body")
+
+            items >> body
+            dag.set_loop_policy(items, body, max_in_flight=3)
+
+        return dag
+
+    received = []
+    run(build(received, fail_on=7), {"value": 0})
+
+    assert sorted(received) == [0, 1, 2, 3, 4, 5, 6, 8, 9, 10, 11]
+    # the low watermark moves on while the generator is ahead of the body,
+    # and stops before the failed item
+    assert any(count < 12 for position, count in positions if position)
+    assert [position for position, _ in positions] == sorted(
+        position for position, _ in positions
+    )
+    assert positions[-1][0] == 7
+
+    received = []
+    run(build(received, fail_on=-1), {"value": 0}, resume=True)
+
+    assert sorted(received) == [7, 8, 9, 10, 11]
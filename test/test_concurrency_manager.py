@@ -0,0 +1,117 @@
+import asyncio
+import threading
+
+from core.managers.concurrency_manager import (
+    AsyncConcurrencyLimiter,
+    ConcurrencyManager,
+)
+
+
+def test_parse_limits():
+    limits = ConcurrencyManager.parse_limits("arxiv-api=1; gpu-less CPU heavy=2;")
+
+    assert limits == {"arxiv-api": 1, "gpu-less CPU heavy": 2}
+    assert ConcurrencyManager.parse_limits(None) == {}
+
+
+def test_limiter_does_not_block_loop():
+    limiter = AsyncConcurrencyLimiter("test", 1)
+    ticks = []
+
+    async def hold():
+        async with limiter:
+            await asyncio.sleep(0.05)
+
+    async def ticker():
+        for _ in range(5):
+            ticks.append(limiter.queue_depth)
+            await asyncio.sleep(0.01)
+
+    async def main():
+        await asyncio.gather(hold(), hold(), hold(), ticker())
+
+    asyncio.run(main())
+
+    # the loop kept running while two coroutines were queued
+    assert len(ticks) == 5
+    assert max(ticks) == 2
+
+    stats = limiter.as_json()
+    assert stats["acquired"] == 3
+    assert stats["waited"] == 2
+    assert stats["inFlight"] == 0
+    assert stats["maxQueueDepth"] == 2
+
+
+def test_limiter_is_fair():
+    limiter = AsyncConcurrencyLimiter("fair", 1)
+    order = []
+
+    async def worker(index: int):
+        async with limiter:
+            order.append(index)
+            await asyncio.sleep(0)
+
+    async def main():
+        await asyncio.gather(*(worker(index) for index in range(10)))
+
+    asyncio.run(main())
+
+    assert order == list(range(10))
+
+
+def test_limiter_cancelled_waiter():
+    limiter = AsyncConcurrencyLimiter("cancel", 1)
+
+    async def main():
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.sleep(0)
+        limiter.release()
+
+        assert limiter.in_flight == 0
+        assert limiter.queue_depth == 0
+
+        await asyncio.wait_for(limiter.acquire(), 1)
+        limiter.release()
+
+    asyncio.run(main())
+
+
+def test_limiter_across_loops():
+    limiter = AsyncConcurrencyLimiter("threads", 2)
+    lock = threading.Lock()
+    running = [0]
+    max_running = [0]
+
+    async def work():
+        async with limiter:
+            with lock:
+                running[0] += 1
+                max_running[0] = max(max_running[0], running[0])
+            await asyncio.sleep(0.02)
+            with lock:
+                running[0] -= 1
+
+    threads = [threading.Thread(target=asyncio.run, args=(work(),)) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert max_running[0] == 2
+    assert limiter.in_flight == 0
+
+
+def test_manager_resources():
+    manager = ConcurrencyManager({"arxiv-api": 2})
+
+    assert manager.get("arxiv-api").limit == 2
+    assert manager.get("unknown") is None
+    assert manager.get("unknown", 3).limit == 3
+
+    manager.configure("arxiv-api", 4)
+    assert manager.get("arxiv-api").limit == 4
+    assert {stat["name"] for stat in manager.stats()} == {"arxiv-api", "unknown"}
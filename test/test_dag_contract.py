@@ -0,0 +1,200 @@
+import os
+import pathlib
+import time
+from typing import Optional
+
+from core.context.global_context import GlobalContext
+from core.tasks.task import Task
+from core.tasks.task_dag import TaskDAG
+from core.tasks.task_data import TaskDataContract
+
+os.environ["P6_LOAD_PERSIST_MODELS"] = "False"
+os.environ["P6_RUN_MODE"] = "TEST"
+
+os.chdir(os.path.join(pathlib.Path(__file__).parent, "../src"))
+global_context = GlobalContext.get_instance()
+
+
+class ContractTestTask(Task):
+
+    def required_inputs(self) -> TaskDataContract:
+        return TaskDataContract({key: int for key in self._params.get("inputs", [])})
+
+    def provided_outputs(
+        self, parent_task_output: Optional[TaskDataContract] = None
+    ) -> TaskDataContract:
+        self_contract = TaskDataContract(
+            {key: int for key in self._params.get("outputs", [])}
+        )
+        if parent_task_output and self.is_passthrough:
+            cpy = parent_task_output.copy()
+            cpy.add_all(self_contract)
+            return cpy
+
+        return self_contract
+
+    async def _process(self, context, data_in):
+        return data_in
+
+
+def legacy_required_inputs(dag: TaskDAG) -> TaskDataContract:
+    # path walking implementation the analysis replaced
+
+    def provided(task):
+        parent_nodes = dag.task_node_map[task.id].parent_nodes
+        if not parent_nodes:
+            return task.provided_outputs()
+
+        parents_contract = TaskDataContract()
+        for parent_node in parent_nodes:
+            parents_contract.add_all(
+                provided(dag.task_node_map[parent_node.from_id].task)
+            )
+        return task.provided_outputs(parents_contract)
+
+    def required(task):
+        contract = task.required_inputs()
+        for parent_node in dag.task_node_map[task.id].parent_nodes:
+            parent_task = dag.task_node_map[parent_node.from_id].task
+            contract.subtract_all(provided(parent_task))
+            contract.add_all(required(parent_task))
+        return contract
+
+    full_contract = TaskDataContract()
+    for leaf_task in dag.get_leaf_tasks():
+        full_contract.add_all(required(leaf_task))
+    return full_contract
+
+
+def build_deep_diamond(dag_id: str, depth: int, passthrough: bool = False) -> TaskDAG:
+    with TaskDAG(id=dag_id) as dag:
+        previous = ContractTestTask(
+            id="root", inputs=["seed"], outputs=["level_0"], is_passthrough=passthrough
+        )
+        for level in range(depth):
+            left = ContractTestTask(
+                id=f"left_{level}",
+                inputs=[f"level_{level}", f"left_extra_{level}"],
+                outputs=[f"left_{level}"],
+                is_passthrough=passthrough,
+            )
+            right = ContractTestTask(
+                id=f"right_{level}",
+                inputs=[f"level_{level}"],
+                outputs=[f"right_{level}"],
+                is_passthrough=passthrough,
+            )
+            join = ContractTestTask(
+                id=f"join_{level}",
+                inputs=[f"left_{level}", f"right_{level}"],
+                outputs=[f"level_{level + 1}"],
+                is_passthrough=passthrough,
+            )
+            previous >> left >> join
+            previous >> right >> join
+            previous = join
+
+    return dag
+
+
+def build_wide_diamond(dag_id: str, width: int) -> TaskDAG:
+    with TaskDAG(id=dag_id) as dag:
+        root = ContractTestTask(id="root", inputs=["seed"], outputs=["start"])
+        sink = ContractTestTask(
+            id="sink", inputs=[f"branch_{index}" for index in range(width)]
+        )
+        for index in range(width):
+            branch = ContractTestTask(
+                id=f"branch_{index}",
+                inputs=["start", f"extra_{index}"],
+                outputs=[f"branch_{index}"],
+            )
+            root >> branch >> sink
+
+    return dag
+
+
+def test_matches_legacy_analysis():
+    for passthrough in (False, True):
+        dag = build_deep_diamond(f"contract_small_{passthrough}", 4, passthrough)
+
+        expected = legacy_required_inputs(dag)
+        contract = dag.get_required_inputs()
+
+        assert list(contract.contract_dict.keys()) == list(
+            expected.contract_dict.keys()
+        )
+        assert set(contract.contract_dict.keys()) == {"seed"} | {
+            f"left_extra_{level}" for level in range(4)
+        }
+
+
+def test_cache_and_invalidation():
+    dag = build_deep_diamond("contract_cache", 2)
+
+    analysis = dag.contract_analysis
+    assert dag.contract_analysis is analysis
+
+    # returned contracts are copies
+    dag.get_required_inputs().contract_dict.clear()
+    assert "seed" in dag.get_required_inputs().contract_dict
+
+    with dag:
+        dag.task_node_map["join_1"].task >> ContractTestTask(
+            id="tail", inputs=["level_2", "tail_extra"]
+        )
+
+    assert dag.contract_analysis is not analysis
+    assert "tail_extra" in dag.get_required_inputs().contract_dict
+
+
+def test_deep_diamond_stress():
+    dag = build_deep_diamond("contract_deep", 200)
+
+    start = time.perf_counter()
+    contract = dag.get_required_inputs()
+    elapsed = time.perf_counter() - start
+
+    # 2 ** 200 paths, the legacy recursion would never return
+    assert len(contract.contract_dict) == 201
+    assert elapsed < 5
+
+
+def test_wide_diamond_stress():
+    dag = build_wide_diamond("contract_wide", 2000)
+
+    start = time.perf_counter()
+    contract = dag.get_required_inputs()
+    elapsed = time.perf_counter() - start
+
+    assert set(contract.contract_dict.keys()) == {"seed"} | {
+        f"extra_{index}" for index in range(2000)
+    }
+    assert elapsed < 5
+
+
+def test_invalidation_follows_called_dags():
+    from core.tasks.dag_calling_task import DAGCallingTask
+
+    with TaskDAG(id="contract_called") as called:
+        ContractTestTask(id="called", inputs=["called_input"])
+
+    with TaskDAG(id="contract_caller") as caller:
+        DAGCallingTask("contract_called", id="call")
+
+    unrelated = build_deep_diamond("contract_unrelated", 1)
+
+    analysis = caller.contract_analysis
+    assert "called_input" in caller.get_required_inputs().contract_dict
+
+    # jobs and unrelated DAGs don't invalidate the analysis
+    unrelated.clone()
+    with unrelated:
+        ContractTestTask(id="unrelated_tail")
+    assert caller.contract_analysis is analysis
+
+    with called:
+        ContractTestTask(id="called_extra", inputs=["extra_input"])
+
+    assert caller.contract_analysis is not analysis
+    assert "extra_input" in caller.get_required_inputs().contract_dict
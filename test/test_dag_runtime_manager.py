@@ -0,0 +1,102 @@
+import asyncio
+import threading
+
+import pytest
+
+from core.managers.dag_runtime_manager import DagRuntimeManager, RuntimeSaturatedError
+
+
+def test_runtime_reuses_loop_threads():
+    runtime = DagRuntimeManager(loop_count=2, max_in_flight=4)
+
+    async def thread_name():
+        await asyncio.sleep(0.01)
+        return threading.current_thread().name
+
+    futures = [runtime.submit(thread_name()) for _ in range(20)]
+    names = {future.result(timeout=5) for future in futures}
+
+    assert names <= {"dag-runtime-0", "dag-runtime-1"}
+    assert runtime.shutdown(timeout=5)
+
+    stats = runtime.stats()
+    assert stats["submitted"] == 20
+    assert stats["completed"] == 20
+
+
+def test_runtime_affinity_key():
+    runtime = DagRuntimeManager(loop_count=4)
+
+    async def current_loop():
+        return id(asyncio.get_running_loop())
+
+    loops = {
+        runtime.submit(current_loop(), key="dag").result(timeout=5) for _ in range(8)
+    }
+
+    assert len(loops) == 1
+    runtime.shutdown(timeout=5)
+
+
+def test_runtime_admission_control():
+    runtime = DagRuntimeManager(loop_count=1, max_in_flight=1, max_queued=1)
+    release = threading.Event()
+    max_running = [0]
+    running = [0]
+
+    async def blocked():
+        running[0] += 1
+        max_running[0] = max(max_running[0], running[0])
+        while not release.is_set():
+            await asyncio.sleep(0.01)
+        running[0] -= 1
+
+    first = runtime.submit(blocked())
+    second = runtime.submit(blocked())
+
+    coroutine = blocked()
+    with pytest.raises(RuntimeSaturatedError):
+        runtime.submit(coroutine)
+
+    assert runtime.queued == 1
+
+    release.set()
+    first.result(timeout=5)
+    second.result(timeout=5)
+
+    assert max_running[0] == 1
+    assert runtime.stats()["rejected"] == 1
+    runtime.shutdown(timeout=5)
+
+
+def test_runtime_graceful_drain():
+    runtime = DagRuntimeManager(loop_count=2)
+    done = []
+
+    async def work(index: int):
+        await asyncio.sleep(0.05)
+        done.append(index)
+
+    for index in range(5):
+        runtime.submit(work(index))
+
+    assert runtime.shutdown(timeout=5)
+    assert sorted(done) == list(range(5))
+
+    coroutine = work(6)
+    runtime.start()
+    runtime.submit(coroutine).result(timeout=5)
+    runtime.shutdown(timeout=5)
+
+
+def test_runtime_exception_propagation():
+    runtime = DagRuntimeManager(loop_count=1)
+
+    async def failing():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        runtime.submit(failing()).result(timeout=5)
+
+    assert runtime.stats()["failed"] == 1
+    runtime.shutdown(timeout=5)
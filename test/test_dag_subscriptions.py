@@ -0,0 +1,197 @@
+import asyncio
+import os
+import pathlib
+import threading
+
+import pytest
+
+from core.callbacks.dag_execution_memory import DagExecutionMemory
+from core.callbacks.dag_subscription import (
+    ENCODING_JSON,
+    ENCODING_MSGPACK,
+    SubscriptionLog,
+    available_encoding,
+)
+from core.callbacks.dag_ws_callback_handler import DagWebsocketCallbackHandler
+from core.context.composite_context import CompositeContext
+from core.context.global_context import GlobalContext
+from core.managers.memory_flush_manager import MemoryFlushManager
+from core.tasks.task import Task
+from core.tasks.task_dag import TaskDAG
+
+os.environ["P6_LOAD_PERSIST_MODELS"] = "False"
+os.environ["P6_RUN_MODE"] = "TEST"
+
+os.chdir(os.path.join(pathlib.Path(__file__).parent, "../src"))
+global_context = GlobalContext.get_instance()
+
+
+class FakeSocket:
+    def __init__(self):
+        self.sent = []
+
+    def send(self, data, to=None):
+        self.sent.append((to, data))
+
+
+class NoopTask(Task):
+    async def _process(self, context, data_in):
+        return data_in
+
+
+class Room:
+    """A running DAG, its memory and the subscribers of its room"""
+
+    def __init__(self, dag_id: str):
+        with TaskDAG(id=dag_id) as self.dag:
+            self.task = NoopTask(id="task")
+
+        self.socket = FakeSocket()
+        self.flush_manager = MemoryFlushManager(interval=60)
+        self.memory = DagExecutionMemory(dag_id, flush_manager=self.flush_manager)
+
+        self.run_context = CompositeContext(global_context)
+        self.run_context.create_local_context(
+            callbacks=[
+                self.memory,
+                DagWebsocketCallbackHandler(self.socket, f"dag_{dag_id}"),
+            ]
+        )
+
+    async def subscribe(self, sid, seq=None, encoding=ENCODING_JSON):
+        context = CompositeContext(global_context)
+        context.create_local_context(
+            callbacks=[
+                self.memory,
+                DagWebsocketCallbackHandler(self.socket, sid, encoding=encoding),
+            ]
+        )
+        await context.event(
+            self.dag, "subscription", {"seq": seq, "encoding": encoding}
+        )
+
+    async def step(self, value):
+        await self.run_context.event(self.task, "data", {"value": value})
+        await self.flush_manager.flush()
+
+    def received(self, to):
+        return [data["payload"] for sent_to, data in self.socket.sent if sent_to == to]
+
+
+def test_subscription_log():
+    log = SubscriptionLog(history=2)
+
+    assert log.since(0) == []
+    for index in range(3):
+        log.append({"index": index})
+
+    assert log.seq == 3
+    assert log.since(3) == []
+    assert [seq for seq, _ in log.since(1)] == [2, 3]
+    assert log.since(0) is None
+    assert log.since(4) is None
+
+    log.clear()
+    assert log.since(3) is None
+
+
+def test_subscribers_get_a_snapshot_then_deltas():
+    room = Room("subscriptions_snapshot")
+
+    async def run():
+        await room.subscribe("first")
+        for value in range(3):
+            await room.step(value)
+
+    asyncio.run(run())
+
+    (snapshot,) = room.received("first")
+    assert snapshot["snapshot"] and snapshot["seq"] == 0
+    assert snapshot["encoding"] == ENCODING_JSON
+
+    deltas = room.received("dag_subscriptions_snapshot")
+    assert [delta["seq"] for delta in deltas] == [1, 2, 3]
+    assert deltas[-1]["values"] == [
+        {"task": room.task.full_id, "id": "value", "data": 2}
+    ]
+
+
+def test_reconnecting_subscribers_resume_from_their_sequence():
+    room = Room("subscriptions_resume")
+
+    async def run():
+        await room.subscribe("first")
+        for value in range(5):
+            await room.step(value)
+
+        await room.subscribe("resumed", seq=3)
+        await room.subscribe("late", seq=-1)
+
+    asyncio.run(run())
+
+    assert [delta["seq"] for delta in room.received("resumed")] == [4, 5]
+    assert "snapshot" not in room.received("resumed")[0]
+
+    (snapshot,) = room.received("late")
+    assert snapshot["snapshot"] and snapshot["seq"] == 5
+
+
+def test_pending_changes_are_sequenced_before_the_snapshot():
+    room = Room("subscriptions_pending")
+
+    async def run():
+        await room.subscribe("first")
+        await room.run_context.event(room.task, "data", {"value": 1})
+        await room.subscribe("second")
+
+    asyncio.run(run())
+
+    (delta,) = room.received("dag_subscriptions_pending")
+    (snapshot,) = room.received("second")
+    assert delta["seq"] == snapshot["seq"] == 1
+
+
+def test_room_deltas_wait_for_a_joining_subscriber():
+    room = Room("subscriptions_joining")
+
+    async def run():
+        await room.subscribe("first")
+        await room.run_context.event(room.task, "data", {"value": 1})
+
+    asyncio.run(run())
+
+    # the subscribe handler joins the room under the room lock
+    with room.memory.room_lock:
+        flush = threading.Thread(target=asyncio.run, args=(room.flush_manager.flush(),))
+        flush.start()
+        flush.join(timeout=0.2)
+        assert flush.is_alive()
+
+        asyncio.run(room.subscribe("second"))
+
+    flush.join()
+    room.flush_manager.shutdown()
+
+    (snapshot,) = room.received("second")
+    assert snapshot["seq"] == 1
+    assert [delta["seq"] for delta in room.received("dag_subscriptions_joining")] == [1]
+
+
+def test_msgpack_subscribers():
+    msgpack = pytest.importorskip("msgpack")
+    assert available_encoding(ENCODING_MSGPACK) == ENCODING_MSGPACK
+
+    room = Room("subscriptions_msgpack")
+
+    async def run():
+        await room.subscribe("binary", encoding=ENCODING_MSGPACK)
+        await room.step(1)
+
+    asyncio.run(run())
+
+    sent = dict(room.socket.sent)
+    snapshot = msgpack.unpackb(sent["binary"])["payload"]
+    delta = msgpack.unpackb(sent["dag_subscriptions_msgpack/msgpack"])["payload"]
+
+    assert snapshot["snapshot"] and snapshot["encoding"] == ENCODING_MSGPACK
+    assert delta["seq"] == 1
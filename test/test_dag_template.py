@@ -0,0 +1,88 @@
+import os
+import pathlib
+
+from pydantic import BaseModel
+
+from core.context.global_context import GlobalContext
+from core.tasks.task import Task
+from core.tasks.task_dag import TaskDAG
+from core.tasks.types import Status
+
+os.environ["P6_LOAD_PERSIST_MODELS"] = "False"
+os.environ["P6_RUN_MODE"] = "TEST"
+
+os.chdir(os.path.join(pathlib.Path(__file__).parent, "../src"))
+global_context = GlobalContext.get_instance()
+
+
+class TemplateTestTask(Task):
+    class InputModel(BaseModel):
+        value: int = 0
+
+    async def _process(self, context, data_in):
+        return data_in
+
+
+def build_dag(dag_id: str) -> TaskDAG:
+    with TaskDAG(id=dag_id) as dag:
+        first = TemplateTestTask(id="first")
+        second = TemplateTestTask(id="second", label="Second")
+        third = TemplateTestTask(id="third")
+
+        first >> second >> third
+        first >> third
+
+    return dag
+
+
+def test_clone_shares_definitions():
+    dag = build_dag("template_share")
+
+    first_task = dag.task_node_map["first"].task
+    first_task.set_data("key", {"data": 1})
+
+    clone = dag.clone()
+
+    assert clone.id.startswith("template_share:")
+    assert clone.parent_id == "template_share"
+    assert global_context.dag_manager.get(clone.id) is clone
+    assert list(clone.task_node_map.keys()) == ["first", "second", "third"]
+
+    cloned_first = clone.task_node_map["first"].task
+    assert cloned_first is not first_task
+    assert cloned_first.dag() is clone
+    assert cloned_first.full_id == f"{clone.id}::first"
+    assert cloned_first.data == {}
+    assert cloned_first.status == Status.IDLE
+    assert cloned_first._input_model is first_task._input_model
+
+    second_node = dag.task_node_map["second"]
+    cloned_second_node = clone.task_node_map["second"]
+    assert cloned_second_node.task.label == "Second"
+    assert cloned_second_node.sub_nodes is not second_node.sub_nodes
+    assert cloned_second_node.sub_nodes[0] is second_node.sub_nodes[0]
+
+
+def test_clone_edges_are_copy_on_write():
+    dag = build_dag("template_cow")
+    clone = dag.clone()
+
+    clone.remove_parent_task("third", clone.task_node_map["first"].task)
+
+    assert len(clone.task_node_map["first"].sub_nodes) == 1
+    assert len(dag.task_node_map["first"].sub_nodes) == 2
+    assert len(dag.clone().task_node_map["first"].sub_nodes) == 2
+
+
+def test_template_invalidation():
+    dag = build_dag("template_invalidation")
+    template = dag.template
+
+    assert dag.template is template
+
+    with dag:
+        fourth = TemplateTestTask(id="fourth")
+        dag.task_node_map["third"].task >> fourth
+
+    assert dag.template is not template
+    assert "fourth" in dag.clone().task_node_map
@@ -0,0 +1,52 @@
+import asyncio
+import os
+import pathlib
+
+import pytest
+
+from conf import Config
+from core.managers.dbms_manager import DBMSManager
+from misc.asyncio import run_managed
+
+os.environ["P6_LOAD_PERSIST_MODELS"] = "False"
+os.environ["P6_RUN_MODE"] = "TEST"
+
+os.chdir(os.path.join(pathlib.Path(__file__).parent, "../src"))
+
+
+def test_async_client_per_event_loop(monkeypatch):
+    # clients connect lazily, no server is needed
+    monkeypatch.setitem(Config().final_var, "MONGODB_URI", "mongodb://localhost:27017")
+
+    dbms = DBMSManager()
+
+    async def get_clients():
+        assert dbms.get_async("elasticsearch") is None
+        return dbms.get_async("mongodb"), dbms.get_async("mongodb")
+
+    first, same = run_managed(get_clients())
+    other, _ = run_managed(get_clients())
+
+    # motor clients can't be shared across event loops
+    assert first is same
+    assert first is not other
+    assert first.io_loop is not other.io_loop
+
+    # and are closed with their event loop
+    assert first.delegate._closed and other.delegate._closed
+    assert not dbms._loaded_async_dbms
+
+
+def test_async_clients_need_a_managed_loop(monkeypatch):
+    monkeypatch.setitem(Config().final_var, "MONGODB_URI", "mongodb://localhost:27017")
+
+    dbms = DBMSManager()
+
+    async def get_client():
+        return dbms.get_async("mongodb")
+
+    # nothing would close the client of an unmanaged loop
+    with pytest.raises(RuntimeError):
+        asyncio.run(get_client())
+
+    assert not dbms._loaded_async_dbms
@@ -0,0 +1,127 @@
+import json
+import os
+import pathlib
+import threading
+from types import SimpleNamespace
+
+import pytest
+from elasticsearch import Elasticsearch, helpers
+
+from core.context.global_context import GlobalContext
+from core.database.elasticsearch import EsIndexHandler
+from core.models.a_model import AModel
+
+os.environ["P6_LOAD_PERSIST_MODELS"] = "False"
+os.environ["P6_RUN_MODE"] = "TEST"
+
+os.chdir(os.path.join(pathlib.Path(__file__).parent, "../src"))
+global_context = GlobalContext.get_instance()
+
+
+class FakeBulkClient:
+    """Patched over Elasticsearch, answers bulk requests without a server"""
+
+    def __init__(self, failing_ids=()):
+        self.failing_ids = set(failing_ids)
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def bulk(self, client, *args, operations=None, **kwargs):
+        with self.lock:
+            self.requests.append((operations, kwargs))
+
+        items = []
+        for action_line in operations[::2]:
+            action = json.loads(action_line)["index"]
+            object_id = action.get("_id", f"generated_{len(items)}")
+            if object_id in self.failing_ids:
+                items.append(
+                    {"index": {"_id": object_id, "status": 400, "error": "mapping"}}
+                )
+            else:
+                items.append({"index": {"_id": object_id, "status": 201}})
+
+        return SimpleNamespace(body={"errors": bool(self.failing_ids), "items": items})
+
+
+@pytest.fixture
+def fake_bulk(monkeypatch):
+    fake = FakeBulkClient(failing_ids={"doc_3"})
+    monkeypatch.setattr(
+        Elasticsearch,
+        "bulk",
+        lambda client, *args, **kwargs: fake.bulk(client, *args, **kwargs),
+    )
+    return fake
+
+
+def build_models(count):
+    return [AModel(_id=f"doc_{index}", label=f"Doc {index}") for index in range(count)]
+
+
+@pytest.mark.parametrize("thread_count", [1, 3])
+def test_bulk_insert_chunks_and_reports_errors(fake_bulk, thread_count):
+    handler = EsIndexHandler(Elasticsearch("http://localhost:9200"), "test_index")
+    models = build_models(10)
+
+    report = handler.insert_objects(
+        global_context,
+        models,
+        "test_index",
+        chunk_size=4,
+        thread_count=thread_count,
+        refresh="wait_for",
+        raise_on_error=False,
+    )
+
+    assert len(fake_bulk.requests) == 3
+    assert all(kwargs["refresh"] == "wait_for" for _, kwargs in fake_bulk.requests)
+
+    assert report.indexed == 9
+    assert len(report.errors) == 1
+    assert report.errors[0][0] is models[3]
+    assert report.errors[0][1]["error"] == "mapping"
+
+
+def test_bulk_insert_raises_on_error(fake_bulk):
+    handler = EsIndexHandler(Elasticsearch("http://localhost:9200"), "test_index")
+
+    with pytest.raises(helpers.BulkIndexError):
+        handler.insert_objects(
+            global_context, build_models(5), "test_index", refresh="false"
+        )
+
+
+def test_load_multiples_uses_mget(monkeypatch):
+    requests = []
+
+    def mget(client, index, ids):
+        requests.append(ids)
+        return {
+            "docs": [
+                (
+                    {"_id": object_id, "found": True, "_source": {"label": object_id}}
+                    if object_id != "missing"
+                    else {"_id": object_id, "found": False}
+                )
+                for object_id in ids
+            ]
+        }
+
+    monkeypatch.setattr(Elasticsearch, "mget", mget)
+    handler = EsIndexHandler(Elasticsearch("http://localhost:9200"), "test_index")
+
+    loaded = list(
+        handler.load_multiples(
+            "test_index",
+            {"_id": {"$in": ["a", "missing", "b", "c"]}},
+            as_model="amodel",
+            chunk_size=2,
+        )
+    )
+
+    assert requests == [["a", "missing"], ["b", "c"]]
+    assert [model.id for model in loaded] == ["a", "b", "c"]
+
+    with pytest.raises(ValueError):
+        list(handler.load_multiples("test_index", {"label": "a"}))
@@ -0,0 +1,120 @@
+import asyncio
+import os
+import pathlib
+
+from core.callbacks.callback_handler import CallbackHandler
+from core.callbacks.callback_manager import CallbackManager
+from core.callbacks.subscriptions import (
+    SENDER_DAG,
+    SENDER_STR,
+    SENDER_TASK,
+    callback_stats,
+    sender_kind,
+)
+from core.context.composite_context import CompositeContext
+from core.context.context import Context
+from core.context.global_context import GlobalContext
+from core.tasks.task import Task
+from core.tasks.task_dag import TaskDAG
+
+os.environ["P6_LOAD_PERSIST_MODELS"] = "False"
+os.environ["P6_RUN_MODE"] = "TEST"
+
+os.chdir(os.path.join(pathlib.Path(__file__).parent, "../src"))
+global_context = GlobalContext.get_instance()
+
+
+class RecordingHandler(CallbackHandler):
+    def __init__(self, events=None, senders=None, **kwargs):
+        super().__init__(**kwargs)
+        self.received = []
+        if events is not None:
+            self.EVENTS = frozenset(events)
+        if senders is not None:
+            self.SENDERS = frozenset(senders)
+
+    async def on_handled_event(
+        self, context, sender, event, payload, raw_payload=False
+    ):
+        self.received.append(event)
+        return False
+
+
+class SelfHandlingContext(Context):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.received = []
+
+    async def on_handled_event(
+        self, context, sender, event, payload, raw_payload=False
+    ):
+        self.received.append(event)
+        return False
+
+
+class NoopTask(Task):
+    async def _process(self, context, data_in):
+        return data_in
+
+
+def test_sender_kind():
+    with TaskDAG(id="subscriptions_kind") as dag:
+        task = NoopTask(id="task")
+
+    assert sender_kind(task) == SENDER_TASK
+    assert sender_kind(dag) == SENDER_DAG
+    assert sender_kind("global") == SENDER_STR
+    assert sender_kind(object()) == "object"
+
+
+def test_events_reach_subscribed_handlers_only():
+    with TaskDAG(id="subscriptions_dispatch"):
+        task = NoopTask(id="task")
+
+    data_handler = RecordingHandler(events={"data"}, senders={SENDER_TASK})
+    dag_handler = RecordingHandler(senders={SENDER_DAG})
+    any_handler = RecordingHandler()
+
+    context = CompositeContext(global_context)
+    context.create_local_context(callbacks=[data_handler])
+    context.create_local_context(callbacks=[dag_handler, any_handler])
+
+    async def send():
+        await context.event(task, "data", {"value": 1})
+        await context.event(task, "metrics", {"loss": 0.1})
+
+    asyncio.run(send())
+
+    assert data_handler.received == ["data"]
+    assert dag_handler.received == []
+    assert any_handler.received == ["data", "metrics"]
+
+    assert context.subscribes("metrics", SENDER_TASK)
+
+    data_context = CompositeContext(global_context)
+    data_context.create_local_context(callbacks=[data_handler])
+    assert data_context.subscribes("data", SENDER_TASK)
+    assert not data_context.subscribes("metrics", SENDER_TASK)
+
+    handlers = {(stat["handler"], stat["event"]) for stat in callback_stats()}
+    assert ("RecordingHandler", "data") in handlers
+
+
+def test_subscription_index_is_memoized():
+    handler = RecordingHandler(events={"data"})
+    manager = CallbackManager([handler])
+
+    assert manager.handlers_for("data", SENDER_TASK) == (handler,)
+    assert manager.handlers_for("data", SENDER_TASK) is manager.handlers_for(
+        "data", SENDER_TASK
+    )
+    assert manager.handlers_for("status", SENDER_TASK) == ()
+    assert not manager.subscribes("status", SENDER_TASK)
+
+
+def test_contexts_handling_events_themselves_receive_everything():
+    context = SelfHandlingContext()
+
+    asyncio.run(context.event("global", "anything", {}))
+
+    assert context.received == ["anything"]
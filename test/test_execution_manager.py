@@ -0,0 +1,170 @@
+import asyncio
+import os
+import pathlib
+import threading
+import time
+
+import pytest
+from pydantic import BaseModel
+
+from core.context.context import Context
+from core.context.global_context import GlobalContext
+from core.managers.execution_manager import ExecutionManager, ExecutionPool
+from core.tasks.task import Task
+from core.tasks.task_dag import TaskDAG
+from core.tasks.types import ExecutionMode
+
+os.environ["P6_LOAD_PERSIST_MODELS"] = "False"
+os.environ["P6_RUN_MODE"] = "TEST"
+
+os.chdir(os.path.join(pathlib.Path(__file__).parent, "../src"))
+global_context = GlobalContext.get_instance()
+
+
+class RecordingContext(Context):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.events = []
+
+    async def on_handled_event(
+        self, context, sender, event, payload, raw_payload=False
+    ):
+        self.events.append((sender, event, payload, threading.get_ident()))
+        return False
+
+
+class BlockingTask(Task):
+    EXECUTION_POOL = "thread"
+
+    class InputModel(BaseModel):
+        value: int = 0
+
+    async def _process(self, context, data_in):
+        time.sleep(0.2)
+        await context.event(self, "data", {"thread": threading.get_ident()})
+        return {"value": data_in["value"] + 1}
+
+
+class SleepingTask(Task):
+    EXECUTION_POOL = "thread"
+
+    cancelled = threading.Event()
+
+    async def _process(self, context, data_in):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            SleepingTask.cancelled.set()
+            raise
+        return data_in
+
+
+class ProcessTask(Task):
+    EXECUTION_POOL = "process"
+
+    async def _process(self, context, data_in):
+        await self.set_progress(context, 0.5)
+        return {"pid": os.getpid(), **data_in}
+
+
+def test_parse_pools():
+    assert ExecutionManager.parse_pools("training=process:1; io=thread:8") == {
+        "training": (ExecutionMode.PROCESS, 1),
+        "io": (ExecutionMode.THREAD, 8),
+    }
+    assert ExecutionManager.parse_task_pools("ArxivTrainTask=training") == {
+        "ArxivTrainTask": "training"
+    }
+
+    with pytest.raises(ValueError):
+        ExecutionManager.parse_pools("training=process")
+
+    with pytest.raises(ValueError):
+        ExecutionPool("loop", ExecutionMode.LOOP, 1)
+
+
+def test_thread_pool_keeps_loop_responsive():
+    with TaskDAG(id="execution_thread"):
+        task = BlockingTask(id="blocking")
+
+    context = RecordingContext()
+    ticks = []
+
+    async def ticker():
+        for _ in range(10):
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.01)
+
+    async def main():
+        result, _ = await asyncio.gather(task.process(context, {"value": 1}), ticker())
+        return result
+
+    loop_thread = threading.get_ident()
+    result = asyncio.run(main())
+
+    assert result == {"value": 2}
+    # the ticker kept running while the body slept
+    assert ticks[-1] - ticks[0] < 0.2
+
+    (sender, event, payload, event_thread) = context.events[0]
+    assert sender is task
+    assert event == "data"
+    assert payload["thread"] != loop_thread
+    # events are dispatched from the DAG loop
+    assert event_thread == loop_thread
+
+
+def test_thread_pool_cancellation():
+    with TaskDAG(id="execution_cancel"):
+        task = SleepingTask(id="sleeping")
+
+    async def main():
+        run = asyncio.ensure_future(task.process(RecordingContext(), {}))
+        await asyncio.sleep(0.1)
+        run.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await run
+
+    asyncio.run(main())
+
+    assert SleepingTask.cancelled.wait(1)
+
+    stats = global_context.execution_manager.pool("thread").as_json()
+    assert stats["cancelled"] >= 1
+    assert stats["running"] == 0
+
+
+def test_process_pool():
+    with TaskDAG(id="execution_process") as dag:
+        task = ProcessTask(id="process")
+
+    context = RecordingContext()
+    result = asyncio.run(task.process(context, {"value": 1}))
+
+    assert result["value"] == 1
+    assert result["pid"] != os.getpid()
+    # events of the worker process are emitted by the parent
+    assert [(sender, event) for sender, event, *_ in context.events] == [
+        (dag, "progress")
+    ]
+
+
+def test_task_pool_override():
+    execution_manager = ExecutionManager(
+        {"io": (ExecutionMode.THREAD, 2)}, {"BlockingTask": "io"}
+    )
+
+    with TaskDAG(id="execution_override"):
+        task = BlockingTask(id="blocking")
+
+    assert execution_manager.pool_for_task(task).name == "io"
+
+    class LoopTask(Task):
+        async def _process(self, context, data_in):
+            return data_in
+
+    with TaskDAG(id="execution_loop"):
+        loop_task = LoopTask(id="loop")
+
+    assert execution_manager.pool_for_task(loop_task) is None
+    execution_manager.shutdown()
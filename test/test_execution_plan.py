@@ -0,0 +1,126 @@
+import asyncio
+import os
+import pathlib
+
+from pydantic import BaseModel
+
+from core.context.composite_context import CompositeContext
+from core.context.global_context import GlobalContext
+from core.tasks.task import Task
+from core.tasks.task_dag import TaskDAG
+from core.tasks.types import TaskEdgeKind
+from tasks.round_robin_task import RoundRobinTask
+
+os.environ["P6_LOAD_PERSIST_MODELS"] = "False"
+os.environ["P6_RUN_MODE"] = "TEST"
+
+os.chdir(os.path.join(pathlib.Path(__file__).parent, "../src"))
+global_context = GlobalContext.get_instance()
+
+
+class AddTask(Task):
+    class InputModel(BaseModel):
+        value: int = 0
+
+    def __init__(self, increment: int = 1, **kwargs):
+        super().__init__(**kwargs)
+        self.increment = increment
+
+    async def _process(self, context, data_in):
+        return {self.id: data_in.get("value", 0) + self.increment}
+
+
+class SinkTask(Task):
+    class InputModel(BaseModel):
+        pass
+
+    def __init__(self, received: list, **kwargs):
+        super().__init__(**kwargs)
+        self.received = received
+
+    async def _process(self, context, data_in):
+        self.received.append(dict(data_in))
+        return data_in
+
+
+def build_diamond(received: list) -> TaskDAG:
+    with TaskDAG(id="plan_diamond") as dag:
+        left = AddTask(1, id="left")
+        right = AddTask(10, id="right")
+        sink = SinkTask(received, id="sink")
+
+        left >> sink
+        right >> sink
+
+    return dag
+
+
+def test_plan_indexes_the_structure():
+    dag = build_diamond([])
+    plan = dag.execution_plan
+
+    left, right, sink = (
+        plan.index_of(task_id) for task_id in ("left", "right", "sink")
+    )
+
+    assert plan.task_ids == ("left", "right", "sink")
+    assert plan.roots == (left, right)
+    assert plan.in_degree(sink) == 2
+    assert [parent for parent, _ in plan.parents(sink)] == [left, right]
+    assert [child for child, _ in plan.tasks_after(left)] == [sink]
+    assert plan.tasks_after(left, for_mode=TaskEdgeKind.LOOP_END) == ()
+    assert plan.edge_count == 2
+    assert plan.index_of("missing") is None
+    assert [task.id for task in dag.get_root_tasks()] == ["left", "right"]
+
+
+def test_plan_is_shared_by_clones_and_rebuilt_on_change():
+    dag = build_diamond([])
+    plan = dag.execution_plan
+
+    clone = dag.clone()
+    clone_plan = clone.execution_plan
+
+    assert clone_plan is not plan
+    assert clone_plan.parents(2) is plan.parents(2)
+    assert clone_plan.tasks[0] is clone.task_node_map["left"].task
+
+    with dag:
+        extra = AddTask(id="extra")
+        dag.task_node_map["sink"].task >> extra
+
+    assert dag.execution_plan is not plan
+    assert dag.execution_plan.in_degree(dag.execution_plan.index_of("extra")) == 1
+
+
+def test_fan_in_merges_parent_results():
+    received = []
+    dag = build_diamond(received)
+
+    asyncio.run(
+        global_context.run_dag(dag, {"value": 1}, CompositeContext(global_context))
+    )
+
+    assert received
+    assert all(data_in["left"] == 2 and data_in["right"] == 11 for data_in in received)
+
+
+def test_dynamic_routing_is_resolved_per_activation():
+    received = []
+    with TaskDAG(id="plan_round_robin") as dag:
+        first = AddTask(id="first")
+        router = RoundRobinTask(id="router")
+        left = SinkTask(received, id="left")
+        right = SinkTask(received, id="right")
+
+        first >> router
+        router >> left
+        router >> right
+
+    for _ in range(2):
+        asyncio.run(
+            global_context.run_dag(dag, {"value": 0}, CompositeContext(global_context))
+        )
+
+    assert dag.execution_plan.as_json()["dynamicRouting"] == ["router"]
+    assert len(received) == 2
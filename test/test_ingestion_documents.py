@@ -0,0 +1,91 @@
+import asyncio
+import datetime
+import os
+import pathlib
+
+from models.ingestion import IngestedDocument, Ingestion, IngestionStatus
+from models.ingestion_documents import IngestionDocumentStore
+
+os.environ["P6_LOAD_PERSIST_MODELS"] = "False"
+os.environ["P6_RUN_MODE"] = "TEST"
+
+os.chdir(os.path.join(pathlib.Path(__file__).parent, "../src"))
+
+UPDATED = datetime.datetime(2024, 5, 1, tzinfo=datetime.timezone.utc)
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self._rows = iter(rows)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._rows)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class FakeDocumentsCollection:
+    """Just enough of a motor collection for the store queries"""
+
+    def __init__(self):
+        self.rows = {}
+        self.bulk_writes = 0
+
+    async def create_index(self, *args, **kwargs):
+        pass
+
+    async def bulk_write(self, requests, ordered=True):
+        self.bulk_writes += 1
+        for request in requests:
+            key = (request._filter["ingestion_id"], request._filter["document_id"])
+            self.rows.setdefault(key, {}).update(request._doc["$set"])
+
+    def find(self, query, projection=None):
+        document_ids = query["document_id"]["$in"]
+        return FakeCursor(
+            row
+            for (ingestion_id, document_id), row in self.rows.items()
+            if ingestion_id == query["ingestion_id"] and document_id in document_ids
+        )
+
+
+def test_bulk_upsert_and_fetch():
+    collection = FakeDocumentsCollection()
+    store = IngestionDocumentStore(collection)
+
+    async def run():
+        await store.upsert(
+            "ingestion",
+            {
+                "paper_1": IngestedDocument(date=UPDATED),
+                "paper_2": IngestedDocument(
+                    date=UPDATED, status=IngestionStatus.FAILED
+                ),
+            },
+        )
+        return await store.fetch("ingestion", ["paper_1", "paper_2", "paper_3"])
+
+    tracked = asyncio.run(run())
+
+    assert collection.bulk_writes == 1
+    assert set(tracked.keys()) == {"paper_1", "paper_2"}
+    # the aware date survives the round trip
+    assert tracked["paper_1"].is_ingested(UPDATED)
+    assert not tracked["paper_2"].is_ingested(UPDATED)
+    assert not tracked["paper_1"].is_ingested(UPDATED + datetime.timedelta(days=1))
+
+
+def test_legacy_documents_are_not_rewritten():
+    ingestion = Ingestion(
+        data={"keyword": "llm"},
+        pipeline="arxiv",
+        first_ingestion_date=UPDATED,
+        last_ingestion_run_date=UPDATED,
+        documents={"paper_1": {"date": UPDATED.isoformat()}},
+    )
+
+    assert "documents" not in ingestion.as_dict()
@@ -0,0 +1,133 @@
+import asyncio
+import os
+import pathlib
+
+from pydantic import BaseModel
+
+from core.context.composite_context import CompositeContext
+from core.context.global_context import GlobalContext
+from core.managers.job_lifecycle_manager import JobLifecycleManager, JobState
+from core.tasks.task import Task
+from core.tasks.task_dag import TaskDAG
+from core.tasks.types import Status
+
+os.environ["P6_LOAD_PERSIST_MODELS"] = "False"
+os.environ["P6_RUN_MODE"] = "TEST"
+
+os.chdir(os.path.join(pathlib.Path(__file__).parent, "../src"))
+global_context = GlobalContext.get_instance()
+
+
+class LifecycleTestTask(Task):
+    class InputModel(BaseModel):
+        value: int = 0
+
+    async def _process(self, context, data_in):
+        return data_in
+
+
+def test_lifecycle_states_and_ttl():
+    lifecycle = JobLifecycleManager(ttl=10.0, max_retained=10)
+
+    record = lifecycle.track("dag:job")
+    assert record.state == JobState.CREATED
+
+    lifecycle.set_status("dag:job", Status.RUNNING)
+    assert record.state == JobState.RUNNING
+    assert lifecycle.collect(now=record.last_access + 100) == []
+
+    lifecycle.set_status("dag:job", Status.IDLE)
+    assert record.state == JobState.RUNNING
+
+    lifecycle.set_status("dag:job", Status.ERROR, ValueError("boom"))
+    assert record.state == JobState.FINISHED
+    assert record.error == "boom"
+
+    assert lifecycle.collect(now=record.last_access + 1) == []
+    assert lifecycle.collect(now=record.last_access + 10) == ["dag:job"]
+
+    summary = lifecycle.expire("dag:job", {"label": "job"})
+    assert summary["state"] == "EXPIRED"
+    assert summary["status"] == "ERROR"
+    assert summary["label"] == "job"
+    assert "dag:job" not in lifecycle
+    assert lifecycle.get_summary("dag:job") == summary
+    assert lifecycle.stats()["states"]["EXPIRED"] == 1
+
+
+def test_lifecycle_lru():
+    lifecycle = JobLifecycleManager(ttl=-1, max_retained=2, max_summaries=2)
+
+    for index in range(4):
+        lifecycle.track(f"dag:{index}")
+
+    lifecycle.set_status("dag:0", Status.RUNNING)
+    lifecycle.touch("dag:1")
+
+    # dag:0 is running, dag:1 was used last
+    assert lifecycle.collect() == ["dag:2", "dag:3"]
+
+    for job_dag_id in ("dag:2", "dag:3", "dag:1"):
+        lifecycle.expire(job_dag_id)
+
+    assert lifecycle.get_summary("dag:2") is None
+    assert lifecycle.stats()["evictedUnfinished"] == 3
+
+
+def test_dag_manager_evicts_finished_jobs():
+    dag_manager = global_context.dag_manager
+    lifecycle = dag_manager.job_lifecycle
+
+    with TaskDAG(id="lifecycle_dag") as dag:
+        LifecycleTestTask(id="first") >> LifecycleTestTask(id="second")
+
+    jobs = [dag.clone() for _ in range(3)]
+
+    async def run_jobs():
+        for job in jobs:
+            await global_context.run_dag(
+                job, {}, context=CompositeContext(global_context)
+            )
+            dag_manager.get_memory(job.id)
+
+    asyncio.run(run_jobs())
+
+    for job in jobs:
+        assert lifecycle.get_record(job.id).state == JobState.FINISHED
+
+    assert dag_manager.job_stats()["retainedBytes"] > 0
+
+    evicted = dag_manager.evict_jobs(now=float("inf"))
+    assert set(job.id for job in jobs) <= set(evicted)
+
+    for job in jobs:
+        assert job.id not in dag_manager
+        assert not dag_manager.has_memory(job.id)
+        # evicted jobs are not cloned again from their parent
+        assert dag_manager.get(job.id) is None
+
+        summary = dag_manager.get_job_summary(job.id)
+        assert summary["state"] == "EXPIRED"
+        assert summary["status"] == "FINISHED"
+        assert summary["parentId"] == "lifecycle_dag"
+        assert summary["taskStatus"] == {"FINISHED": 2}
+
+    assert "lifecycle_dag" in dag_manager
+
+
+def test_dag_manager_sweeps_expired_jobs(monkeypatch):
+    dag_manager = global_context.dag_manager
+
+    with TaskDAG(id="lifecycle_sweep_dag") as dag:
+        LifecycleTestTask(id="first")
+
+    job = dag.clone()
+    dag_manager.job_status_changed(job.id, Status.FINISHED)
+    assert job.id in dag_manager
+
+    monkeypatch.setattr(dag_manager.job_lifecycle, "_ttl", 0.0)
+    monkeypatch.setattr(dag_manager, "_job_sweep_interval", 0.0)
+
+    assert dag_manager.get("lifecycle_sweep_dag") is dag
+    assert job.id not in dag_manager
+    assert dag_manager.get_job_summary(job.id)["status"] == "FINISHED"
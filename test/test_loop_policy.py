@@ -0,0 +1,119 @@
+import asyncio
+import os
+import pathlib
+
+from pydantic import BaseModel
+
+from core.context.composite_context import CompositeContext
+from core.context.global_context import GlobalContext
+from core.tasks.loop_policy import LoopPolicy
+from core.tasks.task import Task
+from core.tasks.task_dag import TaskDAG
+from core.tasks.task_node import TaskEdge
+from core.tasks.types import TaskEdgeKind
+
+os.environ["P6_LOAD_PERSIST_MODELS"] = "False"
+os.environ["P6_RUN_MODE"] = "TEST"
+
+os.chdir(os.path.join(pathlib.Path(__file__).parent, "../src"))
+global_context = GlobalContext.get_instance()
+
+
+class ItemsTask(Task):
+    class InputModel(BaseModel):
+        pass
+
+    def __init__(self, count: int = 8, **kwargs):
+        super().__init__(**kwargs)
+        self.count = count
+        self.produced = []
+
+    async def _generator_process(self, context, data_in):
+        for index in range(self.count):
+            self.produced.append(index)
+            yield {"index": index}
+
+
+class BodyTask(Task):
+    class InputModel(BaseModel):
+        index: int
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def _process(self, context, data_in):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        # later items finish first
+        await asyncio.sleep(0.01 * (8 - data_in["index"]))
+        self.in_flight -= 1
+
+        return {"index": data_in["index"], "body": True}
+
+
+class CollectTask(Task):
+    class InputModel(BaseModel):
+        index: int
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.received = []
+
+    async def _process(self, context, data_in):
+        self.received.append(data_in["index"])
+        return data_in
+
+
+def run_loop(max_in_flight: int, ordered: bool):
+    with TaskDAG(id=f"loop_policy_{max_in_flight}_{ordered}") as dag:
+        items = ItemsTask(id="items")
+        body = BodyTask(id="body")
+        collect = CollectTask(id="collect")
+
+        items >> body >> collect
+        dag.set_loop_policy(items, body, max_in_flight=max_in_flight, ordered=ordered)
+
+    asyncio.run(global_context.run_dag(dag, {}, CompositeContext(global_context)))
+
+    return items, body, collect, dag
+
+
+def test_window_bounds_in_flight_iterations():
+    items, body, collect, dag = run_loop(3, ordered=False)
+
+    assert body.max_in_flight == 3
+    assert sorted(collect.received) == list(range(8))
+    assert dag.loop_windows_stats()["items::body"]["maxInFlight"] == 3
+
+
+def test_ordered_window():
+    items, body, collect, dag = run_loop(4, ordered=True)
+
+    assert body.max_in_flight == 4
+    assert collect.received == list(range(8))
+
+
+def test_default_policy_runs_one_iteration_at_a_time():
+    with TaskDAG(id="loop_policy_default") as dag:
+        items = ItemsTask(id="items")
+        body = BodyTask(id="body")
+        collect = CollectTask(id="collect")
+
+        items >> body >> collect
+
+    asyncio.run(global_context.run_dag(dag, {}, CompositeContext(global_context)))
+
+    assert body.max_in_flight == 1
+    assert collect.received == list(range(8))
+
+
+def test_edge_policy_serialization():
+    edge = TaskEdge("items", "body", TaskEdgeKind.LOOP, LoopPolicy(4, True))
+
+    restored = TaskEdge.deserialize(edge.serialize())
+
+    assert restored.loop_policy.max_in_flight == 4
+    assert restored.loop_policy.ordered
+    assert TaskEdge.deserialize(TaskEdge("a", "b").serialize()).loop_policy is None
@@ -0,0 +1,131 @@
+import asyncio
+import os
+import pathlib
+import threading
+import time
+
+from core.callbacks.callback_handler import CallbackHandler
+from core.callbacks.dag_execution_memory import DagExecutionMemory
+from core.context.composite_context import CompositeContext
+from core.context.global_context import GlobalContext
+from core.managers.memory_flush_manager import MemoryFlushManager
+from core.tasks.task import Task
+from core.tasks.task_dag import TaskDAG
+from core.tasks.types import Status
+
+os.environ["P6_LOAD_PERSIST_MODELS"] = "False"
+os.environ["P6_RUN_MODE"] = "TEST"
+
+os.chdir(os.path.join(pathlib.Path(__file__).parent, "../src"))
+global_context = GlobalContext.get_instance()
+
+
+class RoomHandler(CallbackHandler):
+    EVENTS = frozenset({"ws", "ws_dag_room"})
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.pushes = []
+        self.threads = set()
+
+    async def on_handled_event(
+        self, context, sender, event, payload, raw_payload=False
+    ):
+        if event == "ws_dag_room":
+            self.pushes.append(payload)
+            self.threads.add(threading.current_thread().name)
+        return True
+
+
+class NoopTask(Task):
+    async def _process(self, context, data_in):
+        return data_in
+
+
+def subscribed_memory(dag, flush_manager):
+    memory = DagExecutionMemory(dag.id, flush_manager=flush_manager)
+    handler = RoomHandler()
+
+    context = CompositeContext(global_context)
+    context.create_local_context(callbacks=[memory, handler])
+
+    return memory, handler, context
+
+
+def test_changes_are_sent_once_per_flush():
+    with TaskDAG(id="memory_flush_delta") as dag:
+        task = NoopTask(id="task")
+
+    flush_manager = MemoryFlushManager(interval=60)
+    memory, handler, context = subscribed_memory(dag, flush_manager)
+
+    async def send():
+        await context.event(dag, "subscription", {})
+        await context.event(task, "data", {"loss": 0.5})
+        await context.event(task, "data", {"loss": 0.4})
+        await context.event(task, "stream", {"logs": ([1], False)})
+        await context.event(task, "stream", {"logs": ([2], False)})
+        await context.event(dag, "progress", {"progress": 0.5})
+
+        assert flush_manager.dirty_count == 1
+        assert await flush_manager.flush() == 1
+
+        await context.event(task, "data", {"loss": 0.4})
+        assert await flush_manager.flush() == 0
+
+        await context.event(dag, "status", {"status": Status.FINISHED})
+        assert await flush_manager.flush() == 1
+
+    try:
+        asyncio.run(send())
+    finally:
+        flush_manager.shutdown()
+
+    first, second = handler.pushes
+    assert first["dagProgress"] == {dag.id: 0.5}
+    assert {"task": task.full_id, "id": "loss", "data": 0.4} in first["values"]
+    assert [value["stream"] for value in first["values"] if "stream" in value] == [
+        [1, 2]
+    ]
+    assert second == {
+        "dagStatus": {dag.id: "FINISHED"},
+        "dagError": {dag.id: ""},
+        "seq": first["seq"] + 1,
+    }
+
+    stats = flush_manager.stats()
+    assert stats["flushes"] >= 3
+    assert stats["sent"] == 2
+    assert stats["maxBytes"] > 0
+    assert stats["maxLatency"] >= stats["meanLatency"] > 0
+
+
+def test_one_flush_thread_serves_all_memories():
+    flush_manager = MemoryFlushManager(interval=0.05)
+    handlers = []
+
+    async def send(index):
+        with TaskDAG(id=f"memory_flush_shared_{index}") as dag:
+            task = NoopTask(id="task")
+
+        _, handler, context = subscribed_memory(dag, flush_manager)
+        handlers.append(handler)
+
+        await context.event(dag, "subscription", {})
+        await context.event(task, "data", {"value": index})
+
+    try:
+        for index in range(3):
+            asyncio.run(send(index))
+
+        deadline = time.monotonic() + 5
+        while not all(handler.pushes for handler in handlers):
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+    finally:
+        flush_manager.shutdown()
+
+    assert {thread for handler in handlers for thread in handler.threads} == {
+        "memory-flush"
+    }
+    assert not flush_manager.stats()["running"]
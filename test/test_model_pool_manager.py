@@ -0,0 +1,85 @@
+import threading
+import time
+
+import pytest
+
+from core.managers.model_pool_manager import MB, ModelPool, ModelPoolManager
+
+
+def test_parse_budgets():
+    assert ModelPoolManager.parse_budgets("llamacpp=4096; pipelines=512") == {
+        "llamacpp": 4096 * MB,
+        "pipelines": 512 * MB,
+    }
+    assert ModelPoolManager.parse_budgets(None) == {}
+
+    with pytest.raises(ValueError):
+        ModelPoolManager.parse_budgets("4096")
+
+
+def test_concurrent_leases_load_once():
+    pool = ModelPool("test", memory_budget=100)
+    load_count = 0
+
+    def loader():
+        nonlocal load_count
+        load_count += 1
+        time.sleep(0.05)
+        return object()
+
+    values = []
+
+    def use():
+        with pool.lease("model", loader, 10) as entry:
+            values.append(entry.value)
+
+    threads = [threading.Thread(target=use) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert load_count == 1
+    assert len(set(map(id, values))) == 1
+
+    stats = pool.stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 7
+    assert stats["models"][0]["uses"] == 8
+
+
+def test_lru_eviction_within_budget():
+    unloaded = []
+    pool = ModelPool("test", memory_budget=20, unload=unloaded.append)
+
+    pool.warm_up("a", lambda: "A", 10)
+    pool.warm_up("b", lambda: "B", 10)
+
+    with pool.lease("a", lambda: "A", 10):
+        # b is the least recently used one
+        pool.warm_up("c", lambda: "C", 10)
+
+        assert unloaded == ["B"]
+
+        # a is leased, c is evicted instead
+        pool.warm_up("d", lambda: "D", 10)
+        assert unloaded == ["B", "C"]
+        assert "a" in pool
+
+    assert pool.retained_size == 20
+    assert pool.stats()["evictions"] == 2
+
+
+def test_failed_load_is_retried():
+    pool = ModelPool("test", memory_budget=100)
+
+    def failing_loader():
+        raise RuntimeError("missing weights")
+
+    with pytest.raises(RuntimeError):
+        pool.warm_up("model", failing_loader)
+
+    pool.warm_up("model", lambda: "loaded", lambda value: len(value))
+
+    assert pool.stats()["loadErrors"] == 1
+    assert pool.retained_size == 6
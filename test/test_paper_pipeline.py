@@ -0,0 +1,132 @@
+import asyncio
+import os
+import pathlib
+
+import pytest
+
+from applications.arxiv import paper_pipeline as paper_pipeline_module
+from applications.arxiv.paper_pipeline import PaperPipeline, paper_pipeline
+from misc.asyncio import run_managed
+
+os.environ["P6_LOAD_PERSIST_MODELS"] = "False"
+os.environ["P6_RUN_MODE"] = "TEST"
+
+os.chdir(os.path.join(pathlib.Path(__file__).parent, "../src"))
+
+
+class FakeStages:
+    def __init__(self):
+        self.active_downloads = 0
+        self.max_active_downloads = 0
+        self.paths = set()
+        self.batches = []
+
+    async def download(self, job):
+        self.active_downloads += 1
+        self.max_active_downloads = max(
+            self.max_active_downloads, self.active_downloads
+        )
+        try:
+            await asyncio.sleep(0.02)
+            if job.doc_id == "broken":
+                raise IOError("404")
+            with open(job.path, "w") as file:
+                file.write(job.doc_id)
+            self.paths.add(job.path)
+        finally:
+            self.active_downloads -= 1
+
+    @staticmethod
+    def parse(path, metadata):
+        with open(path) as file:
+            return [(file.read(), dict(metadata))]
+
+    def index(self, index, jobs):
+        self.batches.append([job.doc_id for job in jobs])
+
+
+def test_pipeline_stages(tmp_path):
+    stages = FakeStages()
+    pipeline = PaperPipeline(
+        download_concurrency=3,
+        batch_size=4,
+        batch_wait=0.2,
+        download_folder=str(tmp_path),
+        download=stages.download,
+        parse=stages.parse,
+        index=stages.index,
+    )
+
+    async def run():
+        futures = [
+            await pipeline.submit(f"http://pdf/{doc_id}", doc_id, {}, "", "index")
+            for doc_id in [*(f"paper_{index}" for index in range(8)), "broken"]
+        ]
+        results = await asyncio.gather(*futures, return_exceptions=True)
+        stats = pipeline.stats()
+        await pipeline.close()
+        return results, stats
+
+    results, stats = asyncio.run(run())
+
+    assert results[:8] == [None] * 8
+    assert isinstance(results[8], IOError)
+
+    # every paper has its own folder, removed once parsed
+    assert len({os.path.dirname(path) for path in stages.paths}) == 8
+    assert list(tmp_path.iterdir()) == []
+
+    assert stages.max_active_downloads == 3
+    assert sorted(sum(stages.batches, [])) == [f"paper_{index}" for index in range(8)]
+    assert max(len(batch) for batch in stages.batches) == 4
+    assert len(stages.batches) < 8
+
+    assert stats["download"]["completed"] == 8
+    assert stats["download"]["errors"] == 1
+    assert stats["index"]["completed"] == 8
+    assert stats["index"]["papersPerMinute"] > 0
+
+
+def test_index_failure_fails_the_batch(tmp_path):
+    stages = FakeStages()
+
+    def failing_index(index, jobs):
+        raise RuntimeError("elasticsearch is down")
+
+    pipeline = PaperPipeline(
+        batch_wait=0.05,
+        download_folder=str(tmp_path),
+        download=stages.download,
+        parse=stages.parse,
+        index=failing_index,
+    )
+
+    async def run():
+        done = await pipeline.submit("http://pdf/paper", "paper", {}, "", "index")
+        try:
+            with pytest.raises(RuntimeError):
+                await done
+        finally:
+            await pipeline.close()
+
+    asyncio.run(run())
+
+
+def test_shared_pipeline_is_closed_with_its_loop(monkeypatch):
+    closed = []
+
+    async def close(self):
+        closed.append(self)
+
+    monkeypatch.setattr(PaperPipeline, "close", close)
+
+    async def run():
+        assert paper_pipeline() is paper_pipeline()
+        return paper_pipeline()
+
+    first = run_managed(run())
+    second = run_managed(run())
+
+    assert first is not second
+    assert closed == [first, second]
+    assert not paper_pipeline_module._pipelines
@@ -0,0 +1,83 @@
+import os
+import pathlib
+
+os.environ["P6_LOAD_PERSIST_MODELS"] = "False"
+os.environ["P6_RUN_MODE"] = "TEST"
+os.chdir(os.path.join(pathlib.Path(__file__).parent, "../src"))
+
+from applications.huggingface import pipeline_registry
+from applications.huggingface.pipeline_registry import (
+    TRANSFORMERS_POOL,
+    lease_pipeline,
+    pipeline_key,
+    preload_pipelines,
+)
+from conf import Config
+from core.context.global_context import GlobalContext
+
+
+def test_pipeline_key(tmp_path):
+    assert pipeline_key("text-classification", "bert", top_k=2, device=0) == (
+        pipeline_key("text-classification", "bert", device=0, top_k=2)
+    )
+    assert pipeline_key("text-classification", "bert") != pipeline_key(
+        "zero-shot-classification", "bert"
+    )
+
+    # a retrained local model gets a new key
+    key = pipeline_key("text-classification", str(tmp_path))
+    os.utime(tmp_path, (0, 0))
+    assert pipeline_key("text-classification", str(tmp_path)) != key
+
+    # saving a model again overwrites its weights and config, which doesn't
+    # change the mtime of the folder
+    weights = tmp_path / "model.safetensors"
+    config = tmp_path / "config.json"
+    for path in (weights, config):
+        path.write_bytes(b"0")
+        os.utime(path, (0, 0))
+    os.utime(tmp_path, (0, 0))
+    key = pipeline_key("text-classification", str(tmp_path))
+
+    # the files are only walked again when the folder or the config change
+    os.utime(weights, (1, 1))
+    assert pipeline_key("text-classification", str(tmp_path)) == key
+
+    weights.write_bytes(b"1")
+    config.write_bytes(b"1")
+    os.utime(tmp_path, (0, 0))
+    assert pipeline_key("text-classification", str(tmp_path)) != key
+
+
+def test_lease_and_preload(monkeypatch):
+    global_context = GlobalContext.get_instance()
+    pool = global_context.model_pool_manager.pool(TRANSFORMERS_POOL)
+    pool.clear()
+
+    built = []
+
+    def build_pipeline(task, model, **options):
+        built.append((task, model))
+        return object()
+
+    monkeypatch.setattr(pipeline_registry, "_build_pipeline", build_pipeline)
+    monkeypatch.setitem(
+        Config().final_var,
+        "TRANSFORMERS_PRELOAD",
+        "zero-shot-classification=bart; keybert=minilm",
+    )
+
+    preload_pipelines(global_context)
+    with lease_pipeline("zero-shot-classification", "bart") as first:
+        pass
+    with lease_pipeline("zero-shot-classification", "bart") as second:
+        pass
+
+    assert first.value is second.value
+    assert built == [("zero-shot-classification", "bart"), ("keybert", "minilm")]
+
+    stats = pool.stats()
+    assert stats["misses"] >= 2
+    assert stats["hits"] >= 2
+
+    pool.clear()
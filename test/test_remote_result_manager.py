@@ -0,0 +1,85 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from core.managers.local_remote_broker import LocalRemoteBroker
+from core.managers.remote_result_manager import RemoteResultManager, RemoteTaskError
+
+
+def test_many_outstanding_remote_calls():
+    manager = RemoteResultManager(poll_interval=0)
+    broker = LocalRemoteBroker(manager, max_workers=4)
+
+    @broker.register("worker.run_task")
+    def run_task(value: int):
+        time.sleep(0.01)
+        return {"value": value * 2}
+
+    async def call(value: int):
+        task_id = f"task-{value}"
+        future = manager.register(task_id)
+        result = broker.send_task("worker.run_task", [value], task_id=task_id)
+        return await manager.wait(task_id, future=future, remote_result=result)
+
+    async def main():
+        thread_count = threading.active_count()
+        calls = asyncio.gather(*(call(value) for value in range(50)))
+        await asyncio.sleep(0.01)
+        # outstanding calls don't hold a thread each
+        assert threading.active_count() <= thread_count + 4
+        return await calls
+
+    results = asyncio.run(main())
+    broker.shutdown()
+
+    assert results == [{"value": value * 2} for value in range(50)]
+    assert manager.outstanding == 0
+    assert manager.stats()["notified"] == 50
+
+
+def test_remote_error():
+    manager = RemoteResultManager(poll_interval=0)
+    broker = LocalRemoteBroker(manager)
+
+    @broker.register("worker.run_task")
+    def run_task():
+        raise ValueError("boom")
+
+    async def main():
+        future = manager.register("failing")
+        result = broker.send_task("worker.run_task", task_id="failing")
+        await manager.wait("failing", future=future, remote_result=result)
+
+    with pytest.raises(RemoteTaskError):
+        asyncio.run(main())
+
+    broker.shutdown()
+
+
+def test_lost_notification_falls_back_to_polling():
+    manager = RemoteResultManager(poll_interval=0.01)
+    broker = LocalRemoteBroker(manager, notify=False)
+
+    @broker.register("worker.run_task")
+    def run_task():
+        return {"ok": True}
+
+    async def main():
+        future = manager.register("lost")
+        result = broker.send_task("worker.run_task", task_id="lost")
+        return await manager.wait(
+            "lost", future=future, remote_result=result, timeout=5
+        )
+
+    assert asyncio.run(main()) == {"ok": True}
+    assert manager.stats()["polled"] == 1
+    broker.shutdown()
+
+
+def test_unknown_notification():
+    manager = RemoteResultManager()
+
+    assert not manager.notify("unknown", result={})
+    assert manager.stats()["unknown"] == 1
@@ -0,0 +1,80 @@
+import asyncio
+import os
+import pathlib
+
+from pydantic import BaseModel
+
+from core.context.composite_context import CompositeContext
+from core.context.global_context import GlobalContext
+from core.managers.local_remote_broker import LocalRemoteBroker
+from core.managers.remote_result_manager import RemoteResultManager
+from core.tasks.remote_task_wrapper import RemoteTaskWrapper
+from core.tasks.task import Task
+from core.tasks.task_dag import TaskDAG
+
+os.environ["P6_LOAD_PERSIST_MODELS"] = "False"
+os.environ["P6_RUN_MODE"] = "TEST"
+
+os.chdir(os.path.join(pathlib.Path(__file__).parent, "../src"))
+global_context = GlobalContext.get_instance()
+
+
+class DoubleTask(Task):
+    class InputModel(BaseModel):
+        value: int = 0
+
+    async def _process(self, context, data_in):
+        return {"value": data_in["value"] * 2}
+
+
+class SinkTask(Task):
+    class InputModel(BaseModel):
+        pass
+
+    def __init__(self, received: list, **kwargs):
+        super().__init__(**kwargs)
+        self.received = received
+
+    async def _process(self, context, data_in):
+        self.received.append(dict(data_in))
+        return data_in
+
+
+def test_remote_task_runs_on_a_worker(monkeypatch):
+    result_manager = RemoteResultManager(poll_interval=30)
+    broker = LocalRemoteBroker(result_manager, queues=("gpu",))
+    calls = []
+
+    @broker.register("worker.run_task")
+    def run_task(task, context, data_in):
+        calls.append((task, context, data_in))
+        return {"value": data_in["value"] * 2, "remote": True}
+
+    monkeypatch.setattr(global_context, "celery", broker)
+    monkeypatch.setattr(global_context, "_remote_result_manager", result_manager)
+
+    received = []
+    with TaskDAG(id="remote_wrapper") as dag:
+        remote = RemoteTaskWrapper(
+            DoubleTask(id="double", _register_task=False), worker_tag="gpu"
+        )
+        sink = SinkTask(received, id="sink")
+
+        remote >> sink
+
+    try:
+        asyncio.run(
+            global_context.run_dag(dag, {"value": 21}, CompositeContext(global_context))
+        )
+    finally:
+        broker.shutdown()
+
+    assert remote.id == "double"
+    assert received == [{"value": 42, "remote": True}]
+
+    ((task, _, data_in),) = calls
+    assert task["_meta"]["class"] == "DoubleTask"
+    assert data_in == {"value": 21}
+    assert [sent["queue"] for sent in broker.sent.values()] == ["gpu"]
+    assert result_manager.outstanding == 0
+    assert result_manager.stats()["notified"] == 1
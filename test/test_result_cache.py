@@ -0,0 +1,164 @@
+import asyncio
+import os
+import pathlib
+import time
+
+import pytest
+from pydantic import BaseModel
+
+from core.context.composite_context import CompositeContext
+from core.context.global_context import GlobalContext
+from core.managers.result_cache_manager import (
+    DiskResultCache,
+    MemoryResultCache,
+    ResultCacheManager,
+    result_cache_key,
+)
+from core.tasks.task import Task
+from core.tasks.task_dag import TaskDAG
+
+os.environ["P6_LOAD_PERSIST_MODELS"] = "False"
+os.environ["P6_RUN_MODE"] = "TEST"
+
+os.chdir(os.path.join(pathlib.Path(__file__).parent, "../src"))
+global_context = GlobalContext.get_instance()
+
+
+class SquareTask(Task):
+    RESULT_CACHE = "memory"
+
+    class InputModel(BaseModel):
+        value: int
+
+    calls = 0
+    hits = 0
+
+    async def _process(self, context, data_in):
+        SquareTask.calls += 1
+        return {"value": data_in["value"], "squared": data_in["value"] ** 2}
+
+    async def result_cache_hit(self, context, data_in, data_out):
+        SquareTask.hits += 1
+
+
+class SinkTask(Task):
+    class InputModel(BaseModel):
+        squared: int
+
+    received = []
+
+    async def _process(self, context, data_in):
+        SinkTask.received.append(dict(data_in))
+        return data_in
+
+
+class Unhashable:
+    pass
+
+
+@pytest.fixture
+def result_cache(monkeypatch):
+    manager = ResultCacheManager(backends={"memory": MemoryResultCache()})
+    monkeypatch.setattr(global_context, "_result_cache_manager", manager)
+    SquareTask.calls = 0
+    SquareTask.hits = 0
+
+    return manager
+
+
+def run_square(value, **params):
+    with TaskDAG(id="result_cache") as dag:
+        SquareTask(id="square", **params) >> SinkTask(id="sink")
+
+    SinkTask.received = []
+    context = CompositeContext(global_context)
+    asyncio.run(global_context.run_dag(dag, {"value": value}, context))
+
+    return SinkTask.received[-1]
+
+
+def test_results_are_memoized(result_cache):
+    assert run_square(3)["squared"] == 9
+    assert run_square(3)["squared"] == 9
+    assert run_square(4)["squared"] == 16
+
+    assert SquareTask.calls == 2
+    assert SquareTask.hits == 1
+
+    (stats,) = result_cache.stats()["tasks"]
+    assert stats["task"] == "SquareTask"
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["hitRate"] == pytest.approx(1 / 3)
+
+
+def test_params_are_part_of_the_key(result_cache):
+    run_square(3, label="a")
+    run_square(3, label="b")
+
+    assert SquareTask.calls == 2
+
+
+def test_task_cache_can_be_disabled(monkeypatch):
+    manager = ResultCacheManager(
+        ResultCacheManager.parse_task_caches("SquareTask=none"),
+        backends={"memory": MemoryResultCache()},
+    )
+    monkeypatch.setattr(global_context, "_result_cache_manager", manager)
+    SquareTask.calls = 0
+
+    run_square(3)
+    run_square(3)
+
+    assert SquareTask.calls == 2
+
+
+def test_key_is_canonical():
+    with TaskDAG(id="result_cache_key"):
+        task = SquareTask(id="square")
+
+    assert result_cache_key(task, {"a": 1, "b": [1, 2]}) == result_cache_key(
+        task, {"b": [1, 2], "a": 1}
+    )
+    assert result_cache_key(task, {"a": 1}) != result_cache_key(task, {"a": 2})
+
+    with pytest.raises(TypeError):
+        result_cache_key(task, {"a": Unhashable()})
+
+
+def test_memory_cache_lru_and_ttl():
+    cache = MemoryResultCache(max_entries=2)
+
+    cache.set("a", b"1", None)
+    cache.set("b", b"2", None)
+    cache.get("a")
+    cache.set("c", b"3", None)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1"
+    assert cache.stats()["evictions"] == 1
+
+    cache.set("d", b"4", 0.01)
+    time.sleep(0.02)
+    assert cache.get("d") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_disk_cache_is_bounded(tmp_path):
+    cache = DiskResultCache(str(tmp_path), max_bytes=600)
+
+    for index in range(5):
+        cache.set(f"{index:02d}key", b"x" * 200, None)
+        time.sleep(0.01)
+
+    assert cache.get("04key") == b"x" * 200
+    assert cache.get("00key") is None
+    # evicted down to the low water mark, the next write doesn't evict
+    assert cache.stats()["bytes"] <= 540
+    evictions = cache.stats()["evictions"]
+    cache.set("05key", b"x" * 10, None)
+    assert cache.stats()["evictions"] == evictions
+
+    cache.set("ttlkey", b"y", 0.01)
+    time.sleep(0.02)
+    assert cache.get("ttlkey") is None
@@ -0,0 +1,96 @@
+import json
+import os
+import pathlib
+import time
+
+from core.callbacks.dag_execution_memory import ExecutionMemoryBuffer
+from core.callbacks.stream_store import FileStreamSpill, StreamPolicy, TaskStream
+
+os.environ["P6_LOAD_PERSIST_MODELS"] = "False"
+os.environ["P6_RUN_MODE"] = "TEST"
+
+os.chdir(os.path.join(pathlib.Path(__file__).parent, "../src"))
+
+
+def test_text_stream():
+    stream = TaskStream("dag/task/answer", max_items=8)
+
+    stream.append("Hello")
+    stream.append(" world")
+    assert stream.value() == "lo world"
+    assert stream.dropped == 3
+    assert stream.reset
+
+    stream.append("again", reset=True)
+    assert stream.value() == "again"
+    assert stream.dropped == 0
+    assert stream.reset
+
+
+def test_ring_stream_spills_dropped_chunks(tmp_path):
+    spill = FileStreamSpill(str(tmp_path))
+    stream = TaskStream("dag/task/logs", max_items=5, spill=spill)
+
+    for index in range(4):
+        stream.append([[index, index], [index, -index]])
+
+    assert stream.value() == [
+        [1, -1],
+        [2, 2],
+        [2, -2],
+        [3, 3],
+        [3, -3],
+    ]
+    assert stream.reset
+    assert stream.dropped == 3
+
+    with open(spill.path_for("dag/task/logs"), encoding="utf-8") as file:
+        spilled = [json.loads(line) for line in file]
+
+    assert spilled == [[[0, 0]], [[0, 0]], [[1, 1]]]
+
+
+def test_downsampled_stream():
+    stream = TaskStream("dag/task/loss", max_items=10, policy=StreamPolicy.DOWNSAMPLE)
+
+    for index in range(100):
+        stream.append([index])
+
+    values = stream.value()
+    assert len(values) <= 10
+    assert stream.stride == 16
+    assert values == list(range(0, 100, 16))
+
+    stream.append(list(range(100, 140)))
+    assert stream.value() == list(range(0, 140, 16))
+
+
+def test_append_is_linear():
+    stream = TaskStream("dag/task/steps", max_items=1000)
+
+    start = time.perf_counter()
+    for index in range(200000):
+        stream.append([index])
+    elapsed = time.perf_counter() - start
+
+    assert stream.size == 1000
+    assert stream.value()[0] == 199000
+    assert elapsed < 5
+
+
+def test_buffer_payload():
+    buffer = ExecutionMemoryBuffer("dag", max_stream_items=4)
+
+    buffer.add_task_stream("dag::task", "answer", "abc", False)
+    buffer.add_task_stream("dag::task", "answer", "de", False)
+
+    assert buffer.as_payload()["values"] == [
+        {"task": "dag::task", "id": "answer", "stream": "bcde", "reset": True}
+    ]
+
+    buffer.clear()
+    buffer.add_task_stream("dag::task", "answer", "f", False)
+
+    assert buffer.as_payload()["values"] == [
+        {"task": "dag::task", "id": "answer", "stream": "f", "reset": False}
+    ]
@@ -0,0 +1,148 @@
+import asyncio
+import os
+import pathlib
+
+import pytest
+from pydantic import BaseModel
+
+from core.callbacks.callback_handler import CallbackHandler
+from core.context.composite_context import CompositeContext
+from core.context.global_context import GlobalContext
+from core.context.telemetry_channel import (
+    TelemetryChannel,
+    parse_telemetry_events,
+    telemetry_stats,
+)
+from core.tasks.task import Task
+from core.tasks.task_dag import TaskDAG
+from core.tasks.types import Status
+
+os.environ["P6_LOAD_PERSIST_MODELS"] = "False"
+os.environ["P6_RUN_MODE"] = "TEST"
+
+os.chdir(os.path.join(pathlib.Path(__file__).parent, "../src"))
+global_context = GlobalContext.get_instance()
+
+POLICIES = parse_telemetry_events(
+    "progress=last:10;data=merge:10;stream=batch:10;metrics=summary:10"
+)
+
+
+class RecordingHandler(CallbackHandler):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.received = []
+
+    async def on_handled_event(
+        self, context, sender, event, payload, raw_payload=False
+    ):
+        self.received.append((event, payload))
+        return False
+
+
+class LoopTask(Task):
+    class InputModel(BaseModel):
+        pass
+
+    async def _process(self, context, data_in):
+        for step in range(100):
+            await context.event(self, "data", {"step": step})
+            await context.event(self, "metrics", {"loss": float(step)})
+        return data_in
+
+
+def recording_context():
+    handler = RecordingHandler()
+    context = CompositeContext(global_context)
+    context.create_local_context(callbacks=[handler])
+
+    return context, handler
+
+
+def test_parse_telemetry_events():
+    assert POLICIES["progress"] == ("last", 10.0)
+    assert parse_telemetry_events("none") == {}
+    assert parse_telemetry_events(None)["stream"][0] == "batch"
+
+    with pytest.raises(ValueError):
+        parse_telemetry_events("progress=average:1")
+
+
+def test_events_are_coalesced_until_flushed():
+    with TaskDAG(id="telemetry_coalesce"):
+        task = LoopTask(id="task")
+
+    context, handler = recording_context()
+    channel = TelemetryChannel(context, POLICIES)
+    context.set_telemetry(channel)
+
+    async def send():
+        for step in range(10):
+            await context.event(task, "progress", {"progress": step / 10})
+            await context.event(task, "data", {f"key_{step % 2}": step})
+            await context.event(task, "stream", {"logs": ([step], step == 0)})
+            await context.event(task, "metrics", {"loss": float(step), "tag": "a"})
+        assert handler.received == []
+        await channel.close()
+
+    asyncio.run(send())
+
+    received = dict(
+        (event, payload) for event, payload in handler.received if event != "data"
+    )
+    data = [payload for event, payload in handler.received if event == "data"]
+
+    assert received["progress"] == {"progress": 0.9}
+    assert received["stream"] == {"logs": (list(range(10)), True)}
+    assert {"key_0": 8, "key_1": 9} in data
+    assert {
+        "loss": {"count": 10, "mean": 4.5, "min": 0.0, "max": 9.0, "last": 9.0},
+        "tag": "a",
+    } in data
+    assert len(handler.received) == 4
+    assert telemetry_stats()["progress"]["received"] >= 10
+
+
+def test_other_events_flush_the_pending_ones_first():
+    with TaskDAG(id="telemetry_order") as dag:
+        task = LoopTask(id="task")
+
+    context, handler = recording_context()
+    context.set_telemetry(TelemetryChannel(context, POLICIES))
+
+    async def send():
+        await context.event(task, "data", {"value": 1})
+        await context.event(task, "stream", {"logs": ("a", False)})
+        await context.event(task, "stream", {"logs": (["b"], False)})
+        await context.event(task, "status", {"status": Status.FINISHED})
+        await context.event(task, "progress", {"progress": 1.0})
+        await context.event(dag, "status", {"status": Status.FINISHED})
+
+    asyncio.run(send())
+
+    assert [event for event, _ in handler.received] == [
+        "data",
+        "stream",
+        "stream",
+        "status",
+        "progress",
+        "status",
+    ]
+
+
+def test_dag_runs_send_coalesced_telemetry(monkeypatch):
+    monkeypatch.setattr(global_context, "_telemetry_events", POLICIES)
+
+    with TaskDAG(id="telemetry_run") as dag:
+        LoopTask(id="task")
+
+    context, handler = recording_context()
+    asyncio.run(global_context.run_dag(dag, {}, context))
+
+    events = [event for event, _ in handler.received]
+    data = [payload for event, payload in handler.received if event == "data"]
+
+    assert events.count("data") == 2
+    assert {"step": 99} in data
+    assert context.telemetry is None
+    assert handler.received[-1][1]["status"] == Status.FINISHED